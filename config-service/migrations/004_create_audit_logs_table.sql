@@ -0,0 +1,17 @@
+-- Create audit logs table (same shape as the .NET service's audit_logs)
+CREATE TABLE IF NOT EXISTS audit_logs (
+    id VARCHAR(26) PRIMARY KEY,  -- ULID format
+    user_id VARCHAR(26),
+    action VARCHAR(100) NOT NULL,
+    resource VARCHAR(100) NOT NULL,
+    ip_address INET,
+    user_agent TEXT,
+    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    status_code INTEGER,
+    details TEXT
+);
+
+-- Create indexes for faster queries
+CREATE INDEX IF NOT EXISTS idx_audit_logs_user_id ON audit_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_timestamp ON audit_logs(timestamp);
+CREATE INDEX IF NOT EXISTS idx_audit_logs_action ON audit_logs(action);
@@ -0,0 +1,5 @@
+-- Layered configurations: a configuration overlays the resolved result of its parents, in order
+ALTER TABLE configurations ADD COLUMN IF NOT EXISTS parent_ids VARCHAR(26)[] NOT NULL DEFAULT '{}';
+
+-- Find the children of a configuration when it changes
+CREATE INDEX IF NOT EXISTS idx_configurations_parent_ids ON configurations USING GIN(parent_ids);
@@ -0,0 +1,4 @@
+-- Row versions for optimistic concurrency: every UPDATE increments version and
+-- conditional updates (If-Match) compare it in the WHERE clause
+ALTER TABLE applications ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+ALTER TABLE configurations ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
@@ -0,0 +1,26 @@
+-- Background jobs: any replica's worker claims pending rows with FOR UPDATE SKIP LOCKED
+-- and holds them under a lease (locked_until) that it renews while the job runs
+CREATE TABLE IF NOT EXISTS jobs (
+    id VARCHAR(26) PRIMARY KEY,  -- ULID format
+    kind VARCHAR(100) NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status VARCHAR(16) NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'completed', 'failed', 'cancelled')),
+    progress JSONB NOT NULL DEFAULT '{}',
+    result JSONB,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 3,
+    cancel_requested BOOLEAN NOT NULL DEFAULT FALSE,
+    run_after TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    locked_by VARCHAR(100),
+    locked_until TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+-- Claiming scans only runnable jobs and expired leases, never the finished history
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON jobs(run_after) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(locked_until) WHERE status = 'running';
+CREATE INDEX IF NOT EXISTS idx_jobs_finished_at ON jobs(finished_at) WHERE finished_at IS NOT NULL;
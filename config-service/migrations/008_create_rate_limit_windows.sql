@@ -0,0 +1,8 @@
+-- Cluster-wide request counts per client and fixed window, for the postgres rate limit backend.
+-- UNLOGGED: counts are worthless after a crash and skipping WAL keeps the per-second upserts cheap
+CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_windows (
+    client_key VARCHAR(100) NOT NULL,
+    window_start BIGINT NOT NULL,  -- epoch seconds divided by the window length
+    count INTEGER NOT NULL,
+    PRIMARY KEY (client_key, window_start)
+);
@@ -0,0 +1,58 @@
+-- Change feed: rows changed since a (updated_at, id) cursor, plus tombstones for deletes
+
+-- Stamp updated_at from the database clock so the feed orders changes by one clock
+-- whichever replica wrote them
+CREATE OR REPLACE FUNCTION stamp_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at := LOCALTIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_applications_updated_at ON applications;
+CREATE TRIGGER trg_applications_updated_at
+    BEFORE INSERT OR UPDATE ON applications
+    FOR EACH ROW EXECUTE FUNCTION stamp_updated_at();
+
+DROP TRIGGER IF EXISTS trg_configurations_updated_at ON configurations;
+CREATE TRIGGER trg_configurations_updated_at
+    BEFORE INSERT OR UPDATE ON configurations
+    FOR EACH ROW EXECUTE FUNCTION stamp_updated_at();
+
+-- Row-value comparisons (updated_at, id) > (%s, %s) walk these indexes from the cursor
+CREATE INDEX IF NOT EXISTS idx_applications_updated_at_id ON applications(updated_at, id);
+CREATE INDEX IF NOT EXISTS idx_configurations_updated_at_id ON configurations(updated_at, id);
+
+CREATE TABLE IF NOT EXISTS tombstones (
+    kind VARCHAR(16) NOT NULL,  -- application or configuration
+    id VARCHAR(26) NOT NULL,  -- ULID of the deleted row
+    application_id VARCHAR(26) NOT NULL,
+    deleted_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP,
+    PRIMARY KEY (kind, id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_tombstones_deleted_at_id ON tombstones(deleted_at, id);
+
+-- Every delete path (single, bulk, ON DELETE CASCADE) leaves a tombstone
+CREATE OR REPLACE FUNCTION record_tombstone() RETURNS trigger AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'applications' THEN
+        INSERT INTO tombstones (kind, id, application_id) VALUES ('application', OLD.id, OLD.id)
+        ON CONFLICT DO NOTHING;
+    ELSE
+        INSERT INTO tombstones (kind, id, application_id) VALUES ('configuration', OLD.id, OLD.application_id)
+        ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_applications_tombstone ON applications;
+CREATE TRIGGER trg_applications_tombstone
+    AFTER DELETE ON applications
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
+
+DROP TRIGGER IF EXISTS trg_configurations_tombstone ON configurations;
+CREATE TRIGGER trg_configurations_tombstone
+    AFTER DELETE ON configurations
+    FOR EACH ROW EXECUTE FUNCTION record_tombstone();
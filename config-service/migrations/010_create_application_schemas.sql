@@ -0,0 +1,7 @@
+-- Optional JSON Schema per application, enforced on its configuration documents
+CREATE TABLE IF NOT EXISTS application_schemas (
+    application_id VARCHAR(26) PRIMARY KEY REFERENCES applications(id) ON DELETE CASCADE,
+    config_schema JSONB NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    updated_at TIMESTAMP NOT NULL DEFAULT LOCALTIMESTAMP
+);
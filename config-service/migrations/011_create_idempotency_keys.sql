@@ -0,0 +1,12 @@
+-- Responses of requests sent with an Idempotency-Key, replayed when the request is retried
+CREATE TABLE IF NOT EXISTS idempotency_keys (
+    key CHAR(64) PRIMARY KEY,  -- sha256 hex of the client identity and its Idempotency-Key
+    request_hash CHAR(64) NOT NULL,  -- sha256 hex of method, path, query and body
+    status_code SMALLINT,  -- NULL while the first request is still running
+    headers JSONB,
+    body BYTEA,
+    locked_until TIMESTAMP NOT NULL,  -- a running claim older than this was abandoned and may be taken over
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_idempotency_keys_expires_at ON idempotency_keys(expires_at);
@@ -0,0 +1,7 @@
+-- Trigram indexes for substring and fuzzy search over application names and comments.
+-- pg_trgm is a trusted extension from PostgreSQL 13; older servers need setup-db.sql to create it.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Serve ILIKE '%text%' and the word similarity operator text <% column
+CREATE INDEX IF NOT EXISTS idx_applications_name_trgm ON applications USING gin (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_applications_comments_trgm ON applications USING gin (comments gin_trgm_ops);
@@ -0,0 +1,4 @@
+-- Application lists are ordered by (name COLLATE "C", id): byte order, the same order the
+-- catalogue cache and snapshots sort in, whatever the database's collation.
+-- This index lets paged lists read rows in that order instead of sorting the table.
+CREATE INDEX IF NOT EXISTS idx_applications_name_c_id ON applications (name COLLATE "C", id);
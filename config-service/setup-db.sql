@@ -22,6 +22,8 @@ GRANT ALL PRIVILEGES ON DATABASE config_service TO devuser;
 
 -- Connect to the database and grant schema privileges
 \c config_service;
+-- Application search needs trigram indexes
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 GRANT ALL ON SCHEMA public TO devuser;
 GRANT ALL PRIVILEGES ON ALL TABLES IN SCHEMA public TO devuser;
 GRANT ALL PRIVILEGES ON ALL SEQUENCES IN SCHEMA public TO devuser;
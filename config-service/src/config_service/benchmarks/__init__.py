@@ -0,0 +1 @@
+"""Benchmarks for the config service."""
\ No newline at end of file
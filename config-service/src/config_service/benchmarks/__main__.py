@@ -0,0 +1,212 @@
+"""Benchmark harness CLI.
+
+Seed data once, then run scenarios against the real app and repository:
+
+    python -m config_service.benchmarks seed --applications 1000 --configurations 10 --keys 50
+    python -m config_service.benchmarks run --concurrency 50 --requests 5000
+    python -m config_service.benchmarks run --save-baseline
+    python -m config_service.benchmarks run --tolerance 0.15   # exits 1 on regression
+    python -m config_service.benchmarks scale --workers 1,2,4,8 --scenario get_application
+
+HTTP scenarios run in-process against ``config_service.main:app`` unless
+``--url`` points at a running server. Repository scenarios always run
+in-process and need DATABASE_URL. ``scale`` starts ``config_service.server``
+once per worker count and reports throughput and speedup.
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+import httpx
+from config_service.benchmarks.harness import compare, drive, load_baseline, save_baseline
+from config_service.benchmarks.scaling import SCENARIOS, default_worker_counts, run_scaling
+from config_service.benchmarks.seed import seed, seeded_applications
+from config_service.config import settings
+from config_service.database.connection import db_manager
+from config_service.models.application import ApplicationUpdate
+from config_service.repositories.application_repository import application_repository
+
+Operation = Callable[[int], Awaitable[Any]]
+
+
+def http_scenarios(client: httpx.AsyncClient, apps: List[Tuple[str, str]]) -> Dict[str, Operation]:
+    """HTTP-level scenarios driven through the full middleware and routing stack."""
+    async def list_applications(n: int):
+        response = await client.get("/api/v1/applications")
+        response.raise_for_status()
+
+    async def get_application(n: int):
+        app_id, _ = apps[n % len(apps)]
+        response = await client.get(f"/api/v1/applications/{app_id}")
+        response.raise_for_status()
+
+    async def update_application(n: int):
+        app_id, name = apps[n % len(apps)]
+        response = await client.put(
+            f"/api/v1/applications/{app_id}",
+            json={"name": name, "comments": f"Benchmark update {n}"}
+        )
+        response.raise_for_status()
+
+    async def conditional_update_application(n: int):
+        app_id, name = apps[n % len(apps)]
+        # Optimistic read-modify-write: a 412 means another writer won, so re-read and retry
+        for _ in range(5):
+            current = await client.get(f"/api/v1/applications/{app_id}")
+            current.raise_for_status()
+            response = await client.put(
+                f"/api/v1/applications/{app_id}",
+                json={"name": name, "comments": f"Benchmark update {n}"},
+                headers={"If-Match": current.headers["etag"]}
+            )
+            if response.status_code != 412:
+                response.raise_for_status()
+                return
+        raise RuntimeError("Gave up after repeated version conflicts")
+
+    return {
+        "http.list_applications": list_applications,
+        "http.get_application": get_application,
+        "http.update_application": update_application,
+        "http.conditional_update_application": conditional_update_application,
+    }
+
+
+def repository_scenarios(apps: List[Tuple[str, str]]) -> Dict[str, Operation]:
+    """Repository-level scenarios that skip HTTP, validation and serialization."""
+    async def get_all(n: int):
+        await application_repository.get_all()
+
+    async def get_by_id_with_configs(n: int):
+        app_id, _ = apps[n % len(apps)]
+        await application_repository.get_by_id_with_configs(app_id)
+
+    async def update(n: int):
+        app_id, name = apps[n % len(apps)]
+        await application_repository.update(app_id, ApplicationUpdate(name=name, comments=f"Benchmark update {n}"))
+
+    return {
+        "repo.get_all": get_all,
+        "repo.get_by_id_with_configs": get_by_id_with_configs,
+        "repo.update": update,
+    }
+
+
+async def pool_counters(client: httpx.AsyncClient, remote: bool) -> Tuple[float, int]:
+    """Read cumulative pool wait time and acquisitions for the process doing the queries."""
+    if remote:
+        response = await client.get("/metrics")
+        pool = response.json().get("database_pool", {})
+    else:
+        pool = db_manager.pool_stats()
+    return pool.get("wait_time_total", 0.0), pool.get("acquired", 0)
+
+
+async def run_scenarios(args) -> Dict[str, Dict[str, float]]:
+    """Run every selected scenario and return its summary keyed by name."""
+    apps = seeded_applications(settings.database_url)
+    if not apps:
+        raise SystemExit("No seeded applications found; run the seed command first")
+
+    db_manager.initialize()
+    try:
+        if args.url:
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            client = httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0)
+        else:
+            from config_service.main import app
+            client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench")
+
+        async with client:
+            scenarios = {**http_scenarios(client, apps), **repository_scenarios(apps)}
+            selected = [name for name in scenarios if not args.scenario or name in args.scenario]
+
+            results = {}
+            for name in selected:
+                # Repository scenarios always hit the local pool, HTTP ones the serving process's
+                remote = bool(args.url) and name.startswith("http.")
+                wait_before, acquired_before = await pool_counters(client, remote)
+                summary = await drive(scenarios[name], args.requests, args.concurrency, warmup=args.warmup)
+                wait_after, acquired_after = await pool_counters(client, remote)
+                acquired = acquired_after - acquired_before
+                summary["pool_wait_ms"] = (wait_after - wait_before) / acquired * 1000 if acquired else 0.0
+                results[name] = summary
+                print_summary(name, summary)
+        return results
+    finally:
+        db_manager.close()
+
+
+def print_summary(name: str, summary: Dict[str, float]):
+    """Print one scenario's results on a single line."""
+    print(
+        f"{name:<30} {summary['rps']:9.1f} req/s  "
+        f"p50 {summary['p50_ms']:7.2f} ms  p95 {summary['p95_ms']:7.2f} ms  p99 {summary['p99_ms']:7.2f} ms  "
+        f"pool wait {summary['pool_wait_ms']:6.2f} ms  errors {summary['errors']}"
+    )
+
+
+def main():
+    """Parse arguments and run the requested command."""
+    parser = argparse.ArgumentParser(prog="python -m config_service.benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    seed_parser = commands.add_parser("seed", help="Seed benchmark data")
+    seed_parser.add_argument("--applications", type=int, default=1000)
+    seed_parser.add_argument("--configurations", type=int, default=10, help="Configurations per application")
+    seed_parser.add_argument("--keys", type=int, default=50, help="Keys per configuration document")
+
+    run_parser = commands.add_parser("run", help="Run benchmark scenarios")
+    run_parser.add_argument("--scenario", action="append", help="Scenario to run (repeatable); default all")
+    run_parser.add_argument("--requests", type=int, default=2000, help="Requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=20)
+    run_parser.add_argument("--warmup", type=int, default=50)
+    run_parser.add_argument("--url", help="Base URL of a running server; default is in-process")
+    run_parser.add_argument("--baseline", type=Path, default=Path("benchmark-baseline.json"))
+    run_parser.add_argument("--tolerance", type=float, default=0.15, help="Allowed regression as a fraction")
+    run_parser.add_argument("--save-baseline", action="store_true", help="Store results as the new baseline")
+
+    scale_parser = commands.add_parser("scale", help="Measure server throughput per worker count")
+    scale_parser.add_argument(
+        "--workers", type=lambda value: [int(n) for n in value.split(",")], default=default_worker_counts(),
+        help="Comma-separated worker counts; default powers of two up to the CPU count"
+    )
+    scale_parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="get_application")
+    scale_parser.add_argument("--requests", type=int, default=20000, help="Requests per worker count")
+    scale_parser.add_argument("--concurrency", type=int, default=200)
+    scale_parser.add_argument("--clients", type=int, default=4, help="Load generator processes")
+    scale_parser.add_argument("--port", type=int, default=8765)
+
+    args = parser.parse_args()
+
+    if args.command == "seed":
+        apps = seed(settings.database_url, args.applications, args.configurations, args.keys)
+        print(f"Seeded {len(apps)} applications")
+        return
+
+    if args.command == "scale":
+        apps = seeded_applications(settings.database_url)
+        if not apps:
+            raise SystemExit("No seeded applications found; run the seed command first")
+        paths = [SCENARIOS[args.scenario].format(app_id=app_id) for app_id, _ in apps]
+        run_scaling(args.workers, paths, args.requests, args.concurrency, args.clients, args.port)
+        return
+
+    results = asyncio.run(run_scenarios(args))
+    if args.save_baseline:
+        save_baseline(args.baseline, results)
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    if regressions:
+        print("Regressions beyond tolerance:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Benchmark layered configuration resolution for deep chains of large documents.
+
+Run with: python -m config_service.benchmarks.config_resolution
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Dict
+from unittest.mock import patch
+from config_service.benchmarks.seed import make_config
+from config_service.services.config_resolver import ConfigResolver
+
+
+def build_chain(depth: int, keys: int, overrides: int) -> Dict[str, Dict[str, Any]]:
+    """Build lineage rows for a chain with a large root and small overriding layers."""
+    rng = random.Random(42)
+    rows = {"L0": {"id": "L0", "application_id": "APP", "name": "l0", "config": make_config(keys, rng), "parent_ids": []}}
+    for level in range(1, depth):
+        layer = {f"key_{rng.randrange(keys)}": f"override-{level}" for _ in range(overrides)}
+        rows[f"L{level}"] = {
+            "id": f"L{level}", "application_id": "APP", "name": f"l{level}",
+            "config": layer, "parent_ids": [f"L{level - 1}"]
+        }
+    return rows
+
+
+async def run(depth: int, keys: int, overrides: int, repeat: int) -> Dict[str, float]:
+    """Return microseconds per cold resolution, per cached resolution and per re-resolution after a leaf edit."""
+    rows = build_chain(depth, keys, overrides)
+    leaf = f"L{depth - 1}"
+
+    async def get_lineage(config_ids):
+        return rows
+
+    with patch('config_service.services.config_resolver.configuration_repository.get_lineage', get_lineage):
+        cold = []
+        for _ in range(repeat):
+            resolver = ConfigResolver()
+            started = time.perf_counter()
+            await resolver.resolve(leaf)
+            cold.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for _ in range(repeat):
+            await resolver.resolve(leaf)
+        cached = (time.perf_counter() - started) / repeat
+
+        leaf_edit = []
+        for _ in range(repeat):
+            resolver.invalidate(leaf)
+            started = time.perf_counter()
+            await resolver.resolve(leaf)
+            leaf_edit.append(time.perf_counter() - started)
+
+    return {
+        "cold resolve": min(cold) * 1e6,
+        "cached resolve": cached * 1e6,
+        "resolve after leaf edit": min(leaf_edit) * 1e6,
+    }
+
+
+def main():
+    """Print resolution cost for each scenario."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--depth", type=int, default=20, help="Configurations in the chain")
+    parser.add_argument("--keys", type=int, default=5000, help="Keys in the root configuration")
+    parser.add_argument("--overrides", type=int, default=20, help="Keys overridden per layer")
+    parser.add_argument("--repeat", type=int, default=200, help="Repetitions per scenario")
+    args = parser.parse_args()
+
+    print(f"Chain of {args.depth} over a {args.keys:,}-key root, {args.overrides} overrides per layer")
+    results = asyncio.run(run(args.depth, args.keys, args.overrides, args.repeat))
+    for name, micros in results.items():
+        print(f"  {name:<24} {micros:10.1f} µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Load driver, latency statistics and baseline comparison for benchmarks."""
+
+import asyncio
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Metrics where a larger value is a regression; everything else is "higher is better"
+LOWER_IS_BETTER = ("p50_ms", "p95_ms", "p99_ms", "mean_ms", "pool_wait_ms", "error_rate")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Return the pct-th percentile of already sorted values (nearest-rank)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    """Summarize per-request latencies (seconds) into the reported metrics."""
+    ordered = sorted(latencies)
+    total = len(ordered) + errors
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "rps": len(ordered) / elapsed if elapsed > 0 else 0.0,
+        "mean_ms": (sum(ordered) / len(ordered) * 1000) if ordered else 0.0,
+        "p50_ms": percentile(ordered, 50) * 1000,
+        "p95_ms": percentile(ordered, 95) * 1000,
+        "p99_ms": percentile(ordered, 99) * 1000,
+    }
+
+
+async def drive(
+    operation: Callable[[int], Awaitable[Any]],
+    requests: int,
+    concurrency: int,
+    warmup: int = 0
+) -> Dict[str, float]:
+    """Run operation ``requests`` times across ``concurrency`` workers and summarize.
+
+    The operation receives the request number so scenarios can vary keys
+    deterministically. ``warmup`` calls are made first and not recorded.
+    """
+    for i in range(warmup):
+        await operation(i)
+
+    latencies: List[float] = []
+    errors = 0
+    next_request = 0
+
+    async def worker():
+        nonlocal errors, next_request
+        while next_request < requests:
+            n = next_request
+            next_request += 1
+            started = time.perf_counter()
+            try:
+                await operation(n)
+            except Exception:
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+def load_baseline(path: Path) -> Dict[str, Dict[str, float]]:
+    """Load stored baseline results, or an empty dict if none exist yet."""
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(path: Path, results: Dict[str, Dict[str, float]]):
+    """Store results as the new baseline, merged over existing scenarios."""
+    baseline = load_baseline(path)
+    baseline.update(results)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    tolerance: float,
+    metrics: Optional[List[str]] = None
+) -> List[str]:
+    """Return a description of every metric that regressed beyond tolerance."""
+    metrics = metrics or ["p50_ms", "p95_ms", "p99_ms", "rps", "error_rate"]
+    regressions = []
+    for scenario, current in results.items():
+        previous = baseline.get(scenario)
+        if not previous:
+            continue
+        for metric in metrics:
+            if metric not in current or metric not in previous:
+                continue
+            before, after = previous[metric], current[metric]
+            if metric in LOWER_IS_BETTER:
+                limit = before * (1 + tolerance)
+                # Absolute slack so a zero baseline does not fail on noise
+                regressed = after > limit and after - before > 0.01
+            else:
+                limit = before * (1 - tolerance)
+                regressed = after < limit
+            if regressed:
+                regressions.append(
+                    f"{scenario}.{metric}: {after:.3f} vs baseline {before:.3f} (limit {limit:.3f})"
+                )
+    return regressions
@@ -0,0 +1,71 @@
+"""Tests for the benchmark harness statistics and baselines."""
+
+import asyncio
+from config_service.benchmarks.harness import compare, drive, load_baseline, percentile, save_baseline, summarize
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles on a known distribution."""
+    values = [float(v) for v in range(1, 101)]
+    
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summarize_reports_rates_and_latencies():
+    """Test that summaries convert seconds to milliseconds and count errors."""
+    summary = summarize([0.001, 0.002, 0.003, 0.004], errors=1, elapsed=2.0)
+    
+    assert summary["requests"] == 5
+    assert summary["error_rate"] == 0.2
+    assert summary["rps"] == 2.0
+    assert summary["p50_ms"] == 2.0
+    assert summary["p99_ms"] == 4.0
+
+
+async def test_drive_runs_requested_operations():
+    """Test that drive runs each request once across workers and records failures."""
+    seen = []
+    
+    async def operation(n):
+        await asyncio.sleep(0)
+        seen.append(n)
+        if n % 10 == 0:
+            raise RuntimeError("failed")
+    
+    summary = await drive(operation, requests=50, concurrency=5)
+    
+    assert sorted(seen) == list(range(50))
+    assert summary["requests"] == 50
+    assert summary["errors"] == 5
+
+
+def test_compare_flags_regressions_beyond_tolerance():
+    """Test that latency increases and throughput drops beyond tolerance are reported."""
+    baseline = {"repo.get_all": {"p95_ms": 10.0, "rps": 1000.0}}
+    
+    within = compare({"repo.get_all": {"p95_ms": 11.0, "rps": 950.0}}, baseline, tolerance=0.15)
+    slower = compare({"repo.get_all": {"p95_ms": 12.0, "rps": 1000.0}}, baseline, tolerance=0.15)
+    fewer = compare({"repo.get_all": {"p95_ms": 10.0, "rps": 800.0}}, baseline, tolerance=0.15)
+    
+    assert within == []
+    assert len(slower) == 1 and "p95_ms" in slower[0]
+    assert len(fewer) == 1 and "rps" in fewer[0]
+
+
+def test_compare_ignores_scenarios_without_baseline():
+    """Test that new scenarios never count as regressions."""
+    assert compare({"new": {"p95_ms": 100.0}}, {}, tolerance=0.1) == []
+
+
+def test_baseline_round_trip(tmp_path):
+    """Test that saved baselines merge with existing scenarios."""
+    path = tmp_path / "baseline.json"
+    
+    save_baseline(path, {"a": {"rps": 1.0}})
+    save_baseline(path, {"b": {"rps": 2.0}})
+    
+    assert load_baseline(path) == {"a": {"rps": 1.0}, "b": {"rps": 2.0}}
+    assert load_baseline(tmp_path / "missing.json") == {}
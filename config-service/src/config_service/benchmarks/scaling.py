@@ -0,0 +1,138 @@
+"""Throughput of config_service.server as the worker count grows.
+
+Each worker count gets a fresh server process on a local port, driven by
+several client processes so the load generator is not the bottleneck.
+"""
+
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+import httpx
+from config_service.benchmarks.harness import drive
+
+# Read-only scenarios, as path templates filled with a seeded application id
+SCENARIOS = {
+    "health": "/health",
+    "get_application": "/api/v1/applications/{app_id}",
+    "list_applications": "/api/v1/applications",
+}
+
+
+def default_worker_counts() -> List[int]:
+    """Powers of two up to the CPU count, plus the CPU count itself."""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def start_server(workers: int, port: int) -> subprocess.Popen:
+    """Start config_service.server with workers on 127.0.0.1:port."""
+    env = {**os.environ, "SERVER_WORKERS": str(workers), "HOST": "127.0.0.1", "PORT": str(port), "DEBUG": "false"}
+    return subprocess.Popen([sys.executable, "-m", "config_service.server"], env=env)
+
+
+def wait_until_ready(url: str, timeout: float = 30.0):
+    """Poll /health until the server answers or timeout passes."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/health", timeout=1.0).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout}s")
+
+
+def stop_server(process: subprocess.Popen, timeout: float = 60.0):
+    """Stop the server gracefully, killing it if it does not exit in time."""
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+def _client(url: str, paths: List[str], requests: int, concurrency: int) -> Dict[str, float]:
+    """One load generator process: drive GETs of paths round-robin."""
+    async def run():
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+            async def get(n: int):
+                response = await client.get(paths[n % len(paths)])
+                response.raise_for_status()
+
+            return await drive(get, requests, concurrency, warmup=min(50, requests))
+
+    return asyncio.run(run())
+
+
+def combine(summaries: List[Dict[str, float]]) -> Dict[str, float]:
+    """Merge concurrent client summaries: rates and counts add, latency percentiles take the worst."""
+    return {
+        "requests": sum(s["requests"] for s in summaries),
+        "errors": sum(s["errors"] for s in summaries),
+        "rps": sum(s["rps"] for s in summaries),
+        "p50_ms": max(s["p50_ms"] for s in summaries),
+        "p99_ms": max(s["p99_ms"] for s in summaries),
+    }
+
+
+def speedups(results: Dict[int, Dict[str, float]]) -> Dict[int, Tuple[float, float]]:
+    """Return (speedup, efficiency) per worker count relative to the smallest count measured."""
+    base_workers = min(results)
+    base_rps = results[base_workers]["rps"]
+    scaling = {}
+    for workers, summary in sorted(results.items()):
+        speedup = summary["rps"] / base_rps if base_rps else 0.0
+        scaling[workers] = (speedup, speedup / (workers / base_workers))
+    return scaling
+
+
+def measure(url: str, paths: List[str], requests: int, concurrency: int, clients: int) -> Dict[str, float]:
+    """Split requests and concurrency across client processes and combine their results."""
+    with ProcessPoolExecutor(max_workers=clients) as pool:
+        futures = [
+            pool.submit(_client, url, paths, requests // clients, max(1, concurrency // clients))
+            for _ in range(clients)
+        ]
+        return combine([future.result() for future in futures])
+
+
+def run_scaling(
+    worker_counts: List[int],
+    paths: List[str],
+    requests: int,
+    concurrency: int,
+    clients: int,
+    port: int
+) -> Dict[int, Dict[str, float]]:
+    """Measure each worker count against a fresh server and print the scaling table."""
+    url = f"http://127.0.0.1:{port}"
+    results = {}
+    for workers in worker_counts:
+        process = start_server(workers, port)
+        try:
+            wait_until_ready(url)
+            results[workers] = measure(url, paths, requests, concurrency, clients)
+        finally:
+            stop_server(process)
+
+    print(f"{'workers':>7} {'req/s':>10} {'speedup':>8} {'efficiency':>10} {'p50 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for workers, (speedup, efficiency) in speedups(results).items():
+        summary = results[workers]
+        print(
+            f"{workers:>7} {summary['rps']:>10.1f} {speedup:>7.2f}x {efficiency:>9.0%} "
+            f"{summary['p50_ms']:>8.2f} {summary['p99_ms']:>8.2f} {summary['errors']:>6}"
+        )
+    return results
@@ -0,0 +1,31 @@
+"""Tests for the worker scaling benchmark."""
+
+from config_service.benchmarks.scaling import combine, default_worker_counts, speedups
+
+
+def test_default_worker_counts_end_at_cpu_count(monkeypatch):
+    """Test powers of two up to and including the CPU count."""
+    monkeypatch.setattr("config_service.benchmarks.scaling.os.cpu_count", lambda: 6)
+    
+    assert default_worker_counts() == [1, 2, 4, 6]
+
+
+def test_combine_adds_rates_and_keeps_worst_latency():
+    """Test that concurrent client summaries are merged."""
+    summaries = [
+        {"requests": 100, "errors": 0, "rps": 500.0, "p50_ms": 2.0, "p99_ms": 9.0},
+        {"requests": 100, "errors": 1, "rps": 450.0, "p50_ms": 3.0, "p99_ms": 7.0},
+    ]
+    
+    assert combine(summaries) == {"requests": 200, "errors": 1, "rps": 950.0, "p50_ms": 3.0, "p99_ms": 9.0}
+
+
+def test_speedups_relative_to_fewest_workers():
+    """Test speedup and per-worker efficiency against the smallest worker count."""
+    results = {1: {"rps": 1000.0}, 2: {"rps": 1900.0}, 4: {"rps": 3000.0}}
+    
+    scaling = speedups(results)
+    
+    assert scaling[1] == (1.0, 1.0)
+    assert scaling[2] == (1.9, 0.95)
+    assert scaling[4] == (3.0, 0.75)
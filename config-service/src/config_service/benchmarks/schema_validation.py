@@ -0,0 +1,91 @@
+"""Benchmark configuration schema validation cost per 100 KB document.
+
+Run with: python -m config_service.benchmarks.schema_validation
+"""
+
+import argparse
+import json
+import timeit
+from typing import Any, Callable, Dict, Tuple
+from config_service.services.config_schema import CompiledSchema, compile_schema
+
+
+def _time_per_call(func: Callable[[], object], repeat: int, number: int) -> float:
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def document_and_schema(target_bytes: int = 100_000) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Build a configuration of about target_bytes of JSON and a schema describing all of it."""
+    service = {
+        "type": "object",
+        "required": ["host", "port", "enabled", "timeouts", "tags"],
+        "additionalProperties": False,
+        "properties": {
+            "host": {"type": "string", "minLength": 1, "pattern": "^[a-z0-9.-]+$"},
+            "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+            "enabled": {"type": "boolean"},
+            "mode": {"enum": ["active", "standby", "drain"]},
+            "timeouts": {
+                "type": "object",
+                "properties": {"connect": {"type": "number", "exclusiveMinimum": 0}, "read": {"type": "number"}},
+                "required": ["connect"]
+            },
+            "tags": {"type": "array", "items": {"type": "string", "maxLength": 64}, "maxItems": 32}
+        }
+    }
+    schema = {
+        "type": "object",
+        "$defs": {"service": service},
+        "properties": {"version": {"type": "integer"}},
+        "patternProperties": {"^service-[0-9]+$": {"$ref": "#/$defs/service"}}
+    }
+    document: Dict[str, Any] = {"version": 1}
+    size = 0
+    while size < target_bytes:
+        entry = {
+            "host": f"node-{len(document)}.internal.example.com",
+            "port": 8000 + len(document) % 1000,
+            "enabled": True,
+            "mode": "active",
+            "timeouts": {"connect": 1.5, "read": 30},
+            "tags": ["primary", "eu-west-1", f"shard-{len(document) % 16}"]
+        }
+        document[f"service-{len(document)}"] = entry
+        size += len(json.dumps(entry)) + 16
+    return document, schema
+
+
+def run(target_bytes: int = 100_000, repeat: int = 5, number: int = 20) -> Dict[str, float]:
+    """Return milliseconds per document for each strategy."""
+    document, schema = document_and_schema(target_bytes)
+    validator = compile_schema(schema)
+    if validator.errors(document):
+        raise RuntimeError("Generated document does not match its schema")
+
+    results = {
+        # What validating with the schema document on every request costs
+        "compile + validate": _time_per_call(lambda: CompiledSchema(schema).errors(document), repeat, number),
+        "compile only": _time_per_call(lambda: CompiledSchema(schema), repeat, number),
+        "cached validator": _time_per_call(lambda: validator.errors(document), repeat, number),
+        # Baseline every write already pays to store the document
+        "json.dumps": _time_per_call(lambda: json.dumps(document), repeat, number),
+    }
+    return {name: seconds * 1000 for name, seconds in results.items()}
+
+
+def main():
+    """Print validation cost for each strategy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bytes", type=int, default=100_000, help="Approximate document size")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions")
+    parser.add_argument("--number", type=int, default=20, help="Validations per repetition")
+    args = parser.parse_args()
+
+    document, _ = document_and_schema(args.bytes)
+    print(f"Validating a {len(json.dumps(document)):,} byte document (best of {args.repeat})")
+    for name, millis in run(args.bytes, args.repeat, args.number).items():
+        print(f"  {name:<20} {millis:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
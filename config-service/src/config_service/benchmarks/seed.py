@@ -0,0 +1,97 @@
+"""Seed PostgreSQL with benchmark data of a configurable shape."""
+
+import json
+import logging
+import random
+from datetime import datetime
+from typing import List, Tuple
+import psycopg2
+from psycopg2 import extras
+from ulid import ULID as ULIDGenerator
+
+logger = logging.getLogger(__name__)
+
+# Every seeded application name starts with this, so reseeding only removes benchmark rows
+NAME_PREFIX = "bench-"
+
+
+def make_config(keys: int, rng: random.Random) -> dict:
+    """Build a configuration document with ``keys`` mixed-type entries."""
+    document = {}
+    for k in range(keys):
+        kind = k % 4
+        if kind == 0:
+            document[f"key_{k}"] = f"value-{rng.randrange(1_000_000)}"
+        elif kind == 1:
+            document[f"key_{k}"] = rng.randrange(1_000_000)
+        elif kind == 2:
+            document[f"key_{k}"] = rng.random() < 0.5
+        else:
+            document[f"key_{k}"] = {"nested": f"value-{k}", "list": [1, 2, 3]}
+    return document
+
+
+def seed(
+    dsn: str,
+    applications: int,
+    configurations: int,
+    keys: int,
+    seed_value: int = 42
+) -> List[Tuple[str, str]]:
+    """Replace previously seeded rows with ``applications`` × ``configurations`` rows.
+
+    Returns (id, name) pairs for the seeded applications.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.now()
+    app_rows: List[Tuple] = []
+    config_rows: List[Tuple] = []
+
+    for a in range(applications):
+        app_id = str(ULIDGenerator())
+        app_rows.append((app_id, f"{NAME_PREFIX}{a:07d}", f"Benchmark application {a}", now, now))
+        for c in range(configurations):
+            config_rows.append((
+                str(ULIDGenerator()), app_id, f"config-{c}", None,
+                json.dumps(make_config(keys, rng)), now, now
+            ))
+
+    connection = psycopg2.connect(dsn)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM applications WHERE name LIKE %s", (f"{NAME_PREFIX}%",))
+            extras.execute_values(
+                cursor,
+                "INSERT INTO applications (id, name, comments, created_at, updated_at) VALUES %s",
+                app_rows,
+                page_size=1000
+            )
+            extras.execute_values(
+                cursor,
+                "INSERT INTO configurations (id, application_id, name, comments, config, created_at, updated_at) "
+                "VALUES %s",
+                config_rows,
+                page_size=1000
+            )
+            cursor.execute("ANALYZE applications")
+            cursor.execute("ANALYZE configurations")
+        connection.commit()
+    finally:
+        connection.close()
+
+    logger.info(
+        "Seeded %s applications with %s configurations of %s keys each",
+        applications, configurations, keys
+    )
+    return [(row[0], row[1]) for row in app_rows]
+
+
+def seeded_applications(dsn: str) -> List[Tuple[str, str]]:
+    """Return (id, name) pairs of previously seeded applications."""
+    connection = psycopg2.connect(dsn)
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, name FROM applications WHERE name LIKE %s ORDER BY name", (f"{NAME_PREFIX}%",))
+            return [(row[0], row[1]) for row in cursor.fetchall()]
+    finally:
+        connection.close()
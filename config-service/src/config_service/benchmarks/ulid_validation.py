@@ -0,0 +1,62 @@
+"""Benchmark ULID validation cost per 100k IDs.
+
+Run with: python -m config_service.benchmarks.ulid_validation
+"""
+
+import argparse
+import re
+import timeit
+from datetime import datetime
+from typing import Callable, Dict, List
+from ulid import ULID as ULIDGenerator
+from config_service.models.application import ApplicationWithConfigs
+from config_service.models.ulid import is_valid_ulid
+
+
+def _inline_regex(value: str) -> bool:
+    """The per-call ``re.match`` string literal the models used to run."""
+    return bool(re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', value))
+
+
+def _time_per_call(func: Callable[[], object], repeat: int) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(count: int = 100_000, repeat: int = 5) -> Dict[str, float]:
+    """Return milliseconds to validate ``count`` IDs with each strategy."""
+    ids: List[str] = [str(ULIDGenerator()) for _ in range(count)]
+    now = datetime.now()
+    rows = [
+        {"id": ids[i], "name": f"app-{i}", "comments": None, "created_at": now,
+         "updated_at": now, "configuration_ids": ids[i + 1:i + 11]}
+        for i in range(0, count, 10)
+    ]
+
+    results = {
+        "inline re.match": _time_per_call(lambda: [_inline_regex(v) for v in ids], repeat),
+        "is_valid_ulid": _time_per_call(lambda: [is_valid_ulid(v) for v in ids], repeat),
+        # Each row carries 1 application id + 10 configuration ids
+        "model validate (rows)": _time_per_call(
+            lambda: [ApplicationWithConfigs(**row) for row in rows], repeat
+        ),
+        "from_row (rows)": _time_per_call(
+            lambda: [ApplicationWithConfigs.from_row(row) for row in rows], repeat
+        ),
+    }
+    return {name: seconds * 1000 for name, seconds in results.items()}
+
+
+def main():
+    """Print validation cost for each strategy."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000, help="Number of IDs to validate")
+    parser.add_argument("--repeat", type=int, default=5, help="Best-of repetitions")
+    args = parser.parse_args()
+
+    print(f"Validating {args.count:,} ULIDs (best of {args.repeat})")
+    for name, millis in run(args.count, args.repeat).items():
+        print(f"  {name:<24} {millis:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+"""Python client for the Config Service API.
+
+Install with the ``client`` extra. Reads are served from a local cache
+that is revalidated in the background and, optionally, persisted to disk
+as a last-known-good snapshot::
+
+    async with AsyncConfigClient("http://config:8000", snapshot_path="/var/cache/app/config.json") as client:
+        settings = await client.get_config(config_id)
+
+    with ConfigClient("http://config:8000") as client:
+        settings = client.get_config(config_id, rendered=True)
+"""
+
+from config_service.client.async_client import AsyncConfigClient
+from config_service.client.errors import ConfigServiceError, NotFoundError, UnavailableError
+from config_service.client.sync_client import ConfigClient
+
+__all__ = [
+    "AsyncConfigClient",
+    "ConfigClient",
+    "ConfigServiceError",
+    "NotFoundError",
+    "UnavailableError",
+]
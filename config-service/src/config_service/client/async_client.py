@@ -0,0 +1,113 @@
+"""Asynchronous Config Service client."""
+
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+import httpx
+from config_service.client.cache import ResponseCache, application_path, config_path
+from config_service.client.errors import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncConfigClient:
+    """Reads configurations through a local cache that a background task keeps fresh.
+
+    Use as an async context manager. Every path read once is revalidated
+    every ``refresh_interval`` seconds (± ``jitter``) with If-None-Match;
+    unchanged configurations cost a 304 and no body, while applications,
+    whose ETag is only the row version, are fetched again in full. With
+    ``snapshot_path`` the cache is persisted after every change and loaded
+    on start, so reads succeed at once and keep working while the service
+    is down.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        refresh_interval: float = 30.0,
+        jitter: float = 0.1,
+        snapshot_path=None,
+        timeout: float = 5.0,
+        max_connections: int = 10,
+        transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        headers = {"X-API-Key": api_key} if api_key else {}
+        self._http = httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            transport=transport
+        )
+        self.cache = ResponseCache(refresh_interval, jitter, snapshot_path)
+        self.max_connections = max_connections
+        self._refresher: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "AsyncConfigClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def start(self):
+        """Load the snapshot and start refreshing in the background."""
+        await asyncio.to_thread(self.cache.load_snapshot)
+        self._refresher = asyncio.get_running_loop().create_task(self._refresh_loop())
+
+    async def close(self):
+        """Stop refreshing, save the snapshot and close the connection pool."""
+        if self._refresher is not None:
+            self._refresher.cancel()
+            await asyncio.gather(self._refresher, return_exceptions=True)
+            self._refresher = None
+        await asyncio.to_thread(self.cache.save_snapshot)
+        await self._http.aclose()
+
+    async def get_config(self, config_id: str, rendered: bool = False) -> Dict[str, Any]:
+        """Return a configuration's document merged over its parents (with ${...} expanded if rendered)."""
+        return (await self.get(config_path(config_id, rendered)))["config"]
+
+    async def get_application(self, app_id: str) -> Dict[str, Any]:
+        """Return an application with its configuration IDs."""
+        return await self.get(application_path(app_id))
+
+    async def get(self, path: str) -> Any:
+        """Return the JSON body of GET path, from the cache when possible."""
+        # While the refresher runs it owns freshness, so any cached body is served as is
+        cached = self.cache.cached(path, allow_stale=self._refresher is not None)
+        if cached is not None:
+            return cached
+        return await self._fetch(path)
+
+    async def refresh(self):
+        """Revalidate every tracked path now and save the snapshot if anything changed."""
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def revalidate(path: str):
+            async with semaphore:
+                try:
+                    await self._fetch(path)
+                except NotFoundError:
+                    logger.info("%s no longer exists; stopped refreshing it", path)
+                except Exception as e:
+                    logger.warning("Failed to refresh %s: %s", path, e)
+
+        await asyncio.gather(*(revalidate(path) for path in self.cache.tracked()))
+        await asyncio.to_thread(self.cache.save_snapshot)
+
+    async def _fetch(self, path: str) -> Any:
+        try:
+            response = await self._http.get(path, headers=self.cache.request_headers(path))
+        except httpx.HTTPError as e:
+            return self.cache.fallback(path, e)
+        body = response.json() if response.status_code == 200 else None
+        return self.cache.apply(path, response.status_code, response.headers.get("etag"), body)
+
+    async def _refresh_loop(self):
+        # Revalidate snapshot entries right away, then on the jittered interval
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.cache.next_refresh_delay())
@@ -0,0 +1,142 @@
+"""Response cache shared by the async and sync clients."""
+
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set
+from config_service.client.errors import ConfigServiceError, NotFoundError, UnavailableError
+from config_service.client.snapshot import SnapshotStore
+
+# Statuses that mean "try again later" rather than "this request is wrong"
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CacheEntry:
+    """One cached response body and the validator to revalidate it with."""
+
+    __slots__ = ("etag", "data", "fetched_at")
+
+    def __init__(self, etag: Optional[str], data: Any, fetched_at: float):
+        self.etag = etag
+        self.data = data
+        self.fetched_at = fetched_at
+
+
+class ResponseCache:
+    """Cached GET responses keyed by path, with ETag revalidation and a disk snapshot.
+
+    The HTTP clients call ``request_headers`` before and ``apply`` (or
+    ``fallback`` on network errors) after each request; everything else
+    about caching lives here. Thread-safe, so the sync client's refresher
+    thread can share it with callers.
+    """
+
+    def __init__(self, refresh_interval: float, jitter: float, snapshot_path=None):
+        self.refresh_interval = refresh_interval
+        self.jitter = jitter
+        self.snapshot = SnapshotStore(snapshot_path) if snapshot_path else None
+        self._entries: Dict[str, CacheEntry] = {}
+        self._tracked: Set[str] = set()
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "fetched": 0, "revalidated": 0, "fallbacks": 0, "errors": 0}
+
+    def load_snapshot(self):
+        """Seed the cache from the last snapshot so reads succeed before the first request."""
+        if self.snapshot is None:
+            return
+        with self._lock:
+            for path, saved in self.snapshot.load().items():
+                if path not in self._entries:
+                    self._entries[path] = CacheEntry(saved.get("etag"), saved.get("data"), saved.get("fetched_at", 0.0))
+                    self._tracked.add(path)
+
+    def save_snapshot(self):
+        """Persist the cache if it changed since the last save."""
+        if self.snapshot is None:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = {
+                path: {"etag": entry.etag, "data": entry.data, "fetched_at": entry.fetched_at}
+                for path, entry in self._entries.items()
+            }
+            self._dirty = False
+        self.snapshot.save(entries)
+
+    def cached(self, path: str, allow_stale: bool) -> Optional[Any]:
+        """Return the cached body if fresh, or at any age with allow_stale."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                return None
+            if not allow_stale and time.time() - entry.fetched_at >= self.refresh_interval:
+                return None
+            self._stats["hits"] += 1
+            return entry.data
+
+    def tracked(self) -> List[str]:
+        """Paths the background refresher keeps up to date."""
+        with self._lock:
+            return list(self._tracked)
+
+    def request_headers(self, path: str) -> Dict[str, str]:
+        """Conditional headers for revalidating path."""
+        with self._lock:
+            entry = self._entries.get(path)
+        return {"If-None-Match": entry.etag} if entry is not None and entry.etag else {}
+
+    def apply(self, path: str, status_code: int, etag: Optional[str], body: Any) -> Any:
+        """Update the cache from a response and return the current body."""
+        with self._lock:
+            if status_code == 304 and path in self._entries:
+                entry = self._entries[path]
+                entry.fetched_at = time.time()
+                self._stats["revalidated"] += 1
+                return entry.data
+            if status_code == 200:
+                self._entries[path] = CacheEntry(etag, body, time.time())
+                # Paths read once are kept fresh from now on
+                self._tracked.add(path)
+                self._dirty = True
+                self._stats["fetched"] += 1
+                return body
+            if status_code == 404:
+                # Deleted upstream: forget it rather than serve it from the snapshot forever
+                if self._entries.pop(path, None) is not None:
+                    self._dirty = True
+                self._tracked.discard(path)
+                raise NotFoundError(f"{path} not found", status_code)
+        if status_code in RETRYABLE_STATUSES:
+            return self.fallback(path, ConfigServiceError(f"{path} returned {status_code}", status_code))
+        raise ConfigServiceError(f"{path} returned {status_code}", status_code)
+
+    def fallback(self, path: str, error: Exception) -> Any:
+        """Serve the last known body when the service cannot answer, or raise UnavailableError."""
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                self._stats["errors"] += 1
+                raise UnavailableError(f"Config service unavailable and {path} is not cached: {error}") from error
+            self._stats["fallbacks"] += 1
+            return entry.data
+
+    def next_refresh_delay(self) -> float:
+        """Refresh interval with random jitter, so clients started together do not poll in lockstep."""
+        return self.refresh_interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and hit/fetch/fallback counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "tracked": len(self._tracked), **self._stats}
+
+
+def config_path(config_id: str, rendered: bool) -> str:
+    """Request path of a configuration's resolved or rendered document."""
+    return f"/api/v1/configurations/{config_id}/{'rendered' if rendered else 'resolved'}"
+
+
+def application_path(app_id: str) -> str:
+    """Request path of an application."""
+    return f"/api/v1/applications/{app_id}"
@@ -0,0 +1,141 @@
+"""Tests for the Config Service client, run against the real app in-process."""
+
+import json
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, patch
+from config_service.client import AsyncConfigClient, ConfigClient, NotFoundError, UnavailableError
+from config_service.client.cache import ResponseCache, config_path
+from config_service.client.snapshot import SnapshotStore
+from config_service.main import app
+from config_service.services.config_resolver import ResolvedEntry
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+CONFIG_ID = "01HKQJQJQJQJQJQJQJQJQJQJQC"
+
+
+def make_entry(config):
+    """Resolver cache entry for CONFIG_ID."""
+    return ResolvedEntry(
+        id=CONFIG_ID, application_id=APP_ID, name="prod", chain=(CONFIG_ID,),
+        ancestors=frozenset(), config=config, expires_at=0.0
+    )
+
+
+@pytest.fixture
+def resolver():
+    """Patch the resolver behind the resolved endpoint; entries stay the same object, so ETags hold."""
+    with patch('config_service.routers.configurations.config_resolver') as mock:
+        mock.resolve = AsyncMock(return_value=make_entry({"db": {"host": "db1"}}))
+        yield mock
+
+
+def in_process(**kwargs) -> AsyncConfigClient:
+    """Async client talking to the app through ASGITransport."""
+    return AsyncConfigClient(
+        base_url="http://config", refresh_interval=3600, transport=httpx.ASGITransport(app=app), **kwargs
+    )
+
+
+def unreachable(**kwargs) -> AsyncConfigClient:
+    """Async client whose every request fails to connect."""
+    def fail(request):
+        raise httpx.ConnectError("connection refused", request=request)
+    return AsyncConfigClient(base_url="http://config", refresh_interval=3600, transport=httpx.MockTransport(fail), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_and_revalidated(resolver, tmp_path):
+    """Test that repeated reads hit memory and refreshes revalidate with If-None-Match."""
+    snapshot = tmp_path / "config.json"
+    async with in_process(snapshot_path=snapshot) as client:
+        assert await client.get_config(CONFIG_ID) == {"db": {"host": "db1"}}
+        assert await client.get_config(CONFIG_ID) == {"db": {"host": "db1"}}
+        await client.refresh()
+        
+        stats = client.cache.stats()
+        assert (stats["fetched"], stats["hits"], stats["revalidated"]) == (1, 1, 1)
+    
+    saved = json.loads(snapshot.read_text())
+    assert saved[config_path(CONFIG_ID, False)]["data"]["config"] == {"db": {"host": "db1"}}
+
+
+@pytest.mark.asyncio
+async def test_refresh_picks_up_changes(resolver):
+    """Test that a changed document replaces the cached one on refresh."""
+    async with in_process() as client:
+        await client.get_config(CONFIG_ID)
+        resolver.resolve = AsyncMock(return_value=make_entry({"db": {"host": "db2"}}))
+        
+        await client.refresh()
+        
+        assert await client.get_config(CONFIG_ID) == {"db": {"host": "db2"}}
+
+
+@pytest.mark.asyncio
+async def test_snapshot_serves_reads_during_outage(resolver, tmp_path):
+    """Test that a client started while the service is down serves the last known good config."""
+    snapshot = tmp_path / "config.json"
+    async with in_process(snapshot_path=snapshot) as client:
+        await client.get_config(CONFIG_ID)
+    
+    async with unreachable(snapshot_path=snapshot) as client:
+        assert await client.get_config(CONFIG_ID) == {"db": {"host": "db1"}}
+        await client.refresh()
+        assert await client.get_config(CONFIG_ID) == {"db": {"host": "db1"}}
+        assert client.cache.stats()["fallbacks"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_unavailable_without_cache():
+    """Test that an outage with nothing cached raises UnavailableError."""
+    async with unreachable() as client:
+        with pytest.raises(UnavailableError):
+            await client.get_config(CONFIG_ID)
+
+
+@pytest.mark.asyncio
+async def test_deleted_configuration_is_forgotten(resolver):
+    """Test that a 404 raises NotFoundError and drops the path from the cache and refresh set."""
+    # Not started, so every read past refresh_interval goes to the service
+    client = in_process()
+    try:
+        await client.get_config(CONFIG_ID)
+        client.cache._entries[config_path(CONFIG_ID, False)].fetched_at = 0.0
+        resolver.resolve = AsyncMock(return_value=None)
+        
+        with pytest.raises(NotFoundError):
+            await client.get_config(CONFIG_ID)
+        assert client.cache.tracked() == []
+    finally:
+        await client.close()
+
+
+def test_sync_client(resolver, tmp_path):
+    """Test the blocking client against the app through TestClient."""
+    with ConfigClient(http_client=TestClient(app), refresh_interval=3600, snapshot_path=tmp_path / "c.json") as client:
+        assert client.get_config(CONFIG_ID) == {"db": {"host": "db1"}}
+        client.refresh()
+        
+        assert client.cache.stats()["revalidated"] >= 1
+    
+    assert (tmp_path / "c.json").exists()
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    """Test that a corrupt snapshot file does not prevent startup."""
+    path = tmp_path / "config.json"
+    path.write_text("{not json")
+    
+    assert SnapshotStore(path).load() == {}
+
+
+def test_refresh_delay_is_jittered():
+    """Test that refresh delays stay within the jitter band."""
+    cache = ResponseCache(refresh_interval=10.0, jitter=0.2)
+    
+    delays = [cache.next_refresh_delay() for _ in range(100)]
+    
+    assert all(8.0 <= delay <= 12.0 for delay in delays)
+    assert len(set(delays)) > 1
@@ -0,0 +1,17 @@
+"""Exceptions raised by the Config Service client."""
+
+
+class ConfigServiceError(Exception):
+    """The service answered with an unexpected status."""
+
+    def __init__(self, message: str, status_code: int = 0):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class NotFoundError(ConfigServiceError):
+    """The requested application or configuration does not exist."""
+
+
+class UnavailableError(ConfigServiceError):
+    """The service could not be reached and nothing is cached for the request."""
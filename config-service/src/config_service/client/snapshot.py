@@ -0,0 +1,50 @@
+"""Last-known-good snapshot of cached responses on disk."""
+
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotStore:
+    """Stores cache entries as one JSON file, replaced atomically on every save.
+
+    A reader (including a process that crashed mid-save) always sees
+    either the previous or the new snapshot, never a torn file.
+    """
+
+    def __init__(self, path: os.PathLike):
+        self.path = Path(path)
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Return saved entries keyed by request path; empty if missing or unreadable."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable config snapshot %s: %s", self.path, e)
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def save(self, entries: Dict[str, Dict[str, Any]]):
+        """Write entries to a temporary file and move it over the snapshot."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{self.path.name}.", dir=self.path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
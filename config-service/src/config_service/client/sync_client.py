@@ -0,0 +1,115 @@
+"""Synchronous Config Service client."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+import httpx
+from config_service.client.cache import ResponseCache, application_path, config_path
+from config_service.client.errors import NotFoundError
+
+logger = logging.getLogger(__name__)
+
+
+class ConfigClient:
+    """Blocking counterpart of AsyncConfigClient; a daemon thread does the refreshing.
+
+    Use as a context manager. ``http_client`` may be any ``httpx.Client``
+    (for example Starlette's TestClient) and is then not closed by this
+    client.
+    """
+
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        refresh_interval: float = 30.0,
+        jitter: float = 0.1,
+        snapshot_path=None,
+        timeout: float = 5.0,
+        max_connections: int = 10,
+        http_client: Optional[httpx.Client] = None
+    ):
+        self._owns_http = http_client is None
+        self._http = http_client or httpx.Client(
+            base_url=base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+        self._headers = {"X-API-Key": api_key} if api_key else {}
+        self.cache = ResponseCache(refresh_interval, jitter, snapshot_path)
+        self.max_connections = max_connections
+        self._stop = threading.Event()
+        self._refresher: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "ConfigClient":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def start(self):
+        """Load the snapshot and start refreshing in a background thread."""
+        self.cache.load_snapshot()
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="config-client-refresh", daemon=True)
+        self._refresher.start()
+
+    def close(self):
+        """Stop refreshing, save the snapshot and close the connection pool."""
+        if self._refresher is not None:
+            self._stop.set()
+            self._refresher.join()
+            self._refresher = None
+        self.cache.save_snapshot()
+        if self._owns_http:
+            self._http.close()
+
+    def get_config(self, config_id: str, rendered: bool = False) -> Dict[str, Any]:
+        """Return a configuration's document merged over its parents (with ${...} expanded if rendered)."""
+        return self.get(config_path(config_id, rendered))["config"]
+
+    def get_application(self, app_id: str) -> Dict[str, Any]:
+        """Return an application with its configuration IDs."""
+        return self.get(application_path(app_id))
+
+    def get(self, path: str) -> Any:
+        """Return the JSON body of GET path, from the cache when possible."""
+        cached = self.cache.cached(path, allow_stale=self._refresher is not None)
+        if cached is not None:
+            return cached
+        return self._fetch(path)
+
+    def refresh(self):
+        """Revalidate every tracked path now and save the snapshot if anything changed."""
+        def revalidate(path: str):
+            try:
+                self._fetch(path)
+            except NotFoundError:
+                logger.info("%s no longer exists; stopped refreshing it", path)
+            except Exception as e:
+                logger.warning("Failed to refresh %s: %s", path, e)
+
+        paths = self.cache.tracked()
+        if paths:
+            with ThreadPoolExecutor(max_workers=min(self.max_connections, len(paths))) as pool:
+                list(pool.map(revalidate, paths))
+        self.cache.save_snapshot()
+
+    def _fetch(self, path: str) -> Any:
+        try:
+            response = self._http.get(path, headers={**self._headers, **self.cache.request_headers(path)})
+        except httpx.HTTPError as e:
+            return self.cache.fallback(path, e)
+        body = response.json() if response.status_code == 200 else None
+        return self.cache.apply(path, response.status_code, response.headers.get("etag"), body)
+
+    def _refresh_loop(self):
+        # Revalidate snapshot entries right away, then on the jittered interval
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.warning("Config refresh failed: %s", e)
+            self._stop.wait(self.cache.next_refresh_delay())
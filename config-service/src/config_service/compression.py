@@ -0,0 +1,255 @@
+"""Content negotiation and cached compression of encoded response payloads."""
+
+import asyncio
+import gzip
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+from fastapi import Request, Response
+from config_service.config import settings
+from config_service.repositories.single_flight import SingleFlight
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+
+def _compressors(zstd_level: int, brotli_quality: int, gzip_level: int) -> Dict[str, Callable[[bytes], bytes]]:
+    """Compressors by Content-Encoding token, in server preference order."""
+    compressors: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        # A ZstdCompressor must not be shared by threads compressing at the same time
+        compressors["zstd"] = lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data)
+    if brotli is not None:
+        compressors["br"] = lambda data: brotli.compress(data, quality=brotli_quality)
+    # mtime=0 keeps the output identical for identical input
+    compressors["gzip"] = lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0)
+    return compressors
+
+
+# Cached payloads are compressed once per version, so levels favour ratio over speed
+COMPRESSORS = _compressors(zstd_level=12, brotli_quality=9, gzip_level=9)
+# Transient payloads are compressed for a single response, so levels favour speed
+FAST_COMPRESSORS = _compressors(zstd_level=3, brotli_quality=4, gzip_level=6)
+
+# Compressions of large bodies running on worker threads, keyed by payload and encoding
+_compressions = SingleFlight()
+
+
+def negotiate(accept_encoding: Optional[str], available: Optional[List[str]] = None) -> Optional[str]:
+    """Pick the preferred available encoding the client accepts, or None for identity."""
+    if not accept_encoding:
+        return None
+    available = available if available is not None else list(COMPRESSORS)
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+    
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class EncodedPayload:
+    """A serialized response body with its lazily computed ETag and compressed variants."""
+    
+    __slots__ = ("key", "body", "variants", "_etag")
+    
+    def __init__(self, body: bytes, key: Hashable = None):
+        self.key = key
+        self.body = body
+        self.variants: Dict[str, bytes] = {}
+        self._etag: Optional[str] = None
+    
+    @property
+    def etag(self) -> str:
+        """Weak validator for the body, shared by all of its encodings."""
+        if self._etag is None:
+            self._etag = f'W/"{hashlib.blake2b(self.body, digest_size=12).hexdigest()}"'
+        return self._etag
+    
+    @property
+    def size(self) -> int:
+        """Bytes held by the body and its variants."""
+        return len(self.body) + sum(len(v) for v in self.variants.values())
+
+
+class CompressionStats:
+    """Counters showing how much compression work and bandwidth the cache saves."""
+    
+    def __init__(self):
+        self.counters: Dict[str, int] = {
+            "responses": 0, "compressed_responses": 0, "not_modified": 0, "below_threshold": 0,
+            "compressions": 0, "bytes_uncompressed": 0, "bytes_sent": 0
+        }
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the counters plus the supported encodings."""
+        return {"encodings": list(COMPRESSORS), "min_size": settings.compression_min_size, **self.counters}
+
+
+# Global compression statistics instance
+compression_stats = CompressionStats()
+
+
+async def encoded_response(
+    request: Request,
+    payload: EncodedPayload,
+    add_variant: Optional[Callable[[EncodedPayload, str, bytes], None]] = None,
+    media_type: str = "application/json",
+    transient: bool = False
+) -> Response:
+    """Build a response for a cached payload, honouring If-None-Match and Accept-Encoding.
+    
+    A compressed variant is produced the first time an encoding is asked for
+    and stored through add_variant (by default on the payload itself), so
+    every later request for the same payload version is a dictionary lookup.
+    Bodies of at least ``compression_offload_size`` bytes are compressed on
+    a worker thread, so the event loop keeps serving other requests.
+    Transient payloads, built for one response, use fast compression levels.
+    """
+    counters = compression_stats.counters
+    counters["responses"] += 1
+    headers = {"ETag": payload.etag, "Vary": "Accept-Encoding"}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, payload.etag):
+        counters["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+    
+    body = payload.body
+    counters["bytes_uncompressed"] += len(body)
+    encoding = None
+    if len(body) < settings.compression_min_size:
+        counters["below_threshold"] += 1
+    else:
+        encoding = negotiate(request.headers.get("accept-encoding"))
+    
+    if encoding is not None:
+        compressed = payload.variants.get(encoding)
+        if compressed is None:
+            compress = (FAST_COMPRESSORS if transient else COMPRESSORS)[encoding]
+            store = add_variant or _store_variant
+            if len(body) >= settings.compression_offload_size:
+                compressed = await _compressions.do(
+                    (id(payload), encoding), lambda: _compress_off_loop(payload, encoding, compress, store)
+                )
+            else:
+                compressed = compress(body)
+                counters["compressions"] += 1
+                store(payload, encoding, compressed)
+        body = compressed
+        headers["Content-Encoding"] = encoding
+        counters["compressed_responses"] += 1
+    
+    counters["bytes_sent"] += len(body)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+async def _compress_off_loop(payload: EncodedPayload, encoding: str, compress: Callable[[bytes], bytes], store) -> bytes:
+    # Coalesced per payload and encoding, so concurrent requests compress and store it once
+    compressed = await asyncio.to_thread(compress, payload.body)
+    compression_stats.counters["compressions"] += 1
+    store(payload, encoding, compressed)
+    return compressed
+
+
+def _store_variant(payload: EncodedPayload, encoding: str, data: bytes):
+    payload.variants[encoding] = data
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class PayloadCache:
+    """LRU of encoded payloads keyed by resource, each tied to the source object it was built from.
+    
+    ``get`` returns the cached payload only while the caller's source object
+    is the very one it was built from, so whatever produces the source
+    (e.g. the resolver's cache) decides when a payload is stale.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+    
+    def get(self, key: Hashable, source: Any) -> Optional[EncodedPayload]:
+        """Return the payload built from source, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] is not source:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        self._entries.move_to_end(key)
+        return entry[1]
+    
+    def put(self, key: Hashable, source: Any, body: bytes) -> EncodedPayload:
+        """Store a freshly encoded body for source and return its payload."""
+        self.discard(key)
+        payload = EncodedPayload(body, key)
+        self._entries[key] = (source, payload)
+        self._bytes += payload.size
+        self._evict()
+        return payload
+    
+    def add_variant(self, payload: EncodedPayload, encoding: str, data: bytes):
+        """Attach a compressed variant, counting it against max_bytes."""
+        payload.variants[encoding] = data
+        entry = self._entries.get(payload.key)
+        if entry is not None and entry[1] is payload:
+            self._bytes += len(data)
+            self._evict()
+    
+    def discard(self, key: Hashable):
+        """Drop the payload stored under key."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1].size
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size, memory use and hit/miss/eviction counters."""
+        return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes, **self._stats}
+    
+    def _evict(self):
+        while self._entries and self._bytes > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self._stats["evictions"] += 1
+
+
+# Global payload cache instance
+payload_cache = PayloadCache(max_bytes=settings.response_cache_max_bytes)
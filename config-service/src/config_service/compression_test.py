@@ -0,0 +1,139 @@
+"""Tests for response compression."""
+
+import asyncio
+import gzip
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+from starlette.requests import Request as StarletteRequest
+from config_service.compression import (
+    EncodedPayload, PayloadCache, compression_stats, encoded_response, negotiate
+)
+
+
+@pytest.mark.parametrize("header,expected", [
+    (None, None),
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("*", "zstd"),
+    ("br;q=0.5, zstd;q=0.8", "zstd"),
+    ("br, zstd;q=0.1", "br"),
+    ("deflate, gzip;q=0.5", "gzip"),
+    ("*;q=0.1, zstd;q=0", "br"),
+])
+def test_negotiate(header, expected):
+    """Test Accept-Encoding negotiation against a full set of encodings."""
+    assert negotiate(header, ["zstd", "br", "gzip"]) == expected
+
+
+def test_negotiate_only_offers_available_encodings():
+    """Test that unavailable encodings are never chosen."""
+    assert negotiate("br, gzip;q=0.1", ["gzip"]) == "gzip"
+    assert negotiate("br", ["gzip"]) is None
+
+
+def test_payload_etag_stable():
+    """Test that equal bodies get equal weak ETags."""
+    assert EncodedPayload(b"abc").etag == EncodedPayload(b"abc").etag
+    assert EncodedPayload(b"abc").etag.startswith('W/"')
+    assert EncodedPayload(b"abc").etag != EncodedPayload(b"abd").etag
+
+
+@pytest.fixture
+def client():
+    """App serving one large and one small cached payload."""
+    app = FastAPI()
+    payloads = {"large": EncodedPayload(b'{"data":"' + b"x" * 4096 + b'"}'), "small": EncodedPayload(b'{"a":1}')}
+    
+    @app.get("/{name}")
+    async def serve(name: str, request: Request):
+        return await encoded_response(request, payloads[name])
+    
+    client = TestClient(app)
+    client.payloads = payloads
+    return client
+
+
+def test_large_payload_compressed_once(client):
+    """Test that a gzip variant is computed on first request and reused afterwards."""
+    before = compression_stats.counters["compressions"]
+    
+    first = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    
+    assert first.headers["content-encoding"] == "gzip"
+    assert first.headers["vary"] == "Accept-Encoding"
+    assert second.content == client.payloads["large"].body
+    assert compression_stats.counters["compressions"] == before + 1
+    assert len(client.payloads["large"].variants["gzip"]) < 100
+    assert gzip.decompress(client.payloads["large"].variants["gzip"]) == client.payloads["large"].body
+
+
+def test_small_payload_not_compressed(client):
+    """Test that payloads below the threshold are sent as is."""
+    response = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"a": 1}
+
+
+def test_identity_when_not_accepted(client):
+    """Test that clients not sending Accept-Encoding get the raw body."""
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    
+    assert "content-encoding" not in response.headers
+    assert response.content == client.payloads["large"].body
+
+
+def test_if_none_match_returns_304(client):
+    """Test that revalidation with the current ETag returns 304 without a body."""
+    etag = client.get("/large").headers["etag"]
+    
+    response = client.get("/large", headers={"If-None-Match": etag})
+    stale = client.get("/large", headers={"If-None-Match": 'W/"other"'})
+    
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+    assert stale.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_large_payload_compressed_once_off_loop(monkeypatch):
+    """Test that concurrent requests for a large body share one compression on a worker thread."""
+    monkeypatch.setattr('config_service.compression.settings.compression_offload_size', 2048)
+    payload = EncodedPayload(b'{"data":"' + b"y" * 8192 + b'"}')
+    request = StarletteRequest({"type": "http", "headers": [(b"accept-encoding", b"gzip")]})
+    before = compression_stats.counters["compressions"]
+    
+    responses = await asyncio.gather(*(encoded_response(request, payload) for _ in range(5)))
+    
+    assert compression_stats.counters["compressions"] == before + 1
+    assert all(gzip.decompress(response.body) == payload.body for response in responses)
+    assert "gzip" in payload.variants
+
+
+def test_payload_cache_tied_to_source():
+    """Test that payloads are only returned for the source object they were built from."""
+    cache = PayloadCache()
+    source = object()
+    payload = cache.put("k", source, b"body")
+    
+    assert cache.get("k", source) is payload
+    assert cache.get("k", object()) is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_payload_cache_memory_cap():
+    """Test that bodies and variants count against the cap with LRU eviction."""
+    cache = PayloadCache(max_bytes=10)
+    first = cache.put("a", None, b"12345")
+    cache.put("b", None, b"12345")
+    
+    cache.add_variant(first, "gzip", b"123")
+    
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["bytes"] <= 10
+    assert cache.stats()["evictions"] == 1
@@ -1,6 +1,7 @@
 """Application configuration using pydantic-settings."""
 
-from pydantic import Field, ConfigDict
+from typing import Dict, List, Optional
+from pydantic import Field, ConfigDict, model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -13,15 +14,98 @@ class Settings(BaseSettings):
     )
     
     # Database configuration
-    database_url: str = Field(..., description="PostgreSQL connection URL")
+    database_url: str = Field("", description="PostgreSQL connection URL (not needed with SNAPSHOT_PATH)")
     database_min_connections: int = Field(1, description="Minimum database connections")
     database_max_connections: int = Field(10, description="Maximum database connections")
+    database_pool_timeout: float = Field(5.0, description="Seconds to wait for a free connection before failing")
+    database_pool_max_waiters: int = Field(100, description="Maximum requests queued for a connection before rejecting")
+    database_max_lifetime: float = Field(1800.0, description="Seconds after which a connection is recycled")
+    database_idle_timeout: float = Field(300.0, description="Seconds an idle connection above the minimum is kept open")
+    database_liveness_check_interval: float = Field(30.0, description="Idle seconds after which a connection is pinged before checkout")
+    database_breaker_failure_threshold: int = Field(5, description="Consecutive connection failures that open the database circuit breaker")
+    database_breaker_reset_timeout: float = Field(10.0, description="Seconds the circuit stays open before a probe query is let through")
     
     # Application configuration
     log_level: str = Field("INFO", description="Logging level")
+    log_format: str = Field("json", description="Log output format: json or text")
+    log_queue_size: int = Field(10000, description="Maximum log records buffered before new ones are dropped")
+    log_sample_rate: float = Field(1.0, description="Fraction of successful requests given an access log entry")
+    log_route_sample_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Per-route access log sampling rates keyed by 'METHOD /route/template'"
+    )
+    log_payloads: bool = Field(False, description="Dump request and row payloads at DEBUG level")
+    audit_queue_size: int = Field(10000, description="Maximum audit events buffered before new ones are dropped")
+    audit_batch_size: int = Field(500, description="Audit events written per multi-row INSERT")
+    audit_flush_interval: float = Field(1.0, description="Maximum seconds an audit event waits before being flushed")
+    admin_token: Optional[str] = Field(None, description="Shared secret for admin endpoints and the X-Profile-Token header")
+    profiling_sample_rate: float = Field(0.0, description="Fraction of requests profiled; 0 disables sampling")
+    config_cache_max_entries: int = Field(10000, description="Maximum resolved configurations kept in memory")
+    config_cache_ttl: float = Field(30.0, description="Seconds a resolved configuration is cached")
+    catalogue_cache_max_bytes: int = Field(64 * 1024 * 1024, description="Memory cap for the encoded application catalogue cache")
+    catalogue_cache_ttl: float = Field(30.0, description="Seconds before the cached application catalogue is reloaded")
+    application_cache_backend: str = Field("none", description="Cache for application repository reads: none, memory (per process) or shared (all workers on the host)")
+    application_cache_max_entries: int = Field(10000, description="Cached application reads; slots of the shared backend")
+    application_cache_ttl: float = Field(30.0, description="Seconds a cached application read is served; bounds staleness across hosts")
+    shared_cache_path: str = Field("/dev/shm/config-service-cache", description="File backing the shared cache; every worker on the host must use the same one")
+    shared_cache_bytes: int = Field(64 * 1024 * 1024, description="Size of the shared cache file")
+    stale_if_error_max_age: float = Field(86400.0, description="Seconds past its TTL a cached read is still served while it is refreshed or the database is down")
+    compression_min_size: int = Field(1024, description="Responses smaller than this many bytes are sent uncompressed")
+    compression_offload_size: int = Field(64 * 1024, description="Responses of at least this many bytes are compressed on a worker thread instead of the event loop")
+    response_cache_max_bytes: int = Field(64 * 1024 * 1024, description="Memory cap for cached encoded configuration responses")
+    config_schema_cache_ttl: float = Field(30.0, description="Seconds a compiled application schema is used before it is reloaded; bounds how long other processes enforce a replaced schema")
+    require_if_match: bool = Field(False, description="Reject updates without an If-Match header with 428")
+    bulk_delete_chunk_size: int = Field(1000, description="Configurations deleted per transaction by bulk application deletes")
+    job_worker_enabled: bool = Field(True, description="Run the background job worker in this process")
+    job_worker_concurrency: int = Field(2, description="Jobs one process runs at the same time")
+    job_poll_interval: float = Field(1.0, description="Seconds between checks for new jobs")
+    job_heartbeat_interval: float = Field(5.0, description="Seconds between progress writes and lease renewals of running jobs")
+    job_lease_seconds: float = Field(60.0, description="Seconds without a heartbeat after which another worker may take a job over")
+    job_max_attempts: int = Field(3, description="Attempts before a failing job is marked failed")
+    job_retry_delay: float = Field(5.0, description="Seconds before the first retry; doubled for each further attempt")
+    job_retention: float = Field(7 * 24 * 3600, description="Seconds finished jobs are kept for status queries")
+    change_feed_settle_seconds: float = Field(2.0, description="Changes younger than this are held back so commits arriving late are not skipped")
+    change_feed_retention: float = Field(30 * 24 * 3600, description="Seconds tombstones are kept; older cursors must resynchronise")
+    rate_limit_enabled: bool = Field(False, description="Refuse over-budget requests with 429 before they reach the database")
+    rate_limit_per_second: float = Field(50.0, description="Sustained requests per second allowed per client")
+    rate_limit_burst: int = Field(100, description="Requests a client may make at once before the sustained rate applies")
+    rate_limit_max_concurrent: int = Field(5, description="Requests one client may have in flight per process; 0 disables the cap")
+    rate_limit_max_clients: int = Field(10000, description="Client buckets kept in memory")
+    rate_limit_key_header: str = Field("X-API-Key", description="Header identifying a client; the remote address is used without it")
+    rate_limit_api_keys: List[str] = Field(
+        default_factory=list,
+        description="API keys that get a budget of their own; clients sending any other key are limited by address"
+    )
+    rate_limit_exempt_paths: List[str] = Field(
+        default_factory=lambda: ["/health", "/metrics"],
+        description="Paths never rate limited"
+    )
+    rate_limit_backend: str = Field("memory", description="memory for per-process limits, postgres to share the rate across replicas")
+    rate_limit_window: float = Field(10.0, description="Seconds per shared counting window of the postgres backend")
+    rate_limit_sync_interval: float = Field(1.0, description="Seconds between syncs of shared request counts")
+    idempotency_enabled: bool = Field(True, description="Replay stored responses to mutating requests retried with the same Idempotency-Key")
+    idempotency_ttl: float = Field(24 * 3600, description="Seconds a stored response is replayed for its Idempotency-Key")
+    idempotency_lock_timeout: float = Field(60.0, description="Seconds a key stays claimed by a request that never finished before a retry may run it again")
+    idempotency_max_response_bytes: int = Field(1024 * 1024, description="Larger responses are not stored, so their retries run again")
+    snapshot_path: Optional[str] = Field(None, description="Serve reads from this snapshot file instead of PostgreSQL; writes are refused")
+    snapshot_reload_interval: float = Field(1.0, description="Seconds between checks for a new snapshot file")
     host: str = Field("0.0.0.0", description="Host to bind to")
     port: int = Field(8000, description="Port to bind to")
     debug: bool = Field(False, description="Enable debug mode")
+    server_workers: int = Field(0, description="Worker processes started by config_service.server; 0 means one per CPU")
+    server_loop: str = Field("auto", description="Event loop: auto (uvloop when installed), uvloop or asyncio")
+    server_http: str = Field("auto", description="HTTP parser: auto (httptools when installed), httptools or h11")
+    server_preload: bool = Field(True, description="Import the app once before forking workers, sharing its memory copy-on-write")
+    server_backlog: int = Field(2048, description="Pending connections the listening socket queues before refusing")
+    server_keepalive_timeout: float = Field(75.0, description="Seconds an idle keep-alive connection is held; keep above the load balancer's idle timeout")
+    server_graceful_timeout: float = Field(30.0, description="Seconds a stopping worker waits for in-flight requests, then again for running queries")
+    
+    @model_validator(mode="after")
+    def require_data_source(self):
+        """Demand a database unless reads come from a snapshot file."""
+        if not self.database_url and not self.snapshot_path:
+            raise ValueError("DATABASE_URL is required unless SNAPSHOT_PATH is set")
+        return self
 
 
 # Global settings instance
@@ -0,0 +1,93 @@
+"""Circuit breaker that fails database calls fast while the database is down."""
+
+import logging
+import time
+from typing import Any, Dict, Optional
+import psycopg2
+from config_service.database.pool import PoolTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# Errors that say the database (not the query) is the problem; a pool timeout
+# only says every connection is busy, which is load, not an outage
+OUTAGE_ERRORS = (psycopg2.OperationalError, psycopg2.InterfaceError)
+
+
+class CircuitOpenError(PoolTimeoutError):
+    """Raised instead of calling the database while the circuit is open.
+
+    A PoolTimeoutError, so it passes through repositories and routers and
+    becomes a 503 with Retry-After like any other unavailable connection.
+    """
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Database circuit open, retry in {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Stops sending calls to the database after consecutive outage errors.
+
+    Closed: calls go through and ``failure_threshold`` consecutive outage
+    errors open the circuit. Open: calls fail at once with
+    CircuitOpenError for ``reset_timeout`` seconds. Half-open: one probe
+    call is let through per ``reset_timeout``; its success closes the
+    circuit and its failure opens it again. Query errors such as
+    constraint violations are the caller's problem and do not count.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probe_at = 0.0
+        self._stats = {"opened": 0, "rejected": 0, "probes": 0}
+
+    @property
+    def state(self) -> str:
+        """closed, open or half_open."""
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.reset_timeout:
+            return "open"
+        return "half_open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go to the database now."""
+        if self._opened_at is None:
+            return
+        now = time.monotonic()
+        if now - self._opened_at >= self.reset_timeout and now >= self._probe_at:
+            # A probe that never reports back (cancelled, hung) only holds the slot for one timeout
+            self._probe_at = now + self.reset_timeout
+            self._stats["probes"] += 1
+            return
+        self._stats["rejected"] += 1
+        retry_at = max(self._opened_at + self.reset_timeout, self._probe_at)
+        raise CircuitOpenError(max(0.0, retry_at - now))
+
+    def record_success(self):
+        """Note a completed call; closes the circuit."""
+        if self._opened_at is not None:
+            logger.info("Database circuit closed")
+        self._failures = 0
+        self._opened_at = None
+        self._probe_at = 0.0
+
+    def record_failure(self, error: BaseException):
+        """Note a failed call; outage errors count towards opening the circuit."""
+        if not isinstance(error, OUTAGE_ERRORS):
+            return
+        self._failures += 1
+        if self._opened_at is not None:
+            # The half-open probe failed
+            self._opened_at = time.monotonic()
+        elif self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._stats["opened"] += 1
+            logger.error("Database circuit opened after %s consecutive failures: %s", self._failures, error)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the state, consecutive failures and transition counters."""
+        return {"state": self.state, "consecutive_failures": self._failures, **self._stats}
@@ -0,0 +1,121 @@
+"""Tests for the database circuit breaker."""
+
+import psycopg2
+import pytest
+from unittest.mock import patch
+from config_service.database.circuit_breaker import CircuitBreaker, CircuitOpenError
+from config_service.database.pool import PoolExhaustedError, PoolTimeoutError
+
+
+class Clock:
+    """Controllable stand-in for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Patch the breaker's clock."""
+    fake = Clock()
+    with patch('config_service.database.circuit_breaker.time.monotonic', fake):
+        yield fake
+
+
+def trip(breaker: CircuitBreaker):
+    """Record enough outage errors to open the circuit."""
+    for _ in range(breaker.failure_threshold):
+        breaker.before_call()
+        breaker.record_failure(psycopg2.OperationalError("connection refused"))
+
+
+def test_opens_after_consecutive_failures(clock):
+    """Test that the threshold of consecutive outage errors opens the circuit."""
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0)
+
+    breaker.record_failure(psycopg2.OperationalError("down"))
+    breaker.record_failure(psycopg2.OperationalError("down"))
+    breaker.record_success()
+    breaker.record_failure(psycopg2.OperationalError("down"))
+    breaker.record_failure(psycopg2.OperationalError("down"))
+    assert breaker.state == "closed"
+
+    breaker.record_failure(psycopg2.OperationalError("down"))
+    assert breaker.state == "open"
+    assert breaker.stats()["opened"] == 1
+
+
+def test_open_circuit_rejects_with_retry_after(clock):
+    """Test that calls fail fast with the time left until the next probe."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    trip(breaker)
+    clock.now += 4.0
+
+    with pytest.raises(CircuitOpenError) as exc_info:
+        breaker.before_call()
+
+    assert exc_info.value.retry_after == pytest.approx(6.0)
+    assert isinstance(exc_info.value, PoolTimeoutError)
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_query_errors_do_not_count(clock):
+    """Test that errors caused by the query, rejections, pool timeouts and overload leave the circuit closed."""
+    breaker = CircuitBreaker(failure_threshold=1)
+
+    breaker.record_failure(psycopg2.IntegrityError("duplicate key"))
+    breaker.record_failure(RuntimeError("bad input"))
+    breaker.record_failure(PoolExhaustedError("queue full"))
+    breaker.record_failure(PoolTimeoutError("no connection within 5s"))
+    breaker.record_failure(CircuitOpenError(1.0))
+
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_probe_through(clock):
+    """Test that after the reset timeout a single probe call is allowed."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    trip(breaker)
+    clock.now += 10.0
+    assert breaker.state == "half_open"
+
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == "closed"
+    breaker.before_call()
+
+
+def test_failed_probe_reopens(clock):
+    """Test that a failing probe keeps the circuit open for another reset timeout."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    trip(breaker)
+    clock.now += 10.0
+
+    breaker.before_call()
+    breaker.record_failure(psycopg2.OperationalError("still down"))
+
+    assert breaker.state == "open"
+    clock.now += 9.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    clock.now += 1.0
+    breaker.before_call()
+
+
+def test_lost_probe_frees_its_slot(clock):
+    """Test that a probe that never reports back does not wedge the circuit."""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10.0)
+    trip(breaker)
+    clock.now += 10.0
+    breaker.before_call()
+
+    clock.now += 10.0
+    breaker.before_call()
+
+    assert breaker.stats()["probes"] == 2
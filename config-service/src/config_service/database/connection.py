@@ -1,142 +1,247 @@
 """Database connection management with connection pooling."""
 
+import asyncio
 import logging
+import time
 from contextlib import asynccontextmanager
 from concurrent.futures import ThreadPoolExecutor
-from typing import AsyncGenerator, Dict, Any, Optional
+from typing import AsyncGenerator, Callable, Dict, Any, Optional, Set
 import psycopg2
-from psycopg2 import pool
+from psycopg2 import extras
 from psycopg2.extras import RealDictCursor
 from config_service.config import settings
+from config_service.database.circuit_breaker import CircuitBreaker
+from config_service.database.pool import ConnectionPool, psycopg2_connection_factory
+from config_service.profiling import current_profile
 
 logger = logging.getLogger(__name__)
 
 
 class DatabaseManager:
-    """Manages database connections using ThreadedConnectionPool."""
+    """Manages database connections using an adaptive ConnectionPool.
+    
+    Every query goes through a circuit breaker, so while the database is
+    down callers fail at once instead of each waiting out a connect or
+    pool timeout.
+    """
     
     def __init__(self):
-        self._pool: Optional[pool.ThreadedConnectionPool] = None
+        self._pool: Optional[ConnectionPool] = None
         self._executor: Optional[ThreadPoolExecutor] = None
+        # Queries running on the executor, awaited by drain() before shutdown
+        self._in_flight: Set[asyncio.Future] = set()
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.database_breaker_failure_threshold,
+            reset_timeout=settings.database_breaker_reset_timeout
+        )
     
     def initialize(self):
         """Initialize the connection pool and thread executor."""
         try:
-            self._pool = psycopg2.pool.ThreadedConnectionPool(
-                minconn=settings.database_min_connections,
-                maxconn=settings.database_max_connections,
-                dsn=settings.database_url,
-                cursor_factory=RealDictCursor
-            )
             self._executor = ThreadPoolExecutor(max_workers=settings.database_max_connections)
+            self._pool = ConnectionPool(
+                connection_factory=psycopg2_connection_factory(
+                    settings.database_url,
+                    cursor_factory=RealDictCursor
+                ),
+                executor=self._executor,
+                min_size=settings.database_min_connections,
+                max_size=settings.database_max_connections,
+                max_waiters=settings.database_pool_max_waiters,
+                timeout=settings.database_pool_timeout,
+                max_lifetime=settings.database_max_lifetime,
+                idle_timeout=settings.database_idle_timeout,
+                liveness_check_interval=settings.database_liveness_check_interval
+            )
+            self._pool.open()
             logger.info("Database connection pool initialized")
         except Exception as e:
-            logger.error(f"Failed to initialize database pool: {e}")
+            logger.error("Failed to initialize database pool: %s", e)
             raise
     
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for queries already running on the executor.
+        
+        Call before close() during shutdown: a cancelled request's query keeps
+        running, and this lets it finish and return its connection while the
+        event loop is still free to process the release.
+        """
+        if not self._in_flight:
+            return True
+        logger.info("Waiting for %s in-flight database queries", len(self._in_flight))
+        _, pending = await asyncio.wait(set(self._in_flight), timeout=timeout)
+        if pending:
+            logger.warning("%s database queries still running after %ss", len(pending), timeout)
+        return not pending
+    
     def close(self):
         """Close the connection pool and thread executor."""
         if self._pool:
-            self._pool.closeall()
+            self._pool.close()
             logger.info("Database connection pool closed")
         
         if self._executor:
             self._executor.shutdown(wait=True)
             logger.info("Thread executor shutdown")
     
+    def pool_stats(self) -> Dict[str, Any]:
+        """Return connection pool occupancy and wait statistics."""
+        if not self._pool:
+            return {}
+        return self._pool.stats()
+    
     @asynccontextmanager
     async def get_connection(self) -> AsyncGenerator[psycopg2.extensions.connection, None]:
         """Get a database connection from the pool."""
         if not self._pool:
             raise RuntimeError("Database pool not initialized")
         
-        connection = None
+        connection = await self._pool.acquire()
         try:
-            connection = self._pool.getconn()
             yield connection
         except Exception as e:
-            if connection:
-                connection.rollback()
-            logger.error(f"Database connection error: {e}")
+            connection.rollback()
+            logger.error("Database connection error: %s", e)
             raise
         finally:
-            if connection:
-                self._pool.putconn(connection)
+            self._pool.release(connection)
     
-    async def execute_query(self, query: str, params: tuple = None) -> list[Dict[str, Any]]:
-        """Execute a SELECT query and return results."""
+    async def _run(self, work: Callable[[psycopg2.extensions.connection], Any]) -> Any:
+        """Check out a connection and run blocking work with it on the executor.
+        
+        When the request is being profiled, pool wait, executor hop and SQL
+        time are recorded too; otherwise nothing is timed.
+        """
         if not self._pool or not self._executor:
             raise RuntimeError("Database pool not initialized")
         
-        def _execute():
-            connection = None
+        self.breaker.before_call()
+        profile = current_profile.get()
+        timings: Optional[Dict[str, float]] = {} if profile is not None else None
+        try:
+            if timings is not None:
+                timings["acquire"] = time.perf_counter()
+            connection = await self._pool.acquire()
+            if timings is not None:
+                timings["acquired"] = time.perf_counter()
+            
+            def _execute():
+                if timings is not None:
+                    timings["thread_start"] = time.perf_counter()
+                try:
+                    return work(connection)
+                except Exception:
+                    if not connection.closed:
+                        connection.rollback()
+                    raise
+                finally:
+                    if not connection.closed:
+                        self._pool.reset(connection)
+                    if timings is not None:
+                        timings["thread_end"] = time.perf_counter()
+            
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self._executor, _execute)
+            # Release only once the thread is done, even if the awaiting task is cancelled
+            future.add_done_callback(lambda _: self._pool.release(connection))
+            self._track(future)
             try:
-                connection = self._pool.getconn()
-                with connection.cursor() as cursor:
-                    cursor.execute(query, params)
-                    return cursor.fetchall()
-            except Exception as e:
-                if connection:
-                    connection.rollback()
-                raise
+                result = await asyncio.shield(future)
             finally:
-                if connection:
-                    self._pool.putconn(connection)
+                if timings is not None:
+                    self._record_timings(profile, timings)
+        except Exception as e:
+            self.breaker.record_failure(e)
+            raise
+        self.breaker.record_success()
+        return result
+    
+    @staticmethod
+    def _record_timings(profile, timings: Dict[str, float]):
+        """Add the timings of one query to the request's profile."""
+        profile.add("pool_wait", timings["acquired"] - timings["acquire"])
+        if "thread_end" in timings:
+            resumed = time.perf_counter()
+            profile.add("sql", timings["thread_end"] - timings["thread_start"])
+            # Queueing for a worker thread plus the hop back onto the event loop
+            profile.add("executor_hop", (timings["thread_start"] - timings["acquired"]) + (resumed - timings["thread_end"]))
+    
+    def _track(self, future: asyncio.Future):
+        """Count future as in flight until the executor finishes it."""
+        self._in_flight.add(future)
+        future.add_done_callback(self._in_flight.discard)
+    
+    async def execute_query(self, query: str, params: tuple = None) -> list[Dict[str, Any]]:
+        """Execute a SELECT query and return results."""
+        def _execute(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(query, params)
+                return cursor.fetchall()
         
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _execute)
+        return await self._run(_execute)
     
     async def execute_command(self, command: str, params: tuple = None) -> int:
         """Execute an INSERT/UPDATE/DELETE command and return affected rows."""
-        if not self._pool or not self._executor:
-            raise RuntimeError("Database pool not initialized")
-        
-        def _execute():
-            connection = None
-            try:
-                connection = self._pool.getconn()
-                with connection.cursor() as cursor:
-                    cursor.execute(command, params)
-                    connection.commit()
-                    return cursor.rowcount
-            except Exception as e:
-                if connection:
-                    connection.rollback()
-                raise
-            finally:
-                if connection:
-                    self._pool.putconn(connection)
+        def _execute(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(command, params)
+                connection.commit()
+                return cursor.rowcount
         
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _execute)
+        return await self._run(_execute)
     
     async def execute_returning_query(self, command: str, params: tuple = None) -> list[Dict[str, Any]]:
         """Execute an INSERT/UPDATE/DELETE command with RETURNING clause."""
-        if not self._pool or not self._executor:
-            raise RuntimeError("Database pool not initialized")
+        def _execute(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(command, params)
+                result = cursor.fetchall()
+                connection.commit()
+                return result
         
-        def _execute():
-            connection = None
-            try:
-                connection = self._pool.getconn()
-                with connection.cursor() as cursor:
-                    cursor.execute(command, params)
-                    result = cursor.fetchall()
-                    connection.commit()
-                    return result
-            except Exception as e:
-                if connection:
-                    connection.rollback()
-                raise
-            finally:
-                if connection:
-                    self._pool.putconn(connection)
+        return await self._run(_execute)
+    
+    async def execute_locked_returning_query(
+        self, lock: str, lock_params: tuple, command: str, params: tuple = None
+    ) -> list[Dict[str, Any]]:
+        """Execute a command with RETURNING in one transaction after lock, a statement taking a transaction lock.
+        
+        The command runs as a second statement, so under READ COMMITTED it
+        sees everything committed by whoever held the lock before.
+        """
+        def _execute(connection):
+            with connection.cursor() as cursor:
+                cursor.execute(lock, lock_params)
+                cursor.execute(command, params)
+                result = cursor.fetchall()
+                connection.commit()
+                return result
+        
+        return await self._run(_execute)
+    
+    async def execute_consistent_queries(self, queries: list[str]) -> list[list[Dict[str, Any]]]:
+        """Run several SELECTs in one REPEATABLE READ, READ ONLY transaction, so they see the same data."""
+        def _execute(connection):
+            results = []
+            with connection.cursor() as cursor:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+                for query in queries:
+                    cursor.execute(query)
+                    results.append(cursor.fetchall())
+            connection.commit()
+            return results
+        
+        return await self._run(_execute)
+    
+    async def execute_values(self, command: str, rows: list[tuple], page_size: int = 1000) -> int:
+        """Execute a multi-row INSERT built from a single ``VALUES %s`` placeholder."""
+        def _execute(connection):
+            with connection.cursor() as cursor:
+                extras.execute_values(cursor, command, rows, page_size=page_size)
+                connection.commit()
+                return len(rows)
         
-        import asyncio
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self._executor, _execute)
+        return await self._run(_execute)
 
 
 # Global database manager instance
@@ -1,8 +1,13 @@
 """Tests for database connection management."""
 
+import asyncio
+import psycopg2
 import pytest
-from unittest.mock import Mock, patch
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+from config_service.database.circuit_breaker import CircuitOpenError
 from config_service.database.connection import DatabaseManager
+from config_service.profiling import RequestProfile, current_profile
 
 
 @pytest.fixture
@@ -13,7 +18,7 @@ def db_manager():
 
 def test_database_manager_initialization(db_manager):
     """Test DatabaseManager initialization."""
-    with patch('psycopg2.pool.ThreadedConnectionPool') as mock_pool:
+    with patch('config_service.database.connection.ConnectionPool') as mock_pool:
         
         mock_pool_instance = Mock()
         mock_pool.return_value = mock_pool_instance
@@ -24,6 +29,8 @@ def test_database_manager_initialization(db_manager):
         # Check that executor was created (it's a real ThreadPoolExecutor)
         assert db_manager._executor is not None
         mock_pool.assert_called_once()
+        mock_pool_instance.open.assert_called_once()
+        db_manager._executor.shutdown()
 
 
 def test_database_manager_close(db_manager):
@@ -35,10 +42,30 @@ def test_database_manager_close(db_manager):
     
     db_manager.close()
     
-    mock_pool.closeall.assert_called_once()
+    mock_pool.close.assert_called_once()
     mock_executor.shutdown.assert_called_once_with(wait=True)
 
 
+
+async def test_drain_waits_for_in_flight_queries(db_manager):
+    """Test that drain returns once tracked executor work has finished."""
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    db_manager._track(future)
+    loop.call_later(0.01, future.set_result, None)
+    
+    assert await db_manager.drain(timeout=1.0) is True
+    assert not db_manager._in_flight
+
+
+async def test_drain_gives_up_after_timeout(db_manager):
+    """Test that drain reports work still running after the timeout."""
+    future = asyncio.get_running_loop().create_future()
+    db_manager._track(future)
+    
+    assert await db_manager.drain(timeout=0.01) is False
+    future.cancel()
+
 async def test_get_connection_not_initialized(db_manager):
     """Test that get_connection raises error when not initialized."""
     with pytest.raises(RuntimeError, match="Database pool not initialized"):
@@ -61,4 +88,87 @@ async def test_execute_command_not_initialized(db_manager):
 async def test_execute_returning_query_not_initialized(db_manager):
     """Test that execute_returning_query raises error when not initialized."""
     with pytest.raises(RuntimeError, match="Database pool not initialized"):
-        await db_manager.execute_returning_query("INSERT INTO test VALUES (%s) RETURNING id", ('value',))
\ No newline at end of file
+        await db_manager.execute_returning_query("INSERT INTO test VALUES (%s) RETURNING id", ('value',))
+
+
+async def test_execute_query_releases_connection(db_manager):
+    """Test that execute_query returns the connection to the pool after use."""
+    connection = MagicMock()
+    connection.closed = 0
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.fetchall.return_value = [{'id': 1}]
+    
+    mock_pool = Mock()
+    mock_pool.acquire = AsyncMock(return_value=connection)
+    db_manager._pool = mock_pool
+    db_manager._executor = ThreadPoolExecutor(max_workers=1)
+    
+    try:
+        result = await db_manager.execute_query("SELECT 1")
+    finally:
+        db_manager._executor.shutdown()
+    
+    assert result == [{'id': 1}]
+    mock_pool.reset.assert_called_once_with(connection)
+    mock_pool.release.assert_called_once_with(connection)
+
+
+async def test_profiled_query_records_phases(db_manager):
+    """Test that a query run while profiling records pool wait, SQL and executor hop time."""
+    connection = MagicMock()
+    connection.closed = 0
+    
+    mock_pool = Mock()
+    mock_pool.acquire = AsyncMock(return_value=connection)
+    db_manager._pool = mock_pool
+    db_manager._executor = ThreadPoolExecutor(max_workers=1)
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    
+    try:
+        await db_manager.execute_query("SELECT 1")
+    finally:
+        current_profile.reset(token)
+        db_manager._executor.shutdown()
+    
+    assert {"pool_wait", "sql", "executor_hop"} <= set(profile.phases)
+    mock_pool.release.assert_called_once_with(connection)
+
+
+async def test_execute_command_rolls_back_on_error(db_manager):
+    """Test that a failing command is rolled back and the connection released."""
+    connection = MagicMock()
+    connection.closed = 0
+    cursor = connection.cursor.return_value.__enter__.return_value
+    cursor.execute.side_effect = Exception("boom")
+    
+    mock_pool = Mock()
+    mock_pool.acquire = AsyncMock(return_value=connection)
+    db_manager._pool = mock_pool
+    db_manager._executor = ThreadPoolExecutor(max_workers=1)
+    
+    try:
+        with pytest.raises(Exception, match="boom"):
+            await db_manager.execute_command("UPDATE t SET x = 1")
+    finally:
+        db_manager._executor.shutdown()
+    
+    connection.rollback.assert_called_once()
+    mock_pool.release.assert_called_once_with(connection)
+
+
+async def test_open_circuit_fails_fast(db_manager):
+    """Test that once the database keeps failing, queries are rejected without touching the pool."""
+    mock_pool = Mock()
+    mock_pool.acquire = AsyncMock(side_effect=psycopg2.OperationalError("connection refused"))
+    db_manager._pool = mock_pool
+    db_manager._executor = Mock()
+    
+    for _ in range(db_manager.breaker.failure_threshold):
+        with pytest.raises(psycopg2.OperationalError):
+            await db_manager.execute_query("SELECT 1")
+    
+    with pytest.raises(CircuitOpenError):
+        await db_manager.execute_query("SELECT 1")
+    assert mock_pool.acquire.await_count == db_manager.breaker.failure_threshold
+    assert db_manager.breaker.state == "open"
@@ -30,7 +30,7 @@ class MigrationManager:
             await db_manager.execute_command(create_table_sql)
             logger.info("Migrations table initialized")
         except Exception as e:
-            logger.error(f"Failed to initialize migrations table: {e}")
+            logger.error("Failed to initialize migrations table: %s", e)
             raise
     
     async def get_applied_migrations(self) -> List[str]:
@@ -41,13 +41,13 @@ class MigrationManager:
             results = await db_manager.execute_query(query)
             return [row['filename'] for row in results]
         except Exception as e:
-            logger.error(f"Failed to get applied migrations: {e}")
+            logger.error("Failed to get applied migrations: %s", e)
             raise
     
     def get_migration_files(self) -> List[str]:
         """Get list of migration files from the migrations directory."""
         if not self.migrations_dir.exists():
-            logger.warning(f"Migrations directory {self.migrations_dir} does not exist")
+            logger.warning("Migrations directory %s does not exist", self.migrations_dir)
             return []
         
         migration_files = []
@@ -75,10 +75,10 @@ class MigrationManager:
             record_sql = f"INSERT INTO {self.migrations_table} (filename) VALUES (%s)"
             await db_manager.execute_command(record_sql, (filename,))
             
-            logger.info(f"Applied migration: {filename}")
+            logger.info("Applied migration: %s", filename)
             
         except Exception as e:
-            logger.error(f"Failed to apply migration {filename}: {e}")
+            logger.error("Failed to apply migration %s: %s", filename, e)
             raise
     
     async def run_migrations(self):
@@ -105,10 +105,10 @@ class MigrationManager:
             for filename in pending_migrations:
                 await self.apply_migration(filename)
             
-            logger.info(f"Applied {len(pending_migrations)} migrations")
+            logger.info("Applied %s migrations", len(pending_migrations))
             
         except Exception as e:
-            logger.error(f"Migration failed: {e}")
+            logger.error("Migration failed: %s", e)
             raise
 
 
@@ -0,0 +1,367 @@
+"""Adaptive connection pool with a bounded async wait queue."""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Deque, Dict, Optional
+import psycopg2
+from psycopg2 import extensions
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes available before the wait timeout."""
+
+
+class PoolExhaustedError(PoolTimeoutError):
+    """Raised when the wait queue is full and the caller is rejected outright."""
+
+
+class _PooledConnection:
+    """A raw connection plus the bookkeeping the pool needs to recycle it."""
+
+    __slots__ = ("raw", "created_at", "last_used_at")
+
+    def __init__(self, raw: extensions.connection):
+        self.raw = raw
+        self.created_at = time.monotonic()
+        self.last_used_at = self.created_at
+
+
+class ConnectionPool:
+    """Connection pool that grows with demand and shrinks when idle.
+
+    All bookkeeping runs on the event loop; blocking work (connect, ping,
+    close) is pushed to the supplied executor. Callers that find the pool
+    at its maximum size wait in a bounded FIFO queue instead of failing.
+    Connections idle for ``idle_timeout`` are closed on a timer, down to
+    ``min_size``, whether or not traffic continues.
+    """
+
+    def __init__(
+        self,
+        connection_factory: Callable[[], extensions.connection],
+        executor: Executor,
+        min_size: int = 1,
+        max_size: int = 10,
+        max_waiters: int = 100,
+        timeout: float = 5.0,
+        max_lifetime: float = 1800.0,
+        idle_timeout: float = 300.0,
+        liveness_check_interval: float = 30.0,
+    ):
+        if min_size < 0 or max_size < 1 or min_size > max_size:
+            raise ValueError("Invalid pool size bounds")
+
+        self._connection_factory = connection_factory
+        self._executor = executor
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_waiters = max_waiters
+        self.timeout = timeout
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.liveness_check_interval = liveness_check_interval
+
+        # Idle connections are used LIFO so that surplus ones age out from the left
+        self._idle: Deque[_PooledConnection] = deque()
+        self._in_use: Dict[int, _PooledConnection] = {}
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._size = 0
+        self._closed = False
+        self._reap_timer: Optional[asyncio.TimerHandle] = None
+
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "connections_recycled": 0,
+            "liveness_failures": 0,
+            "acquired": 0,
+            "waited": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    @property
+    def size(self) -> int:
+        """Number of open connections, including ones being established."""
+        return self._size
+
+    def open(self):
+        """Open the minimum number of connections synchronously."""
+        for _ in range(self.min_size):
+            self._idle.append(_PooledConnection(self._connection_factory()))
+            self._size += 1
+            self._stats["connections_created"] += 1
+
+    async def acquire(self) -> extensions.connection:
+        """Check out a live connection, waiting in the queue if necessary."""
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            pooled = self._pop_idle()
+            if pooled is not None:
+                if not await self._is_alive(pooled):
+                    continue
+                return self._check_out(pooled)
+
+            if self._size < self.max_size:
+                pooled = await self._create()
+                return self._check_out(pooled)
+
+            pooled = await self._wait(deadline)
+            if pooled is not None:
+                return self._check_out(pooled)
+
+    def release(self, connection: extensions.connection):
+        """Return a connection, handing it straight to a waiter if one is queued."""
+        pooled = self._in_use.pop(id(connection), None)
+        if pooled is None:
+            logger.warning("Released a connection that does not belong to the pool")
+            return
+
+        now = time.monotonic()
+        pooled.last_used_at = now
+
+        if self._closed or self._is_broken(pooled) or now - pooled.created_at > self.max_lifetime:
+            self._stats["connections_recycled"] += 1
+            self._discard(pooled)
+            if self._waiters and not self._closed:
+                asyncio.get_running_loop().create_task(self._replenish())
+            return
+
+        if not self._hand_off(pooled):
+            self._idle.append(pooled)
+        self._reap_idle(now)
+        self._schedule_reap()
+
+    def reset(self, connection: extensions.connection):
+        """Roll back any open transaction before the connection is reused.
+
+        Blocking; call from the executor thread that ran the query.
+        """
+        status = connection.info.transaction_status
+        if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+            connection.close()
+        elif status != extensions.TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+
+    def close(self):
+        """Close idle connections and fail any queued waiters."""
+        self._closed = True
+        if self._reap_timer is not None:
+            self._reap_timer.cancel()
+            self._reap_timer = None
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_exception(RuntimeError("Connection pool is closed"))
+        while self._idle:
+            self._discard(self._idle.pop())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of pool occupancy and counters."""
+        return {
+            "size": self._size,
+            "idle": len(self._idle),
+            "in_use": len(self._in_use),
+            "waiting": len(self._waiters),
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            **self._stats,
+        }
+
+    def _pop_idle(self) -> Optional[_PooledConnection]:
+        now = time.monotonic()
+        while self._idle:
+            pooled = self._idle.pop()
+            if self._is_broken(pooled) or now - pooled.created_at > self.max_lifetime:
+                self._stats["connections_recycled"] += 1
+                self._discard(pooled)
+                continue
+            return pooled
+        return None
+
+    def _check_out(self, pooled: _PooledConnection) -> extensions.connection:
+        self._in_use[id(pooled.raw)] = pooled
+        self._stats["acquired"] += 1
+        return pooled.raw
+
+    async def _create(self) -> _PooledConnection:
+        # Reserve the slot before yielding so concurrent callers cannot overshoot max_size
+        self._size += 1
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._connection_factory)
+        try:
+            raw = await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # The thread keeps connecting; the pool takes over whatever it opens
+            future.add_done_callback(self._adopt_connection)
+            raise
+        except Exception:
+            self._size -= 1
+            raise
+        self._stats["connections_created"] += 1
+        return _PooledConnection(raw)
+
+    def _adopt_connection(self, future: asyncio.Future):
+        """Pool a connection opened for a caller that was cancelled meanwhile."""
+        if future.cancelled() or future.exception() is not None:
+            self._size -= 1
+            return
+        self._stats["connections_created"] += 1
+        self._give_back(_PooledConnection(future.result()))
+
+    async def _replenish(self):
+        """Open a replacement connection for a waiter after a recycle."""
+        if self._size >= self.max_size or not self._waiters:
+            return
+        try:
+            pooled = await self._create()
+        except Exception as e:
+            logger.error("Failed to open replacement connection: %s", e)
+            return
+        if not self._hand_off(pooled):
+            self._idle.append(pooled)
+
+    async def _wait(self, deadline: float) -> Optional[_PooledConnection]:
+        if len(self._waiters) >= self.max_waiters:
+            self._stats["rejected"] += 1
+            raise PoolExhaustedError("Connection pool exhausted: wait queue is full")
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._stats["timeouts"] += 1
+            raise PoolTimeoutError("Timed out waiting for a database connection")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._stats["waited"] += 1
+        started = time.monotonic()
+        try:
+            return await asyncio.wait_for(waiter, remaining)
+        except asyncio.TimeoutError:
+            # A release may have resolved the future just as the timeout fired
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                return waiter.result()
+            self._stats["timeouts"] += 1
+            raise PoolTimeoutError("Timed out waiting for a database connection")
+        except asyncio.CancelledError:
+            # A release handed this waiter a connection in the same tick it was cancelled;
+            # pass it on, or it would be counted in _size yet owned by nobody
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                self._give_back(waiter.result())
+            raise
+        finally:
+            waited = time.monotonic() - started
+            self._stats["wait_time_total"] += waited
+            self._stats["wait_time_max"] = max(self._stats["wait_time_max"], waited)
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+
+    def _give_back(self, pooled: _PooledConnection):
+        if self._closed:
+            self._discard(pooled)
+        elif not self._hand_off(pooled):
+            self._idle.append(pooled)
+            self._schedule_reap()
+
+    def _hand_off(self, pooled: _PooledConnection) -> bool:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(pooled)
+                return True
+        return False
+
+    async def _is_alive(self, pooled: _PooledConnection) -> bool:
+        """Ping connections that have sat idle long enough to have gone stale."""
+        if time.monotonic() - pooled.last_used_at < self.liveness_check_interval:
+            return True
+        future = asyncio.get_running_loop().run_in_executor(self._executor, self._ping, pooled.raw)
+        try:
+            await asyncio.shield(future)
+            return True
+        except asyncio.CancelledError:
+            # Nobody owns the connection while it is pinged; settle it once the ping finishes
+            future.add_done_callback(lambda done: self._settle_ping(pooled, done))
+            raise
+        except Exception as e:
+            self._fail_ping(pooled, e)
+            return False
+
+    def _settle_ping(self, pooled: _PooledConnection, future: asyncio.Future):
+        """Pool or discard a connection whose ping outlived the caller that started it."""
+        if future.cancelled():
+            self._discard(pooled)
+        elif future.exception() is not None:
+            self._fail_ping(pooled, future.exception())
+        else:
+            self._give_back(pooled)
+
+    def _fail_ping(self, pooled: _PooledConnection, error: BaseException):
+        logger.warning("Discarding dead pooled connection: %s", error)
+        self._stats["liveness_failures"] += 1
+        self._discard(pooled)
+
+    def _reap_idle(self, now: float):
+        """Shrink towards min_size by closing connections nobody has needed lately."""
+        while self._idle and self._size > self.min_size:
+            oldest = self._idle[0]
+            if now - oldest.last_used_at < self.idle_timeout:
+                break
+            self._discard(self._idle.popleft())
+
+    def _schedule_reap(self):
+        """Arm a timer for when the oldest surplus idle connection expires."""
+        if self._reap_timer is not None or self._closed or not self._idle or self._size <= self.min_size:
+            return
+        delay = self._idle[0].last_used_at + self.idle_timeout - time.monotonic()
+        self._reap_timer = asyncio.get_running_loop().call_later(max(0.0, delay), self._reap_on_timer)
+
+    def _reap_on_timer(self):
+        self._reap_timer = None
+        self._reap_idle(time.monotonic())
+        self._schedule_reap()
+
+    def _discard(self, pooled: _PooledConnection):
+        self._size -= 1
+        self._stats["connections_closed"] += 1
+        try:
+            # Closing can block on the socket of a server that went away
+            self._executor.submit(self._close, pooled.raw)
+        except RuntimeError:
+            # The executor was shut down first
+            self._close(pooled.raw)
+
+    @staticmethod
+    def _close(connection: extensions.connection):
+        try:
+            connection.close()
+        except Exception as e:
+            logger.debug("Error closing connection: %s", e)
+
+    @staticmethod
+    def _is_broken(pooled: _PooledConnection) -> bool:
+        return bool(pooled.raw.closed)
+
+    @staticmethod
+    def _ping(connection: extensions.connection):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        connection.rollback()
+
+
+def psycopg2_connection_factory(dsn: str, **kwargs) -> Callable[[], extensions.connection]:
+    """Build a zero-argument factory that opens psycopg2 connections."""
+    def _connect() -> extensions.connection:
+        return psycopg2.connect(dsn, **kwargs)
+    return _connect
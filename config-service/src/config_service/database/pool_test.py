@@ -0,0 +1,355 @@
+"""Tests for the adaptive connection pool."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from psycopg2 import extensions
+from config_service.database.pool import ConnectionPool, PoolExhaustedError, PoolTimeoutError
+
+
+class FakeConnection:
+    """Minimal stand-in for a psycopg2 connection."""
+
+    def __init__(self):
+        self.closed = 0
+        self.closed_on = None
+        self.pings = 0
+        self.fail_ping = False
+        self.ping_gate = None
+
+        class _Info:
+            transaction_status = extensions.TRANSACTION_STATUS_IDLE
+        self.info = _Info()
+
+    def cursor(self):
+        connection = self
+
+        class _Cursor:
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *args):
+                return False
+
+            def execute(self, query, params=None):
+                if connection.ping_gate is not None:
+                    connection.ping_gate.wait()
+                if connection.fail_ping:
+                    raise Exception("server closed the connection unexpectedly")
+                connection.pings += 1
+        return _Cursor()
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = 1
+        self.closed_on = threading.current_thread()
+
+
+@pytest.fixture
+def executor():
+    """Thread executor used for blocking pool work."""
+    executor = ThreadPoolExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+def make_pool(executor, connect_gate=None, **kwargs):
+    """Create a pool of fake connections; with connect_gate, connecting waits for it to be set."""
+    created = []
+
+    def factory():
+        if connect_gate is not None:
+            connect_gate.wait()
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    pool = ConnectionPool(connection_factory=factory, executor=executor, **kwargs)
+    pool.created = created
+    return pool
+
+
+def test_open_creates_min_connections(executor):
+    """Test that open pre-creates the minimum number of connections."""
+    pool = make_pool(executor, min_size=2, max_size=5)
+    pool.open()
+
+    stats = pool.stats()
+    assert stats["size"] == 2
+    assert stats["idle"] == 2
+
+
+def test_invalid_bounds_rejected(executor):
+    """Test that a minimum above the maximum is rejected."""
+    with pytest.raises(ValueError):
+        make_pool(executor, min_size=5, max_size=2)
+
+
+async def test_grows_on_demand_up_to_max(executor):
+    """Test that the pool opens connections as demand rises."""
+    pool = make_pool(executor, min_size=0, max_size=3)
+
+    connections = [await pool.acquire() for _ in range(3)]
+
+    assert pool.size == 3
+    assert len({id(c) for c in connections}) == 3
+    for connection in connections:
+        pool.release(connection)
+    assert pool.stats()["idle"] == 3
+
+
+async def test_waiter_receives_released_connection(executor):
+    """Test that a queued caller is handed the next released connection."""
+    pool = make_pool(executor, min_size=0, max_size=1, timeout=1.0)
+    held = await pool.acquire()
+
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+    assert pool.stats()["waiting"] == 1
+
+    pool.release(held)
+    connection = await waiter
+
+    assert connection is held
+    assert pool.stats()["waited"] == 1
+
+
+async def test_waiter_cancelled_while_handed_a_connection(executor):
+    """Test that a connection handed to a waiter cancelled in the same tick returns to the pool."""
+    pool = make_pool(executor, min_size=0, max_size=1, timeout=1.0)
+    held = await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    pool.release(held)
+    waiter.cancel()
+    try:
+        # Before Python 3.12, wait_for returns a result that arrived with the cancellation
+        pool.release(await waiter)
+    except asyncio.CancelledError:
+        pass
+
+    assert pool.stats()["in_use"] == 0 and pool.stats()["idle"] == 1
+    assert await asyncio.wait_for(pool.acquire(), 0.1) is held
+
+
+async def test_wait_times_out(executor):
+    """Test that waiting longer than the timeout raises PoolTimeoutError."""
+    pool = make_pool(executor, min_size=0, max_size=1, timeout=0.05)
+    await pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        await pool.acquire()
+    assert pool.stats()["timeouts"] == 1
+    assert pool.stats()["waiting"] == 0
+
+
+async def test_full_wait_queue_rejects_immediately(executor):
+    """Test that callers beyond max_waiters are rejected without waiting."""
+    pool = make_pool(executor, min_size=0, max_size=1, max_waiters=1, timeout=1.0)
+    await pool.acquire()
+    queued = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    started = time.monotonic()
+    with pytest.raises(PoolExhaustedError):
+        await pool.acquire()
+    assert time.monotonic() - started < 0.5
+    assert pool.stats()["rejected"] == 1
+    queued.cancel()
+
+
+async def test_max_lifetime_recycles_on_release(executor):
+    """Test that connections older than max_lifetime are closed on release."""
+    pool = make_pool(executor, min_size=0, max_size=2, max_lifetime=0.0)
+    connection = await pool.acquire()
+
+    pool.release(connection)
+    await asyncio.sleep(0.01)
+
+    assert connection.closed
+    assert connection.closed_on is not threading.main_thread()
+    assert pool.size == 0
+    assert pool.stats()["connections_recycled"] == 1
+
+
+async def test_idle_connections_shrink_to_min(executor):
+    """Test that connections idle past idle_timeout are closed down to min_size."""
+    pool = make_pool(executor, min_size=1, max_size=4, idle_timeout=0.0)
+    connections = [await pool.acquire() for _ in range(4)]
+
+    for connection in connections:
+        pool.release(connection)
+    await asyncio.sleep(0.01)
+    pool.release(await pool.acquire())
+
+    assert pool.size == 1
+
+
+async def test_idle_connections_reaped_without_traffic(executor):
+    """Test that surplus idle connections are closed on a timer once traffic stops."""
+    pool = make_pool(executor, min_size=1, max_size=4, idle_timeout=0.05)
+    connections = [await pool.acquire() for _ in range(4)]
+
+    for connection in connections:
+        pool.release(connection)
+    assert pool.size == 4
+    await asyncio.sleep(0.2)
+
+    assert pool.size == 1
+    assert pool.stats()["idle"] == 1
+
+
+async def test_cancelled_connect_keeps_its_slot_usable(executor):
+    """Test that a connection opened for a cancelled caller is pooled, not leaked."""
+    gate = threading.Event()
+    pool = make_pool(executor, connect_gate=gate, min_size=0, max_size=2, timeout=0.5)
+    acquiring = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    acquiring.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquiring
+    gate.set()
+    await asyncio.sleep(0.05)
+
+    assert pool.stats()["size"] == 1 and pool.stats()["idle"] == 1
+    first, second = await pool.acquire(), await pool.acquire()
+    assert first is pool.created[0] and second is pool.created[1]
+
+
+async def test_cancelled_connect_that_fails_frees_its_slot(executor):
+    """Test that a failed connect finishing after its caller was cancelled releases the slot."""
+    gate = threading.Event()
+
+    def factory():
+        gate.wait()
+        raise Exception("could not connect to server")
+
+    pool = ConnectionPool(connection_factory=factory, executor=executor, min_size=0, max_size=1)
+    acquiring = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    acquiring.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquiring
+    gate.set()
+    await asyncio.sleep(0.05)
+
+    assert pool.size == 0
+
+
+async def test_cancelled_ping_returns_connection(executor):
+    """Test that a connection pinged for a cancelled caller goes back to the pool once the ping ends."""
+    pool = make_pool(executor, min_size=1, max_size=1, timeout=0.5, liveness_check_interval=0.0)
+    pool.open()
+    pool.created[0].ping_gate = gate = threading.Event()
+    acquiring = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    acquiring.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await acquiring
+    gate.set()
+    await asyncio.sleep(0.05)
+
+    assert pool.stats()["size"] == 1 and pool.stats()["idle"] == 1
+    assert await pool.acquire() is pool.created[0]
+
+
+async def test_dead_connection_replaced_before_checkout(executor):
+    """Test that a connection failing its liveness ping is discarded."""
+    pool = make_pool(executor, min_size=1, max_size=2, liveness_check_interval=0.0)
+    pool.open()
+    pool.created[0].fail_ping = True
+
+    connection = await pool.acquire()
+    await asyncio.sleep(0.01)
+
+    assert connection is not pool.created[0]
+    assert pool.created[0].closed
+    assert pool.stats()["liveness_failures"] == 1
+
+
+async def test_broken_connection_discarded_on_release(executor):
+    """Test that a connection closed during use is not returned to the pool."""
+    pool = make_pool(executor, min_size=0, max_size=2)
+    connection = await pool.acquire()
+    connection.close()
+
+    pool.release(connection)
+
+    assert pool.size == 0
+
+
+async def test_close_fails_waiters(executor):
+    """Test that closing the pool wakes queued callers with an error."""
+    pool = make_pool(executor, min_size=0, max_size=1, timeout=1.0)
+    await pool.acquire()
+    waiter = asyncio.create_task(pool.acquire())
+    await asyncio.sleep(0.01)
+
+    pool.close()
+
+    with pytest.raises(RuntimeError, match="closed"):
+        await waiter
+
+
+async def test_load_ten_times_pool_size_degrades_gracefully():
+    """Load test: 10x more concurrent callers than connections all succeed by queueing."""
+    pool_size = 10
+    callers = pool_size * 10
+    query_time = 0.02
+    executor = ThreadPoolExecutor(max_workers=pool_size)
+    pool = make_pool(executor, min_size=1, max_size=pool_size, max_waiters=callers, timeout=5.0)
+    pool.open()
+
+    async def request():
+        connection = await pool.acquire()
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, time.sleep, query_time)
+        finally:
+            pool.release(connection)
+
+    try:
+        results = await asyncio.gather(*(request() for _ in range(callers)), return_exceptions=True)
+    finally:
+        executor.shutdown()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    stats = pool.stats()
+    assert errors == []
+    assert stats["size"] <= pool_size
+    assert stats["connections_created"] == pool_size
+    assert stats["waited"] > 0
+    # Queued callers wait roughly (callers / pool_size) query durations, not the timeout
+    assert stats["wait_time_max"] < query_time * (callers / pool_size) * 5
+
+
+async def test_load_beyond_queue_capacity_sheds_excess_quickly():
+    """Load test: callers beyond the wait queue get fast rejections, not hangs."""
+    pool_size = 10
+    executor = ThreadPoolExecutor(max_workers=pool_size)
+    pool = make_pool(executor, min_size=0, max_size=pool_size, max_waiters=40, timeout=5.0)
+
+    async def request():
+        connection = await pool.acquire()
+        try:
+            await asyncio.get_running_loop().run_in_executor(executor, time.sleep, 0.02)
+        finally:
+            pool.release(connection)
+
+    try:
+        results = await asyncio.gather(*(request() for _ in range(pool_size * 10)), return_exceptions=True)
+    finally:
+        executor.shutdown()
+
+    rejected = [r for r in results if isinstance(r, PoolExhaustedError)]
+    succeeded = [r for r in results if r is None]
+    assert len(succeeded) >= pool_size + 40
+    assert len(rejected) == len(results) - len(succeeded)
+    assert pool.stats()["rejected"] == len(rejected)
@@ -0,0 +1,318 @@
+"""Idempotency-Key support: retried mutating requests replay the first response instead of running again."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from psycopg2.extras import Json
+from config_service.config import settings
+from config_service.database.connection import db_manager
+
+logger = logging.getLogger(__name__)
+
+HEADER = b"idempotency-key"
+# Methods whose retries the key protects; reads are safe to repeat anyway
+METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+MAX_KEY_LENGTH = 255
+# Response headers stored and replayed with the body
+REPLAYED_HEADERS = frozenset({b"content-type", b"content-encoding", b"etag", b"location", b"vary"})
+# Seconds between deletions of expired keys
+PURGE_INTERVAL = 300.0
+
+
+class StoredResponse(NamedTuple):
+    """The response first given to a request, replayed for its retries."""
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+
+class Claim(NamedTuple):
+    """Outcome of claiming a key: run the request, replay a response, or refuse."""
+    outcome: str  # claimed, replay, in_progress or mismatch
+    response: Optional[StoredResponse] = None
+
+
+class IdempotencyStore:
+    """Keys and their responses in PostgreSQL, shared by every replica.
+
+    A request claims its key with one upsert that inserts a row with no
+    response yet. The unique key is what serialises duplicates: a retry
+    that arrives while the first request is still running finds the
+    unfinished row and is refused, one that arrives later gets the
+    stored response. A claim whose request never finished (its process
+    died) may be taken over after ``lock_timeout`` seconds.
+    """
+
+    CLAIM_SQL = """
+    WITH claimed AS (
+        INSERT INTO idempotency_keys (key, request_hash, locked_until, expires_at)
+        VALUES (%s, %s, LOCALTIMESTAMP + %s * INTERVAL '1 second', LOCALTIMESTAMP + %s * INTERVAL '1 second')
+        ON CONFLICT (key) DO UPDATE
+        SET request_hash = EXCLUDED.request_hash,
+            status_code = NULL,
+            headers = NULL,
+            body = NULL,
+            locked_until = EXCLUDED.locked_until,
+            expires_at = EXCLUDED.expires_at
+        WHERE idempotency_keys.expires_at < LOCALTIMESTAMP
+            OR (idempotency_keys.status_code IS NULL AND idempotency_keys.locked_until < LOCALTIMESTAMP)
+        RETURNING key
+    )
+    SELECT TRUE AS claimed, NULL AS request_hash, NULL::smallint AS status_code, NULL::jsonb AS headers, NULL::bytea AS body
+    FROM claimed
+    UNION ALL
+    SELECT FALSE, request_hash, status_code, headers, body
+    FROM idempotency_keys
+    WHERE key = %s AND NOT EXISTS (SELECT 1 FROM claimed)
+    """
+
+    def __init__(self, ttl: float, lock_timeout: float):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"executed": 0, "replayed": 0, "in_progress": 0, "mismatched": 0, "not_stored": 0}
+
+    def record(self, event: str):
+        """Count one request outcome for stats."""
+        self._stats[event] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request outcome counters of this process."""
+        return dict(self._stats)
+
+    async def claim(self, key: str, request_hash: str) -> Claim:
+        """Claim key for a request with request_hash, or return what to answer instead."""
+        rows = await db_manager.execute_returning_query(
+            self.CLAIM_SQL, (key, request_hash, self.lock_timeout, self.ttl, key)
+        )
+        if not rows:
+            # The row was written by a request that committed after this statement began
+            return Claim("in_progress")
+        row = rows[0]
+        if row["claimed"]:
+            return Claim("claimed")
+        if row["request_hash"] != request_hash:
+            return Claim("mismatch")
+        if row["status_code"] is None:
+            return Claim("in_progress")
+        headers = [(name, value) for name, value in row["headers"]]
+        return Claim("replay", StoredResponse(row["status_code"], headers, bytes(row["body"])))
+
+    async def complete(self, key: str, response: StoredResponse):
+        """Store the response of the request holding key."""
+        await db_manager.execute_command(
+            "UPDATE idempotency_keys SET status_code = %s, headers = %s, body = %s WHERE key = %s",
+            (response.status, Json(response.headers), response.body, key)
+        )
+
+    async def release(self, key: str):
+        """Forget an unfinished claim, so a retry runs the request again."""
+        await db_manager.execute_command(
+            "DELETE FROM idempotency_keys WHERE key = %s AND status_code IS NULL", (key,)
+        )
+
+    async def purge(self) -> int:
+        """Delete expired keys."""
+        return await db_manager.execute_command(
+            "DELETE FROM idempotency_keys WHERE expires_at < LOCALTIMESTAMP"
+        )
+
+    def start(self):
+        """Start purging expired keys on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop purging."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(PURGE_INTERVAL)
+            try:
+                await self.purge()
+            except Exception as e:
+                logger.warning("Idempotency key purge failed: %s", e)
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware answering retried mutating requests from the first request's stored response.
+
+    Only requests carrying an ``Idempotency-Key`` header are affected.
+    Keys are scoped to the client's API key header, and a key reused for
+    a different method, path, query or body is refused with 422. A retry
+    arriving while the first request is still running waits for it when
+    both are in this process, and gets 409 with Retry-After otherwise.
+    Responses with a 5xx status are not stored, so their retries run
+    again; replayed responses carry ``Idempotent-Replayed: true``.
+    """
+
+    def __init__(self, app, store: IdempotencyStore, client_header: str = "x-api-key", max_response_bytes: int = 1024 * 1024):
+        self.app = app
+        self.store = store
+        self.client_header = client_header.lower().encode("latin-1")
+        self.max_response_bytes = max_response_bytes
+        # Keys of requests running in this process, so local duplicates wait instead of failing
+        self._running: Dict[str, asyncio.Future] = {}
+
+    def scoped_key(self, scope, key: bytes) -> str:
+        """Hash the key together with the client identity, so clients cannot replay each other's responses.
+
+        Clients are told apart by API key or, without one, by remote
+        address, as the rate limiter does.
+        """
+        client = next((value for name, value in scope.get("headers", ()) if name == self.client_header and value), None)
+        if client is not None:
+            identity = b"key:" + client
+        else:
+            address = scope.get("client")
+            identity = b"ip:" + (address[0] if address else "unknown").encode("latin-1")
+        return hashlib.sha256(identity + b"\x00" + key).hexdigest()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in METHODS:
+            await self.app(scope, receive, send)
+            return
+        key = next((value for name, value in scope.get("headers", ()) if name == HEADER), None)
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await self._respond(send, 400, f"Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters")
+            return
+
+        body = await self._read_body(receive)
+        if body is None:
+            return
+        request_hash = hashlib.sha256(
+            b"\x00".join((scope["method"].encode(), scope["path"].encode(), scope.get("query_string", b""), body))
+        ).hexdigest()
+        scoped = self.scoped_key(scope, key)
+
+        while scoped in self._running:
+            await asyncio.shield(self._running[scoped])
+        running = self._running[scoped] = asyncio.get_running_loop().create_future()
+        try:
+            await self._handle(scope, receive, send, scoped, request_hash, body)
+        finally:
+            del self._running[scoped]
+            running.set_result(None)
+
+    async def _handle(self, scope, receive, send, scoped: str, request_hash: str, body: bytes):
+        try:
+            claim = await self.store.claim(scoped, request_hash)
+        except Exception as e:
+            # Running the request without its key would defeat the point of sending one
+            logger.warning("Idempotency store unavailable: %s", e)
+            await self._respond(send, 503, "Service temporarily unavailable, please retry", retry_after=1)
+            return
+
+        if claim.outcome == "replay":
+            self.store.record("replayed")
+            await self._replay(send, claim.response)
+            return
+        if claim.outcome == "mismatch":
+            self.store.record("mismatched")
+            await self._respond(send, 422, "Idempotency-Key was already used for a different request")
+            return
+        if claim.outcome == "in_progress":
+            self.store.record("in_progress")
+            await self._respond(
+                send, 409, "A request with this Idempotency-Key is still in progress",
+                retry_after=1
+            )
+            return
+
+        self.store.record("executed")
+        try:
+            response = await self._execute(scope, receive, send, body)
+        except BaseException:
+            await self._finish(scoped, None)
+            raise
+        await self._finish(scoped, response)
+
+    async def _finish(self, scoped: str, response: Optional[StoredResponse]):
+        try:
+            if response is None:
+                self.store.record("not_stored")
+                await self.store.release(scoped)
+            else:
+                await self.store.complete(scoped, response)
+        except Exception as e:
+            # The client has its response; a retry within lock_timeout gets 409, later ones run again
+            logger.warning("Failed to store idempotent response: %s", e)
+
+    async def _execute(self, scope, receive, send, body: bytes) -> Optional[StoredResponse]:
+        """Run the request with its buffered body; return the response if it should be stored."""
+        delivered = False
+
+        async def replay_receive():
+            nonlocal delivered
+            if not delivered:
+                delivered = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # The body was consumed already; only the disconnect is left to receive
+            return await receive()
+
+        status = 500
+        headers: List[Tuple[str, str]] = []
+        chunks: List[bytes] = []
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    (name.decode("latin-1"), value.decode("latin-1"))
+                    for name, value in message.get("headers", ()) if name.lower() in REPLAYED_HEADERS
+                )
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+                if size <= self.max_response_bytes:
+                    chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_receive, send_wrapper)
+        if status >= 500 or size > self.max_response_bytes:
+            return None
+        return StoredResponse(status, headers, b"".join(chunks))
+
+    async def _read_body(self, receive) -> Optional[bytes]:
+        """Buffer the request body, or return None if the client disconnected."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return None
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _replay(self, send, response: StoredResponse):
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in response.headers]
+        headers.append((b"content-length", str(len(response.body)).encode("latin-1")))
+        headers.append((b"idempotent-replayed", b"true"))
+        await send({"type": "http.response.start", "status": response.status, "headers": headers})
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def _respond(self, send, status: int, detail: str, retry_after: Optional[float] = None):
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("latin-1")),
+        ]
+        if retry_after is not None:
+            headers.append((b"retry-after", str(max(1, math.ceil(retry_after))).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global idempotency store instance
+idempotency_store = IdempotencyStore(ttl=settings.idempotency_ttl, lock_timeout=settings.idempotency_lock_timeout)
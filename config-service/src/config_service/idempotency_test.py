@@ -0,0 +1,227 @@
+"""Tests for Idempotency-Key replay."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.testclient import TestClient
+from config_service.idempotency import Claim, IdempotencyMiddleware, IdempotencyStore, StoredResponse
+
+
+class FakeStore(IdempotencyStore):
+    """IdempotencyStore keeping keys in a dict instead of PostgreSQL."""
+    
+    def __init__(self):
+        super().__init__(ttl=60.0, lock_timeout=60.0)
+        self.rows = {}
+    
+    async def claim(self, key, request_hash):
+        row = self.rows.get(key)
+        if row is None:
+            self.rows[key] = (request_hash, None)
+            return Claim("claimed")
+        if row[0] != request_hash:
+            return Claim("mismatch")
+        return Claim("in_progress") if row[1] is None else Claim("replay", row[1])
+    
+    async def complete(self, key, response):
+        self.rows[key] = (self.rows[key][0], response)
+    
+    async def release(self, key):
+        self.rows.pop(key, None)
+
+
+def make_app(store):
+    """An app whose writes count how often they really ran."""
+    app = FastAPI()
+    app.state.calls = 0
+    
+    @app.post("/items")
+    async def create_item(request: Request):
+        app.state.calls += 1
+        body = await request.json()
+        if body.get("fail"):
+            raise HTTPException(status_code=503, detail="try again")
+        return {"call": app.state.calls, **body}
+    
+    app.add_middleware(IdempotencyMiddleware, store=store)
+    return app
+
+
+@pytest.fixture
+def store():
+    """In-memory idempotency store."""
+    return FakeStore()
+
+
+def test_retry_replays_first_response(store):
+    """Test that a retried request gets the stored response without running again."""
+    app = make_app(store)
+    client = TestClient(app)
+    
+    first = client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+    
+    assert first.status_code == retry.status_code == 200
+    assert retry.json() == first.json() == {"call": 1, "name": "a"}
+    assert retry.headers["idempotent-replayed"] == "true"
+    assert retry.headers["content-type"] == "application/json"
+    assert app.state.calls == 1
+    assert store.stats()["replayed"] == 1
+
+
+def test_requests_without_key_always_run(store):
+    """Test that requests without the header are not affected."""
+    app = make_app(store)
+    client = TestClient(app)
+    
+    client.post("/items", json={})
+    client.post("/items", json={})
+    
+    assert app.state.calls == 2
+    assert store.rows == {}
+
+
+def test_key_reused_for_different_request(store):
+    """Test that a key sent with a different body is refused with 422."""
+    client = TestClient(make_app(store))
+    
+    client.post("/items", json={"name": "a"}, headers={"Idempotency-Key": "k1"})
+    response = client.post("/items", json={"name": "b"}, headers={"Idempotency-Key": "k1"})
+    
+    assert response.status_code == 422
+
+
+def test_keys_are_scoped_per_client(store):
+    """Test that two clients using the same key do not see each other's responses."""
+    app = make_app(store)
+    client = TestClient(app)
+    
+    client.post("/items", json={}, headers={"Idempotency-Key": "k1", "X-API-Key": "alice"})
+    response = client.post("/items", json={}, headers={"Idempotency-Key": "k1", "X-API-Key": "bob"})
+    
+    assert "idempotent-replayed" not in response.headers
+    assert app.state.calls == 2
+
+
+def test_anonymous_keys_are_scoped_per_address(store):
+    """Test that clients without an API key using the same key are told apart by address."""
+    app = make_app(store)
+    
+    TestClient(app, client=("10.0.0.1", 50000)).post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    response = TestClient(app, client=("10.0.0.2", 50000)).post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    
+    assert "idempotent-replayed" not in response.headers
+    assert app.state.calls == 2
+
+
+def test_server_errors_are_not_stored(store):
+    """Test that a 5xx response releases the key so the retry runs again."""
+    app = make_app(store)
+    client = TestClient(app)
+    
+    first = client.post("/items", json={"fail": True}, headers={"Idempotency-Key": "k1"})
+    retry = client.post("/items", json={"fail": True}, headers={"Idempotency-Key": "k1"})
+    
+    assert first.status_code == retry.status_code == 503
+    assert app.state.calls == 2
+
+
+def test_retry_while_running_elsewhere(store):
+    """Test that a key still claimed by another replica gets 409 with Retry-After."""
+    client = TestClient(make_app(store))
+    store.claim = AsyncMock(return_value=Claim("in_progress"))
+    
+    response = client.post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    
+    assert response.status_code == 409
+    assert response.headers["retry-after"] == "1"
+
+
+def test_store_unavailable(store):
+    """Test that keyed writes are refused with 503 rather than run unprotected."""
+    app = make_app(store)
+    store.claim = AsyncMock(side_effect=RuntimeError("connection refused"))
+    
+    response = TestClient(app).post("/items", json={}, headers={"Idempotency-Key": "k1"})
+    
+    assert response.status_code == 503
+    assert app.state.calls == 0
+
+
+def test_oversized_key_rejected(store):
+    """Test that an overly long key is refused with 400."""
+    response = TestClient(make_app(store)).post("/items", json={}, headers={"Idempotency-Key": "k" * 256})
+    
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_in_process_wait_and_replay(store):
+    """Test that a duplicate arriving while the first runs in this process waits and replays."""
+    release = asyncio.Event()
+    calls = []
+    
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await release.wait()
+        await send({"type": "http.response.start", "status": 201, "headers": [(b"content-type", b"text/plain")]})
+        await send({"type": "http.response.body", "body": b"created"})
+    
+    middleware = IdempotencyMiddleware(app, store=store)
+    scope = {"type": "http", "method": "POST", "path": "/items", "query_string": b"", "headers": [(b"idempotency-key", b"k1")]}
+    
+    async def request():
+        sent = []
+        
+        async def receive():
+            return {"type": "http.request", "body": b"{}", "more_body": False}
+        
+        async def send(message):
+            sent.append(message)
+        
+        await middleware(scope, receive, send)
+        return sent
+    
+    first = asyncio.create_task(request())
+    second = asyncio.create_task(request())
+    await asyncio.sleep(0.01)
+    release.set()
+    responses = await asyncio.gather(first, second)
+    
+    assert calls == ["/items"]
+    assert [sent[0]["status"] for sent in responses] == [201, 201]
+    assert responses[1][1]["body"] == b"created"
+
+
+@pytest.mark.asyncio
+async def test_claim_replays_stored_response(monkeypatch):
+    """Test that a finished key found by the upsert is returned as a replay."""
+    db = MagicMock()
+    db.execute_returning_query = AsyncMock(return_value=[{
+        "claimed": False, "request_hash": "h", "status_code": 201,
+        "headers": [["content-type", "application/json"]], "body": memoryview(b"{}")
+    }])
+    monkeypatch.setattr('config_service.idempotency.db_manager', db)
+    
+    claim = await IdempotencyStore(ttl=60.0, lock_timeout=30.0).claim("k", "h")
+    
+    assert claim == Claim("replay", StoredResponse(201, [("content-type", "application/json")], b"{}"))
+    params = db.execute_returning_query.call_args[0][1]
+    assert params == ("k", "h", 30.0, 60.0, "k")
+
+
+@pytest.mark.asyncio
+async def test_claim_of_unfinished_key_in_progress(monkeypatch):
+    """Test that a key whose request has not finished, or not committed, is reported in progress."""
+    db = MagicMock()
+    db.execute_returning_query = AsyncMock(return_value=[])
+    monkeypatch.setattr('config_service.idempotency.db_manager', db)
+    store = IdempotencyStore(ttl=60.0, lock_timeout=30.0)
+    
+    assert (await store.claim("k", "h")).outcome == "in_progress"
+    
+    db.execute_returning_query = AsyncMock(return_value=[{
+        "claimed": False, "request_hash": "h", "status_code": None, "headers": None, "body": None
+    }])
+    assert (await store.claim("k", "h")).outcome == "in_progress"
@@ -2,14 +2,31 @@
 
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+import math
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from config_service.compression import compression_stats, payload_cache
 from config_service.config import settings
 from config_service.database.connection import db_manager
-from config_service.routers import applications
+from config_service.database.pool import PoolTimeoutError
+from config_service.idempotency import IdempotencyMiddleware, idempotency_store
+from config_service.repositories.application_repository import application_repository
+from config_service.profiling import ProfilingMiddleware, profiler
+from config_service.rate_limiting import RateLimitMiddleware, rate_limiter
+from config_service.routers import admin, applications, changes, configurations, jobs, schemas
+from config_service.services.audit_service import audit_service
+from config_service.services.catalogue_cache import catalogue_cache
+from config_service.services.config_resolver import config_resolver
+from config_service.services.config_schema import schema_registry
+from config_service.services.config_templates import config_renderer
+from config_service.services.jobs import job_worker
+from config_service.snapshot.store import ReadOnlyMiddleware, snapshot_store
+from config_service.staleness import StaleResponseMiddleware
+from config_service.structured_logging import RequestLoggingMiddleware, RouteSampler, logging_manager
 
 # Configure logging
-logging.basicConfig(level=getattr(logging, settings.log_level.upper()))
+logging_manager.configure(settings)
 logger = logging.getLogger(__name__)
 
 
@@ -18,13 +35,32 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     # Startup
     logger.info("Starting Config Service API")
-    db_manager.initialize()
+    if settings.snapshot_path:
+        # Read-only snapshot mode: no database, so no audit log or jobs either
+        snapshot_store.start()
+    else:
+        db_manager.initialize()
+        audit_service.start()
+        if settings.idempotency_enabled:
+            idempotency_store.start()
+        if settings.job_worker_enabled:
+            job_worker.start()
+    if settings.rate_limit_enabled:
+        rate_limiter.start()
     
     yield
     
     # Shutdown
     logger.info("Shutting down Config Service API")
+    await rate_limiter.stop()
+    await idempotency_store.stop()
+    await job_worker.stop()
+    await audit_service.stop()
+    await snapshot_store.stop()
+    # Queries of requests cut off by the graceful shutdown timeout are still running
+    await db_manager.drain(settings.server_graceful_timeout)
     db_manager.close()
+    logging_manager.stop()
 
 
 # Create FastAPI application
@@ -35,7 +71,47 @@ app = FastAPI(
     lifespan=lifespan
 )
 
-# Add CORS middleware for frontend communication
+# Caches built from the previous snapshot must not outlive it
+snapshot_store.on_reload(catalogue_cache.clear)
+snapshot_store.on_reload(config_resolver.clear)
+
+# Flag responses answered from expired cache entries with X-Served-Stale and Age
+app.add_middleware(StaleResponseMiddleware)
+
+# Profile sampled or token-carrying requests; a no-op pass-through otherwise
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Answer retries of keyed writes from the stored first response; throttled requests never reach it
+if settings.idempotency_enabled and not settings.snapshot_path:
+    app.add_middleware(
+        IdempotencyMiddleware,
+        store=idempotency_store,
+        client_header=settings.rate_limit_key_header,
+        max_response_bytes=settings.idempotency_max_response_bytes
+    )
+
+# Refuse over-budget clients before any handler or database work; throttled requests are still access-logged
+if settings.rate_limit_enabled:
+    app.add_middleware(
+        RateLimitMiddleware,
+        limiter=rate_limiter,
+        key_header=settings.rate_limit_key_header,
+        exempt_paths=settings.rate_limit_exempt_paths,
+        api_keys=settings.rate_limit_api_keys
+    )
+
+# A snapshot instance serves reads only
+if settings.snapshot_path:
+    app.add_middleware(ReadOnlyMiddleware)
+
+# Assign request ids and emit sampled structured access logs
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sampler=RouteSampler(settings.log_sample_rate, settings.log_route_sample_rates)
+)
+
+# Add CORS middleware for frontend communication; added last so it is outermost and the
+# 429s, 503s and replayed responses of the middlewares above carry CORS headers too
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],  # UI dev server ports
@@ -44,10 +120,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+    """Tell clients to back off when no database connection is available."""
+    logger.warning("Database unavailable: %s", exc)
+    # An open circuit knows when it will next try the database
+    retry_after = getattr(exc, "retry_after", None) or settings.database_pool_timeout
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Service temporarily overloaded, please retry"},
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+    )
+
+
 # Include routers with /api/v1 prefix
 app.include_router(applications.router, prefix="/api/v1", tags=["applications"])
-# TODO: Add configurations router when implemented
-# app.include_router(configurations.router, prefix="/api/v1", tags=["configurations"])
+app.include_router(configurations.router, prefix="/api/v1", tags=["configurations"])
+if not settings.snapshot_path:
+    # Jobs, the change feed and schemas live in the database only
+    app.include_router(jobs.router, prefix="/api/v1", tags=["jobs"])
+    app.include_router(changes.router, prefix="/api/v1", tags=["changes"])
+    app.include_router(schemas.router, prefix="/api/v1", tags=["schemas"])
+app.include_router(admin.router, tags=["admin"])
 
 
 @app.get("/")
@@ -62,11 +157,31 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Runtime metrics for the service."""
+    metrics = {
+        "database_pool": db_manager.pool_stats(),
+        "database_circuit": db_manager.breaker.stats(),
+        "application_reads": application_repository.read_stats(),
+        "application_catalogue": catalogue_cache.stats(),
+        "config_resolution": config_resolver.stats(),
+        "config_rendering": config_renderer.stats(),
+        "config_schemas": schema_registry.stats(),
+        "response_cache": payload_cache.stats(),
+        "compression": compression_stats.snapshot(),
+        "logging": logging_manager.stats(),
+        "audit": audit_service.stats(),
+        "jobs": job_worker.stats(),
+        "profiling": profiler.aggregator.stats(),
+        "rate_limiting": rate_limiter.stats(),
+        "idempotency": idempotency_store.stats()
+    }
+    if settings.snapshot_path:
+        metrics["snapshot"] = snapshot_store.stats()
+    return metrics
+
+
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "main:app",
-        host=settings.host,
-        port=settings.port,
-        reload=settings.debug
-    )
\ No newline at end of file
+    from config_service.server import main
+    main()
\ No newline at end of file
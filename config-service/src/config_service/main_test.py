@@ -1,9 +1,13 @@
 """Tests for main FastAPI application."""
 
 import pytest
+from fastapi.middleware.cors import CORSMiddleware
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock, MagicMock
+from config_service.database.circuit_breaker import CircuitOpenError
+from config_service.database.pool import PoolTimeoutError
 from config_service.main import app
+from config_service.services.catalogue_cache import catalogue_cache
 
 
 @pytest.fixture
@@ -29,6 +33,15 @@ def test_health_check_endpoint(client):
     assert data["status"] == "healthy"
 
 
+def test_cors_is_outermost_middleware(client):
+    """Test that responses produced by other middlewares still carry CORS headers."""
+    assert app.user_middleware[0].cls is CORSMiddleware
+    
+    response = client.get("/health", headers={"Origin": "http://localhost:3000"})
+    
+    assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+
 def test_api_v1_prefix_included():
     """Test that API routes are included with correct prefix."""
     # Check that the routers are included
@@ -52,6 +65,7 @@ def test_lifespan_startup_shutdown(mock_db_manager):
     # Configure the mock db_manager
     mock_db_manager.initialize = mock_initialize
     mock_db_manager.close = mock_close
+    mock_db_manager.drain = AsyncMock(return_value=True)
     
     # Test with context manager (simulates lifespan)
     with TestClient(app) as client:
@@ -60,4 +74,40 @@ def test_lifespan_startup_shutdown(mock_db_manager):
         assert response.status_code == 200
     
     # The lifespan events should have been called
-    # Note: TestClient handles the lifespan events automatically
\ No newline at end of file
+    # Note: TestClient handles the lifespan events automatically
+
+def test_metrics_endpoint(client):
+    """Test that metrics expose connection pool statistics."""
+    with patch('config_service.main.db_manager') as mock_db_manager:
+        mock_db_manager.pool_stats.return_value = {"size": 3, "waiting": 0}
+        mock_db_manager.breaker.stats.return_value = {"state": "closed"}
+        
+        response = client.get("/metrics")
+    
+    assert response.status_code == 200
+    assert response.json()["database_pool"] == {"size": 3, "waiting": 0}
+    assert response.json()["database_circuit"] == {"state": "closed"}
+
+
+@patch('config_service.routers.applications.application_repository')
+def test_pool_timeout_returns_503(mock_repo, client):
+    """Test that pool saturation surfaces as 503 with Retry-After instead of 500."""
+    catalogue_cache.clear()
+    mock_repo.get_all = AsyncMock(side_effect=PoolTimeoutError("Timed out waiting for a database connection"))
+    
+    response = client.get("/api/v1/applications")
+    
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+
+@patch('config_service.routers.applications.application_repository')
+def test_open_circuit_returns_503_with_its_retry_after(mock_repo, client):
+    """Test that an open database circuit tells clients when it will next try the database."""
+    catalogue_cache.clear()
+    mock_repo.get_all = AsyncMock(side_effect=CircuitOpenError(7.2))
+    
+    response = client.get("/api/v1/applications")
+    
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "8"
@@ -1,9 +1,10 @@
 """Pydantic models for Application entity."""
 
 from datetime import datetime
-from typing import Optional, List
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-import re
+from typing import Any, Dict, Optional, List
+from pydantic import BaseModel, Field, ConfigDict
+from config_service.models.configuration import Configuration
+from config_service.models.ulid import UlidStr
 
 
 class ApplicationBase(BaseModel):
@@ -26,28 +27,27 @@ class Application(ApplicationBase):
     """Complete application model with all fields."""
     model_config = ConfigDict(from_attributes=True)
     
-    id: str = Field(..., description="Application unique identifier (ULID format)")
+    id: UlidStr = Field(..., description="Application unique identifier (ULID format)")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
+    version: int = Field(1, description="Row version, incremented by every update and sent as the ETag")
     
-    @field_validator('id')
     @classmethod
-    def validate_ulid(cls, v: str) -> str:
-        """Validate that the ID is a valid ULID format."""
-        if not re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', v):
-            raise ValueError('Invalid ULID format')
-        return v
+    def from_row(cls, row: Dict[str, Any]):
+        """Build from a trusted database row without re-running validation."""
+        return cls.model_construct(**row)
 
 
 class ApplicationWithConfigs(Application):
     """Application model including related configuration IDs."""
-    configuration_ids: List[str] = Field(default_factory=list, description="Related configuration IDs (ULID format)")
-    
-    @field_validator('configuration_ids')
-    @classmethod
-    def validate_config_ulids(cls, v: List[str]) -> List[str]:
-        """Validate that all configuration IDs are valid ULID format."""
-        for ulid in v:
-            if not re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', ulid):
-                raise ValueError(f'Invalid ULID format: {ulid}')
-        return v
\ No newline at end of file
+    configuration_ids: List[UlidStr] = Field(default_factory=list, description="Related configuration IDs (ULID format)")
+
+
+class ExpandedApplication(ApplicationWithConfigs):
+    """Application with its configurations embedded, as returned for include=configurations."""
+    configurations: List[Configuration] = Field(default_factory=list, description="Related configurations, ordered by name")
+
+
+class ApplicationMatch(Application):
+    """Application found by a search, with how well it matched."""
+    score: float = Field(..., description="Trigram similarity of the best matching field, 0 to 1; exact and prefix name matches rank first regardless")
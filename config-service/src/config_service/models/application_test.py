@@ -134,4 +134,37 @@ def test_application_json_serialization():
     json_data = app.model_dump()
     assert json_data["id"] == ulid_str
     assert json_data["name"] == "json-app"
-    assert json_data["comments"] == "JSON test"
\ No newline at end of file
+    assert json_data["comments"] == "JSON test"
+
+def test_application_invalid_ulid_rejected():
+    """Test that Application rejects a malformed ID."""
+    now = datetime.now()
+    with pytest.raises(ValidationError):
+        Application(id="invalid", name="app", created_at=now, updated_at=now)
+
+
+def test_application_with_configs_invalid_config_ulid_rejected():
+    """Test that ApplicationWithConfigs rejects malformed configuration IDs."""
+    now = datetime.now()
+    with pytest.raises(ValidationError):
+        ApplicationWithConfigs(
+            id=str(ULIDGenerator()), name="app", created_at=now, updated_at=now,
+            configuration_ids=["invalid"]
+        )
+
+
+def test_application_from_row_skips_validation():
+    """Test that from_row builds a model directly from a database row."""
+    ulid_str = str(ULIDGenerator())
+    config_ulid = str(ULIDGenerator())
+    now = datetime.now()
+    row = {
+        "id": ulid_str, "name": "row-app", "comments": None,
+        "created_at": now, "updated_at": now, "configuration_ids": [config_ulid]
+    }
+    
+    app = ApplicationWithConfigs.from_row(row)
+    
+    assert app.id == ulid_str
+    assert app.configuration_ids == [config_ulid]
+    assert app.model_dump()["name"] == "row-app"
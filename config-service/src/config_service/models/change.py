@@ -0,0 +1,28 @@
+"""Pydantic models for the change feed."""
+
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+from config_service.models.ulid import UlidStr
+
+
+class Change(BaseModel):
+    """One created, updated or deleted application or configuration."""
+    kind: Literal["application", "configuration"] = Field(..., description="Type of the changed object")
+    id: UlidStr = Field(..., description="ID of the changed object")
+    application_id: UlidStr = Field(..., description="Application the object belongs to (its own ID for applications)")
+    deleted: bool = Field(..., description="True for tombstones of deleted objects")
+    changed_at: datetime = Field(..., description="When the change was made")
+    data: Optional[Dict[str, Any]] = Field(None, description="The object as of this change; null for deletes")
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]):
+        """Build from a trusted database row without re-running validation."""
+        return cls.model_construct(**row)
+
+
+class ChangePage(BaseModel):
+    """A page of the change feed and the cursor to continue from."""
+    changes: List[Change] = Field(default_factory=list, description="Changes in (changed_at, id) order")
+    cursor: str = Field(..., description="Pass as ?cursor= to get the changes after this page")
+    has_more: bool = Field(..., description="More changes are available right away")
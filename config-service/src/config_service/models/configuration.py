@@ -1,25 +1,21 @@
 """Pydantic models for Configuration entity."""
 
 from datetime import datetime
-from typing import Optional, Dict, Any
-from pydantic import BaseModel, Field, ConfigDict, field_validator
-import re
+from typing import Optional, Dict, Any, List
+from pydantic import BaseModel, Field, ConfigDict
+from config_service.models.ulid import UlidStr
 
 
 class ConfigurationBase(BaseModel):
     """Base configuration model with common fields."""
-    application_id: str = Field(..., description="Application ID this configuration belongs to (ULID format)")
+    application_id: UlidStr = Field(..., description="Application ID this configuration belongs to (ULID format)")
     name: str = Field(..., min_length=1, max_length=256, description="Configuration name")
     comments: Optional[str] = Field(None, max_length=1024, description="Configuration comments")
     config: Dict[str, Any] = Field(default_factory=dict, description="Configuration key-value pairs")
-    
-    @field_validator('application_id')
-    @classmethod
-    def validate_application_id(cls, v: str) -> str:
-        """Validate that the application_id is a valid ULID format."""
-        if not re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', v):
-            raise ValueError('Invalid ULID format for application_id')
-        return v
+    parent_ids: List[UlidStr] = Field(
+        default_factory=list,
+        description="Configurations this one overlays, lowest precedence first (same application)"
+    )
 
 
 class ConfigurationCreate(ConfigurationBase):
@@ -32,20 +28,28 @@ class ConfigurationUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=256, description="Configuration name")
     comments: Optional[str] = Field(None, max_length=1024, description="Configuration comments")
     config: Optional[Dict[str, Any]] = Field(None, description="Configuration key-value pairs")
+    parent_ids: Optional[List[UlidStr]] = Field(None, description="Configurations this one overlays, lowest precedence first")
 
 
 class Configuration(ConfigurationBase):
     """Complete configuration model with all fields."""
     model_config = ConfigDict(from_attributes=True)
     
-    id: str = Field(..., description="Configuration unique identifier (ULID format)")
+    id: UlidStr = Field(..., description="Configuration unique identifier (ULID format)")
     created_at: datetime = Field(..., description="Creation timestamp")
     updated_at: datetime = Field(..., description="Last update timestamp")
+    version: int = Field(1, description="Row version, incremented by every update and sent as the ETag")
     
-    @field_validator('id')
     @classmethod
-    def validate_id(cls, v: str) -> str:
-        """Validate that the ID is a valid ULID format."""
-        if not re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', v):
-            raise ValueError('Invalid ULID format for id')
-        return v
\ No newline at end of file
+    def from_row(cls, row: Dict[str, Any]):
+        """Build from a trusted database row without re-running validation."""
+        return cls.model_construct(**row)
+
+
+class ResolvedConfiguration(BaseModel):
+    """A configuration deep-merged over its ancestors."""
+    id: str = Field(..., description="Configuration unique identifier (ULID format)")
+    application_id: str = Field(..., description="Application ID this configuration belongs to (ULID format)")
+    name: str = Field(..., description="Configuration name")
+    chain: List[str] = Field(..., description="IDs of the configurations merged, lowest precedence first")
+    config: Dict[str, Any] = Field(..., description="Resolved configuration key-value pairs")
@@ -177,4 +177,15 @@ def test_configuration_json_serialization():
     assert json_data["application_id"] == app_id
     assert json_data["name"] == "json-config"
     assert json_data["comments"] == "JSON test"
-    assert json_data["config"] == {"key": "value"}
\ No newline at end of file
+    assert json_data["config"] == {"key": "value"}
+
+def test_configuration_parent_ids_validation():
+    """Test that parent IDs default to empty and must be ULIDs."""
+    app_id = str(ULIDGenerator())
+    parent_id = str(ULIDGenerator())
+    
+    assert ConfigurationCreate(application_id=app_id, name="base").parent_ids == []
+    assert ConfigurationCreate(application_id=app_id, name="prod", parent_ids=[parent_id]).parent_ids == [parent_id]
+    with pytest.raises(ValidationError):
+        ConfigurationCreate(application_id=app_id, name="prod", parent_ids=["not-a-ulid"])
+    assert ConfigurationUpdate().parent_ids is None
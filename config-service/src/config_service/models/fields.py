@@ -0,0 +1,40 @@
+"""Sparse fieldsets: the ``fields=`` selection and the response models it implies."""
+
+from functools import lru_cache
+from typing import Optional, Tuple, Type
+from pydantic import BaseModel, create_model
+
+# Selected field names in model declaration order; None selects every field
+Fields = Optional[Tuple[str, ...]]
+
+# Returned whatever is selected, so a sparse record can still be identified and fetched in full
+ALWAYS_SELECTED = ("id",)
+
+
+def parse_fields(value: Optional[str], model: Type[BaseModel]) -> Fields:
+    """Parse a comma-separated list of model's field names; None and "" select everything.
+    
+    Raises ValueError naming any unknown field.
+    """
+    if not value:
+        return None
+    requested = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = requested - model.model_fields.keys()
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s) {', '.join(sorted(unknown))}; choose from {', '.join(model.model_fields)}"
+        )
+    requested.update(ALWAYS_SELECTED)
+    # Declaration order, so equal selections share one model, one query and one cache key
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+@lru_cache(maxsize=None)
+def sparse_model(model: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Return a model with only the given fields of model, built once per selection."""
+    if fields == tuple(model.model_fields):
+        return model
+    return create_model(
+        f"{model.__name__}Fields",
+        **{name: (model.model_fields[name].annotation, model.model_fields[name]) for name in fields}
+    )
@@ -0,0 +1,28 @@
+"""Tests for sparse fieldsets."""
+
+import pytest
+from config_service.models.application import Application, ApplicationWithConfigs
+from config_service.models.fields import parse_fields, sparse_model
+
+
+def test_parse_fields_orders_and_adds_id():
+    """Test that selections are normalised to declaration order and always include id."""
+    assert parse_fields("version, name,name", Application) == ("name", "id", "version")
+    assert parse_fields(None, Application) is None
+    assert parse_fields("", Application) is None
+
+
+def test_parse_fields_rejects_unknown():
+    """Test that unknown names are reported."""
+    with pytest.raises(ValueError, match="secret"):
+        parse_fields("name,secret", Application)
+
+
+def test_sparse_model_has_only_selected_fields():
+    """Test that the sparse model serializes just its fields and is built once per selection."""
+    model = sparse_model(ApplicationWithConfigs, ("name", "id"))
+    application = model.model_construct(id="01HKQJQJQJQJQJQJQJQJQJQJQJ", name="app")
+    
+    assert application.__pydantic_serializer__.to_json(application) == b'{"name":"app","id":"01HKQJQJQJQJQJQJQJQJQJQJQJ"}'
+    assert sparse_model(ApplicationWithConfigs, ("name", "id")) is model
+    assert sparse_model(Application, tuple(Application.model_fields)) is Application
@@ -0,0 +1,36 @@
+"""Pydantic models for background jobs."""
+
+from datetime import datetime
+from typing import Any, Dict, Literal, Optional
+from pydantic import BaseModel, Field, ConfigDict
+from config_service.models.ulid import UlidStr
+
+JobStatus = Literal["pending", "running", "completed", "failed", "cancelled"]
+
+# Statuses a job never leaves
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+
+
+class Job(BaseModel):
+    """A background job and its progress."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    id: UlidStr = Field(..., description="Job unique identifier (ULID format)")
+    kind: str = Field(..., description="Registered handler that runs the job")
+    status: JobStatus = Field(..., description="Lifecycle state")
+    payload: Dict[str, Any] = Field(default_factory=dict, description="Handler arguments")
+    progress: Dict[str, Any] = Field(default_factory=dict, description="Counters last reported by the handler")
+    result: Optional[Dict[str, Any]] = Field(None, description="Handler result once completed")
+    error: Optional[str] = Field(None, description="Error of the last failed attempt")
+    attempts: int = Field(0, description="Attempts started so far")
+    max_attempts: int = Field(..., description="Attempts allowed before the job fails for good")
+    cancel_requested: bool = Field(False, description="Cancellation was requested while running")
+    run_after: datetime = Field(..., description="Earliest time the next attempt may start")
+    created_at: datetime = Field(..., description="Creation timestamp")
+    updated_at: datetime = Field(..., description="Last update timestamp")
+    finished_at: Optional[datetime] = Field(None, description="When the job reached a final status")
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]):
+        """Build from a trusted database row without re-running validation."""
+        return cls.model_construct(**row)
@@ -0,0 +1,21 @@
+"""Pydantic models for application configuration schemas."""
+
+from datetime import datetime
+from typing import Any, Dict
+from pydantic import BaseModel, Field, ConfigDict
+from config_service.models.ulid import UlidStr
+
+
+class ApplicationSchema(BaseModel):
+    """The JSON Schema an application's configuration documents must match."""
+    model_config = ConfigDict(from_attributes=True)
+    
+    application_id: UlidStr = Field(..., description="Application the schema belongs to (ULID format)")
+    config_schema: Dict[str, Any] = Field(..., description="JSON Schema every configuration document must match")
+    version: int = Field(..., description="Row version; sent as the ETag and matched against If-Match")
+    updated_at: datetime = Field(..., description="Last update timestamp")
+    
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]):
+        """Build from a trusted database row without re-running validation."""
+        return cls.model_construct(**row)
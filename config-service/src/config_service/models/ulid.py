@@ -0,0 +1,24 @@
+"""Shared ULID validation and types."""
+
+import re
+from typing import Annotated
+from pydantic import AfterValidator
+
+# Crockford base32, 26 characters; compiled once at import
+ULID_PATTERN = re.compile(r'[0-9A-HJKMNP-TV-Z]{26}')
+
+
+def is_valid_ulid(value: str) -> bool:
+    """Return True if value is a well-formed ULID string."""
+    return len(value) == 26 and ULID_PATTERN.fullmatch(value) is not None
+
+
+def validate_ulid(value: str) -> str:
+    """Pydantic validator that rejects malformed ULIDs."""
+    if len(value) != 26 or ULID_PATTERN.fullmatch(value) is None:
+        raise ValueError('Invalid ULID format')
+    return value
+
+
+# String field that must hold a ULID
+UlidStr = Annotated[str, AfterValidator(validate_ulid)]
@@ -0,0 +1,46 @@
+"""Tests for shared ULID validation."""
+
+import pytest
+from pydantic import BaseModel, ValidationError
+from ulid import ULID as ULIDGenerator
+from config_service.models.ulid import UlidStr, is_valid_ulid, validate_ulid
+
+
+class UlidModel(BaseModel):
+    """Model with a ULID field for testing."""
+    id: UlidStr
+
+
+def test_is_valid_ulid_accepts_generated_ids():
+    """Test that generated ULIDs are accepted."""
+    assert is_valid_ulid(str(ULIDGenerator()))
+    assert is_valid_ulid("01HKQJQJQJQJQJQJQJQJQJQJQJ")
+
+
+@pytest.mark.parametrize("value", [
+    "",
+    "invalid-ulid",
+    "01HKQJQJQJQJQJQJQJQJQJQJQ",    # 25 characters
+    "01HKQJQJQJQJQJQJQJQJQJQJQJQ",  # 27 characters
+    "01hkqjqjqjqjqjqjqjqjqjqjqj",   # lowercase
+    "01HKQJQJQJQJQJQJQJQJQJQJQI",   # I is not in the alphabet
+    "01HKQJQJQJQJQJQJQJQJQJQJQU",   # U is not in the alphabet
+    "01HKQJQJQJQJQJQJQJQJQJQJQ\n",
+])
+def test_is_valid_ulid_rejects_malformed(value):
+    """Test that malformed strings are rejected."""
+    assert not is_valid_ulid(value)
+
+
+def test_validate_ulid_raises_value_error():
+    """Test that the validator raises ValueError for bad input."""
+    with pytest.raises(ValueError, match="Invalid ULID format"):
+        validate_ulid("nope")
+
+
+def test_ulid_str_type_in_model():
+    """Test that UlidStr validates model fields."""
+    ulid_str = str(ULIDGenerator())
+    assert UlidModel(id=ulid_str).id == ulid_str
+    with pytest.raises(ValidationError):
+        UlidModel(id="invalid")
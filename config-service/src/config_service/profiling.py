@@ -0,0 +1,195 @@
+"""Opt-in per-request profiling with flamegraph-compatible aggregation."""
+
+import asyncio
+import functools
+import logging
+import random
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+from fastapi.routing import APIRoute
+from config_service.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Phases recorded as children of the handler frame in the folded output
+HANDLER_CHILD_PHASES = ("pool_wait", "executor_hop", "sql")
+
+
+class RequestProfile:
+    """Time split of one profiled request.
+
+    The request is divided into consecutive phases by ``mark``; database
+    work inside the handler is recorded separately with ``add``.
+    """
+
+    __slots__ = ("phases", "_last_mark")
+
+    def __init__(self):
+        self.phases: Dict[str, float] = {}
+        self._last_mark = time.perf_counter()
+
+    def mark(self, phase: str):
+        """Attribute the time since the previous mark to phase."""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last_mark
+        self._last_mark = now
+
+    def add(self, phase: str, seconds: float):
+        """Attribute an explicitly measured duration to phase."""
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class ProfileAggregator:
+    """Accumulates profiled requests as folded stacks weighted in microseconds."""
+
+    def __init__(self, max_stacks: int = 10000):
+        self.max_stacks = max_stacks
+        self._stacks: Dict[str, int] = {}
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def record(self, method: str, route: str, profile: RequestProfile):
+        """Fold one request's phases into the aggregate."""
+        root = f"{method} {route}"
+        phases = profile.phases
+        handler_children = sum(phases.get(p, 0.0) for p in HANDLER_CHILD_PHASES)
+        lines = {}
+        for phase, seconds in phases.items():
+            if phase in HANDLER_CHILD_PHASES:
+                lines[f"{root};handler;{phase}"] = seconds
+            elif phase == "handler":
+                lines[f"{root};handler"] = max(0.0, seconds - handler_children)
+            else:
+                lines[f"{root};{phase}"] = seconds
+
+        with self._lock:
+            self._requests += 1
+            for stack, seconds in lines.items():
+                if stack not in self._stacks and len(self._stacks) >= self.max_stacks:
+                    continue
+                self._stacks[stack] = self._stacks.get(stack, 0) + int(seconds * 1_000_000)
+
+    def folded(self) -> str:
+        """Return stacks in the folded format read by flamegraph.pl and speedscope."""
+        with self._lock:
+            return "".join(f"{stack} {weight}\n" for stack, weight in sorted(self._stacks.items()) if weight > 0)
+
+    def reset(self):
+        """Discard everything collected so far."""
+        with self._lock:
+            self._stacks.clear()
+            self._requests = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of profiled requests and distinct stacks."""
+        with self._lock:
+            return {"requests": self._requests, "stacks": len(self._stacks)}
+
+
+class Profiler:
+    """Runtime profiling switch plus the aggregate it feeds."""
+
+    def __init__(self, sample_rate: float = 0.0, token: Optional[str] = None):
+        self.sample_rate = sample_rate
+        self.token = token
+        self.aggregator = ProfileAggregator()
+
+    def authorized(self, presented: Optional[str]) -> bool:
+        """Check a presented token against the configured one in constant time."""
+        return bool(self.token and presented and secrets.compare_digest(presented, self.token))
+
+    def should_profile(self, header_token: Optional[str]) -> bool:
+        """Profile sampled requests and any request carrying a valid profile token."""
+        if header_token is not None and self.authorized(header_token):
+            return True
+        return self.sample_rate > 0.0 and random.random() < self.sample_rate
+
+
+class ProfilingMiddleware:
+    """ASGI middleware that profiles a sample of requests.
+
+    When profiling is off this costs one float comparison and a header scan
+    per request; nothing is timed or allocated.
+    """
+
+    def __init__(self, app, profiler: "Profiler"):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        header_token = None
+        if self.profiler.token:
+            for name, value in scope.get("headers", ()):
+                if name == b"x-profile-token":
+                    header_token = value.decode("latin-1")
+                    break
+        if not self.profiler.should_profile(header_token):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # Everything after the handler returned was response validation and serialization
+                profile.mark("serialization")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_profile.reset(token)
+            route = scope.get("route")
+            template = getattr(route, "path", None) or scope.get("path", "")
+            self.profiler.aggregator.record(scope.get("method", ""), template, profile)
+
+
+def _profiled_endpoint(endpoint: Callable) -> Callable:
+    """Wrap an endpoint so a profiled request marks handler entry and exit."""
+    if asyncio.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            # Body parsing and parameter validation happened before we were called
+            profile.mark("validation")
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                profile.mark("handler")
+        return wrapper
+
+    @functools.wraps(endpoint)
+    def sync_wrapper(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return endpoint(*args, **kwargs)
+        profile.mark("validation")
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profile.mark("handler")
+    return sync_wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose endpoint reports validation/handler boundaries to the profiler."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+
+# Global profiler instance
+profiler = Profiler(sample_rate=settings.profiling_sample_rate, token=settings.admin_token)
@@ -0,0 +1,100 @@
+"""Tests for per-request profiling."""
+
+import asyncio
+from unittest.mock import patch
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from config_service.profiling import (
+    ProfileAggregator, ProfiledRoute, Profiler, ProfilingMiddleware, RequestProfile, current_profile
+)
+
+
+def test_aggregator_folds_phases_under_route():
+    """Test that phases become folded stacks with DB time nested under the handler."""
+    aggregator = ProfileAggregator()
+    profile = RequestProfile()
+    profile.phases = {"validation": 0.001, "handler": 0.010, "sql": 0.004, "pool_wait": 0.001, "serialization": 0.002}
+    
+    aggregator.record("GET", "/api/v1/applications/{app_id}", profile)
+    
+    lines = dict(line.rsplit(" ", 1) for line in aggregator.folded().splitlines())
+    assert lines["GET /api/v1/applications/{app_id};validation"] == "1000"
+    assert lines["GET /api/v1/applications/{app_id};handler"] == "5000"
+    assert lines["GET /api/v1/applications/{app_id};handler;sql"] == "4000"
+    assert lines["GET /api/v1/applications/{app_id};handler;pool_wait"] == "1000"
+    assert lines["GET /api/v1/applications/{app_id};serialization"] == "2000"
+    assert aggregator.stats()["requests"] == 1
+
+
+def test_aggregator_reset():
+    """Test that reset discards collected stacks."""
+    aggregator = ProfileAggregator()
+    profile = RequestProfile()
+    profile.add("validation", 0.001)
+    aggregator.record("GET", "/", profile)
+    
+    aggregator.reset()
+    
+    assert aggregator.folded() == ""
+    assert aggregator.stats() == {"requests": 0, "stacks": 0}
+
+
+def test_profiler_token_and_sampling():
+    """Test that profiling triggers on a valid token or by sampling only."""
+    profiler = Profiler(sample_rate=0.0, token="secret")
+    
+    assert profiler.should_profile("secret") is True
+    assert profiler.should_profile("wrong") is False
+    assert profiler.should_profile(None) is False
+    assert Profiler(sample_rate=1.0).should_profile(None) is True
+    assert Profiler(sample_rate=0.0, token=None).authorized("") is False
+
+
+def make_app(profiler):
+    """Create an app with a profiled route that simulates database work."""
+    router = APIRouter(route_class=ProfiledRoute)
+    
+    @router.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add("sql", 0.001)
+        await asyncio.sleep(0)
+        return {"id": item_id, "profiled": profile is not None}
+    
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+    return app
+
+
+def test_middleware_skips_unsampled_requests():
+    """Test that requests are not profiled when sampling is off and no token is sent."""
+    profiler = Profiler(sample_rate=0.0, token="secret")
+    client = TestClient(make_app(profiler))
+    
+    response = client.get("/items/1")
+    
+    assert response.json()["profiled"] is False
+    assert profiler.aggregator.stats()["requests"] == 0
+
+
+def test_middleware_profiles_requests_with_token():
+    """Test that a request with a valid token is profiled and split into phases."""
+    profiler = Profiler(sample_rate=0.0, token="secret")
+    client = TestClient(make_app(profiler))
+    
+    response = client.get("/items/1", headers={"X-Profile-Token": "secret"})
+    
+    assert response.json()["profiled"] is True
+    folded = profiler.aggregator.folded()
+    assert "GET /items/{item_id};validation" in folded
+    assert "GET /items/{item_id};handler;sql 1000" in folded
+    assert "GET /items/{item_id};serialization" in folded
+
+
+def test_profiled_route_preserves_endpoint_signature():
+    """Test that wrapping the endpoint keeps path parameter validation intact."""
+    client = TestClient(make_app(Profiler(sample_rate=1.0)))
+    
+    assert client.get("/items/not-a-number").status_code == 422
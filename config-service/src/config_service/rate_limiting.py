@@ -0,0 +1,293 @@
+"""Per-client admission control: token-bucket rate limits and concurrency caps."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+from config_service.config import settings
+from config_service.database.connection import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class Throttle(NamedTuple):
+    """Why a request was refused and when the client may retry."""
+    reason: str
+    retry_after: float
+
+
+class TokenBucket:
+    """Tokens refill at ``rate`` per second up to ``burst``; each request takes one."""
+
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class SharedRateCounter:
+    """Cluster-wide request counts per client in fixed windows, kept in PostgreSQL.
+
+    Requests are counted locally and flushed every ``sync_interval``
+    seconds in one upsert that also returns the cluster totals, so the
+    request path never touches the database. The cost is that replicas
+    see each other's traffic up to one sync interval late.
+    """
+
+    UPSERT_SQL = """
+    INSERT INTO rate_limit_windows (client_key, window_start, count)
+    SELECT client_key, %s, count FROM unnest(%s::varchar[], %s::int[]) AS pending(client_key, count)
+    ON CONFLICT (client_key, window_start) DO UPDATE SET count = rate_limit_windows.count + EXCLUDED.count
+    RETURNING client_key, count
+    """
+
+    def __init__(self, limit: int, window: float, sync_interval: float = 1.0):
+        self.limit = limit
+        self.window = window
+        self.sync_interval = sync_interval
+        self._window_start = 0
+        self._pending: Dict[str, int] = {}
+        self._totals: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"syncs": 0, "sync_failures": 0}
+
+    def check(self, key: str, now: float) -> Optional[Throttle]:
+        """Count one request for key, or refuse it if the cluster used up this window."""
+        window_start = int(now // self.window)
+        if window_start != self._window_start:
+            # Counts of the previous window no longer limit anyone
+            self._window_start = window_start
+            self._pending.clear()
+            self._totals.clear()
+        used = self._totals.get(key, 0) + self._pending.get(key, 0)
+        if used >= self.limit:
+            return Throttle("shared", (window_start + 1) * self.window - now)
+        self._pending[key] = self._pending.get(key, 0) + 1
+        return None
+
+    async def sync(self):
+        """Flush local counts and refresh the cluster totals of the same clients."""
+        window_start, pending = self._window_start, self._pending
+        self._pending = {}
+        if pending:
+            rows = await db_manager.execute_returning_query(
+                self.UPSERT_SQL, (window_start, list(pending), list(pending.values()))
+            )
+            if window_start == self._window_start:
+                self._totals.update({row["client_key"]: row["count"] for row in rows})
+        self._stats["syncs"] += 1
+
+    async def purge(self):
+        """Delete windows that ended before the previous one."""
+        await db_manager.execute_command(
+            "DELETE FROM rate_limit_windows WHERE window_start < %s", (self._window_start - 1,)
+        )
+
+    def start(self):
+        """Start the background sync task on the running event loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop syncing; unflushed counts are dropped."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return sync counters and the number of clients seen this window."""
+        return {"clients": len(self._totals.keys() | self._pending.keys()), **self._stats}
+
+    async def _run(self):
+        purged_window = None
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self.sync()
+                if purged_window != self._window_start:
+                    purged_window = self._window_start
+                    await self.purge()
+            except Exception as e:
+                # Limits keep working on local counts until the database is back
+                self._stats["sync_failures"] += 1
+                logger.warning("Rate limit sync failed: %s", e)
+
+
+class RateLimiter:
+    """Per-client token buckets and in-flight request counters.
+
+    Buckets live in a bounded LRU, so memory stays flat however many
+    clients show up; an evicted client simply starts with a full bucket.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        max_concurrent: int,
+        max_clients: int = 10000,
+        shared: Optional[SharedRateCounter] = None
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.max_clients = max_clients
+        self.shared = shared
+        self._buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        self._in_flight: Dict[str, int] = {}
+        self._stats = {"admitted": 0, "throttled_rate": 0, "throttled_concurrency": 0, "throttled_shared": 0}
+
+    def acquire(self, key: str) -> Optional[Throttle]:
+        """Admit a request for key, or return why not. Admitted requests must be released."""
+        if self.max_concurrent and self._in_flight.get(key, 0) >= self.max_concurrent:
+            self._stats["throttled_concurrency"] += 1
+            return Throttle("concurrency", 1.0)
+
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(self.burst, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * self.rate)
+            bucket.updated = now
+        if bucket.tokens < 1:
+            self._stats["throttled_rate"] += 1
+            return Throttle("rate", (1 - bucket.tokens) / self.rate)
+
+        if self.shared is not None:
+            throttle = self.shared.check(key, time.time())
+            if throttle is not None:
+                self._stats["throttled_shared"] += 1
+                return throttle
+
+        bucket.tokens -= 1
+        self._in_flight[key] = self._in_flight.get(key, 0) + 1
+        self._stats["admitted"] += 1
+        return None
+
+    def release(self, key: str):
+        """Mark an admitted request as finished."""
+        remaining = self._in_flight.get(key, 0) - 1
+        if remaining > 0:
+            self._in_flight[key] = remaining
+        else:
+            self._in_flight.pop(key, None)
+
+    def start(self):
+        """Start syncing shared counts, if configured."""
+        if self.shared is not None:
+            self.shared.start()
+
+    async def stop(self):
+        """Stop syncing shared counts."""
+        if self.shared is not None:
+            await self.shared.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throttling counters, tracked clients and requests in flight."""
+        stats = {
+            "clients": len(self._buckets),
+            "in_flight": sum(self._in_flight.values()),
+            **self._stats
+        }
+        if self.shared is not None:
+            stats["shared"] = self.shared.stats()
+        return stats
+
+
+class RateLimitMiddleware:
+    """ASGI middleware that refuses over-budget requests with 429 before any handler runs.
+
+    Clients sending one of the configured API keys are identified by it
+    (hashed, so keys are never held or stored in clear); everyone else by
+    remote address. The service does not authenticate the header itself,
+    so an unknown key must not buy a fresh budget with every request.
+    """
+
+    def __init__(
+        self,
+        app,
+        limiter: RateLimiter,
+        key_header: str = "x-api-key",
+        exempt_paths: List[str] = (),
+        api_keys: Iterable[str] = ()
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.key_header = key_header.lower().encode("latin-1")
+        self.exempt_paths = frozenset(exempt_paths)
+        self.api_keys = frozenset(self._hash(key.encode("latin-1")) for key in api_keys)
+
+    @staticmethod
+    def _hash(value: bytes) -> str:
+        return hashlib.sha256(value).hexdigest()[:32]
+
+    def client_key(self, scope) -> str:
+        """Return the budget key of the requesting client."""
+        if self.api_keys:
+            for name, value in scope.get("headers", ()):
+                if name == self.key_header and value:
+                    hashed = self._hash(value)
+                    if hashed in self.api_keys:
+                        return "key:" + hashed
+                    break
+        client = scope.get("client")
+        return f"ip:{client[0]}" if client else "ip:unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get("path") in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        key = self.client_key(scope)
+        throttle = self.limiter.acquire(key)
+        if throttle is not None:
+            await self._reject(send, throttle)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release(key)
+
+    async def _reject(self, send, throttle: Throttle):
+        detail = "Too many concurrent requests" if throttle.reason == "concurrency" else "Rate limit exceeded"
+        body = json.dumps({"detail": f"{detail}, please retry later"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"retry-after", str(max(1, math.ceil(throttle.retry_after))).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _shared_counter() -> Optional[SharedRateCounter]:
+    if settings.rate_limit_backend != "postgres":
+        return None
+    return SharedRateCounter(
+        limit=math.ceil(settings.rate_limit_per_second * settings.rate_limit_window),
+        window=settings.rate_limit_window,
+        sync_interval=settings.rate_limit_sync_interval
+    )
+
+
+# Global rate limiter instance
+rate_limiter = RateLimiter(
+    rate=settings.rate_limit_per_second,
+    burst=settings.rate_limit_burst,
+    max_concurrent=settings.rate_limit_max_concurrent,
+    max_clients=settings.rate_limit_max_clients,
+    shared=_shared_counter()
+)
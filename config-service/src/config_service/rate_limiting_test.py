@@ -0,0 +1,152 @@
+"""Tests for per-client rate limiting."""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config_service.rate_limiting import RateLimiter, RateLimitMiddleware, SharedRateCounter
+
+
+class Clock:
+    """Controllable replacement for time.monotonic."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Patch the limiter's monotonic clock."""
+    clock = Clock()
+    with patch('config_service.rate_limiting.time.monotonic', clock):
+        yield clock
+
+
+def test_burst_then_rate(clock):
+    """Test that a client gets its burst at once, then tokens at the sustained rate."""
+    limiter = RateLimiter(rate=2.0, burst=3, max_concurrent=0)
+    
+    for _ in range(3):
+        assert limiter.acquire("a") is None
+        limiter.release("a")
+    throttle = limiter.acquire("a")
+    
+    assert throttle.reason == "rate"
+    assert throttle.retry_after == pytest.approx(0.5)
+    assert limiter.acquire("b") is None
+    
+    clock.now += 0.5
+    assert limiter.acquire("a") is None
+    assert limiter.stats()["throttled_rate"] == 1
+
+
+def test_concurrency_cap(clock):
+    """Test that a client cannot hold more than max_concurrent requests in flight."""
+    limiter = RateLimiter(rate=100.0, burst=100, max_concurrent=2)
+    
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a") is None
+    assert limiter.acquire("a").reason == "concurrency"
+    assert limiter.acquire("b") is None
+    
+    limiter.release("a")
+    assert limiter.acquire("a") is None
+    assert limiter.stats()["in_flight"] == 3
+
+
+def test_buckets_are_bounded(clock):
+    """Test that the least recently seen client is forgotten beyond max_clients."""
+    limiter = RateLimiter(rate=1.0, burst=1, max_concurrent=0, max_clients=2)
+    
+    limiter.acquire("a")
+    limiter.acquire("b")
+    limiter.acquire("a")
+    limiter.acquire("c")
+    
+    assert list(limiter._buckets) == ["a", "c"]
+
+
+def test_shared_counter_limits_across_replicas():
+    """Test that cluster totals from the last sync count against the window's budget."""
+    counter = SharedRateCounter(limit=3, window=10.0)
+    
+    assert counter.check("a", 100.0) is None
+    counter._totals["a"] = 2  # another replica's requests, learned at the last sync
+    throttle = counter.check("a", 104.0)
+    
+    assert throttle.reason == "shared"
+    assert throttle.retry_after == pytest.approx(6.0)
+    assert counter.check("a", 110.0) is None
+
+
+@pytest.mark.asyncio
+async def test_shared_counter_sync(monkeypatch):
+    """Test that a sync flushes local counts in one upsert and adopts the returned totals."""
+    db = MagicMock()
+    db.execute_returning_query = AsyncMock(return_value=[{"client_key": "a", "count": 7}])
+    monkeypatch.setattr('config_service.rate_limiting.db_manager', db)
+    counter = SharedRateCounter(limit=10, window=10.0)
+    counter.check("a", 100.0)
+    counter.check("a", 101.0)
+    
+    await counter.sync()
+    
+    params = db.execute_returning_query.call_args[0][1]
+    assert params == (10, ["a"], [2])
+    assert counter._totals == {"a": 7}
+    assert counter._pending == {}
+
+
+def make_client(limiter: RateLimiter, api_keys=()) -> TestClient:
+    """Minimal app behind the rate limit middleware, with /health exempt."""
+    app = FastAPI()
+    
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+    
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+    
+    app.add_middleware(RateLimitMiddleware, limiter=limiter, exempt_paths=["/health"], api_keys=api_keys)
+    return TestClient(app)
+
+
+def test_middleware_returns_429_with_retry_after(clock):
+    """Test that an over-budget request is refused before reaching the endpoint."""
+    client = make_client(RateLimiter(rate=0.25, burst=1, max_concurrent=0))
+    
+    assert client.get("/ping").status_code == 200
+    response = client.get("/ping")
+    
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "4"
+    assert "Rate limit" in response.json()["detail"]
+    assert client.get("/health").status_code == 200
+
+
+def test_middleware_keys_by_api_key(clock):
+    """Test that each API key has its own budget and is not kept in clear."""
+    limiter = RateLimiter(rate=0.1, burst=1, max_concurrent=0)
+    client = make_client(limiter, api_keys=["one", "two"])
+    
+    assert client.get("/ping", headers={"X-API-Key": "one"}).status_code == 200
+    assert client.get("/ping", headers={"X-API-Key": "two"}).status_code == 200
+    assert client.get("/ping", headers={"X-API-Key": "one"}).status_code == 429
+    assert all(key.startswith("key:") and "one" not in key for key in limiter._buckets)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_middleware_unknown_api_keys_share_address_budget(clock):
+    """Test that unlisted keys cannot buy a fresh budget per request."""
+    limiter = RateLimiter(rate=0.1, burst=1, max_concurrent=0)
+    client = make_client(limiter, api_keys=["one"])
+    
+    assert client.get("/ping", headers={"X-API-Key": "random-1"}).status_code == 200
+    assert client.get("/ping", headers={"X-API-Key": "random-2"}).status_code == 429
+    assert client.get("/ping", headers={"X-API-Key": "one"}).status_code == 200
+    assert sorted(key.split(":")[0] for key in limiter._buckets) == ["ip", "key"]
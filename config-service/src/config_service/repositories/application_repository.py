@@ -1,65 +1,142 @@
 """Repository for Application entity data access."""
 
-import json
-from typing import List, Optional
+import logging
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 from datetime import datetime
+from pydantic import TypeAdapter
 from ulid import ULID as ULIDGenerator
+from config_service.config import settings
+from config_service.database.circuit_breaker import CircuitOpenError
 from config_service.database.connection import db_manager
-from config_service.models.application import Application, ApplicationCreate, ApplicationUpdate, ApplicationWithConfigs
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.application import (
+    Application, ApplicationCreate, ApplicationMatch, ApplicationUpdate, ApplicationWithConfigs
+)
+from config_service.models.fields import Fields, sparse_model
+from config_service.repositories.errors import VersionConflictError
+from config_service.repositories.read_cache import NullReadCache, application_read_cache
+from config_service.repositories.single_flight import SingleFlight
+from config_service.snapshot.repositories import SnapshotApplicationRepository
+from config_service.snapshot.store import snapshot_store
+from config_service.staleness import mark_stale
+from config_service.structured_logging import log_payload
+
+logger = logging.getLogger(__name__)
+
+APPLICATION = TypeAdapter(Application)
+APPLICATION_WITH_CONFIGS = TypeAdapter(ApplicationWithConfigs)
+APPLICATION_LIST = TypeAdapter(List[Application])
+
+# Plain columns a field selection can name; configuration_ids is aggregated only when selected
+APPLICATION_COLUMNS = ("id", "name", "comments", "created_at", "updated_at", "version")
+
+
+@lru_cache(maxsize=None)
+def _sparse_adapters(fields: Tuple[str, ...]) -> Tuple[type, TypeAdapter, TypeAdapter]:
+    """Sparse model for a selection plus adapters caching one record and a list of them."""
+    model = sparse_model(ApplicationWithConfigs, fields)
+    return model, TypeAdapter(model), TypeAdapter(List[model])
+
+
+def _like_pattern(text: str) -> str:
+    """Match text anywhere, with LIKE wildcards in it taken literally."""
+    return "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _select_columns(fields: Tuple[str, ...]) -> str:
+    # Only names from APPLICATION_COLUMNS reach the SQL; selections are validated against the model
+    return ", ".join(f"a.{name}" for name in fields if name in APPLICATION_COLUMNS)
 
 
 class ApplicationRepository:
-    """Repository for Application entity operations using raw SQL."""
+    """Repository for Application entity operations using raw SQL.
+    
+    Reads go through a read cache (see read_cache; none by default) that
+    every write, here or in ConfigurationRepository, invalidates by
+    bumping its generation.
+    """
+    
+    def __init__(self, cache=None):
+        # Concurrent identical reads share one query and one pool connection
+        self._reads = SingleFlight()
+        self.cache = cache or NullReadCache()
+    
+    def read_stats(self) -> Dict[str, Any]:
+        """Return request coalescing and read cache statistics."""
+        return {**self._reads.stats(), "cache": self.cache.stats()}
+    
+    async def _cached_read(self, key: tuple, adapter: TypeAdapter, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Serve a read from the cache, or fetch it (coalesced) and cache the result.
+        
+        While the database circuit is open the last-known value is served
+        instead, flagged stale, for up to ``stale_if_error_max_age``.
+        """
+        cache_key = ":".join(key)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return adapter.validate_json(cached)
+        
+        async def fetch_and_cache():
+            # Taken by the caller that runs the query, just before it, so a write
+            # committed while it runs discards the result; followers joining later
+            # must not store it under their newer generation
+            generation = self.cache.generation()
+            result = await fetch()
+            if result is not None:
+                self.cache.put(cache_key, adapter.dump_json(result), generation)
+            return result
+        
+        try:
+            return await self._reads.do(key, fetch_and_cache)
+        except CircuitOpenError:
+            stale = self.cache.get_stale(cache_key, settings.stale_if_error_max_age)
+            if stale is None:
+                raise
+            value, age = stale
+            mark_stale(age)
+            return adapter.validate_json(value)
     
     async def create(self, application_data: ApplicationCreate) -> Application:
         """Create a new application."""
-        import logging
-        logger = logging.getLogger(__name__)
-        
         try:
             app_id = str(ULIDGenerator())  # Convert to string immediately
-            logger.info(f"Generated ULID: {app_id}")
-            
             now = datetime.now()
-            logger.info(f"Current time: {now}")
             
             query = """
             INSERT INTO applications (id, name, comments, created_at, updated_at)
             VALUES (%s, %s, %s, %s, %s)
-            RETURNING id, name, comments, created_at, updated_at
+            RETURNING id, name, comments, created_at, updated_at, version
             """
             
             params = (app_id, application_data.name, application_data.comments, now, now)
-            logger.info(f"Query params: {params}")
+            log_payload(logger, "Create application params", params)
             
             # Use execute_returning_query for INSERT with RETURNING
             results = await db_manager.execute_returning_query(query, params)
-            logger.info(f"Query results: {results}")
             
             if not results:
                 raise RuntimeError("Failed to create application")
             
             row = results[0]
-            logger.info(f"Row data: {row}")
+            log_payload(logger, "Created application row", row)
+            self.cache.invalidate()
             
-            app = Application(
-                id=row['id'],
-                name=row['name'],
-                comments=row['comments'],
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
-            logger.info(f"Created Application object: {app}")
-            return app
+            return Application.from_row(row)
             
+        except PoolTimeoutError:
+            raise
         except Exception as e:
-            logger.error(f"Error in create method: {e}", exc_info=True)
+            logger.error("Error creating application: %s", e, exc_info=True)
             raise RuntimeError(f"Failed to create application: {e}")
     
     async def get_by_id(self, app_id: str) -> Optional[Application]:
         """Get application by ID."""
+        return await self._cached_read(("get_by_id", app_id), APPLICATION, lambda: self._fetch_by_id(app_id))
+    
+    async def _fetch_by_id(self, app_id: str) -> Optional[Application]:
         query = """
-        SELECT id, name, comments, created_at, updated_at
+        SELECT id, name, comments, created_at, updated_at, version
         FROM applications
         WHERE id = %s
         """
@@ -70,103 +147,217 @@ class ApplicationRepository:
                 return None
             
             row = results[0]
-            return Application(
-                id=row['id'],
-                name=row['name'],
-                comments=row['comments'],
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
+            return Application.from_row(row)
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get application: {e}")
     
-    async def get_by_id_with_configs(self, app_id: str) -> Optional[ApplicationWithConfigs]:
-        """Get application by ID including related configuration IDs."""
-        query = """
+    async def get_by_id_with_configs(self, app_id: str, fields: Fields = None) -> Optional[ApplicationWithConfigs]:
+        """Get application by ID including related configuration IDs.
+        
+        With fields, only those columns are read (configuration IDs are only
+        aggregated if selected) and a sparse model with just them is returned.
+        """
+        if fields is not None:
+            model, adapter, _ = _sparse_adapters(fields)
+            return await self._cached_read(
+                ("get_by_id_with_configs", app_id, ",".join(fields)),
+                adapter,
+                lambda: self._fetch_fields(app_id, fields, model)
+            )
+        return await self._cached_read(
+            ("get_by_id_with_configs", app_id),
+            APPLICATION_WITH_CONFIGS,
+            lambda: self._fetch_with_configs("id", app_id)
+        )
+    
+    async def get_by_name(self, name: str) -> Optional[ApplicationWithConfigs]:
+        """Get application by its exact name, including related configuration IDs."""
+        return await self._cached_read(
+            ("get_by_name", name),
+            APPLICATION_WITH_CONFIGS,
+            lambda: self._fetch_with_configs("name", name)
+        )
+    
+    async def _fetch_with_configs(self, column: str, value: str) -> Optional[ApplicationWithConfigs]:
+        # column is id or name, both uniquely indexed
+        query = f"""
         SELECT 
-            a.id, a.name, a.comments, a.created_at, a.updated_at,
+            a.id, a.name, a.comments, a.created_at, a.updated_at, a.version,
             COALESCE(
                 json_agg(c.id) FILTER (WHERE c.id IS NOT NULL), 
                 '[]'::json
             ) as configuration_ids
         FROM applications a
         LEFT JOIN configurations c ON a.id = c.application_id
-        WHERE a.id = %s
-        GROUP BY a.id, a.name, a.comments, a.created_at, a.updated_at
+        WHERE a.{column} = %s
+        GROUP BY a.id, a.name, a.comments, a.created_at, a.updated_at, a.version
         """
         
         try:
-            results = await db_manager.execute_query(query, (app_id,))
+            results = await db_manager.execute_query(query, (value,))
             if not results:
                 return None
             
             row = results[0]
-            config_ids = []
-            if row['configuration_ids'] and row['configuration_ids'] != [None]:
-                config_ids = [cid for cid in row['configuration_ids']]
+            if not row['configuration_ids'] or row['configuration_ids'] == [None]:
+                row['configuration_ids'] = []
             
-            return ApplicationWithConfigs(
-                id=row['id'],
-                name=row['name'],
-                comments=row['comments'],
-                created_at=row['created_at'],
-                updated_at=row['updated_at'],
-                configuration_ids=config_ids
-            )
+            return ApplicationWithConfigs.from_row(row)
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get application with configs: {e}")
     
+    async def _fetch_fields(self, app_id: str, fields: Tuple[str, ...], model: type) -> Optional[Any]:
+        if "configuration_ids" in fields:
+            query = f"""
+            SELECT {_select_columns(fields)},
+                COALESCE(json_agg(c.id) FILTER (WHERE c.id IS NOT NULL), '[]'::json) AS configuration_ids
+            FROM applications a
+            LEFT JOIN configurations c ON a.id = c.application_id
+            WHERE a.id = %s
+            GROUP BY a.id
+            """
+        else:
+            query = f"SELECT {_select_columns(fields)} FROM applications a WHERE a.id = %s"
+        
+        try:
+            results = await db_manager.execute_query(query, (app_id,))
+            return model.model_construct(**results[0]) if results else None
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get application: {e}")
+    
+    async def get_page(self, fields: Tuple[str, ...], offset: int = 0, limit: Optional[int] = None) -> List[Any]:
+        """Get one page of applications ordered by (name, id) like the catalogue, reading only the selected columns.
+        
+        configuration_ids is not available here; pass Application fields.
+        """
+        model, _, list_adapter = _sparse_adapters(fields)
+        return await self._cached_read(
+            ("get_page", ",".join(fields), str(offset), str(limit)),
+            list_adapter,
+            lambda: self._fetch_page(fields, model, offset, limit)
+        )
+    
+    async def _fetch_page(self, fields: Tuple[str, ...], model: type, offset: int, limit: Optional[int]) -> List[Any]:
+        # LIMIT NULL is no limit
+        query = f"SELECT {_select_columns(fields)} FROM applications a ORDER BY a.name COLLATE \"C\", a.id OFFSET %s LIMIT %s"
+        
+        try:
+            results = await db_manager.execute_query(query, (offset, limit))
+            return [model.model_construct(**row) for row in results]
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get applications: {e}")
+    
+    async def search(self, text: str, offset: int = 0, limit: int = 20) -> List[ApplicationMatch]:
+        """Find applications whose name or comments contain text or resemble it, best matches first.
+        
+        Exact names rank first, then names starting with text, then other
+        substring matches, then fuzzy (trigram word similarity) matches by
+        score. Every condition can use the trigram indexes on name and comments.
+        """
+        return await self._reads.do(("search", text, offset, limit), lambda: self._fetch_search(text, offset, limit))
+    
+    async def _fetch_search(self, text: str, offset: int, limit: int) -> List[ApplicationMatch]:
+        query = """
+        SELECT id, name, comments, created_at, updated_at, version,
+            GREATEST(word_similarity(%(text)s, name), word_similarity(%(text)s, COALESCE(comments, ''))) AS score
+        FROM applications
+        WHERE name ILIKE %(pattern)s OR comments ILIKE %(pattern)s
+            OR %(text)s <%% name OR %(text)s <%% comments
+        ORDER BY
+            CASE
+                WHEN lower(name) = lower(%(text)s) THEN 0
+                WHEN name ILIKE %(prefix)s THEN 1
+                WHEN name ILIKE %(pattern)s THEN 2
+                ELSE 3
+            END,
+            score DESC, name COLLATE "C"
+        OFFSET %(offset)s LIMIT %(limit)s
+        """
+        pattern = _like_pattern(text)
+        params = {"text": text, "pattern": pattern, "prefix": pattern[1:], "offset": offset, "limit": limit}
+        
+        try:
+            results = await db_manager.execute_query(query, params)
+            return [ApplicationMatch.from_row(row) for row in results]
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to search applications: {e}")
+    
     async def get_all(self) -> List[Application]:
         """Get all applications."""
+        return await self._cached_read(("get_all",), APPLICATION_LIST, self._fetch_all)
+    
+    async def _fetch_all(self) -> List[Application]:
         query = """
-        SELECT id, name, comments, created_at, updated_at
+        SELECT id, name, comments, created_at, updated_at, version
         FROM applications
-        ORDER BY name
+        ORDER BY name COLLATE "C", id
         """
         
         try:
             results = await db_manager.execute_query(query)
-            return [
-                Application(
-                    id=row['id'],
-                    name=row['name'],
-                    comments=row['comments'],
-                    created_at=row['created_at'],
-                    updated_at=row['updated_at']
-                )
-                for row in results
-            ]
+            return [Application.from_row(row) for row in results]
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to get applications: {e}")
     
-    async def update(self, app_id: str, application_data: ApplicationUpdate) -> Optional[Application]:
-        """Update an existing application."""
+    async def update(
+        self,
+        app_id: str,
+        application_data: ApplicationUpdate,
+        expected_versions: Optional[List[int]] = None
+    ) -> Optional[Application]:
+        """Update an existing application.
+        
+        With expected_versions the row is only updated if its version is one
+        of them; otherwise VersionConflictError is raised. The check is part
+        of the UPDATE itself, so it costs no extra round trip or lock.
+        """
         now = datetime.now()
         
         query = """
-        UPDATE applications
-        SET name = %s, comments = %s, updated_at = %s
-        WHERE id = %s
-        RETURNING id, name, comments, created_at, updated_at
+        WITH updated AS (
+            UPDATE applications
+            SET name = %s, comments = %s, updated_at = %s, version = version + 1
+            WHERE id = %s AND (%s::int[] IS NULL OR version = ANY(%s::int[]))
+            RETURNING id, name, comments, created_at, updated_at, version
+        )
+        SELECT id, name, comments, created_at, updated_at, version, TRUE AS updated FROM updated
+        UNION ALL
+        SELECT id, name, comments, created_at, updated_at, version, FALSE AS updated
+        FROM applications
+        WHERE id = %s AND NOT EXISTS (SELECT 1 FROM updated)
         """
         
-        params = (application_data.name, application_data.comments, now, app_id)
+        params = (
+            application_data.name, application_data.comments, now, app_id,
+            expected_versions, expected_versions, app_id
+        )
         
         try:
             results = await db_manager.execute_returning_query(query, params)
-            if not results:
-                return None
-            
-            row = results[0]
-            return Application(
-                id=row['id'],
-                name=row['name'],
-                comments=row['comments'],
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to update application: {e}")
+        
+        if not results:
+            return None
+        row = results[0]
+        if not row.pop('updated'):
+            raise VersionConflictError(row['version'])
+        self.cache.invalidate()
+        return Application.from_row(row)
     
     async def delete(self, app_id: str) -> bool:
         """Delete an application."""
@@ -174,25 +365,58 @@ class ApplicationRepository:
         
         try:
             affected_rows = await db_manager.execute_command(query, (app_id,))
+            if affected_rows:
+                self.cache.invalidate()
             return affected_rows > 0
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to delete application: {e}")
     
-    async def delete_multiple(self, app_ids: List[str]) -> int:
-        """Delete multiple applications by IDs."""
+    async def delete_multiple(
+        self,
+        app_ids: List[str],
+        chunk_size: Optional[int] = None,
+        on_chunk: Optional[Callable[[List[str]], None]] = None
+    ) -> int:
+        """Delete multiple applications by IDs.
+        
+        Their configurations are deleted first, chunk_size (default
+        BULK_DELETE_CHUNK_SIZE) rows per statement and transaction, so a large cascade never holds its locks
+        or WAL in one transaction. on_chunk receives each chunk's deleted
+        configuration IDs.
+        """
         if not app_ids:
             return 0
         
-        # Create placeholders for the IN clause
-        placeholders = ','.join(['%s'] * len(app_ids))
-        query = f"DELETE FROM applications WHERE id IN ({placeholders})"
+        ids = list(app_ids)
+        chunk_size = chunk_size or settings.bulk_delete_chunk_size
+        chunk_query = """
+        DELETE FROM configurations
+        WHERE id IN (SELECT id FROM configurations WHERE application_id = ANY(%s) LIMIT %s)
+        RETURNING id
+        """
         
         try:
-            affected_rows = await db_manager.execute_command(query, tuple(app_ids))
-            return affected_rows
+            while True:
+                rows = await db_manager.execute_returning_query(chunk_query, (ids, chunk_size))
+                if rows and on_chunk is not None:
+                    on_chunk([row['id'] for row in rows])
+                if len(rows) < chunk_size:
+                    break
+            
+            return await db_manager.execute_command("DELETE FROM applications WHERE id = ANY(%s)", (ids,))
+        except PoolTimeoutError:
+            raise
         except Exception as e:
             raise RuntimeError(f"Failed to delete applications: {e}")
+        finally:
+            # Chunks committed before a failure changed the data too
+            self.cache.invalidate()
 
 
-# Global repository instance
-application_repository = ApplicationRepository()
\ No newline at end of file
+# Global repository instance; in snapshot mode reads come from the snapshot file
+application_repository = (
+    SnapshotApplicationRepository(snapshot_store) if settings.snapshot_path
+    else ApplicationRepository(cache=application_read_cache)
+)
\ No newline at end of file
@@ -1,8 +1,15 @@
-"""Tests for ApplicationRepository delete functionality."""
+"""Tests for ApplicationRepository."""
 
+import asyncio
 import pytest
+from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
+from config_service.database.circuit_breaker import CircuitOpenError
+from config_service.models.application import ApplicationUpdate
 from config_service.repositories.application_repository import ApplicationRepository
+from config_service.repositories.errors import VersionConflictError
+from config_service.repositories.read_cache import LocalReadCache
+from config_service.staleness import Staleness, current_staleness
 
 
 @pytest.fixture
@@ -87,7 +94,8 @@ async def test_delete_multiple_success(repository, mock_db_manager, monkeypatch)
     # Mock the db_manager
     monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
     
-    # Mock execute_command to return 3 (three rows affected)
+    # No configurations to delete, then three applications deleted
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
     mock_db_manager.execute_command = AsyncMock(return_value=3)
     
     app_ids = [
@@ -103,10 +111,10 @@ async def test_delete_multiple_success(repository, mock_db_manager, monkeypatch)
     assert result == 3
     
     # Verify database call
-    expected_query = "DELETE FROM applications WHERE id IN (%s,%s,%s)"
+    expected_query = "DELETE FROM applications WHERE id = ANY(%s)"
     mock_db_manager.execute_command.assert_called_once_with(
         expected_query,
-        tuple(app_ids)
+        (app_ids,)
     )
 
 
@@ -133,6 +141,7 @@ async def test_delete_multiple_partial_success(repository, mock_db_manager, monk
     monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
     
     # Mock execute_command to return 2 (only two rows affected out of three requested)
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
     mock_db_manager.execute_command = AsyncMock(return_value=2)
     
     app_ids = [
@@ -148,10 +157,10 @@ async def test_delete_multiple_partial_success(repository, mock_db_manager, monk
     assert result == 2
     
     # Verify database call
-    expected_query = "DELETE FROM applications WHERE id IN (%s,%s,%s)"
+    expected_query = "DELETE FROM applications WHERE id = ANY(%s)"
     mock_db_manager.execute_command.assert_called_once_with(
         expected_query,
-        tuple(app_ids)
+        (app_ids,)
     )
 
 
@@ -162,6 +171,7 @@ async def test_delete_multiple_database_error(repository, mock_db_manager, monke
     monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
     
     # Mock execute_command to raise an exception
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
     mock_db_manager.execute_command = AsyncMock(side_effect=Exception("Database error"))
     
     app_ids = ["01HKQJQJQJQJQJQJQJQJQJQJQ1", "01HKQJQJQJQJQJQJQJQJQJQJQ2"]
@@ -178,6 +188,7 @@ async def test_delete_multiple_single_id(repository, mock_db_manager, monkeypatc
     monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
     
     # Mock execute_command to return 1 (one row affected)
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
     mock_db_manager.execute_command = AsyncMock(return_value=1)
     
     app_ids = ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]
@@ -189,8 +200,271 @@ async def test_delete_multiple_single_id(repository, mock_db_manager, monkeypatc
     assert result == 1
     
     # Verify database call
-    expected_query = "DELETE FROM applications WHERE id IN (%s)"
+    expected_query = "DELETE FROM applications WHERE id = ANY(%s)"
     mock_db_manager.execute_command.assert_called_once_with(
         expected_query,
-        tuple(app_ids)
-    )
\ No newline at end of file
+        (app_ids,)
+    )
+
+@pytest.mark.asyncio
+async def test_delete_multiple_deletes_configurations_in_chunks(repository, mock_db_manager, monkeypatch):
+    """Test that child configurations are deleted in bounded chunks before the applications."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    
+    chunks = [[{"id": "C1"}, {"id": "C2"}], [{"id": "C3"}, {"id": "C4"}], [{"id": "C5"}]]
+    mock_db_manager.execute_returning_query = AsyncMock(side_effect=chunks)
+    mock_db_manager.execute_command = AsyncMock(return_value=2)
+    seen = []
+    
+    result = await repository.delete_multiple(["01HKQJQJQJQJQJQJQJQJQJQJQ1"], chunk_size=2, on_chunk=seen.append)
+    
+    assert result == 2
+    assert seen == [["C1", "C2"], ["C3", "C4"], ["C5"]]
+    assert mock_db_manager.execute_returning_query.await_count == 3
+    assert mock_db_manager.execute_returning_query.call_args[0][1] == (["01HKQJQJQJQJQJQJQJQJQJQJQ1"], 2)
+
+@pytest.mark.asyncio
+async def test_concurrent_get_by_id_with_configs_coalesced(repository, mock_db_manager, monkeypatch):
+    """Test that concurrent reads of the same application share one query."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    
+    app_id = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+    now = datetime.now()
+    
+    async def slow_query(*args, **kwargs):
+        await asyncio.sleep(0.01)
+        return [{
+            'id': app_id, 'name': 'hot-app', 'comments': None,
+            'created_at': now, 'updated_at': now, 'configuration_ids': []
+        }]
+    mock_db_manager.execute_query = AsyncMock(side_effect=slow_query)
+    
+    results = await asyncio.gather(*(repository.get_by_id_with_configs(app_id) for _ in range(20)))
+    
+    assert all(result.name == 'hot-app' for result in results)
+    mock_db_manager.execute_query.assert_called_once()
+    assert repository.read_stats()["coalesced"] == 19
+
+
+@pytest.mark.asyncio
+async def test_update_with_matching_version(repository, mock_db_manager, monkeypatch):
+    """Test that a conditional update passes the expected versions to the UPDATE."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    now = datetime.now()
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[{
+        "id": "01HKQJQJQJQJQJQJQJQJQJQJQJ", "name": "app", "comments": None,
+        "created_at": now, "updated_at": now, "version": 4, "updated": True
+    }])
+    
+    application = await repository.update("01HKQJQJQJQJQJQJQJQJQJQJQJ", ApplicationUpdate(name="app"), [3])
+    
+    assert application.version == 4
+    params = mock_db_manager.execute_returning_query.call_args[0][1]
+    assert params[4] == params[5] == [3]
+
+
+@pytest.mark.asyncio
+async def test_update_version_conflict(repository, mock_db_manager, monkeypatch):
+    """Test that a row returned unchanged means the version precondition failed."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    now = datetime.now()
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[{
+        "id": "01HKQJQJQJQJQJQJQJQJQJQJQJ", "name": "app", "comments": None,
+        "created_at": now, "updated_at": now, "version": 5, "updated": False
+    }])
+    
+    with pytest.raises(VersionConflictError) as exc_info:
+        await repository.update("01HKQJQJQJQJQJQJQJQJQJQJQJ", ApplicationUpdate(name="app"), [3])
+    
+    assert exc_info.value.current_version == 5
+
+
+@pytest.mark.asyncio
+async def test_update_not_found(repository, mock_db_manager, monkeypatch):
+    """Test that no rows at all means the application does not exist."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
+    
+    assert await repository.update("01HKQJQJQJQJQJQJQJQJQJQJQJ", ApplicationUpdate(name="app"), [3]) is None
+
+
+@pytest.mark.asyncio
+async def test_cached_read_served_until_write(mock_db_manager, monkeypatch):
+    """Test that reads are served from the cache until a write invalidates it."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    repository = ApplicationRepository(cache=LocalReadCache())
+    now = datetime.now()
+    row = {
+        'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'app', 'comments': None,
+        'created_at': now, 'updated_at': now, 'configuration_ids': []
+    }
+    mock_db_manager.execute_query = AsyncMock(return_value=[row])
+    mock_db_manager.execute_command = AsyncMock(return_value=1)
+    
+    first = await repository.get_by_id_with_configs(row['id'])
+    second = await repository.get_by_id_with_configs(row['id'])
+    
+    assert second == first
+    mock_db_manager.execute_query.assert_called_once()
+    
+    await repository.delete(row['id'])
+    await repository.get_by_id_with_configs(row['id'])
+    
+    assert mock_db_manager.execute_query.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_read_racing_write_not_cached(mock_db_manager, monkeypatch):
+    """Test that a result read before a concurrent write is not cached."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    cache = LocalReadCache()
+    repository = ApplicationRepository(cache=cache)
+    now = datetime.now()
+    
+    async def query_then_write(*args, **kwargs):
+        cache.invalidate()
+        return [{
+            'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'app', 'comments': None,
+            'created_at': now, 'updated_at': now, 'version': 1
+        }]
+    mock_db_manager.execute_query = AsyncMock(side_effect=query_then_write)
+    
+    await repository.get_by_id("01HKQJQJQJQJQJQJQJQJQJQJQJ")
+    
+    assert cache.stats()["stores"] == 0
+
+
+@pytest.mark.asyncio
+async def test_follower_joining_after_write_does_not_cache_stale_read(mock_db_manager, monkeypatch):
+    """Test that a caller joining a read started before a write does not cache its result."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    cache = LocalReadCache()
+    repository = ApplicationRepository(cache=cache)
+    now = datetime.now()
+    started, release = asyncio.Event(), asyncio.Event()
+    
+    async def slow_query(*args, **kwargs):
+        started.set()
+        await release.wait()
+        return [{
+            'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'app', 'comments': None,
+            'created_at': now, 'updated_at': now, 'version': 1
+        }]
+    mock_db_manager.execute_query = AsyncMock(side_effect=slow_query)
+    
+    leader = asyncio.create_task(repository.get_by_id("01HKQJQJQJQJQJQJQJQJQJQJQJ"))
+    await started.wait()
+    cache.invalidate()
+    follower = asyncio.create_task(repository.get_by_id("01HKQJQJQJQJQJQJQJQJQJQJQJ"))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(leader, follower)
+    
+    assert mock_db_manager.execute_query.await_count == 1
+    assert cache.stats()["stores"] == 0
+
+
+@pytest.mark.asyncio
+async def test_last_known_read_served_stale_while_circuit_open(mock_db_manager, monkeypatch):
+    """Test that an open circuit serves the last-known value, even after a write, and flags it stale."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    repository = ApplicationRepository(cache=LocalReadCache())
+    now = datetime.now()
+    row = {
+        'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'app', 'comments': None,
+        'created_at': now, 'updated_at': now, 'version': 1, 'configuration_ids': []
+    }
+    mock_db_manager.execute_query = AsyncMock(return_value=[row])
+    first = await repository.get_by_name('app')
+    repository.cache.invalidate()
+    mock_db_manager.execute_query = AsyncMock(side_effect=CircuitOpenError(5.0))
+    staleness = Staleness()
+    token = current_staleness.set(staleness)
+    try:
+        assert await repository.get_by_name('app') == first
+    finally:
+        current_staleness.reset(token)
+    
+    assert staleness.age is not None
+    with pytest.raises(CircuitOpenError):
+        await repository.get_by_id(row['id'])
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_with_configs_fields_selects_only_columns(repository, mock_db_manager, monkeypatch):
+    """Test that a selection without configuration_ids skips the join and aggregation."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    mock_db_manager.execute_query = AsyncMock(return_value=[{"id": "01HKQJQJQJQJQJQJQJQJQJQJQJ", "name": "app"}])
+    
+    application = await repository.get_by_id_with_configs("01HKQJQJQJQJQJQJQJQJQJQJQJ", ("name", "id"))
+    
+    query = mock_db_manager.execute_query.call_args[0][0]
+    assert query.startswith("SELECT a.name, a.id FROM applications a")
+    assert "JOIN" not in query
+    assert application.model_dump() == {"name": "app", "id": "01HKQJQJQJQJQJQJQJQJQJQJQJ"}
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_with_configs_fields_aggregates_when_selected(repository, mock_db_manager, monkeypatch):
+    """Test that configuration_ids is aggregated when it is selected."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    mock_db_manager.execute_query = AsyncMock(return_value=[
+        {"id": "01HKQJQJQJQJQJQJQJQJQJQJQJ", "configuration_ids": ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]}
+    ])
+    
+    application = await repository.get_by_id_with_configs("01HKQJQJQJQJQJQJQJQJQJQJQJ", ("id", "configuration_ids"))
+    
+    assert "json_agg" in mock_db_manager.execute_query.call_args[0][0]
+    assert application.configuration_ids == ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]
+
+
+@pytest.mark.asyncio
+async def test_get_page_pages_in_sql(repository, mock_db_manager, monkeypatch):
+    """Test that sparse listings read only the selected columns of one page."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    mock_db_manager.execute_query = AsyncMock(return_value=[{"name": "app", "id": "01HKQJQJQJQJQJQJQJQJQJQJQJ"}])
+    
+    page = await repository.get_page(("name", "id"), offset=10, limit=5)
+    
+    query, params = mock_db_manager.execute_query.call_args[0]
+    assert query == "SELECT a.name, a.id FROM applications a ORDER BY a.name COLLATE \"C\", a.id OFFSET %s LIMIT %s"
+    assert params == (10, 5)
+    assert [a.name for a in page] == ["app"]
+
+
+@pytest.mark.asyncio
+async def test_get_by_name_queries_name(repository, mock_db_manager, monkeypatch):
+    """Test that a name lookup filters on the name column and returns configuration IDs."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    now = datetime.now()
+    mock_db_manager.execute_query = AsyncMock(return_value=[{
+        'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'billing', 'comments': None,
+        'created_at': now, 'updated_at': now, 'configuration_ids': []
+    }])
+    
+    application = await repository.get_by_name("billing")
+    
+    query, params = mock_db_manager.execute_query.call_args[0]
+    assert "WHERE a.name = %s" in query
+    assert params == ("billing",)
+    assert application.id == "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+
+
+@pytest.mark.asyncio
+async def test_search_escapes_like_wildcards(repository, mock_db_manager, monkeypatch):
+    """Test that % and _ in the search text match literally and results carry their score."""
+    monkeypatch.setattr('config_service.repositories.application_repository.db_manager', mock_db_manager)
+    now = datetime.now()
+    mock_db_manager.execute_query = AsyncMock(return_value=[{
+        'id': "01HKQJQJQJQJQJQJQJQJQJQJQJ", 'name': 'pay_100%', 'comments': None,
+        'created_at': now, 'updated_at': now, 'version': 1, 'score': 0.75
+    }])
+    
+    matches = await repository.search("y_100%", offset=20, limit=10)
+    
+    query, params = mock_db_manager.execute_query.call_args[0]
+    assert "<%% name" in query
+    assert params == {
+        "text": "y_100%", "pattern": "%y\\_100\\%%", "prefix": "y\\_100\\%%", "offset": 20, "limit": 10
+    }
+    assert [(m.name, m.score) for m in matches] == [("pay_100%", 0.75)]
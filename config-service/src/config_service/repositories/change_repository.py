@@ -0,0 +1,75 @@
+"""Repository for the application and configuration change feed."""
+
+import logging
+from datetime import datetime
+from typing import List
+from config_service.database.connection import db_manager
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.change import Change
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeRepository:
+    """Reads changes after a (changed_at, id) cursor using raw SQL."""
+    
+    # Each branch walks its (timestamp, id) index from the cursor and stops after limit rows
+    CHANGES_SQL = """
+    WITH horizon AS (SELECT LOCALTIMESTAMP - make_interval(secs => %s) AS t)
+    SELECT kind, id, application_id, deleted, changed_at, data FROM (
+        (SELECT 'application' AS kind, id, id AS application_id, FALSE AS deleted,
+                updated_at AS changed_at, to_jsonb(a) AS data
+         FROM applications a
+         WHERE (updated_at, id) > (%s, %s) AND updated_at < (SELECT t FROM horizon)
+         ORDER BY updated_at, id
+         LIMIT %s)
+        UNION ALL
+        (SELECT 'configuration', id, application_id, FALSE, updated_at, to_jsonb(c)
+         FROM configurations c
+         WHERE (updated_at, id) > (%s, %s) AND updated_at < (SELECT t FROM horizon)
+         ORDER BY updated_at, id
+         LIMIT %s)
+        UNION ALL
+        (SELECT kind, id, application_id, TRUE, deleted_at, NULL
+         FROM tombstones
+         WHERE (deleted_at, id) > (%s, %s) AND deleted_at < (SELECT t FROM horizon)
+         ORDER BY deleted_at, id
+         LIMIT %s)
+    ) changes
+    ORDER BY changed_at, id
+    LIMIT %s
+    """
+    
+    async def changes_since(self, changed_at: datetime, last_id: str, limit: int, settle_seconds: float) -> List[Change]:
+        """Return up to limit changes after (changed_at, last_id), oldest first.
+        
+        Changes newer than settle_seconds are held back: a transaction that
+        started earlier may still commit a row stamped before them, and a
+        cursor that moved past that stamp would never see the row.
+        """
+        branch = (changed_at, last_id, limit)
+        params = (settle_seconds,) + branch * 3 + (limit,)
+        
+        try:
+            results = await db_manager.execute_query(self.CHANGES_SQL, params)
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to read changes: {e}")
+        
+        return [Change.from_row(row) for row in results]
+    
+    async def delete_tombstones(self, older_than_seconds: float) -> int:
+        """Delete tombstones older than older_than_seconds."""
+        query = "DELETE FROM tombstones WHERE deleted_at < LOCALTIMESTAMP - make_interval(secs => %s)"
+        
+        try:
+            return await db_manager.execute_command(query, (older_than_seconds,))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete tombstones: {e}")
+
+
+# Global repository instance
+change_repository = ChangeRepository()
@@ -0,0 +1,42 @@
+"""Tests for ChangeRepository."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.repositories.change_repository import ChangeRepository
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+
+
+@pytest.fixture
+def mock_db_manager(monkeypatch):
+    """Mock database manager."""
+    mock = MagicMock()
+    monkeypatch.setattr('config_service.repositories.change_repository.db_manager', mock)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_changes_since_is_one_query(mock_db_manager):
+    """Test that all three sources are read from the cursor in a single round trip."""
+    now = datetime.now()
+    mock_db_manager.execute_query = AsyncMock(return_value=[{
+        "kind": "application", "id": APP_ID, "application_id": APP_ID, "deleted": True,
+        "changed_at": now, "data": None
+    }])
+    
+    changes = await ChangeRepository().changes_since(now, APP_ID, 50, 2.0)
+    
+    assert changes[0].deleted is True
+    mock_db_manager.execute_query.assert_called_once()
+    params = mock_db_manager.execute_query.call_args[0][1]
+    assert params == (2.0, now, APP_ID, 50, now, APP_ID, 50, now, APP_ID, 50, 50)
+
+
+@pytest.mark.asyncio
+async def test_changes_since_wraps_errors(mock_db_manager):
+    """Test that database errors are wrapped in RuntimeError."""
+    mock_db_manager.execute_query = AsyncMock(side_effect=Exception("connection lost"))
+    
+    with pytest.raises(RuntimeError, match="Failed to read changes"):
+        await ChangeRepository().changes_since(datetime.now(), "", 50, 2.0)
@@ -0,0 +1,316 @@
+"""Repository for Configuration entity data access."""
+
+import logging
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+from psycopg2.extras import Json
+from ulid import ULID as ULIDGenerator
+from config_service.config import settings
+from config_service.database.connection import db_manager
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.configuration import Configuration, ConfigurationCreate, ConfigurationUpdate
+from config_service.models.fields import Fields, sparse_model
+from config_service.repositories.errors import VersionConflictError
+from config_service.repositories.read_cache import application_read_cache
+from config_service.repositories.single_flight import SingleFlight
+from config_service.snapshot.repositories import SnapshotConfigurationRepository
+from config_service.snapshot.store import snapshot_store
+from config_service.structured_logging import log_payload
+
+logger = logging.getLogger(__name__)
+
+CONFIGURATION_COLUMNS = "id, application_id, name, comments, config, parent_ids, created_at, updated_at, version"
+
+# Taken per application (parents never cross applications) by creates and updates that set
+# parent links and by deletes, so each checks the parents or children the others committed
+PARENT_LINK_LOCK = """
+SELECT pg_advisory_xact_lock(hashtext('configuration_parents'), hashtext(application_id))
+FROM configurations WHERE id = %s
+"""
+APPLICATION_PARENT_LINK_LOCK = "SELECT pg_advisory_xact_lock(hashtext('configuration_parents'), hashtext(%s))"
+
+
+class ConfigurationInUseError(Exception):
+    """Raised when deleting a configuration that other configurations inherit from."""
+
+
+class ConfigurationCycleError(ValueError):
+    """Raised when parent links would make a configuration its own ancestor."""
+
+
+class InvalidParentError(ValueError):
+    """Raised when a declared parent is missing or belongs to another application."""
+
+
+class ConfigurationRepository:
+    """Repository for Configuration entity operations using raw SQL."""
+    
+    def __init__(self):
+        # Concurrent identical reads share one query and one pool connection
+        self._reads = SingleFlight()
+    
+    def read_stats(self) -> Dict[str, Any]:
+        """Return request coalescing statistics for read methods."""
+        return self._reads.stats()
+    
+    async def create(self, configuration_data: ConfigurationCreate) -> Configuration:
+        """Create a new configuration.
+        
+        Parents are checked to still exist in the application in the same
+        statement, under the per-application lock deletes also take, so a
+        parent deleted meanwhile raises InvalidParentError instead of
+        leaving a dangling link.
+        """
+        config_id = str(ULIDGenerator())
+        now = datetime.now()
+        parent_ids = list(configuration_data.parent_ids)
+        
+        query = f"""
+        INSERT INTO configurations (id, application_id, name, comments, config, parent_ids, created_at, updated_at)
+        SELECT %s, %s, %s, %s, %s::jsonb, %s::varchar(26)[], %s, %s
+        WHERE (
+            SELECT count(*) FROM configurations WHERE id = ANY(%s::varchar(26)[]) AND application_id = %s
+        ) = cardinality(%s::varchar(26)[])
+        RETURNING {CONFIGURATION_COLUMNS}
+        """
+        
+        params = (
+            config_id, configuration_data.application_id, configuration_data.name, configuration_data.comments,
+            Json(configuration_data.config), parent_ids, now, now,
+            parent_ids, configuration_data.application_id, parent_ids
+        )
+        log_payload(logger, "Create configuration params", params)
+        
+        try:
+            if parent_ids:
+                results = await db_manager.execute_locked_returning_query(
+                    APPLICATION_PARENT_LINK_LOCK, (configuration_data.application_id,), query, params
+                )
+            else:
+                results = await db_manager.execute_returning_query(query, params)
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            logger.error("Error creating configuration: %s", e, exc_info=True)
+            raise RuntimeError(f"Failed to create configuration: {e}")
+        
+        if not results:
+            if parent_ids:
+                raise InvalidParentError("A parent configuration was deleted")
+            raise RuntimeError("Failed to create configuration")
+        # Cached applications list their configuration IDs
+        application_read_cache.invalidate()
+        
+        return Configuration.from_row(results[0])
+    
+    async def get_by_id(self, config_id: str, fields: Fields = None) -> Optional[Configuration]:
+        """Get configuration by ID; with fields, read only those columns into a sparse model."""
+        return await self._reads.do(
+            ("get_by_id", config_id, fields),
+            lambda: self._fetch_by_id(config_id, fields)
+        )
+    
+    async def _fetch_by_id(self, config_id: str, fields: Fields = None) -> Optional[Configuration]:
+        # Selections are validated against the model, whose fields are exactly the columns
+        columns = ", ".join(fields) if fields is not None else CONFIGURATION_COLUMNS
+        query = f"""
+        SELECT {columns}
+        FROM configurations
+        WHERE id = %s
+        """
+        
+        try:
+            results = await db_manager.execute_query(query, (config_id,))
+            if not results:
+                return None
+            
+            if fields is not None:
+                return sparse_model(Configuration, fields).model_construct(**results[0])
+            return Configuration.from_row(results[0])
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get configuration: {e}")
+    
+    async def get_by_application(self, app_id: str) -> List[Configuration]:
+        """Get all configurations of an application, ordered by name."""
+        return await self._reads.do(("get_by_application", app_id), lambda: self._fetch_by_application(app_id))
+    
+    async def _fetch_by_application(self, app_id: str) -> List[Configuration]:
+        query = f"""
+        SELECT {CONFIGURATION_COLUMNS}
+        FROM configurations
+        WHERE application_id = %s
+        ORDER BY name COLLATE "C"
+        """
+        
+        try:
+            results = await db_manager.execute_query(query, (app_id,))
+            return [Configuration.from_row(row) for row in results]
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get configurations: {e}")
+    
+    async def get_lineage(self, config_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the given configurations and all of their ancestors, keyed by ID.
+        
+        One recursive query walks parent_ids; UNION (not UNION ALL) stops
+        the walk on cycles.
+        """
+        if not config_ids:
+            return {}
+        
+        query = """
+        WITH RECURSIVE lineage AS (
+            SELECT id, application_id, name, config, parent_ids
+            FROM configurations
+            WHERE id = ANY(%s)
+            UNION
+            SELECT c.id, c.application_id, c.name, c.config, c.parent_ids
+            FROM configurations c
+            JOIN lineage l ON c.id = ANY(l.parent_ids)
+        )
+        SELECT id, application_id, name, config, parent_ids FROM lineage
+        """
+        
+        try:
+            results = await db_manager.execute_query(query, (list(config_ids),))
+            return {row['id']: row for row in results}
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get configuration lineage: {e}")
+    
+    async def update(
+        self,
+        config_id: str,
+        configuration_data: ConfigurationUpdate,
+        expected_versions: Optional[List[int]] = None
+    ) -> Optional[Configuration]:
+        """Update an existing configuration; fields left as None are unchanged.
+        
+        With expected_versions the row is only updated if its version is one
+        of them; otherwise VersionConflictError is raised. New parent_ids are
+        checked for cycles and for still existing in the same statement,
+        under a per-application lock, so two concurrent parent changes cannot
+        together close a loop that neither would alone and a parent deleted
+        meanwhile is noticed; these raise ConfigurationCycleError and
+        InvalidParentError.
+        """
+        now = datetime.now()
+        parent_ids = list(configuration_data.parent_ids) if configuration_data.parent_ids is not None else None
+        
+        query = f"""
+        WITH RECURSIVE ancestors AS (
+            SELECT id, parent_ids FROM configurations WHERE id = ANY(%s::varchar(26)[])
+            UNION
+            SELECT c.id, c.parent_ids FROM configurations c JOIN ancestors a ON c.id = ANY(a.parent_ids)
+        ), cycle AS (
+            SELECT EXISTS (SELECT 1 FROM ancestors WHERE id = %s) AS found
+        ), missing AS (
+            SELECT COALESCE(cardinality(%s::varchar(26)[]) <> (
+                SELECT count(*) FROM configurations
+                WHERE id = ANY(%s::varchar(26)[])
+                AND application_id = (SELECT application_id FROM configurations WHERE id = %s)
+            ), FALSE) AS found
+        ), updated AS (
+            UPDATE configurations
+            SET name = COALESCE(%s, name),
+                comments = COALESCE(%s, comments),
+                config = COALESCE(%s::jsonb, config),
+                parent_ids = COALESCE(%s::varchar(26)[], parent_ids),
+                updated_at = %s,
+                version = version + 1
+            WHERE id = %s AND (%s::int[] IS NULL OR version = ANY(%s::int[]))
+                AND NOT (SELECT found FROM cycle) AND NOT (SELECT found FROM missing)
+            RETURNING {CONFIGURATION_COLUMNS}
+        )
+        SELECT {CONFIGURATION_COLUMNS}, TRUE AS updated, FALSE AS cycle, FALSE AS missing FROM updated
+        UNION ALL
+        SELECT {CONFIGURATION_COLUMNS}, FALSE AS updated, (SELECT found FROM cycle) AS cycle,
+            (SELECT found FROM missing) AS missing
+        FROM configurations
+        WHERE id = %s AND NOT EXISTS (SELECT 1 FROM updated)
+        """
+        
+        params = (
+            parent_ids,
+            config_id,
+            parent_ids,
+            parent_ids,
+            config_id,
+            configuration_data.name,
+            configuration_data.comments,
+            Json(configuration_data.config) if configuration_data.config is not None else None,
+            parent_ids,
+            now,
+            config_id,
+            expected_versions,
+            expected_versions,
+            config_id
+        )
+        
+        try:
+            if parent_ids:
+                results = await db_manager.execute_locked_returning_query(
+                    PARENT_LINK_LOCK, (config_id,), query, params
+                )
+            else:
+                results = await db_manager.execute_returning_query(query, params)
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to update configuration: {e}")
+        
+        if not results:
+            return None
+        row = results[0]
+        cycle = row.pop('cycle')
+        missing = row.pop('missing')
+        if not row.pop('updated'):
+            if expected_versions is None or row['version'] in expected_versions:
+                if missing:
+                    raise InvalidParentError("A parent configuration was deleted")
+                if cycle:
+                    raise ConfigurationCycleError("Parent links would make the configuration its own ancestor")
+            raise VersionConflictError(row['version'])
+        return Configuration.from_row(row)
+    
+    async def delete(self, config_id: str) -> bool:
+        """Delete a configuration unless other configurations inherit from it."""
+        # Under the lock creates and parent changes take, no child can be committed between the check and the delete
+        query = """
+        WITH children AS (
+            SELECT count(*) AS n FROM configurations WHERE parent_ids @> ARRAY[%s]::varchar(26)[]
+        ), deleted AS (
+            DELETE FROM configurations
+            WHERE id = %s AND (SELECT n FROM children) = 0
+            RETURNING id
+        )
+        SELECT (SELECT n FROM children) AS children, (SELECT count(*) FROM deleted) AS deleted
+        """
+        
+        try:
+            results = await db_manager.execute_locked_returning_query(
+                PARENT_LINK_LOCK, (config_id,), query, (config_id, config_id)
+            )
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete configuration: {e}")
+        
+        row = results[0]
+        if row['children']:
+            raise ConfigurationInUseError(
+                f"Configuration is a parent of {row['children']} other configuration(s)"
+            )
+        if row['deleted']:
+            application_read_cache.invalidate()
+        return row['deleted'] > 0
+
+
+# Global repository instance; in snapshot mode reads come from the snapshot file
+configuration_repository = (
+    SnapshotConfigurationRepository(snapshot_store) if settings.snapshot_path else ConfigurationRepository()
+)
\ No newline at end of file
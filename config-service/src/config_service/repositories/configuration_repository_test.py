@@ -0,0 +1,151 @@
+"""Tests for ConfigurationRepository."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.models.configuration import ConfigurationCreate, ConfigurationUpdate
+from config_service.repositories.configuration_repository import (
+    ConfigurationCycleError, ConfigurationInUseError, ConfigurationRepository, InvalidParentError
+)
+from config_service.repositories.errors import VersionConflictError
+
+CONFIG_ID = "01HKQJQJQJQJQJQJQJQJQJQJQC"
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+PARENT_ID = "01HKQJQJQJQJQJQJQJQJQJQJQP"
+
+
+@pytest.fixture
+def mock_db_manager(monkeypatch):
+    """Mock database manager."""
+    mock = MagicMock()
+    monkeypatch.setattr('config_service.repositories.configuration_repository.db_manager', mock)
+    return mock
+
+
+@pytest.fixture
+def repository():
+    """Create repository instance."""
+    return ConfigurationRepository()
+
+
+@pytest.mark.asyncio
+async def test_delete_success(repository, mock_db_manager):
+    """Test successful configuration deletion under the application's parent link lock."""
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[{"children": 0, "deleted": 1}])
+    
+    assert await repository.delete(CONFIG_ID) is True
+    lock, lock_params, query, params = mock_db_manager.execute_locked_returning_query.call_args[0]
+    assert "pg_advisory_xact_lock" in lock and lock_params == (CONFIG_ID,)
+
+
+@pytest.mark.asyncio
+async def test_delete_not_found(repository, mock_db_manager):
+    """Test deletion when the configuration doesn't exist."""
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[{"children": 0, "deleted": 0}])
+    
+    assert await repository.delete(CONFIG_ID) is False
+
+
+@pytest.mark.asyncio
+async def test_delete_with_children(repository, mock_db_manager):
+    """Test that a configuration other configurations inherit from is not deleted."""
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[{"children": 2, "deleted": 0}])
+    
+    with pytest.raises(ConfigurationInUseError):
+        await repository.delete(CONFIG_ID)
+
+
+@pytest.mark.asyncio
+async def test_get_lineage(repository, mock_db_manager):
+    """Test that lineage rows are keyed by ID and the IDs are passed as one array."""
+    rows = [{"id": CONFIG_ID, "parent_ids": []}]
+    mock_db_manager.execute_query = AsyncMock(return_value=rows)
+    
+    lineage = await repository.get_lineage([CONFIG_ID])
+    
+    assert lineage == {CONFIG_ID: rows[0]}
+    assert mock_db_manager.execute_query.call_args[0][1] == ([CONFIG_ID],)
+
+
+@pytest.mark.asyncio
+async def test_get_lineage_empty(repository, mock_db_manager):
+    """Test that no IDs means no query."""
+    mock_db_manager.execute_query = AsyncMock()
+    
+    assert await repository.get_lineage([]) == {}
+    mock_db_manager.execute_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_leaves_unset_fields(repository, mock_db_manager):
+    """Test that fields left as None are passed as NULL so COALESCE keeps them."""
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[])
+    
+    result = await repository.update(CONFIG_ID, ConfigurationUpdate(name="renamed"))
+    
+    assert result is None
+    params = mock_db_manager.execute_returning_query.call_args[0][1]
+    assert params[5] == "renamed"
+    assert params[6:9] == (None, None, None)
+
+
+@pytest.mark.asyncio
+async def test_update_parents_checked_for_cycles_under_lock(repository, mock_db_manager):
+    """Test that new parent links are checked for cycles after taking the application's lock."""
+    row = {
+        "id": CONFIG_ID, "application_id": "01HKQJQJQJQJQJQJQJQJQJQJQA", "name": "prod", "comments": None,
+        "config": {}, "parent_ids": [], "created_at": datetime.now(), "updated_at": datetime.now(),
+        "version": 2, "updated": False, "cycle": True, "missing": False
+    }
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[row])
+    
+    with pytest.raises(ConfigurationCycleError):
+        await repository.update(CONFIG_ID, ConfigurationUpdate(parent_ids=["01HKQJQJQJQJQJQJQJQJQJQJQP"]), [2])
+    
+    lock, lock_params, query, params = mock_db_manager.execute_locked_returning_query.call_args[0]
+    assert "pg_advisory_xact_lock" in lock and lock_params == (CONFIG_ID,)
+    assert "WITH RECURSIVE ancestors" in query
+    assert params[:2] == (["01HKQJQJQJQJQJQJQJQJQJQJQP"], CONFIG_ID)
+
+
+@pytest.mark.asyncio
+async def test_update_stale_version_reported_before_cycle(repository, mock_db_manager):
+    """Test that a stale If-Match gets a version conflict even when the parents would also cycle."""
+    row = {
+        "id": CONFIG_ID, "application_id": "01HKQJQJQJQJQJQJQJQJQJQJQA", "name": "prod", "comments": None,
+        "config": {}, "parent_ids": [], "created_at": datetime.now(), "updated_at": datetime.now(),
+        "version": 3, "updated": False, "cycle": True, "missing": False
+    }
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[row])
+    
+    with pytest.raises(VersionConflictError):
+        await repository.update(CONFIG_ID, ConfigurationUpdate(parent_ids=["01HKQJQJQJQJQJQJQJQJQJQJQP"]), [2])
+
+
+@pytest.mark.asyncio
+async def test_update_parent_deleted_meanwhile(repository, mock_db_manager):
+    """Test that a parent deleted after the router checked it is reported, not linked."""
+    row = {
+        "id": CONFIG_ID, "application_id": APP_ID, "name": "prod", "comments": None,
+        "config": {}, "parent_ids": [], "created_at": datetime.now(), "updated_at": datetime.now(),
+        "version": 2, "updated": False, "cycle": False, "missing": True
+    }
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[row])
+    
+    with pytest.raises(InvalidParentError):
+        await repository.update(CONFIG_ID, ConfigurationUpdate(parent_ids=[PARENT_ID]), [2])
+
+
+@pytest.mark.asyncio
+async def test_create_with_parents_checks_them_under_lock(repository, mock_db_manager, monkeypatch):
+    """Test that a create with parents takes the application's lock and checks the parents still exist."""
+    monkeypatch.setattr('config_service.repositories.configuration_repository.application_read_cache', MagicMock())
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[])
+    
+    with pytest.raises(InvalidParentError):
+        await repository.create(ConfigurationCreate(application_id=APP_ID, name="prod", parent_ids=[PARENT_ID]))
+    
+    lock, lock_params, query, params = mock_db_manager.execute_locked_returning_query.call_args[0]
+    assert "pg_advisory_xact_lock" in lock and lock_params == (APP_ID,)
+    assert "cardinality" in query
+    assert params[-3:] == ([PARENT_ID], APP_ID, [PARENT_ID])
@@ -0,0 +1,15 @@
+"""Exceptions shared by repositories."""
+
+from typing import Optional
+
+
+class VersionConflictError(Exception):
+    """Raised when a conditional update's expected version does not match the stored row."""
+    
+    def __init__(self, current_version: Optional[int]):
+        super().__init__(f"Row was modified; current version is {current_version}")
+        self.current_version = current_version
+
+
+class ConfigurationsChangedError(Exception):
+    """Raised when configurations a write was checked against changed before it was made."""
@@ -0,0 +1,42 @@
+"""Repository for reading the whole dataset at once, for snapshot files."""
+
+import logging
+from typing import Any, Dict, List, Tuple
+from config_service.database.connection import db_manager
+from config_service.database.pool import PoolTimeoutError
+from config_service.repositories.configuration_repository import CONFIGURATION_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+
+class ExportRepository:
+    """Reads every application and configuration as of one instant."""
+    
+    APPLICATIONS_QUERY = """
+    SELECT
+        a.id, a.name, a.comments, a.created_at, a.updated_at, a.version,
+        COALESCE(json_agg(c.id ORDER BY c.id) FILTER (WHERE c.id IS NOT NULL), '[]'::json) AS configuration_ids
+    FROM applications a
+    LEFT JOIN configurations c ON a.id = c.application_id
+    GROUP BY a.id
+    ORDER BY a.id
+    """
+    
+    CONFIGURATIONS_QUERY = f"SELECT {CONFIGURATION_COLUMNS} FROM configurations ORDER BY id"
+    
+    async def dump(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Return all application rows (with configuration_ids) and configuration rows."""
+        try:
+            applications, configurations = await db_manager.execute_consistent_queries(
+                [self.APPLICATIONS_QUERY, self.CONFIGURATIONS_QUERY]
+            )
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to export data: {e}")
+        
+        return applications, configurations
+
+
+# Global repository instance
+export_repository = ExportRepository()
@@ -0,0 +1,245 @@
+"""Repository for background job rows."""
+
+import logging
+from typing import Any, Dict, List, Optional
+from psycopg2.extras import Json
+from ulid import ULID as ULIDGenerator
+from config_service.database.connection import db_manager
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.job import Job
+
+logger = logging.getLogger(__name__)
+
+JOB_COLUMNS = (
+    "id, kind, status, payload, progress, result, error, attempts, max_attempts, "
+    "cancel_requested, run_after, created_at, updated_at, finished_at"
+)
+
+
+class JobRepository:
+    """Repository for job queue operations using raw SQL.
+    
+    Every timestamp is taken from the database clock (LOCALTIMESTAMP) so
+    leases compare correctly across replicas whose clocks disagree.
+    """
+    
+    async def create(self, kind: str, payload: Dict[str, Any], max_attempts: int) -> Job:
+        """Enqueue a new pending job."""
+        query = f"""
+        INSERT INTO jobs (id, kind, payload, max_attempts, run_after, created_at, updated_at)
+        VALUES (%s, %s, %s, %s, LOCALTIMESTAMP, LOCALTIMESTAMP, LOCALTIMESTAMP)
+        RETURNING {JOB_COLUMNS}
+        """
+        
+        try:
+            results = await db_manager.execute_returning_query(
+                query, (str(ULIDGenerator()), kind, Json(payload), max_attempts)
+            )
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to create job: {e}")
+        
+        if not results:
+            raise RuntimeError("Failed to create job")
+        return Job.from_row(results[0])
+    
+    async def get_by_id(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID."""
+        query = f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = %s"
+        
+        try:
+            results = await db_manager.execute_query(query, (job_id,))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get job: {e}")
+        
+        return Job.from_row(results[0]) if results else None
+    
+    async def list(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 100) -> List[Job]:
+        """List the most recent jobs, optionally filtered by status and kind."""
+        query = f"""
+        SELECT {JOB_COLUMNS} FROM jobs
+        WHERE (%s::varchar IS NULL OR status = %s) AND (%s::varchar IS NULL OR kind = %s)
+        ORDER BY id DESC
+        LIMIT %s
+        """
+        
+        try:
+            results = await db_manager.execute_query(query, (status, status, kind, kind, limit))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to list jobs: {e}")
+        
+        return [Job.from_row(row) for row in results]
+    
+    async def claim(self, worker_id: str, kinds: List[str], limit: int, lease_seconds: float) -> List[Job]:
+        """Lease up to limit runnable jobs of the given kinds to worker_id.
+        
+        Runnable means pending and due, or running under a lease that
+        expired because its worker died. SKIP LOCKED lets concurrent
+        workers claim disjoint rows without waiting on each other.
+        """
+        if not kinds or limit <= 0:
+            return []
+        
+        query = f"""
+        UPDATE jobs
+        SET status = 'running', attempts = attempts + 1, locked_by = %s,
+            locked_until = LOCALTIMESTAMP + make_interval(secs => %s), updated_at = LOCALTIMESTAMP
+        WHERE id IN (
+            SELECT id FROM jobs
+            WHERE kind = ANY(%s)
+              AND ((status = 'pending' AND run_after <= LOCALTIMESTAMP)
+                   OR (status = 'running' AND locked_until < LOCALTIMESTAMP))
+            ORDER BY run_after
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING {JOB_COLUMNS}
+        """
+        
+        try:
+            results = await db_manager.execute_returning_query(query, (worker_id, lease_seconds, list(kinds), limit))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to claim jobs: {e}")
+        
+        return [Job.from_row(row) for row in results]
+    
+    async def heartbeat(
+        self,
+        job_id: str,
+        worker_id: str,
+        progress: Dict[str, Any],
+        lease_seconds: float
+    ) -> Optional[bool]:
+        """Store progress and renew the lease.
+        
+        Returns whether cancellation was requested, or None if worker_id no
+        longer holds the job.
+        """
+        query = """
+        UPDATE jobs
+        SET progress = %s, locked_until = LOCALTIMESTAMP + make_interval(secs => %s), updated_at = LOCALTIMESTAMP
+        WHERE id = %s AND locked_by = %s AND status = 'running'
+        RETURNING cancel_requested
+        """
+        
+        try:
+            results = await db_manager.execute_returning_query(
+                query, (Json(progress), lease_seconds, job_id, worker_id)
+            )
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to renew job lease: {e}")
+        
+        return results[0]['cancel_requested'] if results else None
+    
+    async def finish(
+        self,
+        job_id: str,
+        worker_id: str,
+        status: str,
+        progress: Dict[str, Any],
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ) -> bool:
+        """Move a job this worker holds to a final status; False if the lease was lost."""
+        query = """
+        UPDATE jobs
+        SET status = %s, progress = %s, result = %s, error = %s,
+            locked_by = NULL, locked_until = NULL, updated_at = LOCALTIMESTAMP, finished_at = LOCALTIMESTAMP
+        WHERE id = %s AND locked_by = %s AND status = 'running'
+        """
+        params = (
+            status, Json(progress), Json(result) if result is not None else None, error, job_id, worker_id
+        )
+        
+        try:
+            return await db_manager.execute_command(query, params) > 0
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to finish job: {e}")
+    
+    async def requeue(
+        self,
+        job_id: str,
+        worker_id: str,
+        progress: Dict[str, Any],
+        delay_seconds: float = 0.0,
+        error: Optional[str] = None,
+        refund_attempt: bool = False
+    ) -> bool:
+        """Return a job this worker holds to pending, to be retried after delay_seconds.
+        
+        refund_attempt is for interruptions that were not the job's fault,
+        such as shutdown, so they do not use up its retries.
+        """
+        query = """
+        UPDATE jobs
+        SET status = 'pending', progress = %s, error = %s,
+            attempts = attempts - CASE WHEN %s THEN 1 ELSE 0 END,
+            run_after = LOCALTIMESTAMP + make_interval(secs => %s),
+            locked_by = NULL, locked_until = NULL, updated_at = LOCALTIMESTAMP
+        WHERE id = %s AND locked_by = %s AND status = 'running'
+        """
+        params = (Json(progress), error, refund_attempt, delay_seconds, job_id, worker_id)
+        
+        try:
+            return await db_manager.execute_command(query, params) > 0
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to requeue job: {e}")
+    
+    async def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a job and return it, or None if not found.
+        
+        A pending job is cancelled at once; a running one is flagged and
+        stops at its worker's next heartbeat. Finished jobs are returned
+        unchanged.
+        """
+        query = f"""
+        WITH updated AS (
+            UPDATE jobs
+            SET cancel_requested = TRUE,
+                status = CASE WHEN status = 'pending' THEN 'cancelled' ELSE status END,
+                finished_at = CASE WHEN status = 'pending' THEN LOCALTIMESTAMP ELSE finished_at END,
+                updated_at = LOCALTIMESTAMP
+            WHERE id = %s AND status IN ('pending', 'running')
+            RETURNING {JOB_COLUMNS}
+        )
+        SELECT {JOB_COLUMNS} FROM updated
+        UNION ALL
+        SELECT {JOB_COLUMNS} FROM jobs WHERE id = %s AND NOT EXISTS (SELECT 1 FROM updated)
+        """
+        
+        try:
+            results = await db_manager.execute_returning_query(query, (job_id, job_id))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to cancel job: {e}")
+        
+        return Job.from_row(results[0]) if results else None
+    
+    async def delete_finished(self, older_than_seconds: float) -> int:
+        """Delete jobs that finished more than older_than_seconds ago."""
+        query = "DELETE FROM jobs WHERE finished_at < LOCALTIMESTAMP - make_interval(secs => %s)"
+        
+        try:
+            return await db_manager.execute_command(query, (older_than_seconds,))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete finished jobs: {e}")
+
+
+# Global repository instance
+job_repository = JobRepository()
@@ -0,0 +1,86 @@
+"""Tests for JobRepository."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.repositories.job_repository import JobRepository
+
+JOB_ID = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+
+
+@pytest.fixture
+def mock_db_manager(monkeypatch):
+    """Mock database manager."""
+    mock = MagicMock()
+    monkeypatch.setattr('config_service.repositories.job_repository.db_manager', mock)
+    return mock
+
+
+@pytest.fixture
+def repository():
+    """Create repository instance."""
+    return JobRepository()
+
+
+def job_row(**overrides):
+    """A jobs row as the database returns it."""
+    now = datetime.now()
+    row = {
+        "id": JOB_ID, "kind": "test", "status": "running", "payload": {}, "progress": {},
+        "result": None, "error": None, "attempts": 1, "max_attempts": 3, "cancel_requested": False,
+        "run_after": now, "created_at": now, "updated_at": now, "finished_at": None
+    }
+    row.update(overrides)
+    return row
+
+
+@pytest.mark.asyncio
+async def test_claim_skips_locked_rows(repository, mock_db_manager):
+    """Test that claiming uses SKIP LOCKED and passes the kinds as one array."""
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[job_row()])
+    
+    jobs = await repository.claim("w1", ["a", "b"], 2, 60.0)
+    
+    assert [job.id for job in jobs] == [JOB_ID]
+    query, params = mock_db_manager.execute_returning_query.call_args[0]
+    assert "FOR UPDATE SKIP LOCKED" in query
+    assert params == ("w1", 60.0, ["a", "b"], 2)
+
+
+@pytest.mark.asyncio
+async def test_claim_without_capacity(repository, mock_db_manager):
+    """Test that nothing is queried when no job could be run."""
+    mock_db_manager.execute_returning_query = AsyncMock()
+    
+    assert await repository.claim("w1", ["a"], 0, 60.0) == []
+    assert await repository.claim("w1", [], 2, 60.0) == []
+    mock_db_manager.execute_returning_query.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_heartbeat(repository, mock_db_manager):
+    """Test that a heartbeat reports cancellation, or None once the lease is lost."""
+    mock_db_manager.execute_returning_query = AsyncMock(side_effect=[[{"cancel_requested": True}], []])
+    
+    assert await repository.heartbeat(JOB_ID, "w1", {"done": 1}, 60.0) is True
+    assert await repository.heartbeat(JOB_ID, "w1", {"done": 2}, 60.0) is None
+
+
+@pytest.mark.asyncio
+async def test_cancel(repository, mock_db_manager):
+    """Test that cancel returns the job, or None if it does not exist."""
+    mock_db_manager.execute_returning_query = AsyncMock(side_effect=[[job_row(cancel_requested=True)], []])
+    
+    job = await repository.cancel(JOB_ID)
+    
+    assert job.cancel_requested is True
+    assert await repository.cancel(JOB_ID) is None
+
+
+@pytest.mark.asyncio
+async def test_errors_are_wrapped(repository, mock_db_manager):
+    """Test that database errors are wrapped in RuntimeError."""
+    mock_db_manager.execute_command = AsyncMock(side_effect=Exception("connection lost"))
+    
+    with pytest.raises(RuntimeError, match="Failed to finish job"):
+        await repository.finish(JOB_ID, "w1", "completed", {})
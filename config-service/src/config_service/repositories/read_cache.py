@@ -0,0 +1,117 @@
+"""Pluggable caches for repository reads, invalidated by generation."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from config_service.config import settings
+from config_service.repositories.shared_memory_cache import SharedMemoryCache
+
+logger = logging.getLogger(__name__)
+
+
+class NullReadCache:
+    """Caches nothing; every read goes to the database."""
+
+    def generation(self) -> int:
+        """Always 0."""
+        return 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Always a miss."""
+        return None
+
+    def get_stale(self, key: str, max_age: float) -> Optional[Tuple[bytes, float]]:
+        """Nothing is kept to fall back on."""
+        return None
+
+    def put(self, key: str, value: bytes, generation: int):
+        """Discard value."""
+
+    def invalidate(self):
+        """Nothing to invalidate."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Name the backend."""
+        return {"backend": "none"}
+
+
+class LocalReadCache:
+    """Per-process LRU with the same interface and generation semantics as SharedMemoryCache."""
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._generation = 0
+        # key -> (generation, stored_at, value)
+        self._entries: "OrderedDict[str, Tuple[int, float, bytes]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "stale_served": 0}
+
+    def generation(self) -> int:
+        """Current generation; take it before reading the value to store."""
+        return self._generation
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored for key in the current generation, or None."""
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != self._generation or time.monotonic() - entry[1] >= self.ttl:
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return entry[2]
+
+    def get_stale(self, key: str, max_age: float) -> Optional[Tuple[bytes, float]]:
+        """Return the last value stored for key and its age, of any generation, if under max_age."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        age = time.monotonic() - entry[1]
+        if age >= max_age:
+            return None
+        self._stats["stale_served"] += 1
+        return entry[2], age
+
+    def put(self, key: str, value: bytes, generation: int):
+        """Store value for key unless the cache was invalidated since generation was taken."""
+        if generation != self._generation:
+            return
+        self._entries[key] = (generation, time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._stats["stores"] += 1
+
+    def invalidate(self):
+        """Make every stored entry a miss; they stay for get_stale until evicted."""
+        self._generation += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters."""
+        return {"backend": "memory", "entries": len(self._entries), "generation": self._generation, **self._stats}
+
+
+def create_read_cache(backend: str, max_entries: int, ttl: float, path: str, size: int):
+    """Build the read cache backend named by backend: none, memory or shared."""
+    if backend == "memory":
+        return LocalReadCache(max_entries=max_entries, ttl=ttl)
+    if backend == "shared":
+        try:
+            return SharedMemoryCache(path, size=size, slots=max_entries, ttl=ttl)
+        except (OSError, ValueError) as e:
+            # Degrade to per-process caching rather than refuse to start
+            logger.error("Cannot open shared cache %s, caching per process instead: %s", path, e)
+            return LocalReadCache(max_entries=max_entries, ttl=ttl)
+    if backend != "none":
+        raise ValueError(f"Unknown read cache backend: {backend}")
+    return NullReadCache()
+
+
+# Global application read cache instance
+application_read_cache = create_read_cache(
+    settings.application_cache_backend,
+    max_entries=settings.application_cache_max_entries,
+    ttl=settings.application_cache_ttl,
+    path=settings.shared_cache_path,
+    size=settings.shared_cache_bytes
+)
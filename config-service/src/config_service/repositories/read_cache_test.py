@@ -0,0 +1,57 @@
+"""Tests for the read cache backends."""
+
+import pytest
+from config_service.repositories.read_cache import LocalReadCache, NullReadCache, create_read_cache
+from config_service.repositories.shared_memory_cache import SharedMemoryCache
+
+
+def test_local_cache_evicts_least_recently_used():
+    """Test that the local cache keeps at most max_entries."""
+    cache = LocalReadCache(max_entries=2)
+    cache.put("a", b"1", 0)
+    cache.put("b", b"2", 0)
+    cache.get("a")
+    cache.put("c", b"3", 0)
+    
+    assert cache.get("a") == b"1"
+    assert cache.get("b") is None
+
+
+def test_local_cache_ignores_stale_generation():
+    """Test that a value read before an invalidation is not stored."""
+    cache = LocalReadCache()
+    generation = cache.generation()
+    cache.invalidate()
+    cache.put("a", b"1", generation)
+    
+    assert cache.get("a") is None
+
+
+def test_local_cache_keeps_last_known_value_past_invalidation():
+    """Test that get_stale returns an invalidated or expired value until max_age."""
+    cache = LocalReadCache(ttl=0.0)
+    cache.put("a", b"1", cache.generation())
+    cache.invalidate()
+    
+    assert cache.get("a") is None
+    value, age = cache.get_stale("a", 60.0)
+    assert value == b"1" and age >= 0
+    assert cache.get_stale("a", 0.0) is None
+    assert cache.get_stale("b", 60.0) is None
+    assert NullReadCache().get_stale("a", 60.0) is None
+
+
+def test_create_read_cache_backends(tmp_path):
+    """Test that each backend name builds its cache."""
+    assert isinstance(create_read_cache("none", 10, 1.0, "", 0), NullReadCache)
+    assert isinstance(create_read_cache("memory", 10, 1.0, "", 0), LocalReadCache)
+    assert isinstance(create_read_cache("shared", 10, 1.0, str(tmp_path / "c"), 1024 * 1024), SharedMemoryCache)
+    with pytest.raises(ValueError):
+        create_read_cache("redis", 10, 1.0, "", 0)
+
+
+def test_create_shared_cache_falls_back_to_local(tmp_path):
+    """Test that an unusable shared cache path falls back to per-process caching."""
+    cache = create_read_cache("shared", 10, 1.0, str(tmp_path / "missing" / "c"), 1024 * 1024)
+    
+    assert isinstance(cache, LocalReadCache)
@@ -0,0 +1,128 @@
+"""Repository for application configuration schemas."""
+
+import logging
+from typing import Any, Dict, List, Optional
+from psycopg2.extras import Json
+from config_service.database.connection import db_manager
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.schema import ApplicationSchema
+from config_service.repositories.errors import ConfigurationsChangedError, VersionConflictError
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_COLUMNS = "application_id, config_schema, version, updated_at"
+
+# Waits for, then holds off, writes to the application's configurations: inserts check
+# their foreign key with a share lock on the application row, updates lock their own row
+CONFIGURATIONS_LOCK = """
+WITH application AS (
+    SELECT id FROM applications WHERE id = %s FOR UPDATE
+)
+SELECT c.id FROM configurations c
+WHERE c.application_id = (SELECT id FROM application)
+FOR SHARE OF c
+"""
+
+
+class SchemaRepository:
+    """Repository for application schema operations using raw SQL."""
+    
+    async def get(self, app_id: str) -> Optional[ApplicationSchema]:
+        """Get an application's schema, or None if it has none."""
+        query = f"SELECT {SCHEMA_COLUMNS} FROM application_schemas WHERE application_id = %s"
+        
+        try:
+            results = await db_manager.execute_query(query, (app_id,))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to get schema: {e}")
+        
+        return ApplicationSchema.from_row(results[0]) if results else None
+    
+    async def put(
+        self,
+        app_id: str,
+        config_schema: Dict[str, Any],
+        expected_versions: Optional[List[int]] = None,
+        checked_configurations: Optional[Dict[str, int]] = None
+    ) -> ApplicationSchema:
+        """Create or replace an application's schema.
+        
+        With expected_versions an existing schema is only replaced if its
+        version is one of them; otherwise VersionConflictError is raised.
+        With checked_configurations, the ID and version of every
+        configuration the schema was checked against, it is only saved if
+        the application's configurations are still exactly those; otherwise
+        ConfigurationsChangedError is raised.
+        """
+        query = f"""
+        WITH changed AS (
+            SELECT %s::text[] IS NOT NULL AND EXISTS (
+                SELECT 1 FROM configurations c
+                WHERE c.application_id = %s
+                AND (c.id, c.version) NOT IN (SELECT * FROM unnest(%s::text[], %s::int[]))
+            ) AS found
+        ),
+        upserted AS (
+            INSERT INTO application_schemas (application_id, config_schema)
+            SELECT %s, %s::jsonb WHERE NOT (SELECT found FROM changed)
+            ON CONFLICT (application_id) DO UPDATE
+            SET config_schema = EXCLUDED.config_schema,
+                version = application_schemas.version + 1,
+                updated_at = LOCALTIMESTAMP
+            WHERE %s::int[] IS NULL OR application_schemas.version = ANY(%s::int[])
+            RETURNING {SCHEMA_COLUMNS}
+        )
+        SELECT {SCHEMA_COLUMNS}, TRUE AS updated, FALSE AS changed FROM upserted
+        UNION ALL
+        SELECT {SCHEMA_COLUMNS}, FALSE AS updated, FALSE AS changed
+        FROM application_schemas
+        WHERE application_id = %s AND NOT EXISTS (SELECT 1 FROM upserted) AND NOT (SELECT found FROM changed)
+        UNION ALL
+        SELECT NULL, NULL, NULL, NULL, FALSE AS updated, TRUE AS changed
+        WHERE (SELECT found FROM changed)
+        """
+        
+        checked_ids = list(checked_configurations) if checked_configurations is not None else None
+        checked_versions = list(checked_configurations.values()) if checked_configurations is not None else None
+        params = (
+            checked_ids, app_id, checked_ids, checked_versions,
+            app_id, Json(config_schema), expected_versions, expected_versions, app_id
+        )
+        
+        try:
+            if checked_configurations is not None:
+                results = await db_manager.execute_locked_returning_query(CONFIGURATIONS_LOCK, (app_id,), query, params)
+            else:
+                results = await db_manager.execute_returning_query(query, params)
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to save schema: {e}")
+        
+        if not results:
+            raise RuntimeError("Failed to save schema")
+        row = results[0]
+        if row.pop('changed'):
+            raise ConfigurationsChangedError(f"Configurations of application {app_id} changed")
+        if not row.pop('updated'):
+            raise VersionConflictError(row['version'])
+        return ApplicationSchema.from_row(row)
+    
+    async def delete(self, app_id: str) -> bool:
+        """Remove an application's schema; its configurations are no longer validated."""
+        query = "DELETE FROM application_schemas WHERE application_id = %s RETURNING application_id"
+        
+        try:
+            results = await db_manager.execute_returning_query(query, (app_id,))
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            raise RuntimeError(f"Failed to delete schema: {e}")
+        
+        return bool(results)
+
+
+# Global repository instance
+schema_repository = SchemaRepository()
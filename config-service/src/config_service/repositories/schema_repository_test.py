@@ -0,0 +1,93 @@
+"""Tests for SchemaRepository."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.repositories.errors import ConfigurationsChangedError, VersionConflictError
+from config_service.repositories.schema_repository import SchemaRepository
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+
+
+@pytest.fixture
+def mock_db_manager(monkeypatch):
+    """Mock database manager."""
+    mock = MagicMock()
+    monkeypatch.setattr('config_service.repositories.schema_repository.db_manager', mock)
+    return mock
+
+
+@pytest.fixture
+def repository():
+    """Create repository instance."""
+    return SchemaRepository()
+
+
+def schema_row(updated=True, version=1):
+    """An application_schemas row as the upsert returns it."""
+    return {
+        "application_id": APP_ID, "config_schema": {"type": "object"}, "version": version,
+        "updated_at": datetime.now(), "updated": updated, "changed": False
+    }
+
+
+@pytest.mark.asyncio
+async def test_put_returns_saved_schema(repository, mock_db_manager):
+    """Test that an upsert returns the stored schema and passes the expected versions."""
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[schema_row(version=2)])
+    
+    schema = await repository.put(APP_ID, {"type": "object"}, [1])
+    
+    assert schema.version == 2
+    query, params = mock_db_manager.execute_returning_query.call_args[0]
+    assert "ON CONFLICT (application_id) DO UPDATE" in query
+    assert params[6] == params[7] == [1]
+
+
+@pytest.mark.asyncio
+async def test_put_checked_locks_and_passes_configurations(repository, mock_db_manager):
+    """Test that a checked upsert runs after the configurations lock with the checked versions."""
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[schema_row()])
+    
+    await repository.put(APP_ID, {"type": "object"}, None, {"c1": 3, "c2": 1})
+    
+    lock, lock_params, query, params = mock_db_manager.execute_locked_returning_query.call_args[0]
+    assert "FOR UPDATE" in lock and lock_params == (APP_ID,)
+    assert params[:4] == (["c1", "c2"], APP_ID, ["c1", "c2"], [3, 1])
+
+
+@pytest.mark.asyncio
+async def test_put_checked_configurations_changed(repository, mock_db_manager):
+    """Test that a configuration written since the check raises ConfigurationsChangedError."""
+    row = {"application_id": None, "config_schema": None, "version": None, "updated_at": None}
+    mock_db_manager.execute_locked_returning_query = AsyncMock(return_value=[{**row, "updated": False, "changed": True}])
+    
+    with pytest.raises(ConfigurationsChangedError):
+        await repository.put(APP_ID, {"type": "object"}, None, {})
+
+
+@pytest.mark.asyncio
+async def test_put_version_conflict(repository, mock_db_manager):
+    """Test that a row left unchanged by the version check raises VersionConflictError."""
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[schema_row(updated=False, version=5)])
+    
+    with pytest.raises(VersionConflictError) as exc_info:
+        await repository.put(APP_ID, {"type": "object"}, [4])
+    
+    assert exc_info.value.current_version == 5
+
+
+@pytest.mark.asyncio
+async def test_get_missing(repository, mock_db_manager):
+    """Test that an application without a schema returns None."""
+    mock_db_manager.execute_query = AsyncMock(return_value=[])
+    
+    assert await repository.get(APP_ID) is None
+
+
+@pytest.mark.asyncio
+async def test_delete(repository, mock_db_manager):
+    """Test that delete reports whether a schema was removed."""
+    mock_db_manager.execute_returning_query = AsyncMock(return_value=[{"application_id": APP_ID}])
+    
+    assert await repository.delete(APP_ID) is True
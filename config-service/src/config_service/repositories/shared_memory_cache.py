@@ -0,0 +1,197 @@
+"""Read cache in a memory-mapped file shared by every worker process on a host."""
+
+import fcntl
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import time
+import weakref
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CFGSHM\x00\x01"
+# magic, slot count, data size, write position, generation; padded to 64 bytes
+HEADER = struct.Struct("<8sQQQQ")
+HEADER_SIZE = 64
+WRITE_POSITION_OFFSET = 24
+GENERATION_OFFSET = 32
+U64 = struct.Struct("<Q")
+# sequence, key hash, generation, absolute data position, stored at, record length, record crc32
+SLOT = struct.Struct("<QQQQdII")
+KEY_LENGTH = struct.Struct("<H")
+
+
+def _key_hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def _reopen_after_fork(ref: "weakref.ref[SharedMemoryCache]"):
+    cache = ref()
+    if cache is not None and not cache._map.closed:
+        cache._reopen()
+
+
+class SharedMemoryCache:
+    """Byte values keyed by string, shared through a memory-mapped file.
+
+    The file holds a direct-mapped index of fixed slots and a ring buffer
+    of records (key plus value). Writers append to the ring and publish
+    the slot under an exclusive ``flock``; readers take no lock. A slot's
+    sequence number is odd while it is being written, and a record is
+    accepted only if the sequence did not move while it was copied, the
+    ring has not lapped it since, and its CRC and key match; anything else
+    is a miss. Colliding keys and lapped records simply evict each other.
+
+    Invalidation is by generation: every entry records the generation it
+    was read at, ``invalidate`` bumps the shared counter, and entries of
+    older generations become misses in every process at once. A value read
+    from the database before a concurrent write is stored under the
+    generation taken before the read, so it can never outlive that write.
+    ``get_stale`` ignores generation and ``ttl`` and is only for serving
+    the last-known value while the database cannot be reached.
+    """
+
+    def __init__(self, path: str, size: int = 64 * 1024 * 1024, slots: int = 10000, ttl: float = 30.0):
+        self.path = path
+        self.slots = slots
+        self.ttl = ttl
+        self._data_offset = HEADER_SIZE + slots * SLOT.size
+        self.data_size = size - self._data_offset
+        if self.data_size <= 0:
+            raise ValueError(f"Shared cache size {size} is too small for {slots} slots")
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            self._attach(size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "torn_reads": 0, "oversize": 0, "stale_served": 0}
+        # flock belongs to the open file, so a forked worker needs its own or it would share the parent's lock
+        os.register_at_fork(after_in_child=lambda ref=weakref.ref(self): _reopen_after_fork(ref))
+
+    def generation(self) -> int:
+        """Current shared generation; take it before reading the value to store."""
+        return U64.unpack_from(self._map, GENERATION_OFFSET)[0]
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the value stored for key in the current generation, or None."""
+        entry = self._read(key, self.ttl, self.generation())
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+        self._stats["hits"] += 1
+        return entry[0]
+
+    def get_stale(self, key: str, max_age: float) -> Optional[Tuple[bytes, float]]:
+        """Return the last value stored for key and its age, of any generation, if under max_age."""
+        entry = self._read(key, max_age)
+        if entry is not None:
+            self._stats["stale_served"] += 1
+        return entry
+
+    def put(self, key: str, value: bytes, generation: int):
+        """Store value for key unless the cache was invalidated since generation was taken."""
+        key_bytes = key.encode("utf-8")
+        record = KEY_LENGTH.pack(len(key_bytes)) + key_bytes + value
+        if len(record) > self.data_size // 4:
+            self._stats["oversize"] += 1
+            return
+        key_hash = _key_hash(key_bytes)
+        slot_offset = HEADER_SIZE + (key_hash % self.slots) * SLOT.size
+
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if generation != self.generation():
+                return
+            position = U64.unpack_from(self._map, WRITE_POSITION_OFFSET)[0]
+            offset = position % self.data_size
+            if offset + len(record) > self.data_size:
+                # Records never wrap; start the next lap instead
+                position += self.data_size - offset
+                offset = 0
+            # Reserve the space first, so readers of records it overwrites see them lapped
+            U64.pack_into(self._map, WRITE_POSITION_OFFSET, position + len(record))
+            start = self._data_offset + offset
+            self._map[start:start + len(record)] = record
+
+            seq = U64.unpack_from(self._map, slot_offset)[0]
+            U64.pack_into(self._map, slot_offset, seq + 1)
+            SLOT.pack_into(
+                self._map, slot_offset, seq + 1, key_hash, generation, position, time.time(),
+                len(record), zlib.crc32(record)
+            )
+            U64.pack_into(self._map, slot_offset, seq + 2)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        self._stats["stores"] += 1
+
+    def invalidate(self):
+        """Make every stored entry a miss, in all processes."""
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            U64.pack_into(self._map, GENERATION_OFFSET, self.generation() + 1)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def close(self):
+        """Unmap the file; it stays for the other processes."""
+        self._map.close()
+        os.close(self._fd)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return this process's hit/miss counters and the shared generation."""
+        return {"backend": "shared", "generation": self.generation(), "bytes": self.data_size, **self._stats}
+
+    def _read(self, key: str, max_age: float, generation: Optional[int] = None) -> Optional[Tuple[bytes, float]]:
+        """Copy out the record for key, with its age, if it is intact and recent enough."""
+        key_bytes = key.encode("utf-8")
+        key_hash = _key_hash(key_bytes)
+        slot_offset = HEADER_SIZE + (key_hash % self.slots) * SLOT.size
+        seq, stored_hash, stored_generation, position, stored_at, length, crc = SLOT.unpack_from(self._map, slot_offset)
+        age = time.time() - stored_at
+        if (
+            seq & 1 or not length or stored_hash != key_hash or age >= max_age
+            or (generation is not None and stored_generation != generation)
+        ):
+            return None
+
+        start = self._data_offset + position % self.data_size
+        record = self._map[start:start + length]
+        write_position = U64.unpack_from(self._map, WRITE_POSITION_OFFSET)[0]
+        if (
+            SLOT.unpack_from(self._map, slot_offset)[0] != seq
+            or write_position - position > self.data_size
+            or zlib.crc32(record) != crc
+        ):
+            # Rewritten while we copied it
+            self._stats["torn_reads"] += 1
+            return None
+        key_length = KEY_LENGTH.unpack_from(record)[0]
+        if record[KEY_LENGTH.size:KEY_LENGTH.size + key_length] != key_bytes:
+            return None
+        return record[KEY_LENGTH.size + key_length:], age
+
+    def _reopen(self):
+        """Open a fresh descriptor to lock with; the mapping itself survives the fork."""
+        os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR)
+        self._stats = dict.fromkeys(self._stats, 0)
+
+    def _attach(self, size: int):
+        """Map the file, laying it out if it is new or was made with other settings."""
+        # Never shrink: other processes may still map the old size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+        magic, slots, data_size, _, generation = HEADER.unpack_from(self._map, 0)
+        if magic == MAGIC and slots == self.slots and data_size == self.data_size:
+            # Another worker set it up; entries left from before a restart still expire after ttl
+            return
+        if magic == MAGIC:
+            logger.warning("Shared cache %s was laid out with other settings; resetting it", self.path)
+        self._map[:self._data_offset] = bytes(self._data_offset)
+        HEADER.pack_into(self._map, 0, MAGIC, self.slots, self.data_size, 0, generation + 1 if magic == MAGIC else 1)
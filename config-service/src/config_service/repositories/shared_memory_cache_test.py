@@ -0,0 +1,116 @@
+"""Tests for SharedMemoryCache."""
+
+import os
+import pytest
+from config_service.repositories.shared_memory_cache import SharedMemoryCache
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Cache file path."""
+    return str(tmp_path / "cache")
+
+
+def test_roundtrip(path):
+    """Test that a stored value is returned for its key only."""
+    cache = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    
+    cache.put("get_by_id:app", b'{"id":"app"}', cache.generation())
+    
+    assert cache.get("get_by_id:app") == b'{"id":"app"}'
+    assert cache.get("get_by_id:other") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_invalidate_is_seen_by_other_processes(path):
+    """Test that invalidating through one mapping misses entries in every mapping."""
+    writer = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    reader = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    writer.put("get_all", b"[]", writer.generation())
+    
+    assert reader.get("get_all") == b"[]"
+    
+    reader.invalidate()
+    
+    assert writer.get("get_all") is None
+    assert reader.get("get_all") is None
+
+
+def test_get_stale_ignores_generation(path):
+    """Test that the last-known value survives an invalidation for get_stale only."""
+    cache = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    cache.put("get_by_id:app", b'{"id":"app"}', cache.generation())
+    cache.invalidate()
+    
+    assert cache.get("get_by_id:app") is None
+    value, age = cache.get_stale("get_by_id:app", 60.0)
+    assert value == b'{"id":"app"}' and age >= 0
+    assert cache.get_stale("get_by_id:app", 0.0) is None
+    assert cache.get_stale("get_by_id:other", 60.0) is None
+
+
+def test_put_after_invalidate_is_ignored(path):
+    """Test that a value read before an invalidation is not stored."""
+    cache = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    generation = cache.generation()
+    
+    cache.invalidate()
+    cache.put("get_all", b"[]", generation)
+    
+    assert cache.get("get_all") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_entries_expire(path):
+    """Test that entries older than ttl are misses."""
+    cache = SharedMemoryCache(path, size=1024 * 1024, slots=64, ttl=0)
+    
+    cache.put("get_all", b"[]", cache.generation())
+    
+    assert cache.get("get_all") is None
+
+
+def test_lapped_record_is_a_miss(path):
+    """Test that a record overwritten by the ring buffer is not returned."""
+    cache = SharedMemoryCache(path, size=64 + 1024 * 48 + 4096, slots=1024)
+    cache.put("first", b"x" * 900, cache.generation())
+    
+    for i in range(10):
+        cache.put(f"key-{i}", b"y" * 900, cache.generation())
+    
+    assert cache.get("first") is None
+    assert cache.get("key-9") == b"y" * 900
+
+
+def test_oversize_value_not_stored(path):
+    """Test that values larger than a quarter of the ring are skipped."""
+    cache = SharedMemoryCache(path, size=64 + 64 * 48 + 4096, slots=64)
+    
+    cache.put("get_all", b"x" * 2048, cache.generation())
+    
+    assert cache.get("get_all") is None
+    assert cache.stats()["oversize"] == 1
+
+
+def test_reattach_keeps_entries(path):
+    """Test that a restarted worker reuses the existing file and its entries."""
+    SharedMemoryCache(path, size=1024 * 1024, slots=64).put("get_all", b"[]", 1)
+    
+    assert SharedMemoryCache(path, size=1024 * 1024, slots=64).get("get_all") == b"[]"
+
+
+def test_reopen_keeps_shared_mapping(path):
+    """Test that the descriptor reopened in a forked worker still locks the same file."""
+    cache = SharedMemoryCache(path, size=1024 * 1024, slots=64)
+    
+    cache._reopen()
+    cache.put("get_all", b"[]", cache.generation())
+    
+    assert os.fstat(cache._fd).st_ino == os.stat(path).st_ino
+    assert SharedMemoryCache(path, size=1024 * 1024, slots=64).get("get_all") == b"[]"
+
+
+def test_too_small_rejected(path):
+    """Test that a size that cannot hold the index is rejected."""
+    with pytest.raises(ValueError):
+        SharedMemoryCache(path, size=1024, slots=1000)
@@ -0,0 +1,49 @@
+"""Request coalescing for concurrent identical reads."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Shares one in-flight call, and its result, among concurrent callers with the same key.
+
+    The first caller for a key starts the call; callers arriving while it is
+    running await the same task instead of issuing their own query. Results
+    are shared objects, so callers must treat them as read-only.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._calls = 0
+        self._executions = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """Run func for key, or join the call already in flight for it."""
+        return await asyncio.shield(self.start(key, func))
+
+    def start(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """Start func for key without waiting for it, or return the call already in flight.
+
+        The task is referenced until it finishes, so background callers may
+        drop it; they must handle its errors inside func.
+        """
+        self._calls += 1
+        task = self._in_flight.get(key)
+        if task is None:
+            self._executions += 1
+            # Run as its own task so a cancelled leader does not fail the followers
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        return task
+
+    def stats(self) -> Dict[str, Any]:
+        """Return call, execution and coalescing counters."""
+        return {
+            "calls": self._calls,
+            "executions": self._executions,
+            "coalesced": self._calls - self._executions,
+            "in_flight": len(self._in_flight),
+        }
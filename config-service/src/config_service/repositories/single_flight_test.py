@@ -0,0 +1,88 @@
+"""Tests for SingleFlight request coalescing."""
+
+import asyncio
+import pytest
+from config_service.repositories.single_flight import SingleFlight
+
+
+async def test_concurrent_calls_share_one_execution():
+    """Test that concurrent calls with the same key run the function once."""
+    flight = SingleFlight()
+    executions = 0
+    
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        await asyncio.sleep(0.01)
+        return {"id": "app"}
+    
+    results = await asyncio.gather(*(flight.do("key", fetch) for _ in range(50)))
+    
+    assert executions == 1
+    assert all(result is results[0] for result in results)
+    stats = flight.stats()
+    assert stats["calls"] == 50
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 49
+    assert stats["in_flight"] == 0
+
+
+async def test_different_keys_run_independently():
+    """Test that calls with different keys are not coalesced."""
+    flight = SingleFlight()
+    
+    async def fetch(value):
+        await asyncio.sleep(0.01)
+        return value
+    
+    results = await asyncio.gather(flight.do("a", lambda: fetch(1)), flight.do("b", lambda: fetch(2)))
+    
+    assert results == [1, 2]
+    assert flight.stats()["coalesced"] == 0
+
+
+async def test_sequential_calls_are_not_cached():
+    """Test that a finished call is not reused by later callers."""
+    flight = SingleFlight()
+    executions = 0
+    
+    async def fetch():
+        nonlocal executions
+        executions += 1
+        return executions
+    
+    assert await flight.do("key", fetch) == 1
+    await asyncio.sleep(0)
+    assert await flight.do("key", fetch) == 2
+
+
+async def test_errors_propagate_to_all_waiters():
+    """Test that every coalesced caller receives the shared exception."""
+    flight = SingleFlight()
+    
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+    
+    results = await asyncio.gather(*(flight.do("key", fail) for _ in range(3)), return_exceptions=True)
+    
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+
+async def test_cancelled_leader_does_not_fail_followers():
+    """Test that cancelling the first caller leaves the shared call running."""
+    flight = SingleFlight()
+    
+    async def fetch():
+        await asyncio.sleep(0.02)
+        return "value"
+    
+    leader = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("key", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    
+    assert await follower == "value"
+    with pytest.raises(asyncio.CancelledError):
+        await leader
@@ -0,0 +1,79 @@
+"""Admin routes for runtime diagnostics."""
+
+import os
+import tempfile
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse, PlainTextResponse
+from pydantic import BaseModel, Field
+from starlette.background import BackgroundTask
+from config_service.config import settings
+from config_service.profiling import profiler
+from config_service.snapshot.export import export_snapshot
+
+router = APIRouter()
+
+
+class ProfilingSettings(BaseModel):
+    """Runtime profiling switch."""
+    sample_rate: float = Field(..., ge=0.0, le=1.0, description="Fraction of requests to profile")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Reject callers that do not present the configured admin token."""
+    if not profiler.authorized(x_admin_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
+
+
+@router.get("/admin/profiling", response_model=ProfilingSettings, dependencies=[Depends(require_admin)])
+async def get_profiling():
+    """Get the current profiling sample rate."""
+    return ProfilingSettings(sample_rate=profiler.sample_rate)
+
+
+@router.put("/admin/profiling", response_model=ProfilingSettings, dependencies=[Depends(require_admin)])
+async def update_profiling(profiling: ProfilingSettings):
+    """Change the profiling sample rate without a redeploy."""
+    profiler.sample_rate = profiling.sample_rate
+    return profiling
+
+
+@router.get("/admin/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def download_profile():
+    """Download aggregated profiles as folded stacks (flamegraph.pl / speedscope input)."""
+    return PlainTextResponse(
+        profiler.aggregator.folded(),
+        headers={"Content-Disposition": 'attachment; filename="config-service.folded"'}
+    )
+
+
+@router.delete("/admin/profile", status_code=status.HTTP_204_NO_CONTENT, dependencies=[Depends(require_admin)])
+async def reset_profile():
+    """Discard aggregated profiles."""
+    profiler.aggregator.reset()
+    return None
+
+
+@router.get("/admin/snapshot", response_class=FileResponse, dependencies=[Depends(require_admin)])
+async def download_snapshot():
+    """Download all applications and configurations as a snapshot file for read-only instances."""
+    if settings.snapshot_path:
+        # A snapshot instance passes on the file it serves, so edge nodes can feed each other
+        return FileResponse(settings.snapshot_path, media_type="application/octet-stream", filename="config-service.snapshot")
+    
+    fd, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(fd)
+    try:
+        await export_snapshot(path)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return FileResponse(
+        path,
+        media_type="application/octet-stream",
+        filename="config-service.snapshot",
+        background=BackgroundTask(os.unlink, path)
+    )
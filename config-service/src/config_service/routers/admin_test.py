@@ -0,0 +1,77 @@
+"""Tests for Admin router endpoints."""
+
+import os
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import patch
+from config_service.main import app
+from config_service.profiling import Profiler
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+@pytest.fixture
+def profiler():
+    """Replace the global profiler with one that has an admin token."""
+    test_profiler = Profiler(sample_rate=0.0, token="admin-secret")
+    with patch('config_service.routers.admin.profiler', test_profiler):
+        yield test_profiler
+
+
+def test_admin_requires_token(client, profiler):
+    """Test that admin endpoints reject missing or wrong tokens."""
+    assert client.get("/admin/profile").status_code == 403
+    assert client.get("/admin/profile", headers={"X-Admin-Token": "wrong"}).status_code == 403
+
+
+def test_update_sample_rate(client, profiler):
+    """Test that the sample rate can be changed at runtime."""
+    headers = {"X-Admin-Token": "admin-secret"}
+    
+    response = client.put("/admin/profiling", json={"sample_rate": 0.25}, headers=headers)
+    
+    assert response.status_code == 200
+    assert profiler.sample_rate == 0.25
+    assert client.get("/admin/profiling", headers=headers).json() == {"sample_rate": 0.25}
+
+
+def test_update_sample_rate_out_of_range(client, profiler):
+    """Test that sample rates outside [0, 1] are rejected."""
+    response = client.put("/admin/profiling", json={"sample_rate": 2}, headers={"X-Admin-Token": "admin-secret"})
+    
+    assert response.status_code == 422
+
+
+def test_download_and_reset_profile(client, profiler):
+    """Test downloading folded stacks and resetting them."""
+    headers = {"X-Admin-Token": "admin-secret"}
+    profiler.aggregator._stacks["GET /;validation"] = 10
+    
+    response = client.get("/admin/profile", headers=headers)
+    assert response.status_code == 200
+    assert response.text == "GET /;validation 10\n"
+    
+    assert client.delete("/admin/profile", headers=headers).status_code == 204
+    assert profiler.aggregator.folded() == ""
+
+
+def test_download_snapshot(client, profiler):
+    """Test that the snapshot export is streamed and its temporary file removed."""
+    written = []
+    
+    async def fake_export(path):
+        written.append(path)
+        with open(path, "wb") as f:
+            f.write(b"snapshot-bytes")
+    
+    with patch('config_service.routers.admin.export_snapshot', fake_export):
+        response = client.get("/admin/snapshot", headers={"X-Admin-Token": "admin-secret"})
+    
+    assert response.status_code == 200
+    assert response.content == b"snapshot-bytes"
+    assert "config-service.snapshot" in response.headers["content-disposition"]
+    assert not os.path.exists(written[0])
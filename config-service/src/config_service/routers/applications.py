@@ -1,33 +1,55 @@
 """API routes for Application management."""
 
+import asyncio
+import json
 import logging
-from typing import List
-from fastapi import APIRouter, HTTPException, status
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
 from config_service.models.application import (
-    Application, ApplicationCreate, ApplicationUpdate, ApplicationWithConfigs
+    Application, ApplicationCreate, ApplicationMatch, ApplicationUpdate, ApplicationWithConfigs, ExpandedApplication
 )
+from config_service.models.fields import sparse_model
+from config_service.models.ulid import is_valid_ulid
+from config_service.compression import EncodedPayload, encoded_response
+from config_service.database.pool import PoolTimeoutError
 from config_service.repositories.application_repository import application_repository
-import re
+from config_service.repositories.configuration_repository import configuration_repository
+from config_service.profiling import ProfiledRoute
+from config_service.repositories.errors import VersionConflictError
+from config_service.routers.params import (
+    ApplicationFields, ApplicationId, ApplicationListFields, IfMatch, Include, precondition_failed, version_etag
+)
+from config_service.services.audit_service import audit_service
+from config_service.services import bulk_delete
+from config_service.services.bulk_delete import BULK_DELETE_JOB
+from config_service.services.catalogue_cache import catalogue_cache
+from config_service.services.config_resolver import config_resolver
+from config_service.services.jobs import job_worker
+from config_service.structured_logging import log_payload
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
-
-
-def validate_ulid(ulid_str: str) -> bool:
-    """Validate ULID format."""
-    return bool(re.match(r'^[0-9A-HJKMNP-TV-Z]{26}$', ulid_str))
+router = APIRouter(route_class=ProfiledRoute)
 
 
 @router.post("/applications", response_model=Application, status_code=status.HTTP_201_CREATED)
-async def create_application(application_data: ApplicationCreate):
+async def create_application(application_data: ApplicationCreate, request: Request, response: Response):
     """Create a new application."""
     try:
-        logger.info(f"Creating application: {application_data}")
-        result = await application_repository.create(application_data)
-        logger.info(f"Application created successfully: {result}")
-        return result
+        log_payload(logger, "Create application request", application_data)
+        application = await application_repository.create(application_data)
+        response.headers["ETag"] = version_etag(application.version)
+        catalogue_cache.upsert(application)
+        audit_service.record_request(
+            request, "APPLICATION_CREATED", f"applications/{application.id}",
+            status_code=status.HTTP_201_CREATED, details=application.name
+        )
+        return application
+    except PoolTimeoutError:
+        raise
     except RuntimeError as e:
-        logger.error(f"RuntimeError creating application: {e}")
+        logger.error("RuntimeError creating application: %s", e)
         if "unique constraint" in str(e).lower() or "duplicate" in str(e).lower():
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
@@ -38,31 +60,103 @@ async def create_application(application_data: ApplicationCreate):
             detail="Failed to create application"
         )
     except Exception as e:
-        logger.error(f"Unexpected error creating application: {e}", exc_info=True)
+        logger.error("Unexpected error creating application: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to create application"
         )
 
 
-@router.get("/applications/{app_id}", response_model=ApplicationWithConfigs)
-async def get_application(app_id: str):
-    """Get application by ID including related configuration IDs."""
-    if not validate_ulid(app_id):
+async def _expanded_application(app_id: str, fields):
+    """Read an application, only the selected fields, with its configurations embedded."""
+    application, configurations = await asyncio.gather(
+        application_repository.get_by_id_with_configs(app_id, fields),
+        configuration_repository.get_by_application(app_id)
+    )
+    if not application:
+        return None
+    selected = fields or tuple(ApplicationWithConfigs.model_fields)
+    return sparse_model(ExpandedApplication, selected + ("configurations",)).model_construct(
+        **{name: getattr(application, name) for name in selected}, configurations=configurations
+    )
+
+
+# Declared before /applications/{app_id}, which would otherwise take "search" for an ID
+@router.get("/applications/search", response_model=List[ApplicationMatch])
+async def search_applications(
+    q: str = Query(..., min_length=3, max_length=256, description="Text to find in names and comments; at least 3 characters so the trigram index applies"),
+    offset: int = Query(0, ge=0, description="Number of matches to skip"),
+    limit: int = Query(20, ge=1, le=100, description="Maximum number of matches to return")
+):
+    """Search applications by name and comments: exact, prefix and substring name matches first, then fuzzy matches."""
+    try:
+        return await application_repository.search(q, offset, limit)
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        logger.error("Error searching applications: %s", e, exc_info=True)
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid application ID format"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to search applications"
         )
-    
+
+
+# A path parameter, so names containing "/" (sent as "/" or "%2F") can be looked up too
+@router.get("/applications/by-name/{name:path}", response_model=ApplicationWithConfigs)
+async def get_application_by_name(name: str, response: Response):
+    """Get application by its exact name including related configuration IDs."""
     try:
-        application = await application_repository.get_by_id_with_configs(app_id)
+        application = await application_repository.get_by_name(name)
         if not application:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
+        response.headers["ETag"] = version_etag(application.version)
         return application
-    except HTTPException:
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get application"
+        )
+
+
+@router.get("/applications/{app_id}", response_model=ApplicationWithConfigs)
+async def get_application(
+    app_id: ApplicationId,
+    response: Response,
+    fields: ApplicationFields,
+    include: Include = None
+):
+    """Get application by ID including related configuration IDs.
+    
+    ``fields`` narrows both the query and the response to the named fields;
+    ``include=configurations`` embeds the full configurations.
+    """
+    try:
+        if include:
+            application = await _expanded_application(app_id, fields)
+        else:
+            application = await application_repository.get_by_id_with_configs(app_id, fields)
+        if not application:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+        if fields is None and not include:
+            response.headers["ETag"] = version_etag(application.version)
+            return application
+        
+        # Sparse and expanded models are not the declared response model; serialize them as they are
+        headers = {"ETag": version_etag(application.version)} if "version" in type(application).model_fields else None
+        return Response(
+            content=application.__pydantic_serializer__.to_json(application),
+            media_type="application/json",
+            headers=headers
+        )
+    except (HTTPException, PoolTimeoutError):
         raise
     except Exception as e:
         raise HTTPException(
@@ -72,10 +166,26 @@ async def get_application(app_id: str):
 
 
 @router.get("/applications", response_model=List[Application])
-async def list_applications():
-    """Get all applications."""
+async def list_applications(
+    request: Request,
+    fields: ApplicationListFields,
+    offset: int = Query(0, ge=0, description="Number of applications to skip"),
+    limit: Optional[int] = Query(None, ge=1, le=1000, description="Maximum number of applications to return")
+):
+    """Get all applications, ordered by name.
+    
+    With ``fields``, only those columns are queried and serialized, e.g.
+    ``fields=name`` for an id and name listing.
+    """
     try:
-        return await application_repository.get_all()
+        if fields is not None:
+            applications = await application_repository.get_page(fields, offset, limit)
+            body = b"[" + b",".join(app.__pydantic_serializer__.to_json(app) for app in applications) + b"]"
+            return await encoded_response(request, EncodedPayload(body), transient=True)
+        snapshot = await catalogue_cache.snapshot(application_repository.get_all, offset, limit)
+        return await encoded_response(request, snapshot, catalogue_cache.add_variant)
+    except PoolTimeoutError:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -84,24 +194,32 @@ async def list_applications():
 
 
 @router.put("/applications/{app_id}", response_model=Application)
-async def update_application(app_id: str, application_data: ApplicationUpdate):
-    """Update an existing application."""
-    if not validate_ulid(app_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid application ID format"
-        )
-    
+async def update_application(
+    app_id: ApplicationId,
+    application_data: ApplicationUpdate,
+    request: Request,
+    response: Response,
+    expected_versions: IfMatch
+):
+    """Update an existing application; send If-Match with its ETag to avoid overwriting concurrent edits."""
     try:
-        application = await application_repository.update(app_id, application_data)
+        application = await application_repository.update(app_id, application_data, expected_versions)
         if not application:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
+        response.headers["ETag"] = version_etag(application.version)
+        catalogue_cache.upsert(application)
+        audit_service.record_request(
+            request, "APPLICATION_UPDATED", f"applications/{app_id}",
+            status_code=status.HTTP_200_OK, details=application.name
+        )
         return application
-    except HTTPException:
+    except (HTTPException, PoolTimeoutError):
         raise
+    except VersionConflictError as e:
+        raise precondition_failed(e)
     except RuntimeError as e:
         if "unique constraint" in str(e).lower() or "duplicate" in str(e).lower():
             raise HTTPException(
@@ -114,14 +232,8 @@ async def update_application(app_id: str, application_data: ApplicationUpdate):
         )
 
 @router.delete("/applications/{app_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_application(app_id: str):
+async def delete_application(app_id: ApplicationId, request: Request):
     """Delete an application by ID."""
-    if not validate_ulid(app_id):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid application ID format"
-        )
-    
     try:
         deleted = await application_repository.delete(app_id)
         if not deleted:
@@ -129,11 +241,17 @@ async def delete_application(app_id: str):
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found"
             )
+        catalogue_cache.remove([app_id])
+        config_resolver.invalidate_applications([app_id])
+        audit_service.record_request(
+            request, "APPLICATION_DELETED", f"applications/{app_id}",
+            status_code=status.HTTP_204_NO_CONTENT
+        )
         return None
-    except HTTPException:
+    except (HTTPException, PoolTimeoutError):
         raise
     except Exception as e:
-        logger.error(f"Error deleting application {app_id}: {e}", exc_info=True)
+        logger.error("Error deleting application %s: %s", app_id, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete application"
@@ -141,8 +259,12 @@ async def delete_application(app_id: str):
 
 
 @router.delete("/applications", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_applications(request_body: dict):
-    """Delete multiple applications by IDs."""
+async def delete_applications(
+    request_body: dict,
+    request: Request,
+    background: bool = Query(False, description="Delete in a background job and return 202 with its status URL")
+):
+    """Delete multiple applications by IDs, together with their configurations."""
     app_ids = request_body.get('ids', [])
     
     if not app_ids:
@@ -153,26 +275,52 @@ async def delete_applications(request_body: dict):
     
     # Validate all ULIDs
     for app_id in app_ids:
-        if not validate_ulid(app_id):
+        if not isinstance(app_id, str) or not is_valid_ulid(app_id):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Invalid application ID format: {app_id}"
             )
     
+    if background:
+        try:
+            job = await job_worker.submit(BULK_DELETE_JOB, {"application_ids": app_ids})
+        except PoolTimeoutError:
+            raise
+        except Exception as e:
+            logger.error("Error submitting delete job for %s: %s", app_ids, e, exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to start deleting applications"
+            )
+        audit_service.record_request(
+            request, "APPLICATIONS_DELETE_STARTED", f"jobs/{job.id}",
+            status_code=status.HTTP_202_ACCEPTED, details=json.dumps(app_ids)
+        )
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=jsonable_encoder(job),
+            headers={"Location": request.url_for("get_job", job_id=job.id).path}
+        )
+    
     try:
-        deleted_count = await application_repository.delete_multiple(app_ids)
+        deleted_count = await bulk_delete.delete_applications(app_ids)
         if deleted_count == 0:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="No applications found to delete"
             )
-        logger.info(f"Deleted {deleted_count} applications")
+        logger.info("Deleted %s applications", deleted_count)
+        audit_service.record_request(
+            request, "APPLICATIONS_DELETED", "applications",
+            status_code=status.HTTP_204_NO_CONTENT, details=json.dumps(app_ids)
+        )
         return None
-    except HTTPException:
+    except (HTTPException, PoolTimeoutError):
         raise
     except Exception as e:
-        logger.error(f"Error deleting applications {app_ids}: {e}", exc_info=True)
+        logger.error("Error deleting applications %s: %s", app_ids, e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to delete applications"
-        )
\ No newline at end of file
+        )
+
@@ -1,10 +1,18 @@
-"""Tests for Applications router delete endpoints."""
+"""Tests for Applications router endpoints."""
 
 import json
 import pytest
+from datetime import datetime
 from fastapi.testclient import TestClient
 from unittest.mock import patch, AsyncMock
 from config_service.main import app
+from config_service.models.application import Application, ApplicationMatch, ApplicationWithConfigs
+from config_service.models.configuration import Configuration
+from config_service.models.fields import sparse_model
+from config_service.repositories.errors import VersionConflictError
+from config_service.models.job import Job
+from config_service.services.bulk_delete import BULK_DELETE_JOB
+from config_service.services.catalogue_cache import catalogue_cache
 
 
 @pytest.fixture
@@ -13,6 +21,22 @@ def client():
     return TestClient(app)
 
 
+def make_application(app_id: str, name: str) -> Application:
+    """Build an application as the repository would return it."""
+    now = datetime.now()
+    return Application.from_row({"id": app_id, "name": name, "comments": None, "created_at": now, "updated_at": now})
+
+
+def make_job(job_id: str = "01HKQJQJQJQJQJQJQJQJQJQJQJ") -> Job:
+    """Build a freshly submitted bulk delete job."""
+    now = datetime.now()
+    return Job.from_row({
+        "id": job_id, "kind": BULK_DELETE_JOB, "status": "pending", "payload": {}, "progress": {},
+        "result": None, "error": None, "attempts": 0, "max_attempts": 3, "cancel_requested": False,
+        "run_after": now, "created_at": now, "updated_at": now, "finished_at": None
+    })
+
+
 def delete_with_json(client: TestClient, url: str, data: dict):
     """Helper function to make DELETE request with JSON body."""
     return client.request(
@@ -24,7 +48,7 @@ def delete_with_json(client: TestClient, url: str, data: dict):
 
 class TestDeleteApplication:
     """Tests for DELETE /applications/{app_id} endpoint."""
-
+    
     @patch('config_service.routers.applications.application_repository')
     def test_delete_application_success(self, mock_repo, client):
         """Test successful application deletion."""
@@ -42,7 +66,7 @@ class TestDeleteApplication:
         
         # Verify repository was called
         mock_repo.delete.assert_called_once_with(app_id)
-
+    
     @patch('config_service.routers.applications.application_repository')
     def test_delete_application_not_found(self, mock_repo, client):
         """Test deletion of non-existent application."""
@@ -60,7 +84,7 @@ class TestDeleteApplication:
         
         # Verify repository was called
         mock_repo.delete.assert_called_once_with(app_id)
-
+    
     def test_delete_application_invalid_ulid(self, client):
         """Test deletion with invalid ULID format."""
         invalid_id = "invalid-ulid"
@@ -71,7 +95,7 @@ class TestDeleteApplication:
         # Verify response
         assert response.status_code == 400
         assert response.json()["detail"] == "Invalid application ID format"
-
+    
     @patch('config_service.routers.applications.application_repository')
     def test_delete_application_database_error(self, mock_repo, client):
         """Test deletion with database error."""
@@ -90,8 +114,8 @@ class TestDeleteApplication:
 
 class TestDeleteApplications:
     """Tests for DELETE /applications endpoint (bulk delete)."""
-
-    @patch('config_service.routers.applications.application_repository')
+    
+    @patch('config_service.services.bulk_delete.application_repository')
     def test_delete_applications_success(self, mock_repo, client):
         """Test successful bulk application deletion."""
         # Mock repository to return 3 (three applications deleted)
@@ -111,9 +135,9 @@ class TestDeleteApplications:
         assert response.content == b""
         
         # Verify repository was called
-        mock_repo.delete_multiple.assert_called_once_with(app_ids)
-
-    @patch('config_service.routers.applications.application_repository')
+        mock_repo.delete_multiple.assert_called_once_with(app_ids, on_chunk=None)
+    
+    @patch('config_service.services.bulk_delete.application_repository')
     def test_delete_applications_partial_success(self, mock_repo, client):
         """Test bulk deletion where only some applications exist."""
         # Mock repository to return 2 (only two applications deleted)
@@ -133,9 +157,9 @@ class TestDeleteApplications:
         assert response.content == b""
         
         # Verify repository was called
-        mock_repo.delete_multiple.assert_called_once_with(app_ids)
-
-    @patch('config_service.routers.applications.application_repository')
+        mock_repo.delete_multiple.assert_called_once_with(app_ids, on_chunk=None)
+    
+    @patch('config_service.services.bulk_delete.application_repository')
     def test_delete_applications_none_found(self, mock_repo, client):
         """Test bulk deletion when no applications exist."""
         # Mock repository to return 0 (no applications deleted)
@@ -154,8 +178,8 @@ class TestDeleteApplications:
         assert response.json()["detail"] == "No applications found to delete"
         
         # Verify repository was called
-        mock_repo.delete_multiple.assert_called_once_with(app_ids)
-
+        mock_repo.delete_multiple.assert_called_once_with(app_ids, on_chunk=None)
+    
     def test_delete_applications_empty_ids(self, client):
         """Test bulk deletion with empty IDs list."""
         # Make DELETE request with empty IDs
@@ -164,7 +188,7 @@ class TestDeleteApplications:
         # Verify response
         assert response.status_code == 400
         assert response.json()["detail"] == "No application IDs provided"
-
+    
     def test_delete_applications_no_ids_key(self, client):
         """Test bulk deletion without 'ids' key in JSON."""
         # Make DELETE request without 'ids' key
@@ -173,7 +197,7 @@ class TestDeleteApplications:
         # Verify response
         assert response.status_code == 400
         assert response.json()["detail"] == "No application IDs provided"
-
+    
     def test_delete_applications_invalid_ulid(self, client):
         """Test bulk deletion with invalid ULID format."""
         app_ids = [
@@ -188,8 +212,8 @@ class TestDeleteApplications:
         # Verify response
         assert response.status_code == 400
         assert "Invalid application ID format: invalid-ulid" in response.json()["detail"]
-
-    @patch('config_service.routers.applications.application_repository')
+    
+    @patch('config_service.services.bulk_delete.application_repository')
     def test_delete_applications_database_error(self, mock_repo, client):
         """Test bulk deletion with database error."""
         # Mock repository to raise an exception
@@ -206,8 +230,22 @@ class TestDeleteApplications:
         # Verify response
         assert response.status_code == 500
         assert response.json()["detail"] == "Failed to delete applications"
-
-    @patch('config_service.routers.applications.application_repository')
+    
+    @patch('config_service.services.bulk_delete.config_resolver')
+    @patch('config_service.services.bulk_delete.catalogue_cache')
+    @patch('config_service.services.bulk_delete.application_repository')
+    def test_delete_applications_error_still_invalidates(self, mock_repo, mock_catalogue, mock_resolver, client):
+        """Test that a delete failing after some chunks committed still drops the cached applications."""
+        mock_repo.delete_multiple = AsyncMock(side_effect=Exception("Database error"))
+        app_ids = ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]
+        
+        response = delete_with_json(client, "/api/v1/applications", {"ids": app_ids})
+        
+        assert response.status_code == 500
+        mock_catalogue.remove.assert_called_once_with(app_ids)
+        mock_resolver.invalidate_applications.assert_called_once_with(app_ids)
+    
+    @patch('config_service.services.bulk_delete.application_repository')
     def test_delete_applications_single_id(self, mock_repo, client):
         """Test bulk deletion with single ID."""
         # Mock repository to return 1 (one application deleted)
@@ -223,4 +261,357 @@ class TestDeleteApplications:
         assert response.content == b""
         
         # Verify repository was called
-        mock_repo.delete_multiple.assert_called_once_with(app_ids)
\ No newline at end of file
+        mock_repo.delete_multiple.assert_called_once_with(app_ids, on_chunk=None)
+
+class TestAuditEvents:
+    """Tests that mutating endpoints enqueue audit events."""
+    
+    @patch('config_service.routers.applications.audit_service')
+    @patch('config_service.routers.applications.application_repository')
+    def test_delete_application_records_audit_event(self, mock_repo, mock_audit, client):
+        """Test that a successful delete is audited."""
+        mock_repo.delete = AsyncMock(return_value=True)
+        app_id = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+        
+        response = client.delete(f"/api/v1/applications/{app_id}")
+        
+        assert response.status_code == 204
+        mock_audit.record_request.assert_called_once()
+        args = mock_audit.record_request.call_args.args
+        assert args[1:] == ("APPLICATION_DELETED", f"applications/{app_id}")
+    
+    @patch('config_service.routers.applications.audit_service')
+    @patch('config_service.routers.applications.application_repository')
+    def test_failed_delete_not_audited(self, mock_repo, mock_audit, client):
+        """Test that a delete of a missing application is not audited."""
+        mock_repo.delete = AsyncMock(return_value=False)
+        
+        client.delete("/api/v1/applications/01HKQJQJQJQJQJQJQJQJQJQJQJ")
+        
+        mock_audit.record_request.assert_not_called()
+
+
+class TestListApplications:
+    """Tests for GET /applications endpoint."""
+    
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        """Start every test with an unloaded catalogue."""
+        catalogue_cache.clear()
+        yield
+        catalogue_cache.clear()
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_list_served_from_cache(self, mock_repo, client):
+        """Test that the catalogue is loaded once and then served from memory."""
+        mock_repo.get_all = AsyncMock(return_value=[make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "alpha")])
+        
+        first = client.get("/api/v1/applications")
+        second = client.get("/api/v1/applications")
+        
+        assert first.status_code == 200
+        assert first.headers["content-type"] == "application/json"
+        assert [a["name"] for a in second.json()] == ["alpha"]
+        assert mock_repo.get_all.await_count == 1
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_list_pagination(self, mock_repo, client):
+        """Test offset and limit query parameters."""
+        mock_repo.get_all = AsyncMock(return_value=[
+            make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "alpha"),
+            make_application("01HKQJQJQJQJQJQJQJQJQJQJQB", "bravo"),
+        ])
+        
+        response = client.get("/api/v1/applications?offset=1&limit=1")
+        
+        assert [a["name"] for a in response.json()] == ["bravo"]
+        assert client.get("/api/v1/applications?limit=0").status_code == 422
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_update_applied_to_cached_list(self, mock_repo, client):
+        """Test that an update shows up in the list without reloading it."""
+        mock_repo.get_all = AsyncMock(return_value=[make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "alpha")])
+        mock_repo.update = AsyncMock(return_value=make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "renamed"))
+        client.get("/api/v1/applications")
+        
+        client.put("/api/v1/applications/01HKQJQJQJQJQJQJQJQJQJQJQA", json={"name": "renamed"})
+        
+        assert [a["name"] for a in client.get("/api/v1/applications").json()] == ["renamed"]
+        assert mock_repo.get_all.await_count == 1
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_list_compressed_and_revalidated(self, mock_repo, client):
+        """Test that a large list is gzipped from cache and revalidates with 304."""
+        mock_repo.get_all = AsyncMock(return_value=[
+            make_application(f"01HKQJQJQJQJQJQJQJQJQJQ{i:03d}", f"app-{i:03d}") for i in range(50)
+        ])
+        
+        response = client.get("/api/v1/applications", headers={"Accept-Encoding": "gzip"})
+        revalidated = client.get("/api/v1/applications", headers={"If-None-Match": response.headers["etag"]})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 50
+        assert revalidated.status_code == 304
+
+
+class TestConditionalUpdate:
+    """Tests for If-Match handling on PUT /applications/{app_id}."""
+    
+    APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_update_with_if_match(self, mock_repo, client):
+        """Test that If-Match versions reach the repository and the new ETag is returned."""
+        updated = make_application(self.APP_ID, "renamed")
+        updated.version = 4
+        mock_repo.update = AsyncMock(return_value=updated)
+        
+        response = client.put(
+            f"/api/v1/applications/{self.APP_ID}", json={"name": "renamed"}, headers={"If-Match": '"3"'}
+        )
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"4"'
+        assert mock_repo.update.call_args[0][2] == [3]
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_update_without_if_match_is_unconditional(self, mock_repo, client):
+        """Test that omitting If-Match keeps last-write-wins behaviour."""
+        mock_repo.update = AsyncMock(return_value=make_application(self.APP_ID, "renamed"))
+        
+        response = client.put(f"/api/v1/applications/{self.APP_ID}", json={"name": "renamed"})
+        
+        assert response.status_code == 200
+        assert mock_repo.update.call_args[0][2] is None
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_update_version_conflict_returns_412(self, mock_repo, client):
+        """Test that a stale If-Match returns 412 with the current ETag."""
+        mock_repo.update = AsyncMock(side_effect=VersionConflictError(7))
+        
+        response = client.put(
+            f"/api/v1/applications/{self.APP_ID}", json={"name": "renamed"}, headers={"If-Match": '"3"'}
+        )
+        
+        assert response.status_code == 412
+        assert response.headers["etag"] == '"7"'
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_weak_or_malformed_if_match_fails(self, mock_repo, client):
+        """Test that tags which can never match fail without touching the database."""
+        mock_repo.update = AsyncMock()
+        
+        # '"\xb2"' is a superscript two, a Unicode digit; 2^31 overflows the version column
+        for tag in ('W/"3"', 'abc', '""', '"\xb2"'.encode("latin-1"), '"2147483648"', '"12345678901"'):
+            response = client.put(
+                f"/api/v1/applications/{self.APP_ID}", json={"name": "renamed"}, headers={"If-Match": tag}
+            )
+            assert response.status_code == 412
+        mock_repo.update.assert_not_called()
+    
+    @patch('config_service.routers.params.settings')
+    @patch('config_service.routers.applications.application_repository')
+    def test_if_match_required(self, mock_repo, mock_settings, client):
+        """Test that updates without If-Match are rejected when it is required."""
+        mock_settings.require_if_match = True
+        mock_repo.update = AsyncMock()
+        
+        response = client.put(f"/api/v1/applications/{self.APP_ID}", json={"name": "renamed"})
+        
+        assert response.status_code == 428
+        mock_repo.update.assert_not_called()
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_returns_etag(self, mock_repo, client):
+        """Test that GET exposes the version as an ETag for a later If-Match."""
+        application = ApplicationWithConfigs.from_row({
+            "id": self.APP_ID, "name": "app", "comments": None, "created_at": datetime.now(),
+            "updated_at": datetime.now(), "version": 2, "configuration_ids": []
+        })
+        mock_repo.get_by_id_with_configs = AsyncMock(return_value=application)
+        
+        response = client.get(f"/api/v1/applications/{self.APP_ID}")
+        
+        assert response.headers["etag"] == '"2"'
+        assert response.json()["version"] == 2
+
+
+
+class TestBackgroundDelete:
+    """Tests for DELETE /applications?background=true."""
+    
+    @patch('config_service.routers.applications.job_worker')
+    def test_background_delete_returns_202(self, mock_worker, client):
+        """Test that a background delete enqueues a job and points at its status."""
+        job = make_job()
+        mock_worker.submit = AsyncMock(return_value=job)
+        app_ids = ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]
+        
+        response = delete_with_json(client, "/api/v1/applications?background=true", {"ids": app_ids})
+        
+        assert response.status_code == 202
+        assert response.headers["location"] == f"/api/v1/jobs/{job.id}"
+        assert response.json()["status"] == "pending"
+        mock_worker.submit.assert_called_once_with(BULK_DELETE_JOB, {"application_ids": app_ids})
+    
+    @patch('config_service.routers.applications.job_worker')
+    def test_background_delete_submit_failure(self, mock_worker, client):
+        """Test that a failure to enqueue surfaces as 500."""
+        mock_worker.submit = AsyncMock(side_effect=RuntimeError("Failed to create job: boom"))
+        
+        response = delete_with_json(
+            client, "/api/v1/applications?background=true", {"ids": ["01HKQJQJQJQJQJQJQJQJQJQJQ1"]}
+        )
+        
+        assert response.status_code == 500
+
+
+class TestFieldSelection:
+    """Tests for fields= and include= on application reads."""
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_application_fields(self, mock_repo, client):
+        """Test that only the selected fields are queried and returned."""
+        app_id = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+        sparse = sparse_model(ApplicationWithConfigs, ("name", "id")).model_construct(name="app", id=app_id)
+        mock_repo.get_by_id_with_configs = AsyncMock(return_value=sparse)
+        
+        response = client.get(f"/api/v1/applications/{app_id}?fields=name")
+        
+        assert response.status_code == 200
+        assert response.json() == {"id": app_id, "name": "app"}
+        assert "etag" not in response.headers
+        mock_repo.get_by_id_with_configs.assert_called_once_with(app_id, ("name", "id"))
+    
+    def test_get_application_unknown_field(self, client):
+        """Test that unknown field names are rejected with 400."""
+        response = client.get("/api/v1/applications/01HKQJQJQJQJQJQJQJQJQJQJQJ?fields=name,secret")
+        
+        assert response.status_code == 400
+        assert "secret" in response.json()["detail"]
+    
+    @patch('config_service.routers.applications.configuration_repository')
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_application_include_configurations(self, mock_repo, mock_config_repo, client):
+        """Test that include=configurations embeds the application's configurations."""
+        app_id = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+        config_id = "01HKQJQJQJQJQJQJQJQJQJQJQ1"
+        now = datetime.now()
+        sparse = sparse_model(ApplicationWithConfigs, ("name", "id", "version")).model_construct(
+            name="app", id=app_id, version=3
+        )
+        mock_repo.get_by_id_with_configs = AsyncMock(return_value=sparse)
+        mock_config_repo.get_by_application = AsyncMock(return_value=[Configuration.from_row({
+            "id": config_id, "application_id": app_id, "name": "prod", "comments": None, "config": {"a": 1},
+            "parent_ids": [], "created_at": now, "updated_at": now, "version": 1
+        })])
+        
+        response = client.get(f"/api/v1/applications/{app_id}?fields=name,version&include=configurations")
+        
+        assert response.status_code == 200
+        body = response.json()
+        assert set(body) == {"id", "name", "version", "configurations"}
+        assert body["configurations"][0]["config"] == {"a": 1}
+        assert response.headers["etag"] == '"3"'
+        mock_config_repo.get_by_application.assert_called_once_with(app_id)
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_list_applications_fields_bypasses_catalogue(self, mock_repo, client):
+        """Test that a sparse list is paged in SQL and serialized with only the selected fields."""
+        model = sparse_model(ApplicationWithConfigs, ("name", "id"))
+        mock_repo.get_page = AsyncMock(return_value=[
+            model.model_construct(name="a", id="01HKQJQJQJQJQJQJQJQJQJQJQ1"),
+            model.model_construct(name="b", id="01HKQJQJQJQJQJQJQJQJQJQJQ2"),
+        ])
+        
+        response = client.get("/api/v1/applications?fields=name&offset=5&limit=2")
+        
+        assert response.status_code == 200
+        assert response.json() == [
+            {"name": "a", "id": "01HKQJQJQJQJQJQJQJQJQJQJQ1"},
+            {"name": "b", "id": "01HKQJQJQJQJQJQJQJQJQJQJQ2"},
+        ]
+        mock_repo.get_page.assert_called_once_with(("name", "id"), 5, 2)
+        mock_repo.get_all.assert_not_called()
+    
+    def test_list_applications_rejects_configuration_ids(self, client):
+        """Test that the list offers only Application fields."""
+        response = client.get("/api/v1/applications?fields=configuration_ids")
+        
+        assert response.status_code == 400
+
+
+class TestApplicationLookup:
+    """Tests for GET /applications/by-name/{name} and GET /applications/search endpoints."""
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_by_name(self, mock_repo, client):
+        """Test that an application is found by its exact name with its version as ETag."""
+        now = datetime.now()
+        mock_repo.get_by_name = AsyncMock(return_value=ApplicationWithConfigs.from_row({
+            "id": "01HKQJQJQJQJQJQJQJQJQJQJQA", "name": "billing api", "comments": None,
+            "created_at": now, "updated_at": now, "version": 2, "configuration_ids": []
+        }))
+        
+        response = client.get("/api/v1/applications/by-name/billing%20api")
+        
+        assert response.status_code == 200
+        assert response.json()["id"] == "01HKQJQJQJQJQJQJQJQJQJQJQA"
+        assert response.headers["etag"] == '"2"'
+        mock_repo.get_by_name.assert_called_once_with("billing api")
+    
+    @pytest.mark.parametrize("path", ["team/billing", "team%2Fbilling"])
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_by_name_with_slash(self, mock_repo, path, client):
+        """Test that a name containing a slash is looked up whether or not the slash is encoded."""
+        mock_repo.get_by_name = AsyncMock(return_value=None)
+        
+        response = client.get(f"/api/v1/applications/by-name/{path}")
+        
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Application not found"
+        mock_repo.get_by_name.assert_called_once_with("team/billing")
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_get_by_name_not_found(self, mock_repo, client):
+        """Test that an unknown name returns 404."""
+        mock_repo.get_by_name = AsyncMock(return_value=None)
+        
+        response = client.get("/api/v1/applications/by-name/missing")
+        
+        assert response.status_code == 404
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_search(self, mock_repo, client):
+        """Test that matches are returned in repository order with their scores."""
+        now = datetime.now()
+        mock_repo.search = AsyncMock(return_value=[ApplicationMatch.from_row({
+            "id": "01HKQJQJQJQJQJQJQJQJQJQJQA", "name": "billing", "comments": None,
+            "created_at": now, "updated_at": now, "score": 1.0
+        })])
+        
+        response = client.get("/api/v1/applications/search?q=bill&offset=5&limit=10")
+        
+        assert response.status_code == 200
+        assert [(m["name"], m["score"]) for m in response.json()] == [("billing", 1.0)]
+        mock_repo.search.assert_called_once_with("bill", 5, 10)
+    
+    @pytest.mark.parametrize("query", ["q=ab", "q=abc&limit=101", ""])
+    @patch('config_service.routers.applications.application_repository')
+    def test_search_rejects_invalid_parameters(self, mock_repo, query, client):
+        """Test that short queries and oversized pages are refused without a query."""
+        mock_repo.search = AsyncMock()
+        
+        response = client.get(f"/api/v1/applications/search?{query}")
+        
+        assert response.status_code == 422
+        mock_repo.search.assert_not_called()
+    
+    @patch('config_service.routers.applications.application_repository')
+    def test_search_database_error(self, mock_repo, client):
+        """Test that a failing search returns 500."""
+        mock_repo.search = AsyncMock(side_effect=RuntimeError("Failed to search applications: boom"))
+        
+        response = client.get("/api/v1/applications/search?q=bill")
+        
+        assert response.status_code == 500
@@ -0,0 +1,40 @@
+"""API routes for the change feed."""
+
+import logging
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Query, status
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.change import ChangePage
+from config_service.profiling import ProfiledRoute
+from config_service.services.change_feed import CursorExpiredError, InvalidCursorError, read_changes
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/changes", response_model=ChangePage)
+async def get_changes(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page; omit to start from the beginning"),
+    limit: int = Query(500, ge=1, le=5000, description="Maximum number of changes to return")
+):
+    """Get applications and configurations created, updated or deleted after a cursor."""
+    try:
+        return await read_changes(cursor, limit)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    except CursorExpiredError as e:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail=f"{e}; resynchronise from the full listing and start a new cursor"
+        )
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        logger.error("Error reading changes after %s: %s", cursor, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to read changes"
+        )
@@ -0,0 +1,57 @@
+"""Tests for Changes router endpoints."""
+
+import pytest
+from datetime import datetime, timedelta
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from config_service.main import app
+from config_service.models.change import Change
+from config_service.services.change_feed import encode_cursor
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+CONFIG_ID = "01HKQJQJQJQJQJQJQJQJQJQJQC"
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+@patch('config_service.services.change_feed.change_repository')
+def test_get_changes(mock_repo, client):
+    """Test that upserts carry the object and deletes are tombstones."""
+    now = datetime.now()
+    mock_repo.changes_since = AsyncMock(return_value=[
+        Change.from_row({
+            "kind": "application", "id": APP_ID, "application_id": APP_ID, "deleted": False,
+            "changed_at": now, "data": {"id": APP_ID, "name": "app", "version": 2}
+        }),
+        Change.from_row({
+            "kind": "configuration", "id": CONFIG_ID, "application_id": APP_ID, "deleted": True,
+            "changed_at": now, "data": None
+        })
+    ])
+    
+    response = client.get("/api/v1/changes?limit=10")
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [c["deleted"] for c in data["changes"]] == [False, True]
+    assert data["changes"][0]["data"]["version"] == 2
+    assert data["has_more"] is False
+    assert data["cursor"] == encode_cursor(now, CONFIG_ID)
+
+
+def test_get_changes_invalid_cursor(client):
+    """Test that a malformed cursor is 400."""
+    assert client.get("/api/v1/changes?cursor=garbage!").status_code == 400
+
+
+def test_get_changes_expired_cursor(client):
+    """Test that a cursor past the retention is 410 Gone."""
+    cursor = encode_cursor(datetime.now() - timedelta(days=365), APP_ID)
+    
+    response = client.get(f"/api/v1/changes?cursor={cursor}")
+    
+    assert response.status_code == 410
@@ -0,0 +1,260 @@
+"""API routes for Configuration management."""
+
+import logging
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from config_service.models.configuration import (
+    Configuration, ConfigurationCreate, ConfigurationUpdate, ResolvedConfiguration
+)
+from config_service.compression import EncodedPayload, encoded_response, payload_cache
+from config_service.database.pool import PoolTimeoutError
+from config_service.repositories.configuration_repository import ConfigurationInUseError, configuration_repository
+from config_service.profiling import ProfiledRoute
+from config_service.repositories.errors import VersionConflictError
+from config_service.routers.params import (
+    ConfigurationFields, ConfigurationId, IfMatch, precondition_failed, version_etag
+)
+from config_service.services.audit_service import audit_service
+from config_service.services.config_resolver import (
+    ConfigurationCycleError, InvalidParentError, ResolvedEntry, config_resolver
+)
+from config_service.services.config_schema import ConfigValidationError, schema_registry
+from config_service.services.config_templates import TemplateError, config_renderer, validate_templates
+from config_service.structured_logging import log_payload
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=ProfiledRoute)
+
+
+def _is_duplicate(error: Exception) -> bool:
+    message = str(error).lower()
+    return "unique constraint" in message or "duplicate" in message
+
+
+def _schema_violation(error: ConfigValidationError) -> HTTPException:
+    """422 response listing where a document breaks its application's schema."""
+    return HTTPException(
+        status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        detail=[{"path": path, "message": message} for path, message in error.errors]
+    )
+
+
+def _cached_payload(kind: str, resolved: ResolvedEntry, render=None) -> EncodedPayload:
+    """Return the encoded response for a resolved configuration, encoding it once per resolution."""
+    key = (kind, resolved.id)
+    payload = payload_cache.get(key, resolved)
+    if payload is None:
+        model = ResolvedConfiguration.model_construct(
+            id=resolved.id,
+            application_id=resolved.application_id,
+            name=resolved.name,
+            chain=list(resolved.chain),
+            config=render(resolved) if render else resolved.config
+        )
+        payload = payload_cache.put(key, resolved, model.__pydantic_serializer__.to_json(model))
+    return payload
+
+
+@router.post("/configurations", response_model=Configuration, status_code=status.HTTP_201_CREATED)
+async def create_configuration(configuration_data: ConfigurationCreate, request: Request, response: Response):
+    """Create a new configuration."""
+    try:
+        log_payload(logger, "Create configuration request", configuration_data)
+        validate_templates(configuration_data.config)
+        await schema_registry.validate(configuration_data.application_id, configuration_data.config)
+        if configuration_data.parent_ids:
+            await config_resolver.validate_parents(
+                None, configuration_data.application_id, configuration_data.parent_ids
+            )
+        configuration = await configuration_repository.create(configuration_data)
+        response.headers["ETag"] = version_etag(configuration.version)
+        audit_service.record_request(
+            request, "CONFIGURATION_CREATED", f"configurations/{configuration.id}",
+            status_code=status.HTTP_201_CREATED, details=configuration.name
+        )
+        return configuration
+    except PoolTimeoutError:
+        raise
+    except ConfigValidationError as e:
+        raise _schema_violation(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        logger.error("RuntimeError creating configuration: %s", e)
+        if _is_duplicate(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Configuration with name '{configuration_data.name}' already exists for this application"
+            )
+        if "foreign key" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Application not found"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create configuration"
+        )
+
+
+@router.get("/configurations/{config_id}", response_model=Configuration)
+async def get_configuration(config_id: ConfigurationId, response: Response, fields: ConfigurationFields):
+    """Get configuration by ID; ``fields`` narrows both the query and the response."""
+    try:
+        configuration = await configuration_repository.get_by_id(config_id, fields)
+        if not configuration:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Configuration not found"
+            )
+        if fields is None:
+            response.headers["ETag"] = version_etag(configuration.version)
+            return configuration
+        
+        # A sparse model is not the declared response model; serialize it as it is
+        return Response(
+            content=configuration.__pydantic_serializer__.to_json(configuration),
+            media_type="application/json",
+            headers={"ETag": version_etag(configuration.version)} if "version" in fields else None
+        )
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get configuration"
+        )
+
+
+@router.get("/configurations/{config_id}/resolved", response_model=ResolvedConfiguration)
+async def get_resolved_configuration(config_id: ConfigurationId, request: Request):
+    """Get a configuration deep-merged over all of its ancestors."""
+    try:
+        resolved = await config_resolver.resolve(config_id)
+        if not resolved:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Configuration not found"
+            )
+        return await encoded_response(request, _cached_payload("resolved", resolved), payload_cache.add_variant)
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except ConfigurationCycleError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error("Error resolving configuration %s: %s", config_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to resolve configuration"
+        )
+
+
+@router.get("/configurations/{config_id}/rendered", response_model=ResolvedConfiguration)
+async def get_rendered_configuration(config_id: ConfigurationId, request: Request):
+    """Get a resolved configuration with every ${variable} reference expanded."""
+    try:
+        resolved = await config_resolver.resolve(config_id)
+        if not resolved:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Configuration not found"
+            )
+        payload = _cached_payload(
+            "rendered", resolved, lambda entry: config_renderer.render_document(entry.id, entry.config)
+        )
+        return await encoded_response(request, payload, payload_cache.add_variant)
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except (ConfigurationCycleError, TemplateError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+    except Exception as e:
+        logger.error("Error rendering configuration %s: %s", config_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to render configuration"
+        )
+
+
+@router.put("/configurations/{config_id}", response_model=Configuration)
+async def update_configuration(
+    config_id: ConfigurationId,
+    configuration_data: ConfigurationUpdate,
+    request: Request,
+    response: Response,
+    expected_versions: IfMatch
+):
+    """Update an existing configuration; send If-Match with its ETag to avoid overwriting concurrent edits."""
+    try:
+        if configuration_data.config is not None:
+            validate_templates(configuration_data.config)
+        if configuration_data.config is not None or configuration_data.parent_ids:
+            existing = await configuration_repository.get_by_id(config_id)
+            if not existing:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Configuration not found"
+                )
+            if configuration_data.config is not None:
+                await schema_registry.validate(existing.application_id, configuration_data.config)
+            if configuration_data.parent_ids:
+                await config_resolver.validate_parents(
+                    config_id, existing.application_id, configuration_data.parent_ids
+                )
+        configuration = await configuration_repository.update(config_id, configuration_data, expected_versions)
+        if not configuration:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Configuration not found"
+            )
+        response.headers["ETag"] = version_etag(configuration.version)
+        config_resolver.invalidate(config_id)
+        audit_service.record_request(
+            request, "CONFIGURATION_UPDATED", f"configurations/{config_id}",
+            status_code=status.HTTP_200_OK, details=configuration.name
+        )
+        return configuration
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except VersionConflictError as e:
+        raise precondition_failed(e)
+    except ConfigValidationError as e:
+        raise _schema_violation(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except RuntimeError as e:
+        if _is_duplicate(e):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Configuration with name '{configuration_data.name}' already exists for this application"
+            )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to update configuration"
+        )
+
+
+@router.delete("/configurations/{config_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_configuration(config_id: ConfigurationId, request: Request):
+    """Delete a configuration by ID."""
+    try:
+        deleted = await configuration_repository.delete(config_id)
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Configuration not found"
+            )
+        config_resolver.invalidate(config_id)
+        audit_service.record_request(
+            request, "CONFIGURATION_DELETED", f"configurations/{config_id}",
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+        return None
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except ConfigurationInUseError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        logger.error("Error deleting configuration %s: %s", config_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete configuration"
+        )
@@ -0,0 +1,322 @@
+"""Tests for Configurations router endpoints."""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from config_service.main import app
+from config_service.models.configuration import Configuration
+from config_service.models.fields import sparse_model
+from config_service.repositories.configuration_repository import ConfigurationCycleError, ConfigurationInUseError
+from config_service.repositories.errors import VersionConflictError
+from config_service.services.config_resolver import InvalidParentError, ResolvedEntry
+from config_service.services.config_schema import ConfigValidationError
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+CONFIG_ID = "01HKQJQJQJQJQJQJQJQJQJQJQC"
+PARENT_ID = "01HKQJQJQJQJQJQJQJQJQJQJQP"
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def mock_schema_registry():
+    """Validate against no schema unless a test says otherwise."""
+    with patch('config_service.routers.configurations.schema_registry') as registry:
+        registry.validate = AsyncMock()
+        yield registry
+
+
+def make_entry(config):
+    """Build a resolver cache entry for CONFIG_ID."""
+    return ResolvedEntry(
+        id=CONFIG_ID, application_id=APP_ID, name="prod", chain=(CONFIG_ID,),
+        ancestors=frozenset(), config=config, expires_at=0.0
+    )
+
+
+def make_configuration(**overrides):
+    """Build a Configuration as the repository would return it."""
+    now = datetime.now()
+    fields = {
+        "id": CONFIG_ID, "application_id": APP_ID, "name": "prod", "comments": None,
+        "config": {"debug": False}, "parent_ids": [PARENT_ID], "created_at": now, "updated_at": now
+    }
+    fields.update(overrides)
+    return Configuration.from_row(fields)
+
+
+class TestCreateConfiguration:
+    """Tests for POST /configurations endpoint."""
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_create_with_parents(self, mock_repo, mock_resolver, client):
+        """Test that parents are validated before the configuration is created."""
+        mock_resolver.validate_parents = AsyncMock()
+        mock_repo.create = AsyncMock(return_value=make_configuration())
+        
+        response = client.post("/api/v1/configurations", json={
+            "application_id": APP_ID, "name": "prod", "config": {"debug": False}, "parent_ids": [PARENT_ID]
+        })
+        
+        assert response.status_code == 201
+        assert response.json()["parent_ids"] == [PARENT_ID]
+        mock_resolver.validate_parents.assert_called_once_with(None, APP_ID, [PARENT_ID])
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_create_with_invalid_parent(self, mock_repo, mock_resolver, client):
+        """Test that an invalid parent is rejected with 400 and nothing is written."""
+        mock_resolver.validate_parents = AsyncMock(side_effect=InvalidParentError("Parent configuration not found"))
+        mock_repo.create = AsyncMock()
+        
+        response = client.post("/api/v1/configurations", json={
+            "application_id": APP_ID, "name": "prod", "parent_ids": [PARENT_ID]
+        })
+        
+        assert response.status_code == 400
+        mock_repo.create.assert_not_called()
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_create_duplicate_name(self, mock_repo, client):
+        """Test that a duplicate name returns 409."""
+        mock_repo.create = AsyncMock(side_effect=RuntimeError("duplicate key value violates unique constraint"))
+        
+        response = client.post("/api/v1/configurations", json={"application_id": APP_ID, "name": "prod"})
+        
+        assert response.status_code == 409
+
+
+class TestSchemaValidation:
+    """Tests for validating documents against their application's schema."""
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_create_invalid_document(self, mock_repo, mock_schema_registry, client):
+        """Test that a document breaking the schema returns 422 with each error's path and nothing is written."""
+        mock_schema_registry.validate = AsyncMock(side_effect=ConfigValidationError([("/port", "expected integer")]))
+        mock_repo.create = AsyncMock()
+        
+        response = client.post("/api/v1/configurations", json={
+            "application_id": APP_ID, "name": "prod", "config": {"port": "80"}
+        })
+        
+        assert response.status_code == 422
+        assert response.json()["detail"] == [{"path": "/port", "message": "expected integer"}]
+        mock_schema_registry.validate.assert_called_once_with(APP_ID, {"port": "80"})
+        mock_repo.create.assert_not_called()
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_validated_against_stored_application(self, mock_repo, mock_schema_registry, client):
+        """Test that a new document is checked against the schema of the configuration's application."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_configuration())
+        mock_schema_registry.validate = AsyncMock(side_effect=ConfigValidationError([("", "expected object")]))
+        mock_repo.update = AsyncMock()
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"config": {"debug": 1}})
+        
+        assert response.status_code == 422
+        mock_schema_registry.validate.assert_called_once_with(APP_ID, {"debug": 1})
+        mock_repo.update.assert_not_called()
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_without_document_not_validated(self, mock_repo, mock_schema_registry, client):
+        """Test that renaming a configuration does not validate its stored document."""
+        mock_repo.update = AsyncMock(return_value=make_configuration())
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"name": "prod"})
+        
+        assert response.status_code == 200
+        mock_schema_registry.validate.assert_not_called()
+
+
+class TestResolvedConfiguration:
+    """Tests for GET /configurations/{config_id}/resolved endpoint."""
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    def test_get_resolved(self, mock_resolver, client):
+        """Test that the resolved document and chain are returned."""
+        mock_resolver.resolve = AsyncMock(return_value=ResolvedEntry(
+            id=CONFIG_ID, application_id=APP_ID, name="prod", chain=(PARENT_ID, CONFIG_ID),
+            ancestors=frozenset({PARENT_ID}), config={"db": {"host": "prod-db"}}, expires_at=0.0
+        ))
+        
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}/resolved")
+        
+        assert response.status_code == 200
+        assert response.json() == {
+            "id": CONFIG_ID, "application_id": APP_ID, "name": "prod",
+            "chain": [PARENT_ID, CONFIG_ID], "config": {"db": {"host": "prod-db"}}
+        }
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    def test_get_resolved_not_found(self, mock_resolver, client):
+        """Test that an unknown configuration returns 404."""
+        mock_resolver.resolve = AsyncMock(return_value=None)
+        
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}/resolved")
+        
+        assert response.status_code == 404
+    
+    def test_get_resolved_invalid_ulid(self, client):
+        """Test that a malformed ID returns 400."""
+        response = client.get("/api/v1/configurations/not-a-ulid/resolved")
+        
+        assert response.status_code == 400
+
+
+class TestUpdateConfiguration:
+    """Tests for PUT /configurations/{config_id} endpoint."""
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_invalidates_resolution(self, mock_repo, mock_resolver, client):
+        """Test that a successful update invalidates the configuration and its descendants."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_configuration())
+        mock_repo.update = AsyncMock(return_value=make_configuration())
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"config": {"debug": False}})
+        
+        assert response.status_code == 200
+        mock_resolver.invalidate.assert_called_once_with(CONFIG_ID)
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_parents_validated_against_own_application(self, mock_repo, mock_resolver, client):
+        """Test that new parents are checked with the stored application ID."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_configuration())
+        mock_repo.update = AsyncMock(return_value=make_configuration())
+        mock_resolver.validate_parents = AsyncMock()
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"parent_ids": [PARENT_ID]})
+        
+        assert response.status_code == 200
+        mock_resolver.validate_parents.assert_called_once_with(CONFIG_ID, APP_ID, [PARENT_ID])
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_parents_racing_into_cycle(self, mock_repo, mock_resolver, client):
+        """Test that a cycle only detected by the locked update, after a concurrent change, returns 400."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_configuration())
+        mock_repo.update = AsyncMock(side_effect=ConfigurationCycleError("would cycle"))
+        mock_resolver.validate_parents = AsyncMock()
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"parent_ids": [PARENT_ID]})
+        
+        assert response.status_code == 400
+        mock_resolver.invalidate.assert_not_called()
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_not_found(self, mock_repo, mock_resolver, client):
+        """Test that updating an unknown configuration returns 404 and invalidates nothing."""
+        mock_repo.update = AsyncMock(return_value=None)
+        
+        response = client.put(f"/api/v1/configurations/{CONFIG_ID}", json={"name": "prod"})
+        
+        assert response.status_code == 404
+        mock_resolver.invalidate.assert_not_called()
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_update_version_conflict(self, mock_repo, mock_resolver, client):
+        """Test that a stale If-Match returns 412 and invalidates nothing."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_configuration())
+        mock_repo.update = AsyncMock(side_effect=VersionConflictError(3))
+        
+        response = client.put(
+            f"/api/v1/configurations/{CONFIG_ID}", json={"config": {}}, headers={"If-Match": '"2"'}
+        )
+        
+        assert response.status_code == 412
+        assert response.headers["etag"] == '"3"'
+        mock_resolver.invalidate.assert_not_called()
+
+
+class TestDeleteConfiguration:
+    """Tests for DELETE /configurations/{config_id} endpoint."""
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_delete_success(self, mock_repo, mock_resolver, client):
+        """Test successful configuration deletion."""
+        mock_repo.delete = AsyncMock(return_value=True)
+        
+        response = client.delete(f"/api/v1/configurations/{CONFIG_ID}")
+        
+        assert response.status_code == 204
+        mock_resolver.invalidate.assert_called_once_with(CONFIG_ID)
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_delete_parent_in_use(self, mock_repo, client):
+        """Test that deleting a configuration with children returns 409."""
+        mock_repo.delete = AsyncMock(side_effect=ConfigurationInUseError("Configuration is a parent of 2 other configuration(s)"))
+        
+        response = client.delete(f"/api/v1/configurations/{CONFIG_ID}")
+        
+        assert response.status_code == 409
+
+
+class TestRenderedConfiguration:
+    """Tests for GET /configurations/{config_id}/rendered endpoint."""
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    def test_get_rendered(self, mock_resolver, client):
+        """Test that references are expanded in the returned document."""
+        mock_resolver.resolve = AsyncMock(return_value=make_entry({"url": "${host}", "host": "pg"}))
+        
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}/rendered")
+        
+        assert response.status_code == 200
+        assert response.json()["config"] == {"url": "pg", "host": "pg"}
+    
+    @patch('config_service.routers.configurations.config_resolver')
+    def test_get_rendered_cycle(self, mock_resolver, client):
+        """Test that a circular reference returns 422 with the cycle."""
+        mock_resolver.resolve = AsyncMock(return_value=make_entry({"a": "${b}", "b": "${a}"}))
+        
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}/rendered")
+        
+        assert response.status_code == 422
+        assert "a -> b -> a" in response.json()["detail"]
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_create_with_malformed_template(self, mock_repo, client):
+        """Test that malformed references are rejected before writing."""
+        mock_repo.create = AsyncMock()
+        
+        response = client.post("/api/v1/configurations", json={
+            "application_id": APP_ID, "name": "prod", "config": {"url": "${unterminated"}
+        })
+        
+        assert response.status_code == 400
+        mock_repo.create.assert_not_called()
+
+
+class TestGetConfigurationFields:
+    """Tests for GET /configurations/{config_id}?fields=."""
+    
+    @patch('config_service.routers.configurations.configuration_repository')
+    def test_fields_narrow_response(self, mock_repo, client):
+        """Test that only the selected fields are queried and returned."""
+        sparse = sparse_model(Configuration, ("name", "id", "version")).model_construct(
+            name="prod", id=CONFIG_ID, version=2
+        )
+        mock_repo.get_by_id = AsyncMock(return_value=sparse)
+        
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}?fields=version,name")
+        
+        assert response.status_code == 200
+        assert response.json() == {"id": CONFIG_ID, "name": "prod", "version": 2}
+        assert response.headers["etag"] == '"2"'
+        mock_repo.get_by_id.assert_called_once_with(CONFIG_ID, ("name", "id", "version"))
+    
+    def test_unknown_field_rejected(self, client):
+        """Test that unknown field names are rejected with 400."""
+        response = client.get(f"/api/v1/configurations/{CONFIG_ID}?fields=configuration")
+        
+        assert response.status_code == 400
@@ -0,0 +1,84 @@
+"""API routes for background jobs."""
+
+import logging
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.job import Job, JobStatus
+from config_service.profiling import ProfiledRoute
+from config_service.repositories.job_repository import job_repository
+from config_service.routers.params import JobId
+from config_service.services.audit_service import audit_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=ProfiledRoute)
+
+
+@router.get("/jobs", response_model=List[Job])
+async def list_jobs(
+    job_status: Optional[JobStatus] = Query(None, alias="status", description="Only jobs in this status"),
+    kind: Optional[str] = Query(None, description="Only jobs of this kind"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of jobs to return")
+):
+    """List the most recent jobs, newest first."""
+    try:
+        return await job_repository.list(status=job_status, kind=kind, limit=limit)
+    except PoolTimeoutError:
+        raise
+    except Exception as e:
+        logger.error("Error listing jobs: %s", e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to list jobs"
+        )
+
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: JobId):
+    """Get a job's status and progress."""
+    try:
+        job = await job_repository.get_by_id(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        return job
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        logger.error("Error getting job %s: %s", job_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get job"
+        )
+
+
+@router.post("/jobs/{job_id}/cancel", response_model=Job)
+async def cancel_job(job_id: JobId, request: Request):
+    """Cancel a job; a running job stops after the chunk it is working on."""
+    try:
+        job = await job_repository.cancel(job_id)
+        if not job:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Job not found"
+            )
+        if job.status in ("completed", "failed"):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Job already {job.status}"
+            )
+        audit_service.record_request(
+            request, "JOB_CANCELLED", f"jobs/{job_id}",
+            status_code=status.HTTP_200_OK, details=job.kind
+        )
+        return job
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        logger.error("Error cancelling job %s: %s", job_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to cancel job"
+        )
@@ -0,0 +1,99 @@
+"""Tests for Jobs router endpoints."""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from config_service.main import app
+from config_service.models.job import Job
+
+JOB_ID = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+def make_job(**overrides) -> Job:
+    """Build a Job as the repository would return it."""
+    now = datetime.now()
+    fields = {
+        "id": JOB_ID, "kind": "applications.bulk_delete", "status": "running",
+        "payload": {"application_ids": []}, "progress": {"configurations_deleted": 2000},
+        "result": None, "error": None, "attempts": 1, "max_attempts": 3, "cancel_requested": False,
+        "run_after": now, "created_at": now, "updated_at": now, "finished_at": None
+    }
+    fields.update(overrides)
+    return Job.from_row(fields)
+
+
+class TestGetJob:
+    """Tests for GET /jobs endpoints."""
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_get_job(self, mock_repo, client):
+        """Test polling a job's progress."""
+        mock_repo.get_by_id = AsyncMock(return_value=make_job())
+        
+        response = client.get(f"/api/v1/jobs/{JOB_ID}")
+        
+        assert response.status_code == 200
+        assert response.json()["progress"] == {"configurations_deleted": 2000}
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_get_job_not_found(self, mock_repo, client):
+        """Test that an unknown job is 404."""
+        mock_repo.get_by_id = AsyncMock(return_value=None)
+        
+        assert client.get(f"/api/v1/jobs/{JOB_ID}").status_code == 404
+
+    def test_get_job_invalid_id(self, client):
+        """Test that a malformed job ID is 400."""
+        assert client.get("/api/v1/jobs/nope").status_code == 400
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_list_jobs_with_filters(self, mock_repo, client):
+        """Test that status and kind filters reach the repository."""
+        mock_repo.list = AsyncMock(return_value=[make_job(status="failed", error="boom")])
+        
+        response = client.get("/api/v1/jobs?status=failed&kind=applications.bulk_delete&limit=10")
+        
+        assert response.status_code == 200
+        assert response.json()[0]["error"] == "boom"
+        mock_repo.list.assert_called_once_with(status="failed", kind="applications.bulk_delete", limit=10)
+
+    def test_list_jobs_invalid_status(self, client):
+        """Test that an unknown status filter is rejected."""
+        assert client.get("/api/v1/jobs?status=sleeping").status_code == 422
+
+
+class TestCancelJob:
+    """Tests for POST /jobs/{job_id}/cancel endpoint."""
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_cancel_running_job(self, mock_repo, client):
+        """Test that cancelling a running job flags it."""
+        mock_repo.cancel = AsyncMock(return_value=make_job(cancel_requested=True))
+        
+        response = client.post(f"/api/v1/jobs/{JOB_ID}/cancel")
+        
+        assert response.status_code == 200
+        assert response.json()["cancel_requested"] is True
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_cancel_finished_job(self, mock_repo, client):
+        """Test that a completed job cannot be cancelled."""
+        mock_repo.cancel = AsyncMock(return_value=make_job(status="completed"))
+        
+        response = client.post(f"/api/v1/jobs/{JOB_ID}/cancel")
+        
+        assert response.status_code == 409
+
+    @patch('config_service.routers.jobs.job_repository')
+    def test_cancel_unknown_job(self, mock_repo, client):
+        """Test that cancelling an unknown job is 404."""
+        mock_repo.cancel = AsyncMock(return_value=None)
+        
+        assert client.post(f"/api/v1/jobs/{JOB_ID}/cancel").status_code == 404
@@ -0,0 +1,132 @@
+"""Reusable, validated path and header parameters for API routes."""
+
+import re
+from typing import Annotated, List, Literal, Optional, Type
+from fastapi import Depends, Header, HTTPException, Path, Query, status
+from pydantic import BaseModel
+from config_service.config import settings
+from config_service.models.application import Application, ApplicationWithConfigs
+from config_service.models.configuration import Configuration
+from config_service.models.fields import Fields, parse_fields
+from config_service.models.ulid import is_valid_ulid
+from config_service.repositories.errors import VersionConflictError
+
+
+# An ETag holding a row version; ASCII digits only, and versions are PostgreSQL integers
+VERSION_TAG = re.compile(r'"([0-9]{1,10})"')
+MAX_VERSION = 2 ** 31 - 1
+
+
+def application_id_path(app_id: str = Path(..., description="Application ID (ULID format)")) -> str:
+    """Resolve the app_id path parameter, rejecting malformed ULIDs with 400."""
+    if not is_valid_ulid(app_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid application ID format"
+        )
+    return app_id
+
+
+# Application ID taken from the {app_id} path segment
+ApplicationId = Annotated[str, Depends(application_id_path)]
+
+
+def configuration_id_path(config_id: str = Path(..., description="Configuration ID (ULID format)")) -> str:
+    """Resolve the config_id path parameter, rejecting malformed ULIDs with 400."""
+    if not is_valid_ulid(config_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid configuration ID format"
+        )
+    return config_id
+
+
+# Configuration ID taken from the {config_id} path segment
+ConfigurationId = Annotated[str, Depends(configuration_id_path)]
+
+
+def job_id_path(job_id: str = Path(..., description="Job ID (ULID format)")) -> str:
+    """Resolve the job_id path parameter, rejecting malformed ULIDs with 400."""
+    if not is_valid_ulid(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid job ID format"
+        )
+    return job_id
+
+
+# Job ID taken from the {job_id} path segment
+JobId = Annotated[str, Depends(job_id_path)]
+
+
+def fields_query(model: Type[BaseModel]):
+    """Build a dependency parsing the fields query parameter against model, rejecting unknown names with 400."""
+    def fields_selection(
+        fields: Optional[str] = Query(
+            None, description=f"Comma-separated fields to return, of {', '.join(model.model_fields)}; id is always returned"
+        )
+    ) -> Fields:
+        try:
+            return parse_fields(fields, model)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return fields_selection
+
+
+# Sparse fieldsets from the fields query parameter; None means every field
+ApplicationFields = Annotated[Fields, Depends(fields_query(ApplicationWithConfigs))]
+ApplicationListFields = Annotated[Fields, Depends(fields_query(Application))]
+ConfigurationFields = Annotated[Fields, Depends(fields_query(Configuration))]
+
+# Related resources to embed in the response
+Include = Annotated[
+    Optional[Literal["configurations"]],
+    Query(description="Embed the application's configurations")
+]
+
+
+def version_etag(version: int) -> str:
+    """Format a row version as a strong ETag."""
+    return f'"{version}"'
+
+
+def if_match_versions(
+    if_match: Optional[str] = Header(None, description="ETag(s) of the version being replaced")
+) -> Optional[List[int]]:
+    """Parse If-Match into the row versions an update may replace; None means any."""
+    if if_match is None:
+        if settings.require_if_match:
+            raise HTTPException(
+                status_code=status.HTTP_428_PRECONDITION_REQUIRED,
+                detail="If-Match header is required"
+            )
+        return None
+    if if_match.strip() == "*":
+        return None
+    
+    versions = []
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        # If-Match uses strong comparison, so weak, foreign or out of range tags can never match
+        match = VERSION_TAG.fullmatch(tag)
+        if match and int(match.group(1)) <= MAX_VERSION:
+            versions.append(int(match.group(1)))
+    if not versions:
+        raise HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail="If-Match does not match the current version"
+        )
+    return versions
+
+
+def precondition_failed(error: VersionConflictError) -> HTTPException:
+    """412 response for a failed conditional update, carrying the current ETag."""
+    return HTTPException(
+        status_code=status.HTTP_412_PRECONDITION_FAILED,
+        detail="Resource was modified by another request; fetch it again and retry",
+        headers={"ETag": version_etag(error.current_version)}
+    )
+
+
+# Versions from the If-Match header that a conditional update may replace
+IfMatch = Annotated[Optional[List[int]], Depends(if_match_versions)]
@@ -0,0 +1,149 @@
+"""API routes for application configuration schemas."""
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body, HTTPException, Request, Response, status
+from config_service.database.pool import PoolTimeoutError
+from config_service.models.configuration import Configuration
+from config_service.models.schema import ApplicationSchema
+from config_service.profiling import ProfiledRoute
+from config_service.repositories.configuration_repository import configuration_repository
+from config_service.repositories.errors import ConfigurationsChangedError, VersionConflictError
+from config_service.repositories.schema_repository import schema_repository
+from config_service.routers.params import ApplicationId, IfMatch, precondition_failed, version_etag
+from config_service.services.audit_service import audit_service
+from config_service.services.config_schema import (
+    CompiledSchema, SchemaDefinitionError, compile_schema, schema_registry
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=ProfiledRoute)
+
+# Non-conforming configurations listed in a 409, at most
+MAX_REPORTED_CONFIGURATIONS = 20
+# Times the configurations are checked before giving up on them changing under the write
+MAX_CHECK_ATTEMPTS = 3
+
+
+def _nonconforming(validator: CompiledSchema, configurations: List[Configuration]) -> List[Dict[str, Any]]:
+    """Describe the configurations validator rejects, at most MAX_REPORTED_CONFIGURATIONS."""
+    failing = []
+    for configuration in configurations:
+        errors = validator.errors(configuration.config)
+        if errors:
+            failing.append({
+                "id": configuration.id,
+                "name": configuration.name,
+                "errors": [{"path": path, "message": message} for path, message in errors]
+            })
+            if len(failing) >= MAX_REPORTED_CONFIGURATIONS:
+                break
+    return failing
+
+
+@router.get("/applications/{app_id}/schema", response_model=ApplicationSchema)
+async def get_schema(app_id: ApplicationId, response: Response):
+    """Get the JSON Schema the application's configuration documents must match."""
+    try:
+        schema = await schema_repository.get(app_id)
+        if not schema:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application has no schema"
+            )
+        response.headers["ETag"] = version_etag(schema.version)
+        return schema
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        logger.error("Error getting schema of application %s: %s", app_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to get schema"
+        )
+
+
+@router.put("/applications/{app_id}/schema", response_model=ApplicationSchema)
+async def put_schema(
+    app_id: ApplicationId,
+    request: Request,
+    response: Response,
+    expected_versions: IfMatch,
+    config_schema: Dict[str, Any] = Body(..., description="JSON Schema for the application's configuration documents")
+):
+    """Attach or replace the application's schema; existing configurations must already match it."""
+    try:
+        try:
+            validator = compile_schema(config_schema)
+        except SchemaDefinitionError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        
+        for attempt in range(MAX_CHECK_ATTEMPTS):
+            configurations = await configuration_repository.get_by_application(app_id)
+            # Validating every document of a large application is CPU work; keep it off the event loop
+            failing = await asyncio.to_thread(_nonconforming, validator, configurations)
+            if failing:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"message": "Existing configurations do not match the schema", "configurations": failing}
+                )
+            try:
+                # Saved only if no configuration was written since it was read
+                checked = {configuration.id: configuration.version for configuration in configurations}
+                schema = await schema_repository.put(app_id, config_schema, expected_versions, checked)
+                break
+            except ConfigurationsChangedError:
+                if attempt == MAX_CHECK_ATTEMPTS - 1:
+                    raise HTTPException(
+                        status_code=status.HTTP_409_CONFLICT,
+                        detail="Configurations kept changing while the schema was checked; retry"
+                    )
+        schema_registry.invalidate(app_id)
+        response.headers["ETag"] = version_etag(schema.version)
+        audit_service.record_request(
+            request, "SCHEMA_UPDATED", f"applications/{app_id}/schema",
+            status_code=status.HTTP_200_OK, details=f"version {schema.version}"
+        )
+        return schema
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except VersionConflictError as e:
+        raise precondition_failed(e)
+    except RuntimeError as e:
+        if "foreign key" in str(e).lower():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application not found"
+            )
+        logger.error("Error saving schema of application %s: %s", app_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save schema"
+        )
+
+
+@router.delete("/applications/{app_id}/schema", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_schema(app_id: ApplicationId, request: Request):
+    """Remove the application's schema; its configurations are no longer validated."""
+    try:
+        deleted = await schema_repository.delete(app_id)
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Application has no schema"
+            )
+        schema_registry.invalidate(app_id)
+        audit_service.record_request(
+            request, "SCHEMA_DELETED", f"applications/{app_id}/schema",
+            status_code=status.HTTP_204_NO_CONTENT
+        )
+        return None
+    except (HTTPException, PoolTimeoutError):
+        raise
+    except Exception as e:
+        logger.error("Error deleting schema of application %s: %s", app_id, e, exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to delete schema"
+        )
@@ -0,0 +1,170 @@
+"""Tests for application schema router endpoints."""
+
+import pytest
+from datetime import datetime
+from fastapi.testclient import TestClient
+from unittest.mock import patch, AsyncMock
+from config_service.main import app
+from config_service.models.configuration import Configuration
+from config_service.models.schema import ApplicationSchema
+from config_service.repositories.errors import ConfigurationsChangedError, VersionConflictError
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+CONFIG_ID = "01HKQJQJQJQJQJQJQJQJQJQJQC"
+
+SCHEMA = {"type": "object", "required": ["port"], "properties": {"port": {"type": "integer"}}}
+
+
+@pytest.fixture
+def client():
+    """Create test client."""
+    return TestClient(app)
+
+
+def make_schema(version=1):
+    """Build an ApplicationSchema as the repository would return it."""
+    return ApplicationSchema.from_row({
+        "application_id": APP_ID, "config_schema": SCHEMA, "version": version, "updated_at": datetime.now()
+    })
+
+
+def make_configuration(config):
+    """Build a Configuration of APP_ID holding config."""
+    now = datetime.now()
+    return Configuration.from_row({
+        "id": CONFIG_ID, "application_id": APP_ID, "name": "prod", "comments": None,
+        "config": config, "parent_ids": [], "created_at": now, "updated_at": now
+    })
+
+
+class TestGetSchema:
+    """Tests for GET /applications/{app_id}/schema endpoint."""
+    
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_get_schema(self, mock_repo, client):
+        """Test that the schema is returned with its version as ETag."""
+        mock_repo.get = AsyncMock(return_value=make_schema(version=3))
+        
+        response = client.get(f"/api/v1/applications/{APP_ID}/schema")
+        
+        assert response.status_code == 200
+        assert response.json()["config_schema"] == SCHEMA
+        assert response.headers["etag"] == '"3"'
+    
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_get_missing_schema(self, mock_repo, client):
+        """Test that an application without a schema returns 404."""
+        mock_repo.get = AsyncMock(return_value=None)
+        
+        response = client.get(f"/api/v1/applications/{APP_ID}/schema")
+        
+        assert response.status_code == 404
+
+
+class TestPutSchema:
+    """Tests for PUT /applications/{app_id}/schema endpoint."""
+    
+    @patch('config_service.routers.schemas.schema_registry')
+    @patch('config_service.routers.schemas.configuration_repository')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_schema(self, mock_repo, mock_config_repo, mock_registry, client):
+        """Test that a schema all configurations match is stored and the cached validator dropped."""
+        mock_config_repo.get_by_application = AsyncMock(return_value=[make_configuration({"port": 80})])
+        mock_repo.put = AsyncMock(return_value=make_schema(version=2))
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json=SCHEMA, headers={"If-Match": '"1"'})
+        
+        assert response.status_code == 200
+        assert response.headers["etag"] == '"2"'
+        mock_repo.put.assert_called_once_with(APP_ID, SCHEMA, [1], {CONFIG_ID: 1})
+        mock_registry.invalidate.assert_called_once_with(APP_ID)
+    
+    @patch('config_service.routers.schemas.schema_registry')
+    @patch('config_service.routers.schemas.configuration_repository')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_schema_rechecks_changed_configurations(self, mock_repo, mock_config_repo, mock_registry, client):
+        """Test that a configuration written during the check is checked before the schema is saved."""
+        mock_config_repo.get_by_application = AsyncMock(side_effect=[
+            [make_configuration({"port": 80})], [make_configuration({"port": "80"})]
+        ])
+        mock_repo.put = AsyncMock(side_effect=ConfigurationsChangedError("changed"))
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json=SCHEMA)
+        
+        assert response.status_code == 409
+        assert response.json()["detail"]["configurations"][0]["id"] == CONFIG_ID
+        mock_repo.put.assert_called_once()
+        mock_registry.invalidate.assert_not_called()
+    
+    @patch('config_service.routers.schemas.configuration_repository')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_schema_existing_configuration_fails(self, mock_repo, mock_config_repo, client):
+        """Test that a schema existing configurations break is refused with 409 naming them."""
+        mock_config_repo.get_by_application = AsyncMock(return_value=[make_configuration({"port": "80"})])
+        mock_repo.put = AsyncMock()
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json=SCHEMA)
+        
+        assert response.status_code == 409
+        failing = response.json()["detail"]["configurations"]
+        assert failing == [{
+            "id": CONFIG_ID, "name": "prod", "errors": [{"path": "/port", "message": "expected integer"}]
+        }]
+        mock_repo.put.assert_not_called()
+    
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_invalid_schema(self, mock_repo, client):
+        """Test that a schema using an unsupported keyword is rejected with 400."""
+        mock_repo.put = AsyncMock()
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json={"type": "text"})
+        
+        assert response.status_code == 400
+        mock_repo.put.assert_not_called()
+    
+    @patch('config_service.routers.schemas.configuration_repository')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_version_conflict(self, mock_repo, mock_config_repo, client):
+        """Test that a stale If-Match returns 412 with the current ETag."""
+        mock_config_repo.get_by_application = AsyncMock(return_value=[])
+        mock_repo.put = AsyncMock(side_effect=VersionConflictError(4))
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json=SCHEMA, headers={"If-Match": '"3"'})
+        
+        assert response.status_code == 412
+        assert response.headers["etag"] == '"4"'
+    
+    @patch('config_service.routers.schemas.configuration_repository')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_put_unknown_application(self, mock_repo, mock_config_repo, client):
+        """Test that a schema for an unknown application returns 404."""
+        mock_config_repo.get_by_application = AsyncMock(return_value=[])
+        mock_repo.put = AsyncMock(side_effect=RuntimeError("violates foreign key constraint"))
+        
+        response = client.put(f"/api/v1/applications/{APP_ID}/schema", json=SCHEMA)
+        
+        assert response.status_code == 404
+
+
+class TestDeleteSchema:
+    """Tests for DELETE /applications/{app_id}/schema endpoint."""
+    
+    @patch('config_service.routers.schemas.schema_registry')
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_delete_schema(self, mock_repo, mock_registry, client):
+        """Test that deleting the schema drops the cached validator."""
+        mock_repo.delete = AsyncMock(return_value=True)
+        
+        response = client.delete(f"/api/v1/applications/{APP_ID}/schema")
+        
+        assert response.status_code == 204
+        mock_registry.invalidate.assert_called_once_with(APP_ID)
+    
+    @patch('config_service.routers.schemas.schema_repository')
+    def test_delete_missing_schema(self, mock_repo, client):
+        """Test that deleting a schema that does not exist returns 404."""
+        mock_repo.delete = AsyncMock(return_value=False)
+        
+        response = client.delete(f"/api/v1/applications/{APP_ID}/schema")
+        
+        assert response.status_code == 404
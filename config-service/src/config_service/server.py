@@ -0,0 +1,193 @@
+"""Production server: uvicorn workers pre-forked onto one listening socket.
+
+    python -m config_service.server
+
+The parent binds the socket, imports the app once (``SERVER_PRELOAD``) and
+forks ``SERVER_WORKERS`` workers that all accept on it; it respawns workers
+that die and, on SIGTERM or SIGINT, passes SIGTERM on and waits for them to
+drain. Each worker stops accepting, finishes in-flight requests within
+``SERVER_GRACEFUL_TIMEOUT``, then runs the app's shutdown, which waits as
+long again for queries still running in the database executor.
+
+With ``DEBUG`` set it runs a single auto-reloading process instead.
+"""
+
+import importlib.util
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Any, Dict, Optional
+from config_service.config import settings
+from config_service.structured_logging import logging_manager
+
+logger = logging.getLogger(__name__)
+
+APP = "config_service.main:app"
+# A worker that dies sooner than this after starting is respawned after this delay, not at once
+RESPAWN_DELAY = 1.0
+# Slack on top of the two graceful timeouts before a stopping worker is killed
+KILL_GRACE = 5.0
+
+
+def worker_count(configured: int) -> int:
+    """Return the configured worker count, or one per CPU for 0."""
+    if configured > 0:
+        return configured
+    return len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1
+
+
+def event_loop(configured: str) -> str:
+    """Resolve "auto" to uvloop when it is installed, else asyncio."""
+    if configured != "auto":
+        return configured
+    return "uvloop" if importlib.util.find_spec("uvloop") is not None else "asyncio"
+
+
+def http_parser(configured: str) -> str:
+    """Resolve "auto" to httptools when it is installed, else h11."""
+    if configured != "auto":
+        return configured
+    return "httptools" if importlib.util.find_spec("httptools") is not None else "h11"
+
+
+def bind_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Bind and listen on host:port; every worker accepts on the returned socket."""
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    return sock
+
+
+def uvicorn_config(app: Any):
+    """Build the uvicorn config shared by every worker."""
+    import uvicorn
+    return uvicorn.Config(
+        app,
+        loop=event_loop(settings.server_loop),
+        http=http_parser(settings.server_http),
+        backlog=settings.server_backlog,
+        timeout_keep_alive=settings.server_keepalive_timeout,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+        # Requests are access-logged by RequestLoggingMiddleware, and uvicorn's own
+        # records go through the structured logging queue like everything else
+        access_log=False,
+        log_config=None,
+        lifespan="on"
+    )
+
+
+def serve(sock: socket.socket, app: Optional[Any]):
+    """Run one uvicorn worker on sock until it is told to stop."""
+    import uvicorn
+    if app is None:
+        from config_service.main import app
+    uvicorn.Server(uvicorn_config(app)).run(sockets=[sock])
+
+
+class Supervisor:
+    """Forks workers onto a shared socket, respawns them and stops them together."""
+
+    def __init__(self, sock: socket.socket, workers: int, app: Optional[Any]):
+        self.sock = sock
+        self.workers = workers
+        self.app = app
+        self._children: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self):
+        """Start the workers and supervise them until SIGTERM or SIGINT."""
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        for _ in range(self.workers):
+            self._spawn()
+        while not self._stopping:
+            self._reap(respawn=True)
+            time.sleep(0.2)
+        self._shutdown()
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid:
+            self._children[pid] = time.monotonic()
+            return
+        # Worker: uvicorn installs its own signal handlers once it starts serving
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        status = 0
+        try:
+            logging_manager.reset_after_fork(settings)
+            serve(self.sock, self.app)
+        except BaseException:
+            logger.exception("Worker %s failed", os.getpid())
+            status = 1
+        finally:
+            logging_manager.stop()
+            os._exit(status)
+
+    def _reap(self, respawn: bool):
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                self._children.clear()
+                return
+            if not pid:
+                return
+            started = self._children.pop(pid, None)
+            if started is None or not respawn or self._stopping:
+                continue
+            logger.error("Worker %s exited with status %s; starting a new one", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < RESPAWN_DELAY:
+                time.sleep(RESPAWN_DELAY)
+            self._spawn()
+
+    def _stop(self, signum, frame):
+        self._stopping = True
+
+    def _shutdown(self):
+        logger.info("Stopping %s workers", len(self._children))
+        for pid in self._children:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + 2 * settings.server_graceful_timeout + KILL_GRACE
+        while self._children and time.monotonic() < deadline:
+            self._reap(respawn=False)
+            time.sleep(0.1)
+        for pid in self._children:
+            logger.warning("Worker %s did not stop in time; killing it", pid)
+            os.kill(pid, signal.SIGKILL)
+        self._reap(respawn=False)
+
+
+def main():
+    """Serve the app with the settings' host, port, workers and tuning."""
+    if settings.debug:
+        import uvicorn
+        uvicorn.run(APP, host=settings.host, port=settings.port, reload=True)
+        return
+
+    workers = worker_count(settings.server_workers)
+    app = None
+    if settings.server_preload or workers == 1:
+        # Workers share the imported modules, caches and compiled code copy-on-write
+        from config_service.main import app
+    else:
+        logging_manager.configure(settings)
+
+    sock = bind_socket(settings.host, settings.port, settings.server_backlog)
+    logger.info(
+        "Serving on %s:%s with %s workers (loop %s, http %s, preload %s)",
+        settings.host, settings.port, workers, event_loop(settings.server_loop),
+        http_parser(settings.server_http), app is not None
+    )
+    if workers == 1:
+        serve(sock, app)
+        return
+    Supervisor(sock, workers, app).run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Tests for the production server entrypoint."""
+
+import os
+import socket
+import time
+import pytest
+from config_service import server
+from config_service.server import Supervisor, bind_socket, event_loop, http_parser, worker_count
+
+
+def test_worker_count_defaults_to_cpus():
+    """Test that 0 workers means one per available CPU."""
+    assert worker_count(3) == 3
+    assert worker_count(0) >= 1
+
+
+def test_auto_loop_and_parser_fall_back_when_not_installed(monkeypatch):
+    """Test that auto picks uvloop and httptools only when they can be imported."""
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: None)
+    
+    assert event_loop("auto") == "asyncio"
+    assert http_parser("auto") == "h11"
+    assert event_loop("uvloop") == "uvloop"
+    
+    monkeypatch.setattr(server.importlib.util, "find_spec", lambda name: object())
+    
+    assert event_loop("auto") == "uvloop"
+    assert http_parser("auto") == "httptools"
+
+
+def test_bind_socket_listens():
+    """Test that the shared socket accepts connections before any worker runs."""
+    sock = bind_socket("127.0.0.1", 0, 16)
+    try:
+        with socket.create_connection(sock.getsockname(), timeout=1):
+            pass
+    finally:
+        sock.close()
+
+
+@pytest.fixture
+def supervisor(monkeypatch):
+    """Supervisor whose workers sleep instead of serving."""
+    monkeypatch.setattr(server, "serve", lambda sock, app: time.sleep(30))
+    monkeypatch.setattr(server, "RESPAWN_DELAY", 0.0)
+    monkeypatch.setattr(server.settings, "server_graceful_timeout", 1.0)
+    sock = bind_socket("127.0.0.1", 0, 16)
+    supervisor = Supervisor(sock, workers=2, app=None)
+    yield supervisor
+    supervisor._shutdown()
+    sock.close()
+
+
+def test_supervisor_respawns_dead_worker(supervisor):
+    """Test that a worker that dies is replaced."""
+    supervisor._spawn()
+    (pid,) = supervisor._children
+    os.kill(pid, 9)
+    os.waitid(os.P_PID, pid, os.WEXITED | os.WNOWAIT)
+    
+    supervisor._reap(respawn=True)
+    
+    assert len(supervisor._children) == 1
+    assert pid not in supervisor._children
+
+
+def test_supervisor_shutdown_stops_workers(supervisor):
+    """Test that shutdown signals every worker and waits for it to exit."""
+    supervisor._spawn()
+    supervisor._spawn()
+    pids = list(supervisor._children)
+    
+    supervisor._shutdown()
+    
+    assert supervisor._children == {}
+    for pid in pids:
+        with pytest.raises(ProcessLookupError):
+            os.kill(pid, 0)
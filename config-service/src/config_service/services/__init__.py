@@ -0,0 +1 @@
+"""Application services package."""
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Asynchronous, batched audit log writer."""
+
+import asyncio
+import ipaddress
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional
+from fastapi import Request
+from ulid import ULID as ULIDGenerator
+from config_service.config import settings
+from config_service.database.connection import db_manager
+
+logger = logging.getLogger(__name__)
+
+
+class AuditEvent(NamedTuple):
+    """One audit_logs row, in column order."""
+    id: str
+    user_id: Optional[str]
+    action: str
+    resource: str
+    ip_address: Optional[str]
+    user_agent: Optional[str]
+    timestamp: datetime
+    status_code: Optional[int]
+    details: Optional[str]
+
+
+class AuditService:
+    """Buffers audit events in memory and writes them in multi-row INSERTs.
+
+    ``record`` never touches the database and never blocks: events go into
+    a bounded queue and are dropped (and counted) when it is full. A
+    background task flushes a batch once ``batch_size`` events are waiting
+    or ``flush_interval`` seconds have passed, whichever comes first.
+    """
+
+    INSERT_SQL = """
+    INSERT INTO audit_logs (id, user_id, action, resource, ip_address, user_agent, timestamp, status_code, details)
+    VALUES %s
+    """
+
+    def __init__(self, max_queue_size: int = 10000, batch_size: int = 500, flush_interval: float = 1.0):
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._stats = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0}
+
+    def record(
+        self,
+        action: str,
+        resource: str,
+        status_code: Optional[int] = None,
+        details: Optional[str] = None,
+        user_id: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> bool:
+        """Enqueue an audit event; returns False if it was dropped."""
+        if self._queue is None or self._stopping:
+            self._stats["dropped"] += 1
+            return False
+
+        event = AuditEvent(
+            id=str(ULIDGenerator()),
+            user_id=user_id,
+            action=action,
+            resource=resource,
+            ip_address=_valid_ip(ip_address),
+            user_agent=user_agent,
+            timestamp=datetime.now(),
+            status_code=status_code,
+            details=details
+        )
+        try:
+            self._queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            return False
+        self._stats["enqueued"] += 1
+        return True
+
+    def record_request(
+        self,
+        request: Request,
+        action: str,
+        resource: str,
+        status_code: Optional[int] = None,
+        details: Optional[str] = None
+    ) -> bool:
+        """Enqueue an audit event carrying the caller's address and user agent."""
+        return self.record(
+            action,
+            resource,
+            status_code=status_code,
+            details=details,
+            ip_address=request.client.host if request.client else None,
+            user_agent=request.headers.get("user-agent")
+        )
+
+    def start(self):
+        """Start the background flush task on the running event loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._stopping = False
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Audit writer started")
+
+    async def stop(self):
+        """Stop accepting events and flush everything still queued."""
+        if self._task is None:
+            return
+        self._stopping = True
+        try:
+            # Wake the collector immediately rather than after flush_interval
+            self._queue.put_nowait(None)
+        except asyncio.QueueFull:
+            pass
+        await self._task
+        self._task = None
+
+        remaining = self._drain(self._queue.qsize())
+        while remaining:
+            await self._write(remaining[:self.batch_size])
+            remaining = remaining[self.batch_size:]
+        logger.info("Audit writer stopped")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and write/drop counters."""
+        return {"queued": self._queue.qsize() if self._queue else 0, **self._stats}
+
+    async def _run(self):
+        while not self._stopping:
+            batch = await self._collect()
+            if batch:
+                await self._write(batch)
+
+    async def _collect(self) -> List[AuditEvent]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        batch = self._drain(self.batch_size)
+        while len(batch) < self.batch_size and not self._stopping:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                event = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            if event is not None:
+                batch.append(event)
+            batch.extend(self._drain(self.batch_size - len(batch)))
+        return batch
+
+    def _drain(self, limit: int) -> List[AuditEvent]:
+        events = []
+        while len(events) < limit:
+            try:
+                event = self._queue.get_nowait()
+            except asyncio.QueueEmpty:
+                break
+            if event is not None:
+                events.append(event)
+        return events
+
+    async def _write(self, batch: List[AuditEvent]):
+        try:
+            await db_manager.execute_values(self.INSERT_SQL, batch, page_size=self.batch_size)
+            self._stats["written"] += len(batch)
+            self._stats["batches"] += 1
+        except Exception as e:
+            # Audit logging must never break the request path
+            self._stats["failed"] += len(batch)
+            logger.error("Failed to write %s audit events: %s", len(batch), e)
+
+
+def _valid_ip(value: Optional[str]) -> Optional[str]:
+    """Return value if it parses as an IP address (the column is INET), else None."""
+    if not value:
+        return None
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return None
+    return value
+
+
+# Global audit service instance
+audit_service = AuditService(
+    max_queue_size=settings.audit_queue_size,
+    batch_size=settings.audit_batch_size,
+    flush_interval=settings.audit_flush_interval
+)
@@ -0,0 +1,102 @@
+"""Tests for the batched audit log writer."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from config_service.services.audit_service import AuditService
+
+
+@pytest.fixture
+def mock_db_manager(monkeypatch):
+    """Mock database manager used by the audit writer."""
+    mock = MagicMock()
+    mock.execute_values = AsyncMock(side_effect=lambda command, rows, page_size: len(rows))
+    monkeypatch.setattr('config_service.services.audit_service.db_manager', mock)
+    return mock
+
+
+def test_record_before_start_is_dropped():
+    """Test that events recorded before the writer starts are counted as dropped."""
+    service = AuditService()
+    
+    assert service.record("APPLICATION_CREATED", "applications/x") is False
+    assert service.stats()["dropped"] == 1
+
+
+async def test_flushes_on_batch_size(mock_db_manager):
+    """Test that a full batch is written in one multi-row INSERT."""
+    service = AuditService(batch_size=3, flush_interval=10.0)
+    service.start()
+    
+    for i in range(3):
+        service.record("APPLICATION_CREATED", f"applications/{i}", status_code=201)
+    await asyncio.sleep(0.05)
+    
+    mock_db_manager.execute_values.assert_called_once()
+    rows = mock_db_manager.execute_values.call_args.args[1]
+    assert [row.resource for row in rows] == ["applications/0", "applications/1", "applications/2"]
+    assert service.stats()["written"] == 3
+    await service.stop()
+
+
+async def test_flushes_on_interval(mock_db_manager):
+    """Test that a partial batch is written once the flush interval passes."""
+    service = AuditService(batch_size=100, flush_interval=0.05)
+    service.start()
+    
+    service.record("APPLICATION_DELETED", "applications/1")
+    await asyncio.sleep(0.15)
+    
+    assert service.stats()["written"] == 1
+    assert service.stats()["batches"] == 1
+    await service.stop()
+
+
+async def test_stop_flushes_remaining_events(mock_db_manager):
+    """Test that shutdown writes everything still queued."""
+    service = AuditService(batch_size=2, flush_interval=10.0)
+    service.start()
+    
+    for i in range(5):
+        service.record("APPLICATION_UPDATED", f"applications/{i}")
+    await service.stop()
+    
+    assert service.stats()["written"] == 5
+    assert service.stats()["queued"] == 0
+
+
+async def test_full_queue_drops_events(mock_db_manager):
+    """Test that events beyond the queue bound are dropped, not blocked on."""
+    service = AuditService(max_queue_size=2, batch_size=100, flush_interval=10.0)
+    service.start()
+    
+    results = [service.record("APPLICATION_CREATED", "applications/x") for _ in range(4)]
+    
+    assert results == [True, True, False, False]
+    assert service.stats()["dropped"] == 2
+    await service.stop()
+
+
+async def test_write_failure_is_counted_not_raised(mock_db_manager):
+    """Test that a failed INSERT is logged and counted without raising."""
+    mock_db_manager.execute_values = AsyncMock(side_effect=Exception("database down"))
+    service = AuditService(batch_size=1, flush_interval=10.0)
+    service.start()
+    
+    service.record("APPLICATION_CREATED", "applications/x")
+    await service.stop()
+    
+    assert service.stats()["failed"] == 1
+
+
+async def test_invalid_ip_address_is_discarded(mock_db_manager):
+    """Test that non-IP client hosts are stored as NULL for the INET column."""
+    service = AuditService(batch_size=2, flush_interval=10.0)
+    service.start()
+    
+    service.record("A", "r", ip_address="testclient")
+    service.record("A", "r", ip_address="10.0.0.1")
+    await service.stop()
+    
+    rows = mock_db_manager.execute_values.call_args.args[1]
+    assert [row.ip_address for row in rows] == [None, "10.0.0.1"]
@@ -0,0 +1,49 @@
+"""Chunked bulk deletion of applications, inline or as a background job."""
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from config_service.repositories.application_repository import application_repository
+from config_service.services.catalogue_cache import catalogue_cache
+from config_service.services.config_resolver import config_resolver
+from config_service.services.jobs import JobContext, job_worker
+
+logger = logging.getLogger(__name__)
+
+# Job kind of background bulk deletes
+BULK_DELETE_JOB = "applications.bulk_delete"
+
+
+async def delete_applications(
+    app_ids: List[str],
+    on_chunk: Optional[Callable[[List[str]], None]] = None
+) -> int:
+    """Delete applications and their configurations; returns the number of applications deleted."""
+    try:
+        return await application_repository.delete_multiple(app_ids, on_chunk=on_chunk)
+    finally:
+        # Even a failed delete may have removed some rows
+        catalogue_cache.remove(app_ids)
+        config_resolver.invalidate_applications(app_ids)
+
+
+async def run_bulk_delete(context: JobContext) -> Dict[str, Any]:
+    """Job handler: delete payload["application_ids"], reporting deleted configurations as progress.
+    
+    Every chunk is its own transaction, so a cancelled or retried job
+    simply continues with whatever is left.
+    """
+    app_ids = context.payload["application_ids"]
+    
+    def on_chunk(config_ids: List[str]):
+        # Raises JobCancelledError between chunks once the job is cancelled
+        context.increment("configurations_deleted", len(config_ids))
+    
+    deleted = await delete_applications(app_ids, on_chunk)
+    logger.info("Bulk delete job %s removed %s applications", context.job.id, deleted)
+    return {
+        "applications_deleted": deleted,
+        "configurations_deleted": context.progress.get("configurations_deleted", 0)
+    }
+
+
+job_worker.register(BULK_DELETE_JOB, run_bulk_delete)
@@ -0,0 +1,98 @@
+"""Tests for chunked bulk application deletes."""
+
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.models.job import Job
+from config_service.services.bulk_delete import BULK_DELETE_JOB, delete_applications, run_bulk_delete
+from config_service.services.jobs import JobCancelledError, JobContext, job_worker
+
+APP_IDS = ["01HKQJQJQJQJQJQJQJQJQJQJQ1", "01HKQJQJQJQJQJQJQJQJQJQJQ2"]
+
+
+def make_context(progress=None) -> JobContext:
+    """Context of a bulk delete job for APP_IDS."""
+    now = datetime.now()
+    return JobContext(Job.from_row({
+        "id": "01HKQJQJQJQJQJQJQJQJQJQJQJ", "kind": BULK_DELETE_JOB, "status": "running",
+        "payload": {"application_ids": APP_IDS}, "progress": progress or {}, "result": None,
+        "error": None, "attempts": 1, "max_attempts": 3, "cancel_requested": False,
+        "run_after": now, "created_at": now, "updated_at": now, "finished_at": None
+    }))
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    """Mock repository whose delete reports two configuration chunks."""
+    async def delete_multiple(app_ids, on_chunk=None):
+        on_chunk(["C1", "C2"])
+        on_chunk(["C3"])
+        return len(app_ids)
+    
+    mock = MagicMock()
+    mock.delete_multiple = AsyncMock(side_effect=delete_multiple)
+    monkeypatch.setattr('config_service.services.bulk_delete.application_repository', mock)
+    return mock
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """Mock the caches updated after a delete."""
+    catalogue = MagicMock()
+    resolver = MagicMock()
+    monkeypatch.setattr('config_service.services.bulk_delete.catalogue_cache', catalogue)
+    monkeypatch.setattr('config_service.services.bulk_delete.config_resolver', resolver)
+    return catalogue, resolver
+
+
+def test_handler_is_registered():
+    """Test that the global worker can run bulk delete jobs."""
+    assert job_worker._handlers[BULK_DELETE_JOB] is run_bulk_delete
+
+
+@pytest.mark.asyncio
+async def test_job_reports_progress(repository, caches):
+    """Test that the handler counts deleted configurations and returns the totals."""
+    context = make_context()
+    
+    result = await run_bulk_delete(context)
+    
+    assert result == {"applications_deleted": 2, "configurations_deleted": 3}
+    assert context.progress == {"configurations_deleted": 3}
+    catalogue, resolver = caches
+    catalogue.remove.assert_called_once_with(APP_IDS)
+    resolver.invalidate_applications.assert_called_once_with(APP_IDS)
+
+
+@pytest.mark.asyncio
+async def test_retried_job_keeps_counting(repository, caches):
+    """Test that progress from an earlier attempt is carried forward."""
+    context = make_context({"configurations_deleted": 1000})
+    
+    result = await run_bulk_delete(context)
+    
+    assert result["configurations_deleted"] == 1003
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job_stops_between_chunks(repository, caches):
+    """Test that cancellation aborts after the current chunk and still invalidates caches."""
+    context = make_context()
+    context.cancelled = True
+    
+    with pytest.raises(JobCancelledError):
+        await run_bulk_delete(context)
+    
+    assert context.progress == {"configurations_deleted": 2}
+    caches[0].remove.assert_called_once_with(APP_IDS)
+
+
+@pytest.mark.asyncio
+async def test_failed_delete_still_invalidates(repository, caches):
+    """Test that caches are invalidated even when the delete fails part way."""
+    repository.delete_multiple = AsyncMock(side_effect=RuntimeError("Failed to delete applications: boom"))
+    
+    with pytest.raises(RuntimeError):
+        await delete_applications(APP_IDS)
+    
+    caches[1].invalidate_applications.assert_called_once_with(APP_IDS)
@@ -0,0 +1,249 @@
+"""In-memory cache of the encoded application catalogue."""
+
+import bisect
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from config_service.compression import EncodedPayload
+from config_service.config import settings
+from config_service.models.application import Application
+from config_service.repositories.single_flight import SingleFlight
+from config_service.staleness import mark_stale
+
+logger = logging.getLogger(__name__)
+
+# (offset, limit) of a cached page; (0, None) is the whole catalogue
+PageKey = Tuple[int, Optional[int]]
+
+# Seconds between background refreshes after one failed
+REFRESH_RETRY_INTERVAL = 1.0
+
+
+class CatalogueSnapshot(EncodedPayload):
+    """An encoded catalogue page at one catalogue version."""
+    
+    __slots__ = ("version",)
+    
+    def __init__(self, key: PageKey, version: int, body: bytes):
+        super().__init__(body, key)
+        self.version = version
+
+
+def encode_application(application: Application) -> bytes:
+    """Encode one application exactly as the list endpoint's JSON array element."""
+    return application.__pydantic_serializer__.to_json(application)
+
+
+class CatalogueCache:
+    """Keeps every application pre-encoded and serves list pages as joined bytes.
+    
+    The first request loads the catalogue once through the given loader and
+    encodes each application separately. Page snapshots are the cached
+    fragments joined into a JSON array, built on demand and kept LRU under
+    ``max_bytes`` together with the fragments. Writes go through ``upsert``
+    and ``remove``, which re-encode only the affected application; no query
+    and no re-serialization of the rest happens. Changes made by other
+    processes are picked up when the catalogue is reloaded after ``ttl``.
+    
+    For ``stale_ttl`` seconds past ``ttl`` the expired catalogue is still
+    served while a single background load replaces it, so readers never
+    wait on the reload and keep being answered while the database is down.
+    """
+    
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 30.0, stale_ttl: float = 0.0):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._fragments: Dict[str, bytes] = {}
+        self._names: Dict[str, str] = {}
+        # (name, id) in list order
+        self._order: List[Tuple[str, str]] = []
+        self._fragment_bytes = 0
+        self._loaded_at: Optional[float] = None
+        self._version = 0
+        # Bumped by every write so a load that raced one is not installed
+        self._generation = 0
+        self._snapshots: "OrderedDict[PageKey, CatalogueSnapshot]" = OrderedDict()
+        self._snapshot_bytes = 0
+        self._loads = SingleFlight()
+        self._retry_at = 0.0
+        self._stats = {
+            "hits": 0, "misses": 0, "loads": 0, "incremental_updates": 0, "evictions": 0, "oversize": 0,
+            "stale_served": 0, "refresh_failures": 0
+        }
+    
+    async def snapshot(
+        self,
+        loader: Callable[[], Awaitable[List[Application]]],
+        offset: int = 0,
+        limit: Optional[int] = None
+    ) -> CatalogueSnapshot:
+        """Return the encoded page, loading the catalogue through loader if needed."""
+        key = (offset, limit)
+        age = self._age()
+        if age is not None and age >= self.ttl:
+            if age < self.ttl + self.stale_ttl:
+                self._revalidate(loader)
+                self._stats["stale_served"] += 1
+                mark_stale(age)
+            else:
+                age = None
+        if age is not None:
+            snapshot = self._snapshots.get(key)
+            if snapshot is not None and snapshot.version == self._version:
+                self._stats["hits"] += 1
+                self._snapshots.move_to_end(key)
+                return snapshot
+        else:
+            loaded = await self._loads.do("load", lambda: self._load(loader))
+            if loaded is not None:
+                # The catalogue could not be kept (too large, or a write raced the load)
+                order, fragments = loaded
+                return CatalogueSnapshot(key, -1, self._join(order, fragments, offset, limit))
+        
+        self._stats["misses"] += 1
+        snapshot = CatalogueSnapshot(key, self._version, self._join(self._order, self._fragments, offset, limit))
+        self._store(snapshot)
+        return snapshot
+    
+    def add_variant(self, snapshot: CatalogueSnapshot, encoding: str, data: bytes):
+        """Attach an alternative encoding to a cached snapshot, counting it against max_bytes."""
+        if encoding in snapshot.variants:
+            return
+        snapshot.variants[encoding] = data
+        if self._snapshots.get(snapshot.key) is snapshot:
+            self._snapshot_bytes += len(data)
+            self._evict()
+    
+    def upsert(self, application: Application):
+        """Re-encode one created or updated application."""
+        self._generation += 1
+        if self._loaded_at is None:
+            return
+        self._remove(application.id)
+        fragment = encode_application(application)
+        entry = (application.name, application.id)
+        self._order.insert(bisect.bisect(self._order, entry), entry)
+        self._names[application.id] = application.name
+        self._fragments[application.id] = fragment
+        self._fragment_bytes += len(fragment)
+        self._changed()
+    
+    def remove(self, app_ids: Iterable[str]):
+        """Drop deleted applications."""
+        self._generation += 1
+        if self._loaded_at is None:
+            return
+        for app_id in app_ids:
+            self._remove(app_id)
+        self._changed()
+    
+    def clear(self):
+        """Forget the catalogue; the next request reloads it."""
+        self._generation += 1
+        self._loaded_at = None
+        self._fragments.clear()
+        self._names.clear()
+        self._order.clear()
+        self._fragment_bytes = 0
+        self._drop_snapshots()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size, memory use and hit/miss/eviction counters."""
+        return {
+            "applications": len(self._fragments),
+            "snapshots": len(self._snapshots),
+            "bytes": self._fragment_bytes + self._snapshot_bytes,
+            "max_bytes": self.max_bytes,
+            **self._stats
+        }
+    
+    def _age(self) -> Optional[float]:
+        return None if self._loaded_at is None else time.monotonic() - self._loaded_at
+    
+    def _revalidate(self, loader: Callable[[], Awaitable[List[Application]]]):
+        if time.monotonic() >= self._retry_at:
+            self._loads.start("refresh", lambda: self._refresh(loader))
+    
+    async def _refresh(self, loader: Callable[[], Awaitable[List[Application]]]):
+        try:
+            await self._loads.do("load", lambda: self._load(loader))
+        except Exception as e:
+            self._retry_at = time.monotonic() + REFRESH_RETRY_INTERVAL
+            self._stats["refresh_failures"] += 1
+            logger.warning("Failed to refresh application catalogue, serving the cached copy: %s", e)
+    
+    async def _load(self, loader: Callable[[], Awaitable[List[Application]]]):
+        """Load and encode the catalogue; returns it only if it could not be installed."""
+        generation = self._generation
+        applications = await loader()
+        self._stats["loads"] += 1
+        
+        fragments = {application.id: encode_application(application) for application in applications}
+        # Code point order, the same as ORDER BY name COLLATE "C", id in the sparse list query
+        order = sorted((application.name, application.id) for application in applications)
+        fragment_bytes = sum(len(f) for f in fragments.values())
+        if fragment_bytes > self.max_bytes:
+            self._stats["oversize"] += 1
+            logger.warning("Application catalogue (%s bytes) exceeds cache limit; not caching", fragment_bytes)
+            self.clear()
+            return order, fragments
+        if generation != self._generation:
+            return order, fragments
+        
+        self.clear()
+        self._fragments = fragments
+        self._names = {app_id: name for name, app_id in order}
+        self._order = order
+        self._fragment_bytes = fragment_bytes
+        self._loaded_at = time.monotonic()
+        self._version += 1
+        return None
+    
+    @staticmethod
+    def _join(order: List[Tuple[str, str]], fragments: Dict[str, bytes], offset: int, limit: Optional[int]) -> bytes:
+        page = order[offset:offset + limit] if limit is not None else order[offset:]
+        return b"[" + b",".join(fragments[app_id] for _, app_id in page) + b"]"
+    
+    def _remove(self, app_id: str):
+        name = self._names.pop(app_id, None)
+        if name is None:
+            return
+        index = bisect.bisect_left(self._order, (name, app_id))
+        del self._order[index]
+        self._fragment_bytes -= len(self._fragments.pop(app_id))
+    
+    def _changed(self):
+        self._version += 1
+        self._stats["incremental_updates"] += 1
+        self._drop_snapshots()
+        if self._fragment_bytes > self.max_bytes:
+            self._stats["oversize"] += 1
+            self.clear()
+    
+    def _store(self, snapshot: CatalogueSnapshot):
+        previous = self._snapshots.pop(snapshot.key, None)
+        if previous is not None:
+            self._snapshot_bytes -= previous.size
+        self._snapshots[snapshot.key] = snapshot
+        self._snapshot_bytes += snapshot.size
+        self._evict()
+    
+    def _evict(self):
+        while self._snapshots and self._fragment_bytes + self._snapshot_bytes > self.max_bytes:
+            _, evicted = self._snapshots.popitem(last=False)
+            self._snapshot_bytes -= evicted.size
+            self._stats["evictions"] += 1
+    
+    def _drop_snapshots(self):
+        self._snapshots.clear()
+        self._snapshot_bytes = 0
+
+
+# Global catalogue cache instance
+catalogue_cache = CatalogueCache(
+    max_bytes=settings.catalogue_cache_max_bytes,
+    ttl=settings.catalogue_cache_ttl,
+    stale_ttl=settings.stale_if_error_max_age
+)
@@ -0,0 +1,208 @@
+"""Tests for the application catalogue cache."""
+
+import asyncio
+import json
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock
+from config_service.models.application import Application
+from config_service.services.catalogue_cache import CatalogueCache
+from config_service.staleness import Staleness, current_staleness
+
+
+def make_application(app_id: str, name: str, comments: str = None) -> Application:
+    """Build an application as the repository would return it."""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return Application.from_row({
+        "id": app_id, "name": name, "comments": comments, "created_at": now, "updated_at": now
+    })
+
+
+@pytest.fixture
+def loader():
+    """Repository loader returning three applications."""
+    return AsyncMock(return_value=[
+        make_application("01HKQJQJQJQJQJQJQJQJQJQJQC", "charlie"),
+        make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "alpha"),
+        make_application("01HKQJQJQJQJQJQJQJQJQJQJQB", "bravo"),
+    ])
+
+
+def names(snapshot):
+    """Decode a snapshot body into application names."""
+    return [item["name"] for item in json.loads(snapshot.body)]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_matches_model_serialization(loader):
+    """Test that the joined body equals serializing the list in name order."""
+    cache = CatalogueCache()
+    
+    snapshot = await cache.snapshot(loader)
+    
+    applications = sorted(await loader(), key=lambda a: a.name)
+    assert json.loads(snapshot.body) == [json.loads(a.model_dump_json()) for a in applications]
+
+
+@pytest.mark.asyncio
+async def test_snapshot_cached_until_change(loader):
+    """Test that repeated requests reuse the same snapshot and load once."""
+    cache = CatalogueCache()
+    
+    first = await cache.snapshot(loader)
+    second = await cache.snapshot(loader)
+    
+    assert second is first
+    assert loader.await_count == 1
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pages_are_cached_separately(loader):
+    """Test that offset/limit pages slice the ordered catalogue."""
+    cache = CatalogueCache()
+    
+    assert names(await cache.snapshot(loader, 1, 1)) == ["bravo"]
+    assert names(await cache.snapshot(loader, 1)) == ["bravo", "charlie"]
+    assert cache.stats()["snapshots"] == 2
+
+
+@pytest.mark.asyncio
+async def test_upsert_updates_without_reloading(loader):
+    """Test that a created or renamed application is applied incrementally."""
+    cache = CatalogueCache()
+    await cache.snapshot(loader)
+    
+    cache.upsert(make_application("01HKQJQJQJQJQJQJQJQJQJQJQD", "aardvark"))
+    cache.upsert(make_application("01HKQJQJQJQJQJQJQJQJQJQJQC", "zulu", "renamed"))
+    snapshot = await cache.snapshot(loader)
+    
+    assert names(snapshot) == ["aardvark", "alpha", "bravo", "zulu"]
+    assert json.loads(snapshot.body)[-1]["comments"] == "renamed"
+    assert loader.await_count == 1
+    assert cache.stats()["incremental_updates"] == 2
+
+
+@pytest.mark.asyncio
+async def test_remove(loader):
+    """Test that deleted applications disappear without reloading."""
+    cache = CatalogueCache()
+    await cache.snapshot(loader)
+    
+    cache.remove(["01HKQJQJQJQJQJQJQJQJQJQJQB", "01HKQJQJQJQJQJQJQJQJQJQJQZ"])
+    
+    assert names(await cache.snapshot(loader)) == ["alpha", "charlie"]
+    assert loader.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_ttl_reloads(loader):
+    """Test that an expired catalogue is reloaded."""
+    cache = CatalogueCache(ttl=0.0)
+    
+    await cache.snapshot(loader)
+    await cache.snapshot(loader)
+    
+    assert loader.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_write_racing_load_is_not_lost(loader):
+    """Test that a load overlapping a write serves its result but is not installed."""
+    cache = CatalogueCache()
+    applications = await loader()
+    
+    async def racing_loader():
+        cache.upsert(make_application("01HKQJQJQJQJQJQJQJQJQJQJQD", "delta"))
+        return applications
+    
+    snapshot = await cache.snapshot(racing_loader)
+    
+    assert names(snapshot) == ["alpha", "bravo", "charlie"]
+    assert cache.stats()["applications"] == 0
+
+
+@pytest.mark.asyncio
+async def test_memory_cap_evicts_snapshots(loader):
+    """Test that least recently used snapshots are evicted to stay under the cap."""
+    fragments = sum(len(a.model_dump_json()) for a in await loader())
+    cache = CatalogueCache(max_bytes=fragments + 200)
+    
+    await cache.snapshot(loader, 0, 1)
+    await cache.snapshot(loader, 1, 1)
+    await cache.snapshot(loader, 2, 1)
+    
+    stats = cache.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] >= 1
+
+
+@pytest.mark.asyncio
+async def test_oversize_catalogue_not_cached(loader):
+    """Test that a catalogue larger than the cap is served but not retained."""
+    cache = CatalogueCache(max_bytes=10)
+    
+    snapshot = await cache.snapshot(loader)
+    
+    assert names(snapshot) == ["alpha", "bravo", "charlie"]
+    assert cache.stats()["applications"] == 0
+    assert cache.stats()["oversize"] == 1
+
+
+@pytest.mark.asyncio
+async def test_variants_count_against_cap(loader):
+    """Test that alternative encodings are stored on the snapshot and accounted."""
+    cache = CatalogueCache()
+    snapshot = await cache.snapshot(loader)
+    before = cache.stats()["bytes"]
+    
+    cache.add_variant(snapshot, "gzip", b"x" * 10)
+    
+    assert snapshot.variants["gzip"] == b"x" * 10
+    assert cache.stats()["bytes"] == before + 10
+
+
+async def settle():
+    """Let background refresh tasks run to completion."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_expired_catalogue_served_while_refreshing(loader):
+    """Test that an expired catalogue is answered at once, flagged stale, and reloaded in the background."""
+    cache = CatalogueCache(ttl=0.0, stale_ttl=60.0)
+    await cache.snapshot(loader)
+    loader.return_value = [make_application("01HKQJQJQJQJQJQJQJQJQJQJQA", "alpha")]
+    staleness = Staleness()
+    token = current_staleness.set(staleness)
+    
+    try:
+        stale = await cache.snapshot(loader)
+    finally:
+        current_staleness.reset(token)
+    await settle()
+    
+    assert names(stale) == ["alpha", "bravo", "charlie"]
+    assert staleness.age is not None
+    assert loader.await_count == 2
+    assert names(await cache.snapshot(loader)) == ["alpha"]
+    assert cache.stats()["stale_served"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_cached_catalogue(loader):
+    """Test that a database failure during refresh leaves the last known catalogue in service."""
+    cache = CatalogueCache(ttl=0.0, stale_ttl=60.0)
+    await cache.snapshot(loader)
+    loader.side_effect = RuntimeError("database down")
+    
+    first = await cache.snapshot(loader)
+    await settle()
+    second = await cache.snapshot(loader)
+    await settle()
+    
+    assert names(first) == names(second) == ["alpha", "bravo", "charlie"]
+    assert cache.stats()["refresh_failures"] == 1
+    # Retries are spaced out rather than made on every request
+    assert loader.await_count == 2
@@ -0,0 +1,62 @@
+"""Change feed cursors and tombstone retention."""
+
+import base64
+import binascii
+import logging
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from config_service.config import settings
+from config_service.models.change import ChangePage
+from config_service.repositories.change_repository import change_repository
+from config_service.services.jobs import job_worker
+
+logger = logging.getLogger(__name__)
+
+# Position before the first change
+START = (datetime(1970, 1, 1), "")
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor this service did not issue."""
+
+
+class CursorExpiredError(ValueError):
+    """Raised for a cursor older than the tombstone retention, which may have missed deletes."""
+
+
+def encode_cursor(changed_at: datetime, last_id: str) -> str:
+    """Encode a feed position as an opaque URL-safe token."""
+    return base64.urlsafe_b64encode(f"{changed_at.isoformat()}|{last_id}".encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: Optional[str]) -> Tuple[datetime, str]:
+    """Decode a token from encode_cursor; None means the start of the feed."""
+    if not cursor:
+        return START
+    try:
+        changed_at, last_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        return datetime.fromisoformat(changed_at), last_id
+    except (binascii.Error, UnicodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}")
+
+
+async def read_changes(cursor: Optional[str], limit: int) -> ChangePage:
+    """Return the changes after cursor and the cursor to continue from."""
+    changed_at, last_id = decode_cursor(cursor)
+    if (changed_at, last_id) != START and changed_at < datetime.now() - timedelta(seconds=settings.change_feed_retention):
+        raise CursorExpiredError("Cursor is older than the change feed retention")
+    
+    changes = await change_repository.changes_since(changed_at, last_id, limit, settings.change_feed_settle_seconds)
+    if changes:
+        changed_at, last_id = changes[-1].changed_at, changes[-1].id
+    return ChangePage(changes=changes, cursor=encode_cursor(changed_at, last_id), has_more=len(changes) == limit)
+
+
+async def purge_tombstones():
+    """Drop tombstones that every cursor still accepted has already passed."""
+    purged = await change_repository.delete_tombstones(settings.change_feed_retention)
+    if purged:
+        logger.info("Purged %s tombstones", purged)
+
+
+job_worker.register_maintenance(purge_tombstones)
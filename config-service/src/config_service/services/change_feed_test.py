@@ -0,0 +1,89 @@
+"""Tests for change feed cursors."""
+
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from config_service.models.change import Change
+from config_service.services.change_feed import (
+    START, CursorExpiredError, InvalidCursorError, decode_cursor, encode_cursor, purge_tombstones, read_changes
+)
+from config_service.services.jobs import job_worker
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    """Mock change repository."""
+    mock = MagicMock()
+    monkeypatch.setattr('config_service.services.change_feed.change_repository', mock)
+    return mock
+
+
+def make_change(changed_at: datetime, deleted: bool = False) -> Change:
+    """A change of the application APP_ID."""
+    return Change.from_row({
+        "kind": "application", "id": APP_ID, "application_id": APP_ID, "deleted": deleted,
+        "changed_at": changed_at, "data": None if deleted else {"id": APP_ID, "name": "app"}
+    })
+
+
+def test_cursor_round_trip():
+    """Test that a cursor decodes to the position it encodes."""
+    position = (datetime(2026, 5, 1, 12, 30, 0, 123456), APP_ID)
+    
+    assert decode_cursor(encode_cursor(*position)) == position
+    assert decode_cursor(None) == START
+
+
+@pytest.mark.parametrize("cursor", ["not base64!", "bm9waXBl", encode_cursor(datetime.now(), "x").replace("=", "") + "@"])
+def test_invalid_cursor(cursor):
+    """Test that tokens this service did not issue are rejected."""
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_read_changes_advances_cursor(repository):
+    """Test that the next cursor points after the last change returned."""
+    now = datetime.now()
+    repository.changes_since = AsyncMock(return_value=[make_change(now - timedelta(seconds=5)), make_change(now)])
+    
+    page = await read_changes(None, 2)
+    
+    assert page.has_more is True
+    assert decode_cursor(page.cursor) == (now, APP_ID)
+    assert repository.changes_since.call_args[0][:3] == (START[0], START[1], 2)
+
+
+@pytest.mark.asyncio
+async def test_empty_page_keeps_cursor(repository):
+    """Test that polling without new changes returns the same cursor."""
+    repository.changes_since = AsyncMock(return_value=[])
+    cursor = encode_cursor(datetime.now(), APP_ID)
+    
+    page = await read_changes(cursor, 100)
+    
+    assert page.changes == []
+    assert page.cursor == cursor
+    assert page.has_more is False
+
+
+@pytest.mark.asyncio
+async def test_expired_cursor(repository):
+    """Test that a cursor older than the tombstone retention must resynchronise."""
+    cursor = encode_cursor(datetime.now() - timedelta(days=365), APP_ID)
+    
+    with pytest.raises(CursorExpiredError):
+        await read_changes(cursor, 100)
+
+
+@pytest.mark.asyncio
+async def test_tombstones_are_purged_by_maintenance(repository):
+    """Test that tombstone purging runs with the job worker's maintenance."""
+    repository.delete_tombstones = AsyncMock(return_value=3)
+    
+    await purge_tombstones()
+    
+    assert purge_tombstones in job_worker._maintenance
+    repository.delete_tombstones.assert_called_once()
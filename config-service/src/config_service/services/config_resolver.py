@@ -0,0 +1,259 @@
+"""Resolution of layered configurations with a per-configuration cache."""
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+from config_service.config import settings
+from config_service.repositories.configuration_repository import (
+    ConfigurationCycleError, InvalidParentError, configuration_repository
+)
+from config_service.repositories.single_flight import SingleFlight
+from config_service.staleness import mark_stale
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background refreshes after one failed
+REFRESH_RETRY_INTERVAL = 1.0
+
+
+class ResolvedEntry(NamedTuple):
+    """Cached resolution of one configuration; config must be treated as read-only."""
+    id: str
+    application_id: str
+    name: str
+    chain: Tuple[str, ...]
+    ancestors: FrozenSet[str]
+    config: Dict[str, Any]
+    expires_at: float
+
+
+def deep_merge(base: Dict[str, Any], overlay: Dict[str, Any]) -> Dict[str, Any]:
+    """Return base overlaid with overlay, merging nested objects key by key.
+    
+    Non-object values (including lists and null) in overlay replace the base
+    value. Neither input is modified; subtrees overlay does not touch are
+    shared with base rather than copied, so merging a small override onto a
+    large document costs time proportional to the override.
+    """
+    if not base:
+        return overlay
+    if not overlay:
+        return base
+    merged = dict(base)
+    for key, value in overlay.items():
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+class ConfigResolver:
+    """Resolves configurations over their parents and caches the results.
+    
+    A configuration's chain is its parents' chains concatenated left to
+    right with duplicates removed, followed by itself; the resolved document
+    is every config in the chain deep-merged in that order. Every resolved
+    configuration (leaves and the intermediate parents computed on the way)
+    is cached, so a cache miss only merges the links that changed.
+    
+    ``invalidate`` drops a configuration and, through a reverse index of
+    ancestors, exactly the cached configurations that inherit from it.
+    Invalidation is local to this process; ``ttl`` bounds how long another
+    process's write can go unseen. An expired entry is still served for
+    ``stale_ttl`` seconds while it is re-resolved in the background, so a
+    slow or unavailable database does not hold up reads of cached results.
+    """
+    
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0, stale_ttl: float = 0.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries: "OrderedDict[str, ResolvedEntry]" = OrderedDict()
+        # ancestor id -> ids of cached entries that inherit from it
+        self._dependents: Dict[str, Set[str]] = {}
+        # Bumped on every invalidation so resolutions that raced a write are not cached
+        self._generation = 0
+        self._loads = SingleFlight()
+        self._retry_at = 0.0
+        self._stats = {
+            "hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "stale_served": 0, "refresh_failures": 0
+        }
+    
+    async def resolve(self, config_id: str) -> Optional[ResolvedEntry]:
+        """Return the resolved configuration, or None if it does not exist."""
+        entry = self._entries.get(config_id)
+        if entry is not None:
+            now = time.monotonic()
+            if entry.expires_at > now:
+                self._stats["hits"] += 1
+                self._entries.move_to_end(config_id)
+                return entry
+            if now < entry.expires_at + self.stale_ttl:
+                self._stats["stale_served"] += 1
+                self._entries.move_to_end(config_id)
+                self._revalidate(config_id)
+                mark_stale(now - entry.expires_at + self.ttl)
+                return entry
+        self._stats["misses"] += 1
+        return await self._loads.do(config_id, lambda: self._load(config_id))
+    
+    async def validate_parents(self, config_id: Optional[str], application_id: str, parent_ids: List[str]):
+        """Check that parent_ids exist in the same application and create no cycle."""
+        if len(set(parent_ids)) != len(parent_ids):
+            raise InvalidParentError("Parent IDs must be unique")
+        if config_id is not None and config_id in parent_ids:
+            raise ConfigurationCycleError("A configuration cannot be its own parent")
+        
+        lineage = await configuration_repository.get_lineage(parent_ids)
+        for parent_id in parent_ids:
+            parent = lineage.get(parent_id)
+            if parent is None:
+                raise InvalidParentError(f"Parent configuration {parent_id} not found")
+            if parent['application_id'] != application_id:
+                raise InvalidParentError(f"Parent configuration {parent_id} belongs to another application")
+        if config_id is not None and config_id in lineage:
+            raise ConfigurationCycleError("Parent links would make the configuration its own ancestor")
+    
+    def invalidate(self, config_id: str):
+        """Drop cached results for config_id and every configuration inheriting from it."""
+        self._generation += 1
+        affected = self._dependents.pop(config_id, set())
+        affected.add(config_id)
+        for affected_id in affected:
+            self._discard(affected_id)
+        self._stats["invalidations"] += 1
+    
+    def invalidate_applications(self, app_ids):
+        """Drop cached results for every configuration of the given applications."""
+        app_ids = set(app_ids)
+        self._generation += 1
+        for config_id in [e.id for e in self._entries.values() if e.application_id in app_ids]:
+            self._discard(config_id)
+        self._stats["invalidations"] += 1
+    
+    def clear(self):
+        """Drop every cached result."""
+        self._generation += 1
+        self._entries.clear()
+        self._dependents.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss/invalidation counters."""
+        return {"entries": len(self._entries), **self._stats}
+    
+    def _lookup(self, config_id: str) -> Optional[ResolvedEntry]:
+        """Return the cached entry if fresh; expired ones are kept for stale reads."""
+        entry = self._entries.get(config_id)
+        if entry is None or entry.expires_at <= time.monotonic():
+            return None
+        self._entries.move_to_end(config_id)
+        return entry
+    
+    def _revalidate(self, config_id: str):
+        if time.monotonic() >= self._retry_at:
+            self._loads.start(("refresh", config_id), lambda: self._refresh(config_id))
+    
+    async def _refresh(self, config_id: str):
+        try:
+            await self._loads.do(config_id, lambda: self._load(config_id))
+        except Exception as e:
+            self._retry_at = time.monotonic() + REFRESH_RETRY_INTERVAL
+            self._stats["refresh_failures"] += 1
+            logger.warning("Failed to refresh configuration %s, serving the cached result: %s", config_id, e)
+    
+    async def _load(self, config_id: str) -> Optional[ResolvedEntry]:
+        generation = self._generation
+        rows = await configuration_repository.get_lineage([config_id])
+        if config_id not in rows:
+            # Deleted, possibly by another process: stop serving the stale result
+            self._discard(config_id)
+            return None
+        
+        resolved: Dict[str, ResolvedEntry] = {}
+        entry = self._build(config_id, rows, resolved, set())
+        if generation == self._generation:
+            for built in resolved.values():
+                self._store(built)
+        return entry
+    
+    def _build(
+        self,
+        config_id: str,
+        rows: Dict[str, Dict[str, Any]],
+        resolved: Dict[str, ResolvedEntry],
+        visiting: Set[str]
+    ) -> ResolvedEntry:
+        """Resolve config_id from rows, reusing cached and already built ancestors."""
+        entry = resolved.get(config_id) or self._lookup(config_id)
+        if entry is not None:
+            return entry
+        if config_id in visiting:
+            raise ConfigurationCycleError(f"Configuration {config_id} inherits from itself")
+        visiting.add(config_id)
+        
+        row = rows[config_id]
+        # A parent deleted after this row was written simply drops out of the chain
+        parents = [
+            self._build(parent_id, rows, resolved, visiting)
+            for parent_id in row['parent_ids'] or () if parent_id in rows
+        ]
+        chain: List[str] = []
+        ancestors: Set[str] = set()
+        for parent in parents:
+            chain.extend(c for c in parent.chain if c not in ancestors)
+            ancestors.update(parent.chain)
+        chain.append(config_id)
+        
+        if len(parents) == 1:
+            # The common single-inheritance case only merges one more layer
+            config = deep_merge(parents[0].config, row['config'] or {})
+        else:
+            # Shared ancestors appear once in the chain, so a diamond applies them before either branch
+            config = {}
+            for layer_id in chain:
+                config = deep_merge(config, rows[layer_id]['config'] or {})
+        
+        visiting.discard(config_id)
+        entry = ResolvedEntry(
+            id=config_id,
+            application_id=row['application_id'],
+            name=row['name'],
+            chain=tuple(chain),
+            ancestors=frozenset(ancestors),
+            config=config,
+            expires_at=time.monotonic() + self.ttl
+        )
+        resolved[config_id] = entry
+        return entry
+    
+    def _store(self, entry: ResolvedEntry):
+        self._discard(entry.id)
+        self._entries[entry.id] = entry
+        for ancestor_id in entry.ancestors:
+            self._dependents.setdefault(ancestor_id, set()).add(entry.id)
+        while len(self._entries) > self.max_entries:
+            oldest_id = next(iter(self._entries))
+            self._discard(oldest_id)
+            self._stats["evictions"] += 1
+    
+    def _discard(self, config_id: str):
+        entry = self._entries.pop(config_id, None)
+        if entry is None:
+            return
+        for ancestor_id in entry.ancestors:
+            dependents = self._dependents.get(ancestor_id)
+            if dependents is not None:
+                dependents.discard(config_id)
+                if not dependents:
+                    del self._dependents[ancestor_id]
+
+
+# Global resolver instance
+config_resolver = ConfigResolver(
+    max_entries=settings.config_cache_max_entries,
+    ttl=settings.config_cache_ttl,
+    stale_ttl=settings.stale_if_error_max_age
+)
@@ -0,0 +1,272 @@
+"""Tests for layered configuration resolution."""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, patch
+from config_service.services.config_resolver import (
+    ConfigResolver, ConfigurationCycleError, InvalidParentError, deep_merge
+)
+from config_service.staleness import Staleness, current_staleness
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+OTHER_APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQB"
+
+
+def row(config_id, config, parent_ids=(), application_id=APP_ID):
+    """Build a lineage row as returned by the repository."""
+    return {
+        "id": config_id, "application_id": application_id, "name": config_id.lower(),
+        "config": config, "parent_ids": list(parent_ids)
+    }
+
+
+class FakeLineage:
+    """In-memory stand-in for ConfigurationRepository.get_lineage."""
+
+    def __init__(self, *rows):
+        self.rows = {r["id"]: r for r in rows}
+        self.calls = 0
+
+    async def __call__(self, config_ids):
+        self.calls += 1
+        found, pending = {}, list(config_ids)
+        while pending:
+            config_id = pending.pop()
+            if config_id in found or config_id not in self.rows:
+                continue
+            found[config_id] = self.rows[config_id]
+            pending.extend(self.rows[config_id]["parent_ids"])
+        return found
+
+
+@pytest.fixture
+def lineage(monkeypatch):
+    """Patch the repository with a base -> staging -> prod chain."""
+    fake = FakeLineage(
+        row("BASE", {"db": {"host": "localhost", "port": 5432}, "debug": True}),
+        row("STAGING", {"db": {"host": "staging-db"}}, ["BASE"]),
+        row("PROD", {"debug": False}, ["STAGING"]),
+    )
+    monkeypatch.setattr(
+        'config_service.services.config_resolver.configuration_repository.get_lineage', fake
+    )
+    return fake
+
+
+def test_deep_merge_overlays_nested_objects():
+    """Test that nested objects merge while scalars and lists replace."""
+    base = {"db": {"host": "a", "port": 1}, "tags": [1, 2], "keep": {"x": 1}}
+    overlay = {"db": {"host": "b"}, "tags": [3]}
+    
+    merged = deep_merge(base, overlay)
+    
+    assert merged == {"db": {"host": "b", "port": 1}, "tags": [3], "keep": {"x": 1}}
+    assert base == {"db": {"host": "a", "port": 1}, "tags": [1, 2], "keep": {"x": 1}}
+    # Untouched subtrees are shared, not copied
+    assert merged["keep"] is base["keep"]
+
+
+@pytest.mark.asyncio
+async def test_resolve_chain(lineage):
+    """Test that a leaf resolves over every ancestor in order."""
+    resolver = ConfigResolver()
+    
+    resolved = await resolver.resolve("PROD")
+    
+    assert resolved.chain == ("BASE", "STAGING", "PROD")
+    assert resolved.config == {"db": {"host": "staging-db", "port": 5432}, "debug": False}
+    assert resolved.ancestors == frozenset({"BASE", "STAGING"})
+
+
+@pytest.mark.asyncio
+async def test_resolve_caches_leaf_and_ancestors(lineage):
+    """Test that one load caches the whole chain."""
+    resolver = ConfigResolver()
+    
+    await resolver.resolve("PROD")
+    await resolver.resolve("PROD")
+    await resolver.resolve("STAGING")
+    
+    assert lineage.calls == 1
+    assert resolver.stats()["entries"] == 3
+    assert resolver.stats()["hits"] == 2
+
+
+@pytest.mark.asyncio
+async def test_resolve_missing(lineage):
+    """Test that unknown configurations resolve to None."""
+    assert await ConfigResolver().resolve("MISSING") is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_drops_only_descendants(lineage):
+    """Test that invalidating a parent keeps unrelated and ancestor entries."""
+    lineage.rows["OTHER"] = row("OTHER", {"x": 1})
+    resolver = ConfigResolver()
+    await resolver.resolve("PROD")
+    await resolver.resolve("OTHER")
+    
+    lineage.rows["STAGING"] = row("STAGING", {"db": {"host": "new-db"}}, ["BASE"])
+    resolver.invalidate("STAGING")
+    
+    assert set(resolver._entries) == {"BASE", "OTHER"}
+    resolved = await resolver.resolve("PROD")
+    assert resolved.config["db"]["host"] == "new-db"
+
+
+@pytest.mark.asyncio
+async def test_invalidate_applications(lineage):
+    """Test that every cached configuration of a deleted application is dropped."""
+    lineage.rows["OTHER"] = row("OTHER", {"x": 1}, application_id=OTHER_APP_ID)
+    resolver = ConfigResolver()
+    await resolver.resolve("PROD")
+    await resolver.resolve("OTHER")
+    
+    resolver.invalidate_applications([APP_ID])
+    
+    assert set(resolver._entries) == {"OTHER"}
+    assert resolver._dependents == {}
+
+
+@pytest.mark.asyncio
+async def test_diamond_applies_shared_ancestor_once(monkeypatch):
+    """Test that a shared ancestor does not undo one branch's overrides."""
+    fake = FakeLineage(
+        row("BASE", {"x": 1, "y": 1}),
+        row("LEFT", {"x": 2}, ["BASE"]),
+        row("RIGHT", {"y": 3}, ["BASE"]),
+        row("LEAF", {}, ["LEFT", "RIGHT"]),
+    )
+    monkeypatch.setattr('config_service.services.config_resolver.configuration_repository.get_lineage', fake)
+    
+    resolved = await ConfigResolver().resolve("LEAF")
+    
+    assert resolved.chain == ("BASE", "LEFT", "RIGHT", "LEAF")
+    assert resolved.config == {"x": 2, "y": 3}
+
+
+@pytest.mark.asyncio
+async def test_resolve_detects_stored_cycle(monkeypatch):
+    """Test that a cycle that reached the database is reported, not looped on."""
+    fake = FakeLineage(row("A", {}, ["B"]), row("B", {}, ["A"]))
+    monkeypatch.setattr('config_service.services.config_resolver.configuration_repository.get_lineage', fake)
+    
+    with pytest.raises(ConfigurationCycleError):
+        await ConfigResolver().resolve("A")
+
+
+@pytest.mark.asyncio
+async def test_resolution_racing_a_write_is_not_cached(lineage, monkeypatch):
+    """Test that a resolution started before an invalidation is returned but not cached."""
+    resolver = ConfigResolver()
+    original = lineage.__call__
+    
+    async def slow_lineage(config_ids):
+        result = await original(config_ids)
+        resolver.invalidate("BASE")
+        return result
+    
+    monkeypatch.setattr('config_service.services.config_resolver.configuration_repository.get_lineage', slow_lineage)
+    
+    assert await resolver.resolve("PROD") is not None
+    assert resolver.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ttl_expires_entries(lineage):
+    """Test that entries older than the TTL are reloaded."""
+    resolver = ConfigResolver(ttl=0.0)
+    
+    await resolver.resolve("PROD")
+    await resolver.resolve("PROD")
+    
+    assert lineage.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_max_entries_evicts_least_recently_used(lineage):
+    """Test that the cache stays within max_entries."""
+    resolver = ConfigResolver(max_entries=2)
+    
+    await resolver.resolve("PROD")
+    
+    assert set(resolver._entries) == {"STAGING", "PROD"}
+    assert resolver.stats()["evictions"] == 1
+    assert resolver._dependents == {"STAGING": {"PROD"}, "BASE": {"STAGING", "PROD"}}
+
+
+@pytest.mark.asyncio
+async def test_validate_parents(lineage):
+    """Test parent existence, application and cycle checks."""
+    lineage.rows["FOREIGN"] = row("FOREIGN", {}, application_id=OTHER_APP_ID)
+    resolver = ConfigResolver()
+    
+    await resolver.validate_parents(None, APP_ID, ["STAGING"])
+    with pytest.raises(InvalidParentError):
+        await resolver.validate_parents(None, APP_ID, ["MISSING"])
+    with pytest.raises(InvalidParentError):
+        await resolver.validate_parents(None, APP_ID, ["FOREIGN"])
+    with pytest.raises(InvalidParentError):
+        await resolver.validate_parents(None, APP_ID, ["BASE", "BASE"])
+    with pytest.raises(ConfigurationCycleError):
+        await resolver.validate_parents("BASE", APP_ID, ["BASE"])
+    with pytest.raises(ConfigurationCycleError):
+        await resolver.validate_parents("BASE", APP_ID, ["PROD"])
+
+
+async def settle():
+    """Let background refresh tasks run to completion."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_served_while_re_resolving(lineage):
+    """Test that an expired result is returned at once, flagged stale, and refreshed in the background."""
+    resolver = ConfigResolver(ttl=0.0, stale_ttl=60.0)
+    await resolver.resolve("PROD")
+    lineage.rows["PROD"] = row("PROD", {"debug": "changed"}, ["STAGING"])
+    staleness = Staleness()
+    token = current_staleness.set(staleness)
+    
+    try:
+        stale = await resolver.resolve("PROD")
+    finally:
+        current_staleness.reset(token)
+    await settle()
+    
+    assert stale.config["debug"] is False
+    assert staleness.age is not None
+    assert lineage.calls == 2
+    assert (await resolver.resolve("PROD")).config["debug"] == "changed"
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_serving_cached_result(lineage):
+    """Test that a database failure during refresh leaves the last known result in service."""
+    resolver = ConfigResolver(ttl=0.0, stale_ttl=60.0)
+    await resolver.resolve("PROD")
+    
+    async def unavailable(config_ids):
+        raise RuntimeError("database down")
+    
+    with patch('config_service.services.config_resolver.configuration_repository.get_lineage', unavailable):
+        stale = await resolver.resolve("PROD")
+        await settle()
+        again = await resolver.resolve("PROD")
+    
+    assert stale.config == again.config == {"db": {"host": "staging-db", "port": 5432}, "debug": False}
+    assert resolver.stats()["refresh_failures"] == 1
+
+
+@pytest.mark.asyncio
+async def test_refresh_drops_deleted_configuration(lineage):
+    """Test that a configuration deleted elsewhere stops being served once its refresh finds it gone."""
+    resolver = ConfigResolver(ttl=0.0, stale_ttl=60.0)
+    await resolver.resolve("PROD")
+    del lineage.rows["PROD"]
+    
+    await resolver.resolve("PROD")
+    await settle()
+    
+    assert await resolver.resolve("PROD") is None
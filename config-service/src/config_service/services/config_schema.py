@@ -0,0 +1,575 @@
+"""Per-application JSON Schemas for configuration documents, compiled once into validators."""
+
+import functools
+import json
+import logging
+import math
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config_service.config import settings
+from config_service.repositories.schema_repository import schema_repository
+from config_service.repositories.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+Path = Tuple[Any, ...]
+Errors = List[Tuple[Path, str]]
+# A compiled check appends (path, message) for every violation it finds
+Check = Callable[[Any, Path, Errors], None]
+
+# Validation stops collecting after this many errors
+MAX_ERRORS = 100
+
+# Keywords that only describe a schema and never reject a document
+ANNOTATIONS = frozenset({
+    "$schema", "$id", "$comment", "$defs", "definitions", "title", "description", "default",
+    "examples", "deprecated", "readOnly", "writeOnly", "format", "contentMediaType", "contentEncoding"
+})
+
+JSON_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "integer": lambda v: (isinstance(v, int) and not isinstance(v, bool)) or (isinstance(v, float) and v.is_integer()),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+# Exact Python types of parsed JSON values of each type; other values take the slower tests above
+EXACT_TYPES = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+    "null": (type(None),),
+}
+
+
+class SchemaDefinitionError(ValueError):
+    """Raised when a schema is malformed or uses a keyword this validator does not enforce."""
+
+
+class ConfigValidationError(ValueError):
+    """Raised when a configuration document does not match its application's schema."""
+    
+    def __init__(self, errors: List[Tuple[str, str]]):
+        self.errors = errors
+        path, message = errors[0]
+        more = f" (and {len(errors) - 1} more)" if len(errors) > 1 else ""
+        super().__init__(f"{path or '/'}: {message}{more}")
+
+
+def format_path(path: Path) -> str:
+    """Format a document path as a JSON Pointer."""
+    return "".join("/" + str(part).replace("~", "~0").replace("/", "~1") for part in path)
+
+
+def _json_equal(a: Any, b: Any) -> bool:
+    """Equality as JSON sees it: true is not 1, and 1.0 is 1."""
+    if isinstance(a, bool) or isinstance(b, bool):
+        return isinstance(a, bool) and isinstance(b, bool) and a == b
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_json_equal(a[k], b[k]) for k in a)
+    if isinstance(a, list) and isinstance(b, list):
+        return len(a) == len(b) and all(_json_equal(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return a == b
+    return type(a) is type(b) and a == b
+
+
+def _scalar_key(value: Any) -> Tuple[str, Any]:
+    if isinstance(value, bool):
+        return ("boolean", value)
+    if isinstance(value, (int, float)):
+        return ("number", value)
+    return ("other", value)
+
+
+class CompiledSchema:
+    """A schema turned into a tree of closures, so validation never re-reads the schema."""
+    
+    def __init__(self, schema: Any):
+        self.schema = schema
+        self._refs: Dict[str, Check] = {}
+        # References being compiled since the last keyword that moves into a child value
+        self._unguarded: List[str] = []
+        try:
+            self._check = self._compile(schema, "#")
+        except RecursionError:
+            raise SchemaDefinitionError("#: schema is nested too deeply")
+    
+    def errors(self, document: Any) -> List[Tuple[str, str]]:
+        """Return (JSON Pointer, message) for each violation, at most MAX_ERRORS."""
+        errors: Errors = []
+        try:
+            self._check(document, (), errors)
+        except RecursionError:
+            # A recursive schema recurses once per nesting level of the document
+            errors.append(((), "is nested too deeply to validate"))
+        return [(format_path(path), message) for path, message in errors[:MAX_ERRORS]]
+    
+    def validate(self, document: Any):
+        """Raise ConfigValidationError if document does not match."""
+        errors = self.errors(document)
+        if errors:
+            raise ConfigValidationError(errors)
+    
+    def _compile(self, schema: Any, location: str) -> Check:
+        if schema is True:
+            return lambda value, path, errors: None
+        if schema is False:
+            return lambda value, path, errors: errors.append((path, "no value is allowed here"))
+        if not isinstance(schema, dict):
+            raise SchemaDefinitionError(f"{location}: a schema must be an object or a boolean")
+        
+        checks: List[Check] = []
+        for keyword, argument in schema.items():
+            if keyword in ANNOTATIONS or keyword in ("then", "else"):
+                continue
+            compiler = getattr(self, "_keyword_" + ("ref" if keyword == "$ref" else keyword), None)
+            if compiler is None:
+                raise SchemaDefinitionError(f"{location}: unsupported keyword '{keyword}'")
+            check = compiler(argument, schema, f"{location}/{keyword}")
+            if check is not None:
+                checks.append(check)
+        
+        if len(checks) == 1:
+            return checks[0]
+        
+        def check_all(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return check_all
+    
+    def _subschemas(self, argument: Any, location: str, compile_one: Optional[Callable[[Any, str], Check]] = None) -> List[Check]:
+        if not isinstance(argument, list) or not argument:
+            raise SchemaDefinitionError(f"{location}: expected a non-empty array of schemas")
+        compile_one = compile_one or self._compile
+        return [compile_one(sub, f"{location}/{i}") for i, sub in enumerate(argument)]
+    
+    def _compile_child(self, schema: Any, location: str) -> Check:
+        """Compile a schema applied to a property, item or name rather than the value itself."""
+        unguarded, self._unguarded = self._unguarded, []
+        try:
+            return self._compile(schema, location)
+        finally:
+            self._unguarded = unguarded
+    
+    def _number(self, argument: Any, location: str) -> float:
+        if isinstance(argument, bool) or not isinstance(argument, (int, float)):
+            raise SchemaDefinitionError(f"{location}: expected a number")
+        return argument
+    
+    def _count(self, argument: Any, location: str) -> int:
+        if isinstance(argument, bool) or not isinstance(argument, int) or argument < 0:
+            raise SchemaDefinitionError(f"{location}: expected a non-negative integer")
+        return argument
+    
+    # Keyword compilers: each returns a check, or None when the keyword is handled elsewhere
+    
+    def _keyword_ref(self, argument, schema, location):
+        if not isinstance(argument, str) or not argument.startswith("#"):
+            raise SchemaDefinitionError(f"{location}: only local references (#/...) are supported")
+        if argument in self._unguarded:
+            # Validation would follow it forever without moving into the document
+            raise SchemaDefinitionError(f"{location}: reference {argument} refers back to itself without checking a value")
+        if argument not in self._refs:
+            target: Any = self.schema
+            for token in argument[1:].split("/")[1:]:
+                token = token.replace("~1", "/").replace("~0", "~")
+                if not isinstance(target, dict) or token not in target:
+                    raise SchemaDefinitionError(f"{location}: reference {argument} does not resolve")
+                target = target[token]
+            # Registered before compiling so recursive schemas refer back to it
+            compiled: List[Check] = []
+            self._refs[argument] = lambda value, path, errors: compiled[0](value, path, errors)
+            self._unguarded.append(argument)
+            try:
+                compiled.append(self._compile(target, argument))
+            finally:
+                self._unguarded.pop()
+        return self._refs[argument]
+    
+    def _keyword_type(self, argument, schema, location):
+        names = argument if isinstance(argument, list) else [argument]
+        if not names or any(name not in JSON_TYPES for name in names):
+            raise SchemaDefinitionError(f"{location}: unknown type {argument!r}")
+        exact = frozenset(t for name in names for t in EXACT_TYPES[name])
+        tests = [JSON_TYPES[name] for name in names]
+        expected = " or ".join(names)
+        
+        def check_type(value, path, errors):
+            if type(value) not in exact and not any(test(value) for test in tests):
+                errors.append((path, f"expected {expected}"))
+        return check_type
+    
+    def _keyword_enum(self, argument, schema, location):
+        if not isinstance(argument, list) or not argument:
+            raise SchemaDefinitionError(f"{location}: expected a non-empty array")
+        allowed = ", ".join(json.dumps(v) for v in argument)
+        # Scalars are looked up by (kind, value), so true and 1 stay distinct
+        scalars = {_scalar_key(option) for option in argument if not isinstance(option, (dict, list))}
+        containers = [option for option in argument if isinstance(option, (dict, list))]
+        
+        def check_enum(value, path, errors):
+            if isinstance(value, (dict, list)):
+                found = any(_json_equal(value, option) for option in containers)
+            else:
+                found = _scalar_key(value) in scalars
+            if not found:
+                errors.append((path, f"must be one of {allowed}"))
+        return check_enum
+    
+    def _keyword_const(self, argument, schema, location):
+        def check_const(value, path, errors):
+            if not _json_equal(value, argument):
+                errors.append((path, f"must be {json.dumps(argument)}"))
+        return check_const
+    
+    def _keyword_properties(self, argument, schema, location):
+        return self._object_properties(schema, location.rsplit("/", 1)[0])
+    
+    def _keyword_patternProperties(self, argument, schema, location):
+        if "properties" in schema:
+            return None
+        return self._object_properties(schema, location.rsplit("/", 1)[0])
+    
+    def _keyword_additionalProperties(self, argument, schema, location):
+        if "properties" in schema or "patternProperties" in schema:
+            return None
+        return self._object_properties(schema, location.rsplit("/", 1)[0])
+    
+    def _object_properties(self, schema, location):
+        """One check for properties, patternProperties and additionalProperties, which depend on each other."""
+        declared = schema.get("properties", {})
+        pattern_schemas = schema.get("patternProperties", {})
+        if not isinstance(declared, dict) or not isinstance(pattern_schemas, dict):
+            raise SchemaDefinitionError(f"{location}: properties and patternProperties must be objects")
+        properties = {name: self._compile_child(sub, f"{location}/properties/{name}") for name, sub in declared.items()}
+        patterns = []
+        for pattern, sub in pattern_schemas.items():
+            try:
+                compiled = re.compile(pattern)
+            except re.error as e:
+                raise SchemaDefinitionError(f"{location}/patternProperties: invalid pattern {pattern!r}: {e}")
+            patterns.append((compiled, self._compile_child(sub, f"{location}/patternProperties/{pattern}")))
+        additional = schema.get("additionalProperties", True)
+        check_additional = None if additional is True else self._compile_child(additional, f"{location}/additionalProperties")
+        
+        def check_properties(value, path, errors):
+            if not isinstance(value, dict):
+                return
+            for name, item in value.items():
+                check = properties.get(name)
+                if check is not None:
+                    check(item, path + (name,), errors)
+                matched = False
+                for pattern, check_pattern in patterns:
+                    if pattern.search(name):
+                        matched = True
+                        check_pattern(item, path + (name,), errors)
+                if check is None and not matched and check_additional is not None:
+                    if additional is False:
+                        errors.append((path + (name,), "is not an allowed property"))
+                    else:
+                        check_additional(item, path + (name,), errors)
+                if len(errors) >= MAX_ERRORS:
+                    return
+        return check_properties
+    
+    def _keyword_propertyNames(self, argument, schema, location):
+        check_name = self._compile_child(argument, location)
+        
+        def check_property_names(value, path, errors):
+            if isinstance(value, dict):
+                for name in value:
+                    check_name(name, path + (name,), errors)
+        return check_property_names
+    
+    def _keyword_required(self, argument, schema, location):
+        if not isinstance(argument, list) or not all(isinstance(name, str) for name in argument):
+            raise SchemaDefinitionError(f"{location}: expected an array of property names")
+        
+        def check_required(value, path, errors):
+            if isinstance(value, dict):
+                for name in argument:
+                    if name not in value:
+                        errors.append((path + (name,), "is required"))
+        return check_required
+    
+    def _keyword_minProperties(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_min_properties(value, path, errors):
+            if isinstance(value, dict) and len(value) < limit:
+                errors.append((path, f"must have at least {limit} properties"))
+        return check_min_properties
+    
+    def _keyword_maxProperties(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_max_properties(value, path, errors):
+            if isinstance(value, dict) and len(value) > limit:
+                errors.append((path, f"must have at most {limit} properties"))
+        return check_max_properties
+    
+    def _keyword_items(self, argument, schema, location):
+        check_item = self._compile_child(argument, location)
+        start = len(schema.get("prefixItems") or ())
+        
+        def check_items(value, path, errors):
+            if isinstance(value, list):
+                for index in range(start, len(value)):
+                    check_item(value[index], path + (index,), errors)
+                    if len(errors) >= MAX_ERRORS:
+                        return
+        return check_items
+    
+    def _keyword_prefixItems(self, argument, schema, location):
+        checks = self._subschemas(argument, location, self._compile_child)
+        
+        def check_prefix_items(value, path, errors):
+            if isinstance(value, list):
+                for index, (check, item) in enumerate(zip(checks, value)):
+                    check(item, path + (index,), errors)
+        return check_prefix_items
+    
+    def _keyword_minItems(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_min_items(value, path, errors):
+            if isinstance(value, list) and len(value) < limit:
+                errors.append((path, f"must have at least {limit} items"))
+        return check_min_items
+    
+    def _keyword_maxItems(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_max_items(value, path, errors):
+            if isinstance(value, list) and len(value) > limit:
+                errors.append((path, f"must have at most {limit} items"))
+        return check_max_items
+    
+    def _keyword_uniqueItems(self, argument, schema, location):
+        if argument is not True:
+            return None
+        
+        def check_unique_items(value, path, errors):
+            if isinstance(value, list):
+                for i in range(1, len(value)):
+                    if any(_json_equal(value[i], value[j]) for j in range(i)):
+                        errors.append((path + (i,), "duplicates an earlier item"))
+                        return
+        return check_unique_items
+    
+    def _keyword_minimum(self, argument, schema, location):
+        limit = self._number(argument, location)
+        return self._bound(lambda v: v >= limit, f"must be at least {limit}")
+    
+    def _keyword_maximum(self, argument, schema, location):
+        limit = self._number(argument, location)
+        return self._bound(lambda v: v <= limit, f"must be at most {limit}")
+    
+    def _keyword_exclusiveMinimum(self, argument, schema, location):
+        limit = self._number(argument, location)
+        return self._bound(lambda v: v > limit, f"must be greater than {limit}")
+    
+    def _keyword_exclusiveMaximum(self, argument, schema, location):
+        limit = self._number(argument, location)
+        return self._bound(lambda v: v < limit, f"must be less than {limit}")
+    
+    def _keyword_multipleOf(self, argument, schema, location):
+        divisor = self._number(argument, location)
+        if divisor <= 0:
+            raise SchemaDefinitionError(f"{location}: must be greater than 0")
+        
+        def is_multiple(v):
+            quotient = v / divisor
+            return math.isfinite(quotient) and abs(quotient - round(quotient)) < 1e-9
+        return self._bound(is_multiple, f"must be a multiple of {divisor}")
+    
+    def _bound(self, test: Callable[[Any], bool], message: str) -> Check:
+        def check_bound(value, path, errors):
+            if isinstance(value, (int, float)) and not isinstance(value, bool) and not test(value):
+                errors.append((path, message))
+        return check_bound
+    
+    def _keyword_minLength(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_min_length(value, path, errors):
+            if isinstance(value, str) and len(value) < limit:
+                errors.append((path, f"must be at least {limit} characters"))
+        return check_min_length
+    
+    def _keyword_maxLength(self, argument, schema, location):
+        limit = self._count(argument, location)
+        
+        def check_max_length(value, path, errors):
+            if isinstance(value, str) and len(value) > limit:
+                errors.append((path, f"must be at most {limit} characters"))
+        return check_max_length
+    
+    def _keyword_pattern(self, argument, schema, location):
+        try:
+            pattern = re.compile(argument)
+        except (re.error, TypeError) as e:
+            raise SchemaDefinitionError(f"{location}: invalid pattern {argument!r}: {e}")
+        
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append((path, f"must match {argument}"))
+        return check_pattern
+    
+    def _keyword_allOf(self, argument, schema, location):
+        checks = self._subschemas(argument, location)
+        
+        def check_all_of(value, path, errors):
+            for check in checks:
+                check(value, path, errors)
+        return check_all_of
+    
+    def _keyword_anyOf(self, argument, schema, location):
+        checks = self._subschemas(argument, location)
+        
+        def check_any_of(value, path, errors):
+            for check in checks:
+                attempt: Errors = []
+                check(value, path, attempt)
+                if not attempt:
+                    return
+            errors.append((path, "does not match any of the allowed schemas"))
+        return check_any_of
+    
+    def _keyword_oneOf(self, argument, schema, location):
+        checks = self._subschemas(argument, location)
+        
+        def check_one_of(value, path, errors):
+            matches = 0
+            for check in checks:
+                attempt: Errors = []
+                check(value, path, attempt)
+                matches += not attempt
+            if matches != 1:
+                errors.append((path, f"must match exactly one of the allowed schemas, matched {matches}"))
+        return check_one_of
+    
+    def _keyword_not(self, argument, schema, location):
+        check_negated = self._compile(argument, location)
+        
+        def check_not(value, path, errors):
+            attempt: Errors = []
+            check_negated(value, path, attempt)
+            if not attempt:
+                errors.append((path, "matches a schema it must not match"))
+        return check_not
+    
+    def _keyword_if(self, argument, schema, location):
+        check_condition = self._compile(argument, location)
+        check_then = self._compile(schema.get("then", True), location[:-2] + "then")
+        check_else = self._compile(schema.get("else", True), location[:-2] + "else")
+        
+        def check_if(value, path, errors):
+            attempt: Errors = []
+            check_condition(value, path, attempt)
+            (check_else if attempt else check_then)(value, path, errors)
+        return check_if
+
+
+def canonical_schema(schema: Any) -> str:
+    """Serialize a schema so equal schemas share one compiled validator."""
+    return json.dumps(schema, sort_keys=True, separators=(",", ":"))
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_canonical(text: str) -> CompiledSchema:
+    """Compile a canonical schema; each distinct schema is compiled once per process."""
+    return CompiledSchema(json.loads(text))
+
+
+def compile_schema(schema: Any) -> CompiledSchema:
+    """Compile schema, reusing the validator of an identical schema; raises SchemaDefinitionError."""
+    try:
+        text = canonical_schema(schema)
+    except RecursionError:
+        raise SchemaDefinitionError("#: schema is nested too deeply")
+    return compile_canonical(text)
+
+
+class SchemaRegistry:
+    """Caches each application's compiled validator, or the absence of one.
+    
+    Entries are reloaded after ``ttl`` seconds, so a schema changed by
+    another process applies here within ``ttl``; changes made through this
+    process call ``invalidate`` and apply at once. Reloading an unchanged
+    schema reuses its compiled validator. A load that was running when
+    ``invalidate`` was called is neither joined nor stored, since it may
+    have read the old schema.
+    """
+    
+    def __init__(self, ttl: float = 30.0):
+        self.ttl = ttl
+        # application id -> (expires at, validator or None for no schema)
+        self._entries: Dict[str, Tuple[float, Optional[CompiledSchema]]] = {}
+        # Bumped by every invalidation
+        self._generation = 0
+        self._loads = SingleFlight()
+        self._stats = {"hits": 0, "misses": 0, "validations": 0, "rejections": 0}
+    
+    async def validator(self, application_id: str) -> Optional[CompiledSchema]:
+        """Return the application's compiled validator, or None if it has no schema."""
+        entry = self._entries.get(application_id)
+        if entry is not None and entry[0] > time.monotonic():
+            self._stats["hits"] += 1
+            return entry[1]
+        self._stats["misses"] += 1
+        generation = self._generation
+        return await self._loads.do((application_id, generation), lambda: self._load(application_id, generation))
+    
+    async def validate(self, application_id: str, document: Dict[str, Any]):
+        """Raise ConfigValidationError if document violates the application's schema."""
+        validator = await self.validator(application_id)
+        if validator is None:
+            return
+        self._stats["validations"] += 1
+        try:
+            validator.validate(document)
+        except ConfigValidationError:
+            self._stats["rejections"] += 1
+            raise
+    
+    def invalidate(self, application_id: str):
+        """Drop the cached validator after the application's schema changed."""
+        self._generation += 1
+        self._entries.pop(application_id, None)
+    
+    def clear(self):
+        """Drop every cached validator."""
+        self._generation += 1
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size, compiled schema count and validation counters."""
+        compiled = compile_canonical.cache_info()
+        return {"entries": len(self._entries), "compiled": compiled.currsize, "compilations": compiled.misses, **self._stats}
+    
+    async def _load(self, application_id: str, generation: int) -> Optional[CompiledSchema]:
+        record = await schema_repository.get(application_id)
+        validator = None
+        if record is not None:
+            try:
+                validator = compile_schema(record.config_schema)
+            except SchemaDefinitionError as e:
+                # Stored before this validator understood it; do not block writes on it
+                logger.error("Ignoring invalid schema of application %s: %s", application_id, e)
+        if generation == self._generation:
+            self._entries[application_id] = (time.monotonic() + self.ttl, validator)
+        return validator
+
+
+# Global schema registry instance
+schema_registry = SchemaRegistry(ttl=settings.config_schema_cache_ttl)
@@ -0,0 +1,258 @@
+"""Tests for configuration schema compilation and the schema registry."""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+from config_service.models.schema import ApplicationSchema
+from config_service.services.config_schema import (
+    MAX_ERRORS, CompiledSchema, ConfigValidationError, SchemaDefinitionError, SchemaRegistry, compile_schema
+)
+
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+
+SERVICE_SCHEMA = {
+    "type": "object",
+    "required": ["host", "port"],
+    "additionalProperties": False,
+    "properties": {
+        "host": {"type": "string", "minLength": 1},
+        "port": {"type": "integer", "minimum": 1, "maximum": 65535},
+        "mode": {"enum": ["active", "standby"]},
+        "tags": {"type": "array", "items": {"type": "string"}, "uniqueItems": True},
+        "upstream": {"$ref": "#/$defs/upstream"}
+    },
+    "$defs": {
+        "upstream": {
+            "type": "object",
+            "properties": {"next": {"$ref": "#/$defs/upstream"}, "weight": {"type": "number", "exclusiveMinimum": 0}}
+        }
+    }
+}
+
+
+def stored(config_schema, version=1):
+    """An application schema as the repository returns it."""
+    return ApplicationSchema.from_row({
+        "application_id": APP_ID, "config_schema": config_schema, "version": version, "updated_at": datetime.now()
+    })
+
+
+class TestCompiledSchema:
+    """Tests for compiled validators."""
+    
+    def test_valid_document(self):
+        """Test that a conforming document has no errors."""
+        document = {"host": "db", "port": 5432, "tags": ["a", "b"], "upstream": {"next": {"weight": 0.5}}}
+        
+        assert compile_schema(SERVICE_SCHEMA).errors(document) == []
+    
+    def test_errors_carry_json_pointer_paths(self):
+        """Test that every violation is reported at its location in the document."""
+        document = {"port": 0, "extra": 1, "tags": ["a", "a"], "upstream": {"next": {"weight": 0}}}
+        
+        errors = dict(compile_schema(SERVICE_SCHEMA).errors(document))
+        
+        assert errors == {
+            "/host": "is required",
+            "/port": "must be at least 1",
+            "/extra": "is not an allowed property",
+            "/tags/1": "duplicates an earlier item",
+            "/upstream/next/weight": "must be greater than 0",
+        }
+    
+    def test_pointer_escapes_slashes(self):
+        """Test that property names are escaped as JSON Pointer tokens."""
+        validator = compile_schema({"properties": {"a/b~c": {"type": "string"}}})
+        
+        assert validator.errors({"a/b~c": 1}) == [("/a~1b~0c", "expected string")]
+    
+    def test_booleans_are_not_numbers(self):
+        """Test that true is neither an integer nor equal to 1."""
+        assert compile_schema({"type": "integer"}).errors(True) == [("", "expected integer")]
+        assert compile_schema({"enum": [1]}).errors(True)
+        assert compile_schema({"const": 1}).errors(1.0) == []
+        assert compile_schema({"type": "integer"}).errors(2.0) == []
+    
+    def test_pattern_and_additional_properties(self):
+        """Test that properties matched by a pattern are not additional."""
+        validator = compile_schema({
+            "patternProperties": {"^x-": {"type": "string"}},
+            "additionalProperties": {"type": "integer"}
+        })
+        
+        assert validator.errors({"x-a": "s", "b": 1}) == []
+        assert validator.errors({"x-a": 1, "b": "s"}) == [("/x-a", "expected string"), ("/b", "expected integer")]
+    
+    def test_combinators(self):
+        """Test anyOf, oneOf, not and if/then."""
+        assert compile_schema({"anyOf": [{"type": "string"}, {"type": "null"}]}).errors(None) == []
+        assert compile_schema({"oneOf": [{"type": "number"}, {"type": "integer"}]}).errors(1)
+        assert compile_schema({"not": {"type": "string"}}).errors("s")
+        conditional = compile_schema({"if": {"required": ["tls"]}, "then": {"required": ["cert"]}})
+        assert conditional.errors({"tls": True}) == [("/cert", "is required")]
+        assert conditional.errors({}) == []
+    
+    def test_error_count_is_capped(self):
+        """Test that a badly wrong document reports at most MAX_ERRORS violations."""
+        validator = compile_schema({"type": "array", "items": {"type": "string"}})
+        
+        assert len(validator.errors(list(range(10 * MAX_ERRORS)))) == MAX_ERRORS
+    
+    def test_validate_raises_with_errors(self):
+        """Test that validate raises ConfigValidationError listing each violation."""
+        with pytest.raises(ConfigValidationError) as exc_info:
+            compile_schema(SERVICE_SCHEMA).validate({"host": "db"})
+        
+        assert exc_info.value.errors == [("/port", "is required")]
+        assert str(exc_info.value) == "/port: is required"
+    
+    @pytest.mark.parametrize("schema", [
+        {"type": "text"},
+        {"frobnicate": True},
+        {"$ref": "https://example.com/schema.json"},
+        {"$ref": "#/$defs/missing"},
+        {"pattern": "("},
+        {"minLength": -1},
+        {"properties": []},
+        {"anyOf": []},
+        {"$ref": "#"},
+        {"$ref": "#/$defs/loop", "$defs": {"loop": {"$ref": "#/$defs/loop"}}},
+        {"allOf": [{"$ref": "#/$defs/a"}], "$defs": {"a": {"anyOf": [{"$ref": "#/$defs/b"}]}, "b": {"not": {"$ref": "#/$defs/a"}}}},
+        {"properties": {"x": {"$ref": "#/$defs/loop"}}, "$defs": {"loop": {"allOf": [{"$ref": "#/$defs/loop"}]}}},
+    ])
+    def test_invalid_schemas_rejected(self, schema):
+        """Test that malformed schemas and unenforced keywords are refused rather than ignored."""
+        with pytest.raises(SchemaDefinitionError):
+            compile_schema(schema)
+    
+    def test_recursion_through_child_values_allowed(self):
+        """Test that a reference cycle passing through a property or item compiles and validates."""
+        validator = compile_schema({
+            "$ref": "#/$defs/node",
+            "$defs": {"node": {"type": "array", "items": {"$ref": "#/$defs/node"}}}
+        })
+        
+        assert validator.errors([[[]], []]) == []
+        assert validator.errors([[1]]) == [("/0/0", "expected array")]
+    
+    def test_too_deep_schema_rejected(self):
+        """Test that a schema nested beyond the recursion limit is refused rather than crashing."""
+        schema = {}
+        for _ in range(5000):
+            schema = {"not": schema}
+        
+        with pytest.raises(SchemaDefinitionError):
+            compile_schema(schema)
+        with pytest.raises(SchemaDefinitionError):
+            CompiledSchema(schema)
+    
+    def test_too_deep_document_is_a_validation_error(self):
+        """Test that a document nested beyond the recursion limit is reported, not raised."""
+        validator = compile_schema({"$ref": "#/$defs/node", "$defs": {"node": {"items": {"$ref": "#/$defs/node"}}}})
+        document = []
+        for _ in range(5000):
+            document = [document]
+        
+        assert validator.errors(document) == [("", "is nested too deeply to validate")]
+    
+    def test_identical_schemas_share_a_validator(self):
+        """Test that equal schemas, in any key order, are compiled once."""
+        first = compile_schema({"type": "object", "required": ["a"]})
+        second = compile_schema({"required": ["a"], "type": "object"})
+        
+        assert first is second
+
+
+class TestSchemaRegistry:
+    """Tests for SchemaRegistry."""
+    
+    @pytest.mark.asyncio
+    async def test_schema_loaded_once_within_ttl(self):
+        """Test that the schema is read once and reused until it expires."""
+        registry = SchemaRegistry(ttl=60.0)
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(return_value=stored(SERVICE_SCHEMA))
+            
+            await registry.validate(APP_ID, {"host": "db", "port": 1})
+            with pytest.raises(ConfigValidationError):
+                await registry.validate(APP_ID, {"host": "db"})
+        
+        mock_repo.get.assert_called_once_with(APP_ID)
+        assert registry.stats()["rejections"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_no_schema_is_cached(self):
+        """Test that an application without a schema accepts anything and is not re-queried."""
+        registry = SchemaRegistry(ttl=60.0)
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(return_value=None)
+            
+            await registry.validate(APP_ID, {"anything": True})
+            await registry.validate(APP_ID, {"anything": False})
+        
+        mock_repo.get.assert_called_once()
+        assert registry.stats()["validations"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads(self):
+        """Test that a replaced schema applies after invalidate."""
+        registry = SchemaRegistry(ttl=60.0)
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(return_value=None)
+            await registry.validate(APP_ID, {})
+            
+            mock_repo.get = AsyncMock(return_value=stored({"required": ["a"]}, version=2))
+            registry.invalidate(APP_ID)
+            with pytest.raises(ConfigValidationError):
+                await registry.validate(APP_ID, {})
+    
+    @pytest.mark.asyncio
+    async def test_load_racing_invalidate_not_cached(self):
+        """Test that a load started before invalidate is neither joined nor cached."""
+        registry = SchemaRegistry(ttl=60.0)
+        started, release = asyncio.Event(), asyncio.Event()
+        
+        async def slow_get(application_id):
+            started.set()
+            await release.wait()
+            return None
+        
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(side_effect=slow_get)
+            stale = asyncio.create_task(registry.validate(APP_ID, {}))
+            await started.wait()
+            
+            mock_repo.get = AsyncMock(return_value=stored({"required": ["a"]}, version=2))
+            registry.invalidate(APP_ID)
+            with pytest.raises(ConfigValidationError):
+                await asyncio.wait_for(registry.validate(APP_ID, {}), 1.0)
+            release.set()
+            await stale
+            
+            with pytest.raises(ConfigValidationError):
+                await registry.validate(APP_ID, {})
+        
+        mock_repo.get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_loads_coalesce(self):
+        """Test that concurrent validations of a cold application share one query."""
+        registry = SchemaRegistry(ttl=60.0)
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(return_value=stored(SERVICE_SCHEMA))
+            
+            await asyncio.gather(*(registry.validate(APP_ID, {"host": "db", "port": 1}) for _ in range(5)))
+        
+        mock_repo.get.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_stored_schema_that_no_longer_compiles_is_ignored(self):
+        """Test that an uncompilable stored schema does not block writes."""
+        registry = SchemaRegistry(ttl=60.0)
+        with patch('config_service.services.config_schema.schema_repository') as mock_repo:
+            mock_repo.get = AsyncMock(return_value=stored({"type": "text"}))
+            
+            await registry.validate(APP_ID, {})
+        
+        assert registry.stats()["validations"] == 0
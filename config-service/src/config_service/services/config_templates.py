@@ -0,0 +1,298 @@
+"""Server-side ${variable} interpolation for configuration documents."""
+
+import functools
+import json
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Iterable, NamedTuple, Optional, Set, Tuple, Union
+from config_service.config import settings
+
+logger = logging.getLogger(__name__)
+
+Path = Tuple[str, ...]
+
+# $${ is an escaped literal "${"; any other "${" must open a well-formed reference
+TOKEN_PATTERN = re.compile(r"\$\$\{|\$\{([A-Za-z0-9_\-]+(?:\.[A-Za-z0-9_\-]+)*)\}|\$\{")
+
+
+class TemplateError(ValueError):
+    """Raised when a configuration document cannot be rendered."""
+
+
+class TemplateSyntaxError(TemplateError):
+    """Raised for a malformed ${...} reference."""
+
+
+class TemplateCycleError(TemplateError):
+    """Raised when template values reference each other in a loop."""
+
+
+class Template(NamedTuple):
+    """A compiled template: literal strings interleaved with variable paths."""
+    parts: Tuple[Union[str, Path], ...]
+    variables: FrozenSet[Path]
+
+    def render(self, lookup: Callable[[Path], Any]) -> Any:
+        """Render with lookup supplying each variable's value.
+        
+        A template that is exactly one reference keeps the referenced value's
+        type, so ``"${db.port}"`` renders to an int.
+        """
+        if len(self.parts) == 1 and isinstance(self.parts[0], tuple):
+            return lookup(self.parts[0])
+        return "".join(part if isinstance(part, str) else _to_text(lookup(part)) for part in self.parts)
+
+
+def _to_text(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    return json.dumps(value)
+
+
+def _format_path(path: Path) -> str:
+    return ".".join(path)
+
+
+@functools.lru_cache(maxsize=65536)
+def compile_template(text: str) -> Optional[Template]:
+    """Compile text into a Template, or return None if it contains no ${...} syntax.
+    
+    Compiled templates are cached by source text, so identical values across
+    configurations and re-renders are parsed once.
+    """
+    if "${" not in text:
+        return None
+    parts = []
+    variables = set()
+    literal = []
+    position = 0
+    for match in TOKEN_PATTERN.finditer(text):
+        literal.append(text[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if token == "$${":
+            literal.append("${")
+        elif match.group(1) is None:
+            raise TemplateSyntaxError(f"Malformed reference at offset {match.start()} in {text!r}")
+        else:
+            if any(literal):
+                parts.append("".join(literal))
+            literal = []
+            path = tuple(match.group(1).split("."))
+            parts.append(path)
+            variables.add(path)
+    literal.append(text[position:])
+    if any(literal):
+        parts.append("".join(literal))
+    return Template(parts=tuple(parts), variables=frozenset(variables))
+
+
+def validate_templates(config: Dict[str, Any]):
+    """Compile every string value in config, raising TemplateSyntaxError on the first malformed one."""
+    for _, value in _leaves(config, ()):
+        if isinstance(value, str):
+            compile_template(value)
+
+
+def _leaves(node: Dict[str, Any], prefix: Path) -> Iterable[Tuple[Path, Any]]:
+    """Yield (path, value) for every non-object value and every empty object."""
+    for key, value in node.items():
+        path = prefix + (key,)
+        if isinstance(value, dict) and value:
+            yield from _leaves(value, path)
+        else:
+            yield path, value
+
+
+# Placeholder for a key present on only one side of a diff
+_MISSING = object()
+
+
+def _is_tree(value: Any) -> bool:
+    return isinstance(value, dict) and bool(value)
+
+
+def _diff(old: Any, new: Any, prefix: Path, changed: Dict[Path, Any]):
+    """Record each leaf path that differs between two documents with its new value.
+    
+    Removed leaves map to _MISSING. Subtrees that are the same object are
+    skipped without being walked; resolved documents share untouched
+    subtrees, so this is proportional to what actually changed.
+    """
+    if old is new:
+        return
+    if _is_tree(old) and _is_tree(new):
+        for key in old.keys() | new.keys():
+            _diff(old.get(key, _MISSING), new.get(key, _MISSING), prefix + (key,), changed)
+        return
+    if not _is_tree(old) and not _is_tree(new) and type(old) is type(new) and old == new:
+        return
+    if _is_tree(old):
+        changed.update((path, _MISSING) for path, _ in _leaves(old, prefix))
+    elif old is not _MISSING and prefix:
+        changed[prefix] = _MISSING
+    if _is_tree(new):
+        changed.update(_leaves(new, prefix))
+    elif new is not _MISSING and prefix:
+        changed[prefix] = new
+
+
+class RenderedDocument:
+    """A configuration document with its templates compiled, rendered and dependency-indexed.
+    
+    Template values (string leaves containing ${...}) may reference any
+    other leaf by dotted path, including other templates. ``update`` takes
+    the next version of the source document and re-renders only templates
+    whose own text changed or that depend, directly or transitively, on a
+    changed value. Strings inside lists are not expanded.
+    """
+    
+    def __init__(self, source: Dict[str, Any]):
+        self.source: Dict[str, Any] = {}
+        self.output: Dict[str, Any] = {}
+        self.values_rendered = 0
+        self._leaves: Dict[Path, Any] = {}
+        self._templates: Dict[Path, Template] = {}
+        # variable path -> template paths that reference it
+        self._dependents: Dict[Path, Set[Path]] = {}
+        self._rendered: Dict[Path, Any] = {}
+        self._template_prefixes: Set[Path] = set()
+        self.update(source)
+    
+    def update(self, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Re-render against a new source document and return the new output."""
+        changed: Dict[Path, Any] = {}
+        _diff(self.source, source, (), changed)
+        for path, value in changed.items():
+            if value is _MISSING:
+                self._remove_leaf(path)
+            else:
+                self._set_leaf(path, value)
+        
+        for path in self._affected(changed.keys()):
+            self._rendered.pop(path, None)
+        self._template_prefixes = {path[:i] for path in self._templates for i in range(len(path))}
+        
+        self.source = source
+        self.output = self._assemble(source, ())
+        return self.output
+    
+    def _set_leaf(self, path: Path, value: Any):
+        self._remove_leaf(path)
+        self._leaves[path] = value
+        template = compile_template(value) if isinstance(value, str) else None
+        if template is not None:
+            self._templates[path] = template
+            for variable in template.variables:
+                self._dependents.setdefault(variable, set()).add(path)
+    
+    def _remove_leaf(self, path: Path):
+        self._leaves.pop(path, None)
+        template = self._templates.pop(path, None)
+        if template is not None:
+            for variable in template.variables:
+                dependents = self._dependents.get(variable)
+                if dependents is not None:
+                    dependents.discard(path)
+                    if not dependents:
+                        del self._dependents[variable]
+    
+    def _affected(self, changed: Iterable[Path]) -> Set[Path]:
+        """Return changed paths plus every template depending on them, transitively."""
+        affected = set(changed)
+        pending = list(affected)
+        while pending:
+            for dependent in self._dependents.get(pending.pop(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    pending.append(dependent)
+        return affected
+    
+    def _value(self, path: Path, visiting: Tuple[Path, ...]) -> Any:
+        """Return the rendered value at path, rendering it (and its inputs) if needed."""
+        if path in self._rendered:
+            return self._rendered[path]
+        template = self._templates.get(path)
+        if template is None:
+            if path in self._leaves:
+                return self._leaves[path]
+            if path in self._template_prefixes or any(leaf[:len(path)] == path for leaf in self._leaves):
+                raise TemplateError(f"${{{_format_path(path)}}} refers to an object, not a value")
+            raise TemplateError(f"${{{_format_path(path)}}} is not defined")
+        if path in visiting:
+            cycle = visiting[visiting.index(path):] + (path,)
+            raise TemplateCycleError("Circular template reference: " + " -> ".join(map(_format_path, cycle)))
+        
+        visiting = visiting + (path,)
+        value = template.render(lambda variable: self._value(variable, visiting))
+        self._rendered[path] = value
+        self.values_rendered += 1
+        return value
+    
+    def _assemble(self, node: Dict[str, Any], prefix: Path) -> Dict[str, Any]:
+        """Copy only the objects on the way to a template; share everything else with source."""
+        if prefix not in self._template_prefixes:
+            return node
+        assembled = dict(node)
+        for key, value in node.items():
+            path = prefix + (key,)
+            if path in self._templates:
+                assembled[key] = self._value(path, ())
+            elif isinstance(value, dict):
+                assembled[key] = self._assemble(value, path)
+        return assembled
+
+
+class ConfigRenderer:
+    """Renders resolved configurations, keeping one RenderedDocument per configuration.
+    
+    When given the same resolved document as last time the cached output is
+    returned untouched; when it changed, the previous RenderedDocument is
+    updated incrementally.
+    """
+    
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._documents: "OrderedDict[str, RenderedDocument]" = OrderedDict()
+        self._stats = {"hits": 0, "incremental": 0, "full": 0, "errors": 0}
+    
+    def render_document(self, key: str, source: Dict[str, Any]) -> Dict[str, Any]:
+        """Render source, reusing the previous rendering stored under key."""
+        document = self._documents.get(key)
+        try:
+            if document is None:
+                self._stats["full"] += 1
+                document = RenderedDocument(source)
+            elif document.source is source:
+                self._stats["hits"] += 1
+                self._documents.move_to_end(key)
+                return document.output
+            else:
+                self._stats["incremental"] += 1
+                document.update(source)
+        except TemplateError:
+            # A failed update leaves the document half-applied; start over next time
+            self._documents.pop(key, None)
+            self._stats["errors"] += 1
+            raise
+        
+        self._documents[key] = document
+        self._documents.move_to_end(key)
+        while len(self._documents) > self.max_entries:
+            self._documents.popitem(last=False)
+        return document.output
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/incremental/full render counters."""
+        return {
+            "entries": len(self._documents),
+            "values_rendered": sum(d.values_rendered for d in self._documents.values()),
+            **self._stats
+        }
+
+
+# Global renderer instance
+config_renderer = ConfigRenderer(max_entries=settings.config_cache_max_entries)
@@ -0,0 +1,128 @@
+"""Tests for configuration templating."""
+
+import pytest
+from config_service.services.config_templates import (
+    ConfigRenderer, RenderedDocument, TemplateCycleError, TemplateError, TemplateSyntaxError,
+    compile_template, validate_templates
+)
+
+
+def test_compile_plain_string():
+    """Test that strings without references are not templates."""
+    assert compile_template("localhost") is None
+
+
+def test_compile_and_render():
+    """Test literal and variable parts, escapes and type-preserving single references."""
+    template = compile_template("${db.host}:${db.port} $${literal}")
+    values = {("db", "host"): "pg", ("db", "port"): 5432}
+    
+    assert template.variables == frozenset({("db", "host"), ("db", "port")})
+    assert template.render(values.__getitem__) == "pg:5432 ${literal}"
+    assert compile_template("${db.port}").render(values.__getitem__) == 5432
+
+
+def test_compile_is_cached():
+    """Test that identical template text is compiled once."""
+    assert compile_template("${a}-${b}") is compile_template("${a}-${b}")
+
+
+@pytest.mark.parametrize("text", ["${", "${unterminated", "${}", "${bad name}"])
+def test_malformed_references(text):
+    """Test that malformed references are rejected."""
+    with pytest.raises(TemplateSyntaxError):
+        compile_template(text)
+
+
+def test_validate_templates_walks_nested_values():
+    """Test that validation reaches nested string values."""
+    validate_templates({"a": {"b": "${ok}"}, "c": [1, "${"]})
+    with pytest.raises(TemplateSyntaxError):
+        validate_templates({"a": {"b": "${"}})
+
+
+def test_render_document():
+    """Test rendering nested references, including templates referencing templates."""
+    source = {
+        "db": {"host": "pg", "port": 5432, "url": "postgres://${db.host}:${db.port}/app"},
+        "dsn": "${db.url}?sslmode=require",
+        "untouched": {"x": 1}
+    }
+    
+    output = RenderedDocument(source).output
+    
+    assert output["db"] == {"host": "pg", "port": 5432, "url": "postgres://pg:5432/app"}
+    assert output["dsn"] == "postgres://pg:5432/app?sslmode=require"
+    assert output["untouched"] is source["untouched"]
+    assert source["db"]["url"] == "postgres://${db.host}:${db.port}/app"
+
+
+def test_update_rerenders_only_dependents():
+    """Test that changing a variable re-renders only the values that depend on it."""
+    source = {"host": "a", "port": 1, "url": "${host}:${port}", "name": "${app}", "app": "svc"}
+    document = RenderedDocument(source)
+    assert document.values_rendered == 2
+    
+    output = document.update({**source, "host": "b"})
+    
+    assert output["url"] == "b:1"
+    assert output["name"] == "svc"
+    assert document.values_rendered == 3
+
+
+def test_update_with_same_subtrees_skips_diff():
+    """Test that shared subtrees are not re-rendered."""
+    shared = {"host": "pg", "url": "${shared.host}"}
+    document = RenderedDocument({"shared": shared, "flag": True})
+    
+    output = document.update({"shared": shared, "flag": False})
+    
+    assert output == {"shared": {"host": "pg", "url": "pg"}, "flag": False}
+    assert document.values_rendered == 1
+
+
+def test_update_adds_and_removes_leaves():
+    """Test that added templates render and removed variables fail dependents."""
+    document = RenderedDocument({"a": "1"})
+    
+    assert document.update({"a": "1", "b": "${a}"})["b"] == "1"
+    with pytest.raises(TemplateError, match="not defined"):
+        document.update({"b": "${a}"})
+
+
+def test_cycle_detected():
+    """Test that circular references are reported with the cycle path."""
+    with pytest.raises(TemplateCycleError, match="a -> b -> a"):
+        RenderedDocument({"a": "${b}", "b": "${a}"})
+
+
+def test_reference_to_object_rejected():
+    """Test that referencing an object rather than a value is an error."""
+    with pytest.raises(TemplateError, match="refers to an object"):
+        RenderedDocument({"db": {"host": "pg"}, "x": "${db}"})
+
+
+def test_renderer_reuses_output_for_unchanged_source():
+    """Test that the same resolved document renders once."""
+    config = {"host": "pg", "url": "${host}"}
+    renderer = ConfigRenderer()
+    
+    first = renderer.render_document("C", config)
+    second = renderer.render_document("C", config)
+    
+    assert first == {"host": "pg", "url": "pg"}
+    assert second is first
+    assert renderer.stats()["hits"] == 1
+    assert renderer.stats()["full"] == 1
+
+
+def test_renderer_drops_document_after_error():
+    """Test that a failed render is not cached."""
+    renderer = ConfigRenderer()
+    renderer.render_document("C", {"a": "1", "b": "${a}"})
+    
+    with pytest.raises(TemplateError):
+        renderer.render_document("C", {"b": "${a}"})
+    
+    assert renderer.stats()["entries"] == 0
+    assert renderer.stats()["errors"] == 1
@@ -0,0 +1,279 @@
+"""PostgreSQL-backed background jobs with leases, retries and cancellation."""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from config_service.config import settings
+from config_service.models.job import Job
+from config_service.repositories.job_repository import job_repository
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelledError(Exception):
+    """Raised inside a handler once its job was cancelled or taken over by another worker."""
+
+
+class JobContext:
+    """What a running handler sees of its job: the payload and a progress dict.
+    
+    ``progress`` is written to the jobs table on every heartbeat, so
+    updating it is free; ``check_cancelled`` is the handler's cue to stop.
+    """
+    
+    __slots__ = ("job", "progress", "cancelled", "lost")
+    
+    def __init__(self, job: Job):
+        self.job = job
+        # Counters carry over from earlier attempts of the same job
+        self.progress: Dict[str, Any] = dict(job.progress or {})
+        self.cancelled = False
+        self.lost = False
+    
+    @property
+    def payload(self) -> Dict[str, Any]:
+        """The arguments the job was submitted with."""
+        return self.job.payload
+    
+    def increment(self, counter: str, amount: int = 1):
+        """Add to a progress counter, then stop if the job was cancelled."""
+        self.progress[counter] = self.progress.get(counter, 0) + amount
+        self.check_cancelled()
+    
+    def check_cancelled(self):
+        """Raise JobCancelledError if the job should stop."""
+        if self.cancelled:
+            raise JobCancelledError(f"Job {self.job.id} was cancelled")
+
+
+JobHandler = Callable[[JobContext], Awaitable[Optional[Dict[str, Any]]]]
+
+
+class JobWorker:
+    """Claims jobs from the jobs table and runs their registered handlers.
+    
+    Every replica runs one worker; ``FOR UPDATE SKIP LOCKED`` hands each
+    job to exactly one of them. A claimed job is leased for
+    ``lease_seconds`` and the lease is renewed by heartbeats, so the job
+    of a crashed replica becomes claimable again once its lease expires.
+    Failed attempts are retried with exponential backoff up to the job's
+    ``max_attempts``.
+    """
+    
+    def __init__(
+        self,
+        worker_id: Optional[str] = None,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        heartbeat_interval: float = 5.0,
+        lease_seconds: float = 60.0,
+        max_attempts: int = 3,
+        retry_delay: float = 5.0,
+        retention: float = 7 * 24 * 3600
+    ):
+        # The default names the process that calls start(), not the one that imported this
+        # module; preloaded server workers are forked from the latter and would share it
+        self._configured_worker_id = worker_id
+        self.worker_id = worker_id
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.retention = retention
+        self._handlers: Dict[str, JobHandler] = {}
+        self._maintenance: List[Callable[[], Awaitable[Any]]] = [self._purge_jobs]
+        self._running: Dict[str, Tuple[asyncio.Task, JobContext]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._stats = {"claimed": 0, "completed": 0, "retried": 0, "failed": 0, "cancelled": 0, "lost": 0}
+    
+    def register(self, kind: str, handler: JobHandler):
+        """Make jobs of this kind runnable by this worker."""
+        self._handlers[kind] = handler
+    
+    def register_maintenance(self, task: Callable[[], Awaitable[Any]]):
+        """Run task about once an hour, such as purging old rows; failures are logged."""
+        self._maintenance.append(task)
+    
+    async def submit(self, kind: str, payload: Dict[str, Any], max_attempts: Optional[int] = None) -> Job:
+        """Enqueue a job; any replica's worker may run it."""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = await job_repository.create(kind, payload, max_attempts or self.max_attempts)
+        if self._wake is not None:
+            self._wake.set()
+        return job
+    
+    def start(self):
+        """Start polling for jobs on the running event loop."""
+        self.worker_id = self._configured_worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Job worker %s started", self.worker_id)
+    
+    async def stop(self):
+        """Stop claiming jobs and hand running ones back to the queue."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        await self._task
+        self._task = None
+        
+        tasks = [task for task, _ in self._running.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info("Job worker %s stopped", self.worker_id)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return the number of running jobs and outcome counters."""
+        return {"running": len(self._running), **self._stats}
+    
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        next_heartbeat = loop.time() + self.heartbeat_interval
+        next_maintenance = loop.time()
+        while not self._stopping:
+            self._wake.clear()
+            try:
+                await self._claim()
+                if loop.time() >= next_heartbeat:
+                    next_heartbeat = loop.time() + self.heartbeat_interval
+                    await self._heartbeat()
+                if loop.time() >= next_maintenance:
+                    next_maintenance = loop.time() + 3600
+                    await self._run_maintenance()
+            except Exception as e:
+                # The database may be briefly unavailable; leases cover anything missed
+                logger.warning("Job worker poll failed: %s", e)
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+    
+    async def _run_maintenance(self):
+        for task in self._maintenance:
+            try:
+                await task()
+            except Exception as e:
+                logger.warning("Maintenance task %s failed: %s", getattr(task, "__name__", task), e)
+    
+    async def _purge_jobs(self):
+        purged = await job_repository.delete_finished(self.retention)
+        if purged:
+            logger.info("Purged %s finished jobs", purged)
+    
+    async def _claim(self):
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return
+        jobs = await job_repository.claim(self.worker_id, list(self._handlers), free, self.lease_seconds)
+        for job in jobs:
+            self._stats["claimed"] += 1
+            context = JobContext(job)
+            task = asyncio.get_running_loop().create_task(self._execute(context))
+            self._running[job.id] = (task, context)
+            task.add_done_callback(lambda _, job_id=job.id: self._finished(job_id))
+    
+    def _finished(self, job_id: str):
+        self._running.pop(job_id, None)
+        if self._wake is not None:
+            # A slot is free: look for the next job now rather than at the next poll
+            self._wake.set()
+    
+    async def _heartbeat(self):
+        for job_id, (_, context) in list(self._running.items()):
+            cancel_requested = await job_repository.heartbeat(
+                job_id, self.worker_id, dict(context.progress), self.lease_seconds
+            )
+            if cancel_requested is None:
+                # Our lease expired and another worker owns the job now
+                context.lost = True
+                context.cancelled = True
+            elif cancel_requested:
+                context.cancelled = True
+    
+    async def _execute(self, context: JobContext):
+        job = context.job
+        if job.attempts > job.max_attempts:
+            # Only reachable when earlier attempts died without releasing their lease
+            await self._settle(job, "failed", context, error=f"Gave up after {job.max_attempts} attempts")
+            return
+        if job.cancel_requested:
+            # Cancelled while its previous worker held it
+            await self._settle(job, "cancelled", context)
+            return
+        
+        try:
+            result = await self._handlers[job.kind](context)
+        except JobCancelledError:
+            if context.lost:
+                self._stats["lost"] += 1
+                logger.warning("Job %s was taken over by another worker", job.id)
+            else:
+                await self._settle(job, "cancelled", context)
+        except asyncio.CancelledError:
+            # Shutdown: give the job back without charging it an attempt
+            await self._requeue(job, context, 0.0, None, refund_attempt=True)
+            raise
+        except Exception as e:
+            if job.attempts < job.max_attempts:
+                delay = self.retry_delay * 2 ** (job.attempts - 1)
+                logger.warning("Job %s attempt %s failed, retrying in %ss: %s", job.id, job.attempts, delay, e)
+                self._stats["retried"] += 1
+                await self._requeue(job, context, delay, str(e))
+            else:
+                logger.error("Job %s failed: %s", job.id, e, exc_info=True)
+                await self._settle(job, "failed", context, error=str(e))
+        else:
+            await self._settle(job, "completed", context, result=result)
+    
+    async def _settle(
+        self,
+        job: Job,
+        status: str,
+        context: JobContext,
+        result: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None
+    ):
+        self._stats[status] += 1
+        try:
+            await job_repository.finish(job.id, self.worker_id, status, dict(context.progress), result, error)
+        except Exception as e:
+            # The lease runs out and another attempt records the outcome
+            logger.error("Failed to record job %s as %s: %s", job.id, status, e)
+        logger.info("Job %s (%s) %s", job.id, job.kind, status)
+    
+    async def _requeue(
+        self,
+        job: Job,
+        context: JobContext,
+        delay: float,
+        error: Optional[str],
+        refund_attempt: bool = False
+    ):
+        try:
+            await job_repository.requeue(
+                job.id, self.worker_id, dict(context.progress), delay, error, refund_attempt
+            )
+        except Exception as e:
+            logger.error("Failed to requeue job %s: %s", job.id, e)
+
+
+# Global job worker instance
+job_worker = JobWorker(
+    concurrency=settings.job_worker_concurrency,
+    poll_interval=settings.job_poll_interval,
+    heartbeat_interval=settings.job_heartbeat_interval,
+    lease_seconds=settings.job_lease_seconds,
+    max_attempts=settings.job_max_attempts,
+    retry_delay=settings.job_retry_delay,
+    retention=settings.job_retention
+)
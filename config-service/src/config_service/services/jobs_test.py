@@ -0,0 +1,180 @@
+"""Tests for the background job worker."""
+
+import asyncio
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from config_service.models.job import Job
+from config_service.services.jobs import JobContext, JobWorker
+
+JOB_ID = "01HKQJQJQJQJQJQJQJQJQJQJQJ"
+
+
+def make_job(**overrides) -> Job:
+    """Build a claimed job of kind "test"."""
+    now = datetime.now()
+    fields = {
+        "id": JOB_ID, "kind": "test", "status": "running", "payload": {"n": 1}, "progress": {},
+        "result": None, "error": None, "attempts": 1, "max_attempts": 3, "cancel_requested": False,
+        "run_after": now, "created_at": now, "updated_at": now, "finished_at": None
+    }
+    fields.update(overrides)
+    return Job.from_row(fields)
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    """Mock job repository."""
+    mock = MagicMock()
+    mock.finish = AsyncMock(return_value=True)
+    mock.requeue = AsyncMock(return_value=True)
+    monkeypatch.setattr('config_service.services.jobs.job_repository', mock)
+    return mock
+
+
+@pytest.fixture
+def worker():
+    """Worker with one registered kind whose behaviour tests set via worker.behaviour."""
+    worker = JobWorker(worker_id="w1", retry_delay=2.0)
+    
+    async def handler(context: JobContext):
+        return await worker.behaviour(context)
+    
+    worker.register("test", handler)
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_completed_job_records_result(repository, worker):
+    """Test that a handler's return value and progress are stored."""
+    async def behaviour(context):
+        context.increment("done", 5)
+        return {"ok": True}
+    worker.behaviour = behaviour
+    
+    await worker._execute(JobContext(make_job()))
+    
+    repository.finish.assert_called_once_with(JOB_ID, "w1", "completed", {"done": 5}, {"ok": True}, None)
+    assert worker.stats()["completed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_attempt_is_retried_with_backoff(repository, worker):
+    """Test that a failure before max_attempts requeues with exponential delay."""
+    worker.behaviour = AsyncMock(side_effect=RuntimeError("boom"))
+    
+    await worker._execute(JobContext(make_job(attempts=2)))
+    
+    repository.requeue.assert_called_once_with(JOB_ID, "w1", {}, 4.0, "boom", False)
+    repository.finish.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_last_attempt_fails_the_job(repository, worker):
+    """Test that the final failed attempt marks the job failed."""
+    worker.behaviour = AsyncMock(side_effect=RuntimeError("boom"))
+    
+    await worker._execute(JobContext(make_job(attempts=3)))
+    
+    repository.finish.assert_called_once_with(JOB_ID, "w1", "failed", {}, None, "boom")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_job(repository, worker):
+    """Test that a handler stopping on cancellation marks the job cancelled."""
+    async def behaviour(context):
+        context.cancelled = True
+        context.increment("done")
+    worker.behaviour = behaviour
+    
+    await worker._execute(JobContext(make_job()))
+    
+    assert repository.finish.call_args[0][2] == "cancelled"
+
+
+@pytest.mark.asyncio
+async def test_lost_lease_records_nothing(repository, worker):
+    """Test that a job taken over by another worker is left to that worker."""
+    async def behaviour(context):
+        context.lost = context.cancelled = True
+        context.check_cancelled()
+    worker.behaviour = behaviour
+    
+    await worker._execute(JobContext(make_job()))
+    
+    repository.finish.assert_not_called()
+    repository.requeue.assert_not_called()
+    assert worker.stats()["lost"] == 1
+
+
+@pytest.mark.asyncio
+async def test_exhausted_or_cancelled_claims_are_not_run(repository, worker):
+    """Test that jobs whose previous worker died are settled without running them again."""
+    worker.behaviour = AsyncMock()
+    
+    await worker._execute(JobContext(make_job(attempts=4)))
+    await worker._execute(JobContext(make_job(cancel_requested=True)))
+    
+    worker.behaviour.assert_not_called()
+    assert [c[0][2] for c in repository.finish.call_args_list] == ["failed", "cancelled"]
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_flags_cancelled_and_lost_jobs(repository, worker):
+    """Test that heartbeats deliver cancellation and detect lost leases."""
+    cancelled, lost = JobContext(make_job()), JobContext(make_job(id="01HKQJQJQJQJQJQJQJQJQJQJQ2"))
+    worker._running = {cancelled.job.id: (None, cancelled), lost.job.id: (None, lost)}
+    repository.heartbeat = AsyncMock(side_effect=[True, None])
+    
+    await worker._heartbeat()
+    
+    assert cancelled.cancelled and not cancelled.lost
+    assert lost.cancelled and lost.lost
+
+
+@pytest.mark.asyncio
+async def test_worker_claims_runs_and_stops(repository, worker):
+    """Test the poll loop end to end: claim only registered kinds, run, and requeue on shutdown."""
+    started = asyncio.Event()
+    
+    async def behaviour(context):
+        started.set()
+        await asyncio.sleep(10)
+    worker.behaviour = behaviour
+    repository.claim = AsyncMock(side_effect=[[make_job()], [], [], []])
+    repository.delete_finished = AsyncMock(return_value=0)
+    
+    worker.start()
+    await asyncio.wait_for(started.wait(), 1)
+    assert worker.stats()["running"] == 1
+    await worker.stop()
+    
+    assert repository.claim.call_args_list[0][0] == ("w1", ["test"], 2, 60.0)
+    repository.requeue.assert_called_once_with(JOB_ID, "w1", {}, 0.0, None, True)
+    assert worker.stats()["running"] == 0
+
+
+@pytest.mark.asyncio
+async def test_submit_rejects_unknown_kind(repository, worker):
+    """Test that only registered kinds can be submitted."""
+    with pytest.raises(ValueError):
+        await worker.submit("unknown", {})
+    
+    repository.create = AsyncMock(return_value=make_job(status="pending"))
+    job = await worker.submit("test", {"n": 1})
+    
+    assert job.status == "pending"
+    repository.create.assert_called_once_with("test", {"n": 1}, 3)
+
+
+@pytest.mark.asyncio
+async def test_default_worker_id_names_the_starting_process(repository, monkeypatch):
+    """Test that a worker created before a fork takes its id from the process that starts it."""
+    repository.claim = AsyncMock(return_value=[])
+    worker = JobWorker()
+    monkeypatch.setattr('config_service.services.jobs.os.getpid', lambda: 4242)
+    
+    worker.start()
+    await worker.stop()
+    
+    assert worker.worker_id.endswith(":4242")
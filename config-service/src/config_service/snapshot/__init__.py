@@ -0,0 +1,13 @@
+"""Read-only snapshot mode.
+
+A snapshot is one file holding every application and configuration,
+indexed for lookups straight from a memory map. Produce one from the
+database with::
+
+    python -m config_service.snapshot /var/lib/config-service/snapshot.bin
+
+or download it from ``GET /admin/snapshot``. An instance started with
+``SNAPSHOT_PATH`` pointing at that file serves reads from it without
+PostgreSQL, refuses writes, and switches to a new file as soon as one is
+renamed over the old.
+"""
@@ -0,0 +1,30 @@
+"""Export the database to a snapshot file.
+
+    python -m config_service.snapshot /var/lib/config-service/snapshot.bin
+
+Needs DATABASE_URL. The file is replaced atomically, so instances serving
+it pick up the new snapshot on their next reload check.
+"""
+
+import argparse
+import asyncio
+from config_service.database.connection import db_manager
+from config_service.snapshot.export import export_snapshot
+
+
+async def main(path: str):
+    db_manager.initialize()
+    try:
+        exported = await export_snapshot(path)
+    finally:
+        db_manager.close()
+    print(
+        f"Wrote {exported['applications']} applications and {exported['configurations']} configurations "
+        f"to {path} ({exported['bytes']} bytes)"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the database to a snapshot file")
+    parser.add_argument("path", help="Snapshot file to write")
+    asyncio.run(main(parser.parse_args().path))
@@ -0,0 +1,13 @@
+"""Producing snapshot files from the database."""
+
+import asyncio
+from typing import Any, Dict
+from config_service.repositories.export_repository import export_repository
+from config_service.snapshot.format import write_snapshot
+
+
+async def export_snapshot(path) -> Dict[str, Any]:
+    """Write the current database contents to path as a snapshot; returns counts and size."""
+    applications, configurations = await export_repository.dump()
+    size = await asyncio.to_thread(write_snapshot, path, applications, configurations)
+    return {"applications": len(applications), "configurations": len(configurations), "bytes": size}
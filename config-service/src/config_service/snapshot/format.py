@@ -0,0 +1,218 @@
+"""Indexed snapshot file format, read through a memory map.
+
+Layout (little-endian)::
+
+    header | application records | configuration records
+           | application id table | configuration id table
+           | names | name index
+
+Records are compact JSON documents. Each id table is an open-addressing
+hash table of fixed-size slots (id, record length, record offset) with
+``capacity`` a power of two at least twice the entry count, probed
+linearly from ``crc32(id)``, so a lookup reads one or two slots and one
+record. The name index lists (name offset, name length, record offset,
+record length) entries sorted by (name, id); it gives the catalogue order
+and a binary-searchable by-name lookup that only touches names.
+
+Only the pages a request touches are read from disk, so opening a
+snapshot costs one header read whatever its size.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+MAGIC = b"CFGSNAP\x01"
+# magic, created_at, application count, configuration count,
+# application table offset/capacity, configuration table offset/capacity, name index offset, file size
+HEADER = struct.Struct("<8sdIIQIQIQQ")
+# id, record length (0 marks an empty slot), record offset
+SLOT = struct.Struct("<26sIQ")
+# name offset, name length, record offset, record length
+NAME_ENTRY = struct.Struct("<QIQI")
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a file is not a complete snapshot."""
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a snapshot")
+
+
+def _encode_record(row: Dict[str, Any]) -> bytes:
+    return json.dumps(row, separators=(",", ":"), default=_encode_value).encode("utf-8")
+
+
+def _capacity(count: int) -> int:
+    capacity = 2
+    while capacity < 2 * count:
+        capacity *= 2
+    return capacity
+
+
+def _hash_table(entries: List[Tuple[bytes, int, int]]) -> Tuple[bytearray, int]:
+    capacity = _capacity(len(entries))
+    table = bytearray(SLOT.size * capacity)
+    mask = capacity - 1
+    for key, offset, length in entries:
+        slot = zlib.crc32(key) & mask
+        while SLOT.unpack_from(table, slot * SLOT.size)[1]:
+            slot = (slot + 1) & mask
+        SLOT.pack_into(table, slot * SLOT.size, key, length, offset)
+    return table, capacity
+
+
+def write_snapshot(path, applications: Iterable[Dict[str, Any]], configurations: Iterable[Dict[str, Any]]) -> int:
+    """Write a snapshot to path and return its size in bytes.
+
+    Applications need ``configuration_ids``. The file is written next to
+    path and renamed over it, so readers only ever see complete snapshots.
+    """
+    data = bytearray(HEADER.size)
+    application_entries, configuration_entries, named = [], [], []
+    for row in applications:
+        record = _encode_record(row)
+        application_entries.append((row["id"].encode("ascii"), len(data), len(record)))
+        named.append((row["name"], row["id"], len(data), len(record)))
+        data += record
+    for row in configurations:
+        record = _encode_record(row)
+        configuration_entries.append((row["id"].encode("ascii"), len(data), len(record)))
+        data += record
+
+    application_table, application_capacity = _hash_table(application_entries)
+    application_table_offset = len(data)
+    data += application_table
+    configuration_table, configuration_capacity = _hash_table(configuration_entries)
+    configuration_table_offset = len(data)
+    data += configuration_table
+
+    named.sort()
+    name_offsets = []
+    for name, _, _, _ in named:
+        encoded = name.encode("utf-8")
+        name_offsets.append((len(data), len(encoded)))
+        data += encoded
+    name_index_offset = len(data)
+    for (name_offset, name_length), (_, _, record_offset, record_length) in zip(name_offsets, named):
+        data += NAME_ENTRY.pack(name_offset, name_length, record_offset, record_length)
+
+    HEADER.pack_into(
+        data, 0, MAGIC, time.time(), len(application_entries), len(configuration_entries),
+        application_table_offset, application_capacity, configuration_table_offset, configuration_capacity,
+        name_index_offset, len(data)
+    )
+
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+    return len(data)
+
+
+class SnapshotReader:
+    """Read-only view of one snapshot file through a memory map.
+
+    Lookups return freshly decoded dicts, never views into the map, so the
+    reader can be closed as soon as a newer snapshot replaces it.
+    """
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotFormatError(f"{path} is empty") from e
+        try:
+            if len(self._map) < HEADER.size:
+                raise SnapshotFormatError(f"{path} is too short to be a snapshot")
+            (
+                magic, self.created_at, self.application_count, self.configuration_count,
+                self._application_table, self._application_capacity,
+                self._configuration_table, self._configuration_capacity,
+                self._name_index, size
+            ) = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise SnapshotFormatError(f"{path} is not a snapshot file")
+            if size != len(self._map):
+                raise SnapshotFormatError(f"{path} is truncated ({len(self._map)} of {size} bytes)")
+        except SnapshotFormatError:
+            self._map.close()
+            raise
+        self.size = size
+
+    def application(self, app_id: str) -> Optional[Dict[str, Any]]:
+        """Return the application record with app_id, or None."""
+        return self._lookup(self._application_table, self._application_capacity, app_id)
+
+    def configuration(self, config_id: str) -> Optional[Dict[str, Any]]:
+        """Return the configuration record with config_id, or None."""
+        return self._lookup(self._configuration_table, self._configuration_capacity, config_id)
+
+    def application_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the application record named name, or None."""
+        low, high = 0, self.application_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._name(middle) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.application_count and self._name(low) == name:
+            _, _, record_offset, record_length = NAME_ENTRY.unpack_from(
+                self._map, self._name_index + low * NAME_ENTRY.size
+            )
+            return self._record(record_offset, record_length)
+        return None
+
+    def applications(self) -> Iterator[Dict[str, Any]]:
+        """Yield every application record, ordered by name."""
+        for position in range(self.application_count):
+            _, _, record_offset, record_length = NAME_ENTRY.unpack_from(
+                self._map, self._name_index + position * NAME_ENTRY.size
+            )
+            yield self._record(record_offset, record_length)
+
+    def close(self):
+        """Unmap the file."""
+        self._map.close()
+
+    def _lookup(self, table: int, capacity: int, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            encoded = key.encode("ascii")
+        except UnicodeEncodeError:
+            return None
+        mask = capacity - 1
+        slot = zlib.crc32(encoded) & mask
+        for _ in range(capacity):
+            slot_id, length, offset = SLOT.unpack_from(self._map, table + slot * SLOT.size)
+            if not length:
+                return None
+            if slot_id.rstrip(b"\0") == encoded:
+                return self._record(offset, length)
+            slot = (slot + 1) & mask
+        return None
+
+    def _name(self, position: int) -> str:
+        name_offset, name_length, _, _ = NAME_ENTRY.unpack_from(self._map, self._name_index + position * NAME_ENTRY.size)
+        return self._map[name_offset:name_offset + name_length].decode("utf-8")
+
+    def _record(self, offset: int, length: int) -> Dict[str, Any]:
+        return json.loads(self._map[offset:offset + length])
@@ -0,0 +1,121 @@
+"""Tests for the snapshot file format."""
+
+import os
+from datetime import datetime
+import pytest
+from config_service.snapshot.format import SnapshotFormatError, SnapshotReader, write_snapshot
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def application(app_id: str, name: str, configuration_ids=()):
+    """Build an application row as the export query returns it."""
+    return {
+        "id": app_id, "name": name, "comments": None, "created_at": NOW, "updated_at": NOW,
+        "version": 1, "configuration_ids": list(configuration_ids)
+    }
+
+
+def configuration(config_id: str, app_id: str, config, parent_ids=()):
+    """Build a configuration row as the export query returns it."""
+    return {
+        "id": config_id, "application_id": app_id, "name": config_id.lower(), "comments": None,
+        "config": config, "parent_ids": list(parent_ids), "created_at": NOW, "updated_at": NOW, "version": 1
+    }
+
+
+def ulid(n: int, prefix: str = "01HKQJQJQJQJQJQJ") -> str:
+    """A valid-looking 26 character id numbered n."""
+    return f"{prefix}{n:010d}"
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    """A snapshot with 500 applications, one configuration each."""
+    path = tmp_path / "snapshot.bin"
+    applications = [application(ulid(n), f"app-{n:04d}", [ulid(n, "01HKQJQJQJQJQJQC")]) for n in range(500)]
+    configurations = [configuration(ulid(n, "01HKQJQJQJQJQJQC"), ulid(n), {"n": n}) for n in range(500)]
+    write_snapshot(path, reversed(applications), configurations)
+    return path
+
+
+def test_lookup_by_id(snapshot_path):
+    """Test that every record is found by id and unknown ids are not."""
+    reader = SnapshotReader(snapshot_path)
+
+    for n in range(500):
+        assert reader.application(ulid(n))["name"] == f"app-{n:04d}"
+        assert reader.configuration(ulid(n, "01HKQJQJQJQJQJQC"))["config"] == {"n": n}
+    assert reader.application(ulid(500)) is None
+    assert reader.configuration(ulid(0)) is None
+    assert reader.application("not-an-id-é") is None
+    reader.close()
+
+
+def test_records_keep_database_values(snapshot_path):
+    """Test that records round-trip, with timestamps as ISO strings."""
+    reader = SnapshotReader(snapshot_path)
+
+    record = reader.application(ulid(7))
+
+    assert record == {
+        "id": ulid(7), "name": "app-0007", "comments": None, "created_at": NOW.isoformat(),
+        "updated_at": NOW.isoformat(), "version": 1, "configuration_ids": [ulid(7, "01HKQJQJQJQJQJQC")]
+    }
+    reader.close()
+
+
+def test_name_index(snapshot_path):
+    """Test by-name lookups and name-ordered iteration."""
+    reader = SnapshotReader(snapshot_path)
+
+    assert reader.application_by_name("app-0123")["id"] == ulid(123)
+    assert reader.application_by_name("app-9999") is None
+    assert reader.application_by_name("") is None
+    names = [record["name"] for record in reader.applications()]
+    assert names == sorted(names) and len(names) == 500
+    reader.close()
+
+
+def test_empty_snapshot(tmp_path):
+    """Test that a snapshot without data is valid."""
+    path = tmp_path / "empty.bin"
+    write_snapshot(path, [], [])
+    reader = SnapshotReader(path)
+
+    assert reader.application_count == 0
+    assert reader.application(ulid(1)) is None
+    assert reader.application_by_name("x") is None
+    assert list(reader.applications()) == []
+    reader.close()
+
+
+def test_write_replaces_atomically(snapshot_path):
+    """Test that rewriting leaves no temporary files and a reader of the old file keeps working."""
+    reader = SnapshotReader(snapshot_path)
+
+    write_snapshot(snapshot_path, [application(ulid(1), "only")], [])
+
+    assert os.listdir(snapshot_path.parent) == ["snapshot.bin"]
+    assert reader.application(ulid(300))["name"] == "app-0300"
+    assert SnapshotReader(snapshot_path).application_count == 1
+    reader.close()
+
+
+@pytest.mark.parametrize("content", [b"", b"short", b"NOTASNAP" + bytes(80)])
+def test_rejects_invalid_files(tmp_path, content):
+    """Test that empty, short and foreign files are refused."""
+    path = tmp_path / "bad.bin"
+    path.write_bytes(content)
+
+    with pytest.raises(SnapshotFormatError):
+        SnapshotReader(path)
+
+
+def test_rejects_truncated_file(snapshot_path):
+    """Test that a partially copied snapshot is refused."""
+    data = snapshot_path.read_bytes()
+    snapshot_path.write_bytes(data[:-10])
+
+    with pytest.raises(SnapshotFormatError, match="truncated"):
+        SnapshotReader(snapshot_path)
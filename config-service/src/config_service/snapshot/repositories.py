@@ -0,0 +1,171 @@
+"""Read-only repositories backed by the current snapshot file."""
+
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, List, Optional, Tuple
+from config_service.models.application import Application, ApplicationMatch, ApplicationWithConfigs
+from config_service.models.configuration import Configuration
+from config_service.models.fields import Fields, sparse_model
+from config_service.snapshot.store import SnapshotStore
+
+LINEAGE_FIELDS = ("id", "application_id", "name", "config", "parent_ids")
+
+
+class ReadOnlySnapshotError(RuntimeError):
+    """Raised by write methods; snapshot mode serves reads only."""
+
+
+def _row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Turn a snapshot record back into what the database would have returned."""
+    record["created_at"] = datetime.fromisoformat(record["created_at"])
+    record["updated_at"] = datetime.fromisoformat(record["updated_at"])
+    return record
+
+
+def _sparse(model: type, fields: Tuple[str, ...], record: Dict[str, Any]) -> Any:
+    """Project a record onto the selected fields; the record is decoded whole either way."""
+    row = _row(record) if "created_at" in fields or "updated_at" in fields else record
+    return sparse_model(model, fields).model_construct(**{name: row[name] for name in fields})
+
+
+class SnapshotApplicationRepository:
+    """Application reads served from the snapshot, with ApplicationRepository's read interface."""
+
+    def __init__(self, store: SnapshotStore):
+        self.store = store
+
+    def read_stats(self) -> Dict[str, Any]:
+        """Nothing to coalesce; reads are served from the memory map."""
+        return {}
+
+    async def get_by_id(self, app_id: str) -> Optional[Application]:
+        """Get application by ID."""
+        record = self.store.reader.application(app_id)
+        if record is None:
+            return None
+        del record["configuration_ids"]
+        return Application.from_row(_row(record))
+
+    async def get_by_id_with_configs(self, app_id: str, fields: Fields = None) -> Optional[ApplicationWithConfigs]:
+        """Get application by ID including related configuration IDs, optionally only the given fields."""
+        record = self.store.reader.application(app_id)
+        if record is None:
+            return None
+        if fields is not None:
+            return _sparse(ApplicationWithConfigs, fields, record)
+        return ApplicationWithConfigs.from_row(_row(record))
+
+    async def get_by_name(self, name: str) -> Optional[ApplicationWithConfigs]:
+        """Get application by its exact name, including related configuration IDs."""
+        record = self.store.reader.application_by_name(name)
+        if record is None:
+            return None
+        return ApplicationWithConfigs.from_row(_row(record))
+
+    async def search(self, text: str, offset: int = 0, limit: int = 20) -> List[ApplicationMatch]:
+        """Find applications whose name or comments contain text, exact and prefix name matches first.
+
+        The snapshot has no trigram index: this scans every application and
+        finds substrings only, each scored 1.0.
+        """
+        needle = text.lower()
+        matches = []
+        for record in self.store.reader.applications():
+            name = record["name"].lower()
+            if needle in name:
+                tier = 0 if name == needle else 1 if name.startswith(needle) else 2
+            elif needle in (record["comments"] or "").lower():
+                tier = 3
+            else:
+                continue
+            del record["configuration_ids"]
+            # Records come in name order and the sort is stable, so ties stay ordered by name
+            matches.append((tier, record))
+        matches.sort(key=lambda match: match[0])
+        return [
+            ApplicationMatch.from_row({**_row(record), "score": 1.0})
+            for _, record in matches[offset:offset + limit]
+        ]
+
+    async def get_page(self, fields: Tuple[str, ...], offset: int = 0, limit: Optional[int] = None) -> List[Any]:
+        """Get one page of applications ordered by name, with only the given fields."""
+        stop = offset + limit if limit is not None else None
+        return [
+            _sparse(ApplicationWithConfigs, fields, record)
+            for record in islice(self.store.reader.applications(), offset, stop)
+        ]
+
+    async def get_all(self) -> List[Application]:
+        """Get all applications, ordered by name."""
+        applications = []
+        for record in self.store.reader.applications():
+            del record["configuration_ids"]
+            applications.append(Application.from_row(_row(record)))
+        return applications
+
+    async def create(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot create applications in snapshot mode")
+
+    async def update(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot update applications in snapshot mode")
+
+    async def delete(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot delete applications in snapshot mode")
+
+    async def delete_multiple(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot delete applications in snapshot mode")
+
+
+class SnapshotConfigurationRepository:
+    """Configuration reads served from the snapshot, with ConfigurationRepository's read interface."""
+
+    def __init__(self, store: SnapshotStore):
+        self.store = store
+
+    def read_stats(self) -> Dict[str, Any]:
+        """Nothing to coalesce; reads are served from the memory map."""
+        return {}
+
+    async def get_by_id(self, config_id: str, fields: Fields = None) -> Optional[Configuration]:
+        """Get configuration by ID, optionally only the given fields."""
+        record = self.store.reader.configuration(config_id)
+        if record is None:
+            return None
+        if fields is not None:
+            return _sparse(Configuration, fields, record)
+        return Configuration.from_row(_row(record))
+
+    async def get_by_application(self, app_id: str) -> List[Configuration]:
+        """Get all configurations of an application, ordered by name."""
+        reader = self.store.reader
+        application = reader.application(app_id)
+        if application is None:
+            return []
+        records = (reader.configuration(config_id) for config_id in application["configuration_ids"])
+        configurations = [Configuration.from_row(_row(record)) for record in records if record is not None]
+        return sorted(configurations, key=lambda configuration: configuration.name)
+
+    async def get_lineage(self, config_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the given configurations and all of their ancestors, keyed by ID."""
+        reader = self.store.reader
+        lineage: Dict[str, Dict[str, Any]] = {}
+        pending = list(config_ids)
+        while pending:
+            config_id = pending.pop()
+            if config_id in lineage:
+                continue
+            record = reader.configuration(config_id)
+            if record is None:
+                continue
+            lineage[config_id] = {field: record[field] for field in LINEAGE_FIELDS}
+            pending.extend(record["parent_ids"] or ())
+        return lineage
+
+    async def create(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot create configurations in snapshot mode")
+
+    async def update(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot update configurations in snapshot mode")
+
+    async def delete(self, *args, **kwargs):
+        raise ReadOnlySnapshotError("Cannot delete configurations in snapshot mode")
@@ -0,0 +1,117 @@
+"""Tests for the snapshot-backed repositories."""
+
+from datetime import datetime
+import pytest
+from config_service.snapshot.format import write_snapshot
+from config_service.snapshot.repositories import (
+    ReadOnlySnapshotError, SnapshotApplicationRepository, SnapshotConfigurationRepository
+)
+from config_service.snapshot.store import SnapshotStore
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+APP_ID = "01HKQJQJQJQJQJQJQJQJQJQJQA"
+BASE_ID = "01HKQJQJQJQJQJQJQJQJQJQJC1"
+PROD_ID = "01HKQJQJQJQJQJQJQJQJQJQJC2"
+
+
+@pytest.fixture
+def store(tmp_path):
+    """A loaded snapshot with one application and a base -> prod configuration chain."""
+    path = tmp_path / "snapshot.bin"
+    write_snapshot(
+        path,
+        [{
+            "id": APP_ID, "name": "alpha", "comments": "edge", "created_at": NOW, "updated_at": NOW,
+            "version": 3, "configuration_ids": [BASE_ID, PROD_ID]
+        }],
+        [
+            {
+                "id": BASE_ID, "application_id": APP_ID, "name": "base", "comments": None, "config": {"a": 1},
+                "parent_ids": [], "created_at": NOW, "updated_at": NOW, "version": 1
+            },
+            {
+                "id": PROD_ID, "application_id": APP_ID, "name": "prod", "comments": None, "config": {"b": 2},
+                "parent_ids": [BASE_ID], "created_at": NOW, "updated_at": NOW, "version": 2
+            },
+        ]
+    )
+    store = SnapshotStore(str(path))
+    store.check()
+    return store
+
+
+async def test_application_reads(store):
+    """Test that application reads return the same models as the database repository."""
+    repository = SnapshotApplicationRepository(store)
+
+    application = await repository.get_by_id(APP_ID)
+    with_configs = await repository.get_by_id_with_configs(APP_ID)
+
+    assert application.name == "alpha" and application.version == 3
+    assert application.created_at == NOW
+    assert not hasattr(application, "configuration_ids")
+    assert with_configs.configuration_ids == [BASE_ID, PROD_ID]
+    assert [a.id for a in await repository.get_all()] == [APP_ID]
+    assert await repository.get_by_id(PROD_ID) is None
+
+
+async def test_sparse_reads(store):
+    """Test that field selections return only the selected fields."""
+    applications = SnapshotApplicationRepository(store)
+    configurations = SnapshotConfigurationRepository(store)
+
+    application = await applications.get_by_id_with_configs(APP_ID, ("name", "id", "configuration_ids"))
+    page = await applications.get_page(("name", "id"), offset=0, limit=1)
+    configuration = await configurations.get_by_id(PROD_ID, ("name", "id", "updated_at"))
+
+    assert application.model_dump() == {"name": "alpha", "id": APP_ID, "configuration_ids": [BASE_ID, PROD_ID]}
+    assert [a.model_dump() for a in page] == [{"name": "alpha", "id": APP_ID}]
+    assert await applications.get_page(("name", "id"), offset=1) == []
+    assert configuration.model_dump() == {"name": "prod", "id": PROD_ID, "updated_at": NOW}
+    assert [c.name for c in await configurations.get_by_application(APP_ID)] == ["base", "prod"]
+
+async def test_configuration_reads(store):
+    """Test configuration lookups and lineage walks."""
+    repository = SnapshotConfigurationRepository(store)
+
+    configuration = await repository.get_by_id(PROD_ID)
+    lineage = await repository.get_lineage([PROD_ID])
+
+    assert configuration.parent_ids == [BASE_ID] and configuration.updated_at == NOW
+    assert set(lineage) == {BASE_ID, PROD_ID}
+    assert lineage[BASE_ID] == {
+        "id": BASE_ID, "application_id": APP_ID, "name": "base", "config": {"a": 1}, "parent_ids": []
+    }
+    assert await repository.get_lineage(["01HKQJQJQJQJQJQJQJQJQJQJZZ"]) == {}
+
+
+async def test_writes_are_refused(store):
+    """Test that write methods raise instead of silently doing nothing."""
+    with pytest.raises(ReadOnlySnapshotError):
+        await SnapshotApplicationRepository(store).delete(APP_ID)
+    with pytest.raises(ReadOnlySnapshotError):
+        await SnapshotConfigurationRepository(store).update(PROD_ID, None)
+
+
+async def test_name_lookup_and_search(tmp_path):
+    """Test that names are looked up exactly and search ranks exact, prefix, substring, then comment matches."""
+    path = tmp_path / "snapshot.bin"
+    names = [("billing", None), ("billing-api", None), ("legacy-billing", None), ("ledger", "billing backend")]
+    write_snapshot(path, [
+        {
+            "id": f"01HKQJQJQJQJQJQJQJQJQJQJA{i}", "name": name, "comments": comments, "created_at": NOW,
+            "updated_at": NOW, "version": 1, "configuration_ids": []
+        }
+        for i, (name, comments) in enumerate(names)
+    ], [])
+    store = SnapshotStore(str(path))
+    store.check()
+    repository = SnapshotApplicationRepository(store)
+
+    found = await repository.get_by_name("billing-api")
+    matches = await repository.search("BILLING")
+
+    assert found.id == "01HKQJQJQJQJQJQJQJQJQJQJA1"
+    assert await repository.get_by_name("billing-ap") is None
+    assert [m.name for m in matches] == ["billing", "billing-api", "legacy-billing", "ledger"]
+    assert [m.name for m in await repository.search("billing", offset=1, limit=2)] == ["billing-api", "legacy-billing"]
@@ -0,0 +1,151 @@
+"""The snapshot currently being served, reloaded when a new file is published."""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from config_service.config import settings
+from config_service.database.pool import PoolTimeoutError
+from config_service.snapshot.format import SnapshotFormatError, SnapshotReader
+
+logger = logging.getLogger(__name__)
+
+# Methods that never change data and stay available in snapshot mode
+READ_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class SnapshotUnavailableError(PoolTimeoutError):
+    """Raised when no valid snapshot file has been published yet.
+
+    A PoolTimeoutError, so callers see a 503 with Retry-After just as they
+    would for an unavailable database.
+    """
+
+
+class SnapshotStore:
+    """Holds the reader of the current snapshot file and swaps it on change.
+
+    The file is polled every ``reload_interval`` seconds; publish a new
+    snapshot by renaming it over ``path`` (``write_snapshot`` does). A
+    file that fails to open is logged and the previous snapshot kept.
+    """
+
+    def __init__(self, path: Optional[str], reload_interval: float = 1.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._reader: Optional[SnapshotReader] = None
+        self._identity: Optional[Tuple[int, int, int]] = None
+        self._listeners: List[Callable[[], Any]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"reloads": 0, "reload_failures": 0}
+
+    @property
+    def reader(self) -> SnapshotReader:
+        """The current snapshot; raises SnapshotUnavailableError if there is none."""
+        if self._reader is None:
+            raise SnapshotUnavailableError(f"No snapshot loaded from {self.path}")
+        return self._reader
+
+    def on_reload(self, listener: Callable[[], Any]):
+        """Call listener after each swap, e.g. to drop caches built from the previous snapshot."""
+        self._listeners.append(listener)
+
+    def check(self) -> bool:
+        """Open the file at path if it changed since the last check; returns whether it was swapped."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+        identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if identity == self._identity:
+            return False
+        self._identity = identity
+        try:
+            reader = SnapshotReader(self.path)
+        except (OSError, SnapshotFormatError) as e:
+            self._stats["reload_failures"] += 1
+            logger.error("Failed to load snapshot %s: %s", self.path, e)
+            return False
+
+        previous, self._reader = self._reader, reader
+        if previous is not None:
+            previous.close()
+        self._stats["reloads"] += 1
+        logger.info(
+            "Loaded snapshot %s: %s applications, %s configurations",
+            self.path, reader.application_count, reader.configuration_count
+        )
+        for listener in self._listeners:
+            listener()
+        return True
+
+    def start(self):
+        """Load the snapshot and start watching for new ones on the running event loop."""
+        if not self.check():
+            logger.warning("No snapshot at %s yet; reads fail with 503 until one is published", self.path)
+        self._task = asyncio.get_running_loop().create_task(self._watch())
+
+    async def stop(self):
+        """Stop watching and unmap the current snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+            self._identity = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the loaded snapshot's size, age and counts plus reload counters."""
+        stats: Dict[str, Any] = {"path": self.path, "loaded": self._reader is not None, **self._stats}
+        if self._reader is not None:
+            stats.update(
+                applications=self._reader.application_count,
+                configurations=self._reader.configuration_count,
+                bytes=self._reader.size,
+                age_seconds=round(time.time() - self._reader.created_at, 3)
+            )
+        return stats
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                self.check()
+            except Exception as e:
+                logger.error("Snapshot reload check failed: %s", e)
+
+
+class ReadOnlyMiddleware:
+    """ASGI middleware that refuses API writes with 405 while serving a snapshot.
+
+    Paths outside ``prefix`` (admin, health) are left alone.
+    """
+
+    def __init__(self, app, prefix: str = "/api/"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in READ_METHODS or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        body = json.dumps({"detail": "This instance serves a read-only snapshot"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 405,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+                (b"allow", ", ".join(sorted(READ_METHODS)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+# Global snapshot store instance; only used when SNAPSHOT_PATH is set
+snapshot_store = SnapshotStore(settings.snapshot_path, settings.snapshot_reload_interval)
@@ -0,0 +1,104 @@
+"""Tests for the snapshot store and read-only mode."""
+
+import os
+from datetime import datetime
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config_service.snapshot.format import write_snapshot
+from config_service.snapshot.store import ReadOnlyMiddleware, SnapshotStore, SnapshotUnavailableError
+
+NOW = datetime(2024, 1, 1, 12, 0, 0)
+
+
+def publish(path, *names):
+    """Write a snapshot holding one application per name."""
+    applications = [
+        {
+            "id": f"01HKQJQJQJQJQJQJQJQJQJQJ{n:02d}", "name": name, "comments": None,
+            "created_at": NOW, "updated_at": NOW, "version": 1, "configuration_ids": []
+        }
+        for n, name in enumerate(names)
+    ]
+    write_snapshot(path, applications, [])
+
+
+def test_unavailable_until_published(tmp_path):
+    """Test that reads fail with a 503-mapped error until a snapshot exists."""
+    store = SnapshotStore(str(tmp_path / "snapshot.bin"))
+
+    assert store.check() is False
+    with pytest.raises(SnapshotUnavailableError):
+        store.reader
+
+
+def test_reloads_new_file_and_notifies(tmp_path):
+    """Test that a snapshot renamed over the old one is swapped in and listeners run."""
+    path = tmp_path / "snapshot.bin"
+    publish(path, "alpha")
+    store = SnapshotStore(str(path))
+    reloads = []
+    store.on_reload(lambda: reloads.append(store.reader.application_count))
+
+    assert store.check() is True
+    assert store.check() is False
+    publish(path, "alpha", "bravo")
+    assert store.check() is True
+
+    assert reloads == [1, 2]
+    assert store.stats()["reloads"] == 2
+
+
+def test_invalid_file_keeps_previous_snapshot(tmp_path):
+    """Test that a broken file is logged and the last good snapshot kept."""
+    path = tmp_path / "snapshot.bin"
+    publish(path, "alpha")
+    store = SnapshotStore(str(path))
+    store.check()
+
+    broken = tmp_path / "broken.bin"
+    broken.write_bytes(b"garbage")
+    os.replace(broken, path)
+
+    assert store.check() is False
+    assert store.reader.application_by_name("alpha") is not None
+    assert store.stats()["reload_failures"] == 1
+
+
+async def test_start_and_stop(tmp_path):
+    """Test that start loads the file and stop unmaps it."""
+    path = tmp_path / "snapshot.bin"
+    publish(path, "alpha")
+    store = SnapshotStore(str(path), reload_interval=60.0)
+
+    store.start()
+    assert store.stats()["applications"] == 1
+    await store.stop()
+
+    assert store.stats()["loaded"] is False
+
+
+def test_read_only_middleware_refuses_api_writes():
+    """Test that API writes get 405 while reads and non-API paths pass."""
+    app = FastAPI()
+
+    @app.get("/api/v1/things")
+    async def read():
+        return []
+
+    @app.post("/api/v1/things")
+    async def write():
+        return {}
+
+    @app.put("/admin/profiling")
+    async def admin():
+        return {}
+
+    app.add_middleware(ReadOnlyMiddleware)
+    client = TestClient(app)
+
+    assert client.get("/api/v1/things").status_code == 200
+    response = client.post("/api/v1/things", json={})
+    assert response.status_code == 405
+    assert response.headers["Allow"] == "GET, HEAD, OPTIONS"
+    assert client.put("/admin/profiling").status_code == 200
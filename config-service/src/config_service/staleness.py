@@ -0,0 +1,60 @@
+"""Flagging responses that were served from cache past their freshness lifetime."""
+
+import math
+from contextvars import ContextVar
+from typing import Optional
+
+STALE_HEADER = b"x-served-stale"
+
+
+class Staleness:
+    """Age of the oldest stale cache entry a request was answered from."""
+
+    __slots__ = ("age",)
+
+    def __init__(self):
+        self.age: Optional[float] = None
+
+
+current_staleness: ContextVar[Optional[Staleness]] = ContextVar("current_staleness", default=None)
+
+
+def mark_stale(age: float):
+    """Record that the current response uses cached data age seconds old and past its TTL."""
+    staleness = current_staleness.get()
+    if staleness is not None and (staleness.age is None or age > staleness.age):
+        staleness.age = age
+
+
+class StaleResponseMiddleware:
+    """ASGI middleware that adds ``X-Served-Stale: true`` and ``Age`` to responses built from stale data.
+
+    Caches serve expired entries while they refresh them in the background,
+    and keep serving them while the database is unavailable; these headers
+    let clients tell such last-known values from fresh ones.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        staleness = Staleness()
+        token = current_staleness.set(staleness)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and staleness.age is not None:
+                message["headers"] = [
+                    *message.get("headers", ()),
+                    (STALE_HEADER, b"true"),
+                    (b"age", str(math.floor(staleness.age)).encode("latin-1")),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_staleness.reset(token)
@@ -0,0 +1,45 @@
+"""Tests for stale response flagging."""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config_service.staleness import StaleResponseMiddleware, mark_stale
+
+
+def make_app() -> FastAPI:
+    """Build an app whose /stale route answers from a 42.7 second old entry."""
+    app = FastAPI()
+
+    @app.get("/fresh")
+    async def fresh():
+        return {"ok": True}
+
+    @app.get("/stale")
+    async def stale():
+        mark_stale(12.0)
+        mark_stale(42.7)
+        return {"ok": True}
+
+    app.add_middleware(StaleResponseMiddleware)
+    return app
+
+
+def test_stale_response_is_flagged_with_oldest_age():
+    """Test that responses built from stale data carry X-Served-Stale and the oldest entry's Age."""
+    response = TestClient(make_app()).get("/stale")
+
+    assert response.status_code == 200
+    assert response.headers["X-Served-Stale"] == "true"
+    assert response.headers["Age"] == "42"
+
+
+def test_fresh_response_is_not_flagged():
+    """Test that other responses are left alone."""
+    response = TestClient(make_app()).get("/fresh")
+
+    assert "X-Served-Stale" not in response.headers
+    assert "Age" not in response.headers
+
+
+def test_mark_stale_outside_a_request_is_ignored():
+    """Test that caches used outside HTTP requests can mark freely."""
+    mark_stale(1.0)
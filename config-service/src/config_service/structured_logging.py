@@ -0,0 +1,216 @@
+"""Structured JSON logging with a non-blocking queue handler and sampled request logs."""
+
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from ulid import ULID as ULIDGenerator
+from config_service.config import Settings
+
+request_id_var: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+access_logger = logging.getLogger("config_service.access")
+
+# Attributes every LogRecord has; anything else was passed through ``extra``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamp records with the current request id in the thread that logged them."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Render log records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and key != "request_id":
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that never blocks the caller and defers formatting to the listener.
+
+    Records are dropped (and counted) when the queue is full rather than
+    stalling a request on log I/O.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in-process, so the record can be formatted there
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class RouteSampler:
+    """Decide per route whether a successful request gets an access log entry."""
+
+    def __init__(self, default_rate: float = 1.0, route_rates: Optional[Dict[str, float]] = None):
+        self.default_rate = default_rate
+        self.route_rates = route_rates or {}
+
+    def rate_for(self, method: str, route: str) -> float:
+        """Return the sampling rate configured for a method and route template."""
+        return self.route_rates.get(f"{method} {route}", self.default_rate)
+
+    def should_log(self, method: str, route: str, status_code: int) -> bool:
+        """Always log server errors; sample everything else."""
+        if status_code >= 500:
+            return True
+        rate = self.rate_for(method, route)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+class RequestLoggingMiddleware:
+    """ASGI middleware that assigns request ids and emits one sampled access record per request."""
+
+    def __init__(self, app, sampler: RouteSampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope.get("headers", ()):
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        if not request_id:
+            request_id = str(ULIDGenerator())
+        token = request_id_var.set(request_id)
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or scope.get("path", "")
+            method = scope.get("method", "")
+            if self.sampler.should_log(method, template, status_code) and access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(
+                    "%s %s %s",
+                    method, template, status_code,
+                    extra={
+                        "method": method,
+                        "route": template,
+                        "path": scope.get("path"),
+                        "status": status_code,
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    }
+                )
+            request_id_var.reset(token)
+
+
+class LoggingManager:
+    """Owns the queue handler and background listener for the process."""
+
+    def __init__(self):
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._handler: Optional[NonBlockingQueueHandler] = None
+        # Root handlers replaced by configure, put back by stop
+        self._previous_handlers: List[logging.Handler] = []
+        self.log_payloads = False
+
+    def configure(self, settings: Settings):
+        """Route all logging through a bounded queue drained by a listener thread."""
+        self.stop()
+
+        output = logging.StreamHandler()
+        if settings.log_format == "json":
+            output.setFormatter(JsonFormatter())
+        else:
+            output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(request_id)s] %(name)s: %(message)s"))
+
+        self._handler = NonBlockingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+        self._handler.addFilter(RequestContextFilter())
+
+        root = logging.getLogger()
+        self._previous_handlers = list(root.handlers)
+        for handler in self._previous_handlers:
+            root.removeHandler(handler)
+        root.addHandler(self._handler)
+        root.setLevel(getattr(logging, settings.log_level.upper()))
+
+        self.log_payloads = settings.log_payloads
+        self._listener = logging.handlers.QueueListener(self._handler.queue, output, respect_handler_level=True)
+        self._listener.start()
+
+    def reset_after_fork(self, settings: Settings):
+        """Start a new queue and listener in a forked worker; the parent's thread did not survive the fork."""
+        self._listener = None
+        self.configure(settings)
+
+    def stop(self):
+        """Flush queued records, stop the listener thread and restore the previous root handlers.
+
+        Leaving the queue handler installed would queue records nobody drains.
+        """
+        if self._listener:
+            self._listener.stop()
+            self._listener = None
+        if self._handler:
+            root = logging.getLogger()
+            root.removeHandler(self._handler)
+            for handler in self._previous_handlers:
+                root.addHandler(handler)
+            self._previous_handlers = []
+            self._handler = None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and dropped record count."""
+        if not self._handler:
+            return {}
+        return {"queued": self._handler.queue.qsize(), "dropped": self._handler.dropped}
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any):
+    """Dump a request or row payload at DEBUG, only when payload logging is enabled."""
+    if logging_manager.log_payloads and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("%s: %r", message, payload)
+
+
+# Global logging manager instance
+logging_manager = LoggingManager()
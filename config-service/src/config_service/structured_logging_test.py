@@ -0,0 +1,162 @@
+"""Tests for structured logging."""
+
+import json
+import logging
+import queue
+from unittest.mock import patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from config_service.config import settings
+from config_service.structured_logging import (
+    JsonFormatter, LoggingManager, NonBlockingQueueHandler, RequestContextFilter, RequestLoggingMiddleware,
+    RouteSampler, log_payload, logging_manager, request_id_var
+)
+
+
+def make_record(msg="hello %s", args=("world",), **extra):
+    """Create a log record with optional extra attributes."""
+    record = logging.LogRecord("config_service.test", logging.INFO, __file__, 1, msg, args, None)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def test_json_formatter_renders_fields():
+    """Test that records render as JSON including request id and extras."""
+    record = make_record(request_id="req-1", duration_ms=1.5)
+    
+    entry = json.loads(JsonFormatter().format(record))
+    
+    assert entry["message"] == "hello world"
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "config_service.test"
+    assert entry["request_id"] == "req-1"
+    assert entry["duration_ms"] == 1.5
+
+
+def test_request_context_filter_stamps_request_id():
+    """Test that the filter copies the current request id onto records."""
+    token = request_id_var.set("req-42")
+    try:
+        record = make_record()
+        RequestContextFilter().filter(record)
+    finally:
+        request_id_var.reset(token)
+    
+    assert record.request_id == "req-42"
+
+
+def test_queue_handler_defers_formatting():
+    """Test that enqueued records keep their unformatted message and args."""
+    handler = NonBlockingQueueHandler(queue.Queue())
+    record = make_record()
+    
+    handler.emit(record)
+    
+    queued = handler.queue.get_nowait()
+    assert queued.msg == "hello %s"
+    assert queued.args == ("world",)
+
+
+def test_queue_handler_drops_when_full():
+    """Test that a full queue drops records instead of blocking."""
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    
+    handler.emit(make_record())
+    handler.emit(make_record())
+    
+    assert handler.dropped == 1
+
+
+def test_stop_restores_root_handlers():
+    """Test that stopping removes the queue handler, so records are not queued with no listener."""
+    root = logging.getLogger()
+    previous = list(root.handlers)
+    level = root.level
+    manager = LoggingManager()
+    try:
+        manager.configure(settings)
+        assert root.handlers == [manager._handler]
+        
+        manager.stop()
+        
+        assert root.handlers == previous
+        assert manager.stats() == {}
+    finally:
+        manager.stop()
+        root.setLevel(level)
+
+
+def test_route_sampler_rates():
+    """Test per-route sampling and that server errors are always logged."""
+    sampler = RouteSampler(default_rate=1.0, route_rates={"GET /api/v1/applications": 0.0})
+    
+    assert sampler.should_log("GET", "/api/v1/applications", 200) is False
+    assert sampler.should_log("GET", "/api/v1/applications", 500) is True
+    assert sampler.should_log("POST", "/api/v1/applications", 201) is True
+
+
+def test_log_payload_disabled_by_default(caplog):
+    """Test that payload dumps are suppressed unless enabled."""
+    logger = logging.getLogger("config_service.payload_test")
+    with caplog.at_level(logging.DEBUG, logger="config_service.payload_test"):
+        log_payload(logger, "Payload", {"secret": "value"})
+        assert "Payload" not in caplog.text
+        
+        with patch.object(logging_manager, "log_payloads", True):
+            log_payload(logger, "Payload", {"key": "value"})
+        assert "Payload" in caplog.text
+
+
+def make_app(sampler):
+    """Create a small app wrapped in the request logging middleware."""
+    app = FastAPI()
+    
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: str):
+        return {"id": item_id, "request_id": request_id_var.get()}
+    
+    app.add_middleware(RequestLoggingMiddleware, sampler=sampler)
+    return app
+
+
+def test_middleware_assigns_and_echoes_request_id():
+    """Test that a request id is generated, visible to handlers and returned."""
+    client = TestClient(make_app(RouteSampler()))
+    
+    response = client.get("/items/1")
+    
+    assert response.status_code == 200
+    assert response.headers["x-request-id"] == response.json()["request_id"]
+
+
+def test_middleware_preserves_incoming_request_id():
+    """Test that an incoming X-Request-ID header is reused."""
+    client = TestClient(make_app(RouteSampler()))
+    
+    response = client.get("/items/1", headers={"X-Request-ID": "abc"})
+    
+    assert response.headers["x-request-id"] == "abc"
+
+
+def test_middleware_logs_route_template(caplog):
+    """Test that access records carry the route template and timing."""
+    client = TestClient(make_app(RouteSampler()))
+    
+    with caplog.at_level(logging.INFO, logger="config_service.access"):
+        client.get("/items/7")
+    
+    record = next(r for r in caplog.records if r.name == "config_service.access")
+    assert record.route == "/items/{item_id}"
+    assert record.status == 200
+    assert record.duration_ms >= 0
+
+
+def test_middleware_sampling_suppresses_access_logs(caplog):
+    """Test that a zero sampling rate suppresses successful request logs."""
+    client = TestClient(make_app(RouteSampler(default_rate=0.0)))
+    
+    with caplog.at_level(logging.INFO, logger="config_service.access"):
+        client.get("/items/7")
+    
+    assert not [r for r in caplog.records if r.name == "config_service.access"]